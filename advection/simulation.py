@@ -11,13 +11,18 @@ import util.plot_tools as plot_tools
 
 class Simulation(NullSimulation):
 
-    def initialize(self):
+    def initialize(self, ng=4):
         """
         Initialize the grid and variables for advection and set the initial
         conditions for the chosen problem.
+
+        Parameters
+        ----------
+        ng : int, optional
+            The number of ghost cells to use
         """
 
-        my_grid = grid_setup(self.rp, ng=4)
+        my_grid = grid_setup(self.rp, ng=ng)
 
         # create the variables
         my_data = patch.CellCenterData2d(my_grid)
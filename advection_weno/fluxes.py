@@ -40,6 +40,57 @@ def fvs(q, order, u, alpha):
     return flux
 
 
+def fvs_multid(q, order, u, alpha, idir):
+    """
+    Perform Flux-Vector-Split (LF) finite differencing using WENO on
+    every row (or column) of a 2-d array at once.  This is equivalent
+    to calling fvs on each 1-d slice along direction idir.
+
+    Parameters
+    ----------
+
+    q : np array
+        input data with at least order+1 ghost zones
+    order : int
+        WENO order (k)
+    u : float
+        Advection velocity in this direction
+    alpha : float
+        Maximum characteristic speed
+    idir : int
+        The direction (array axis) the flux is computed in
+
+    Returns
+    -------
+
+    f : np array
+        flux through the lower edge of each zone.  Only the interfaces
+        with a full stencil on both sides are filled, the rest are zero.
+    """
+    flux = u * q
+    flux_p = (flux + alpha * q) / 2
+    flux_m = (flux - alpha * q) / 2
+
+    # the left-biased reconstruction to the right edge of zone i-1 and
+    # the right-biased reconstruction to the left edge of zone i both
+    # live on interface i-1/2
+    flux_p_r = reconstruction.weno_upwind_multid(flux_p, order, idir)
+    flux_m_l = reconstruction.weno_upwind_multid(flux_m, order, idir,
+                                                 reverse=True)
+
+    npts = q.shape[idir]
+
+    lo = [slice(None)] * q.ndim
+    lo[idir] = slice(order-1, npts-order-1)
+    hi = [slice(None)] * q.ndim
+    hi[idir] = slice(order, npts-order)
+
+    f = np.zeros_like(q)
+    f[tuple(hi)] = flux_p_r[tuple(lo)] + flux_m_l[tuple(hi)]
+
+    return f
+
+
 def fluxes(my_data, rp, dt):
     r"""
     Construct the fluxes through the interfaces for the linear advection
@@ -82,28 +133,23 @@ def fluxes(my_data, rp, dt):
     u = rp.get_param("advection.u")
     v = rp.get_param("advection.v")
 
-    qx = myg.qx
-    qy = myg.qy
-
     # --------------------------------------------------------------------------
     # WENO fvs
     # --------------------------------------------------------------------------
 
     weno_order = rp.get_param("advection.weno_order")
-    assert(weno_order in (2, 3)), "Currently only implemented weno_order=2, 3"
+    assert(weno_order in (2, 3, 4, 5)), "Currently only implemented weno_order=2, 3, 4, 5"
     assert(myg.ng > weno_order), "Need more ghosts than the weno_order"
 
-    q = a.v(buf=myg.ng)[:, :]
+    q = np.asarray(a)
     F_x = myg.scratch_array()
     F_y = myg.scratch_array()
 
     alpha = np.sqrt(u**2 + v**2)
 
-    # x-direction
-    for j in range(qy):
-        F_x.v(buf=myg.ng)[1:-1, j] = fvs(q[:, j], weno_order, u, alpha)[1:-1]
-    # y-direction
-    for i in range(qx):
-        F_y.v(buf=myg.ng)[i, 1:-1] = fvs(q[i, :], weno_order, v, alpha)[1:-1]
+    # reconstruct all the rows / columns in a single call for each
+    # direction
+    F_x[:, :] = fvs_multid(q, weno_order, u, alpha, 0)
+    F_y[:, :] = fvs_multid(q, weno_order, v, alpha, 1)
 
     return F_x, F_y
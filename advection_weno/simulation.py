@@ -8,6 +8,16 @@ import mesh.array_indexer as ai
 
 class Simulation(advection.Simulation):
 
+    def initialize(self):
+        """
+        Initialize the grid and variables for advection.  The WENO
+        stencils need more than weno_order ghost cells, so we may need
+        more than the default advection solver.
+        """
+
+        weno_order = self.rp.get_param("advection.weno_order")
+        super().initialize(ng=max(4, weno_order+1))
+
     def substep(self, myd):
         """
         take a single substep in the RK timestepping starting with the
@@ -3,14 +3,16 @@ compressible-specific boundary conditions.  Here, in particular, we
 implement an HSE BC in the vertical direction.
 
 Note: the pyro BC routines operate on a single variable at a time, so
-some work will necessarily be repeated.
+some work will necessarily be repeated.  To limit this, the HSE ghost
+cells of each variable are filled by a single compiled kernel.
 
 Also note: we may come in here with the aux_data (source terms), so
 we'll do a special case for them
 
 """
 
-import compressible.eos as eos
+from numba import njit
+
 from util import msg
 
 import math
@@ -45,95 +47,32 @@ def user(bc_name, bc_edge, variable, ccdata):
 
     if bc_name == "hse":
 
-        if bc_edge == "ylb":
+        if bc_edge not in ["ylb", "yrb"]:
+            msg.fail("error: hse BC not supported for xlb or xrb")
 
+        if bc_edge == "ylb":
             # lower y boundary
-
-            # we will take the density to be constant, the velocity to
-            # be outflow, and the pressure to be in HSE
-            if variable in ["density", "x-momentum", "y-momentum", "ymom_src", "E_src", "fuel", "ash"]:
-                v = ccdata.get_var(variable)
-                j = myg.jlo-1
-                while j >= 0:
-                    v[:, j] = v[:, myg.jlo]
-                    j -= 1
-
-            elif variable == "energy":
-                dens = ccdata.get_var("density")
-                xmom = ccdata.get_var("x-momentum")
-                ymom = ccdata.get_var("y-momentum")
-                ener = ccdata.get_var("energy")
-
-                grav = ccdata.get_aux("grav")
-                gamma = ccdata.get_aux("gamma")
-
-                dens_base = dens[:, myg.jlo]
-                ke_base = 0.5*(xmom[:, myg.jlo]**2 + ymom[:, myg.jlo]**2) / \
-                    dens[:, myg.jlo]
-
-                eint_base = (ener[:, myg.jlo] - ke_base)/dens[:, myg.jlo]
-                pres_base = eos.pres(gamma, dens_base, eint_base)
-
-                # we are assuming that the density is constant in this
-                # formulation of HSE, so the pressure comes simply from
-                # differencing the HSE equation
-                j = myg.jlo-1
-                while j >= 0:
-                    pres_below = pres_base - grav*dens_base*myg.dy
-                    rhoe = eos.rhoe(gamma, pres_below)
-
-                    ener[:, j] = rhoe + ke_base
-
-                    pres_base = pres_below.copy()
-
-                    j -= 1
-
-            else:
-                raise NotImplementedError("variable not defined")
-
-        elif bc_edge == "yrb":
-
+            jbase = myg.jlo
+            jdir = -1
+        else:
             # upper y boundary
+            jbase = myg.jhi
+            jdir = 1
 
-            # we will take the density to be constant, the velocity to
-            # be outflow, and the pressure to be in HSE
-            if variable in ["density", "x-momentum", "y-momentum", "ymom_src", "E_src", "fuel", "ash"]:
-                v = ccdata.get_var(variable)
-                for j in range(myg.jhi+1, myg.jhi+myg.ng+1):
-                    v[:, j] = v[:, myg.jhi]
-
-            elif variable == "energy":
-                dens = ccdata.get_var("density")
-                xmom = ccdata.get_var("x-momentum")
-                ymom = ccdata.get_var("y-momentum")
-                ener = ccdata.get_var("energy")
-
-                grav = ccdata.get_aux("grav")
-                gamma = ccdata.get_aux("gamma")
+        # we will take the density to be constant, the velocity to
+        # be outflow, and the pressure to be in HSE
+        if variable in ["density", "x-momentum", "y-momentum", "ymom_src", "E_src", "fuel", "ash"]:
+            hse_fill(jbase, jdir, myg.ng, myg.dy, 0.0, 0.0,
+                     ccdata.get_var(variable), None, None, None)
 
-                dens_base = dens[:, myg.jhi]
-                ke_base = 0.5*(xmom[:, myg.jhi]**2 + ymom[:, myg.jhi]**2) / \
-                    dens[:, myg.jhi]
-
-                eint_base = (ener[:, myg.jhi] - ke_base)/dens[:, myg.jhi]
-                pres_base = eos.pres(gamma, dens_base, eint_base)
-
-                # we are assuming that the density is constant in this
-                # formulation of HSE, so the pressure comes simply from
-                # differencing the HSE equation
-                for j in range(myg.jhi+1, myg.jhi+myg.ng+1):
-                    pres_above = pres_base + grav*dens_base*myg.dy
-                    rhoe = eos.rhoe(gamma, pres_above)
-
-                    ener[:, j] = rhoe + ke_base
-
-                    pres_base = pres_above.copy()
-
-            else:
-                raise NotImplementedError("variable not defined")
+        elif variable == "energy":
+            hse_fill(jbase, jdir, myg.ng, myg.dy,
+                     ccdata.get_aux("grav"), ccdata.get_aux("gamma"),
+                     ccdata.get_var("energy"), ccdata.get_var("density"),
+                     ccdata.get_var("x-momentum"), ccdata.get_var("y-momentum"))
 
         else:
-            msg.fail("error: hse BC not supported for xlb or xrb")
+            raise NotImplementedError("variable not defined")
 
     elif bc_name == "ramp":
         # Boundary conditions for double Mach reflection problem
@@ -213,6 +152,67 @@ def user(bc_name, bc_edge, variable, ccdata):
         msg.fail("error: bc type %s not supported" % (bc_name))
 
 
+@njit(cache=True)
+def hse_fill(jbase, jdir, ng, dy, grav, gamma, v, dens, xmom, ymom):
+    """
+    Fill the ghost cells of a y boundary for one variable, v, from the
+    base row jbase.  All of the columns are done in one pass.
+
+    If dens is None, v is just copied into the ghost cells.
+    Otherwise, v is the energy, and we integrate HSE outward from the
+    base row, assuming that the density, velocity and specific
+    internal energy are constant.
+
+    Parameters
+    ----------
+    jbase : int
+        The last valid row next to the boundary
+    jdir : int
+        The direction to the ghost cells: -1 for the lower boundary,
+        +1 for the upper boundary
+    ng : int
+        The number of ghost cells
+    dy : float
+        The grid spacing in y
+    grav : float
+        The gravitational acceleration
+    gamma : float
+        The ratio of specific heats
+    v : ndarray
+        The variable to fill
+    dens, xmom, ymom : ndarray or None
+        The density and momenta, for the energy fill
+    """
+
+    qx = v.shape[0]
+
+    if dens is None:
+        for i in range(qx):
+            for k in range(ng):
+                v[i, jbase + jdir*(k+1)] = v[i, jbase]
+        return
+
+    for i in range(qx):
+        rho = dens[i, jbase]
+        mx = xmom[i, jbase]
+        my = ymom[i, jbase]
+
+        ke = 0.5*(mx*mx + my*my) / rho
+        eint = (v[i, jbase] - ke)/rho
+        p = rho*eint*(gamma - 1.0)
+
+        # we are assuming that the density is constant in this
+        # formulation of HSE, so the pressure comes simply from
+        # differencing the HSE equation
+        for k in range(ng):
+            if jdir < 0:
+                p = p - grav*rho*dy
+            else:
+                p = p + grav*rho*dy
+
+            v[i, jbase + jdir*(k+1)] = p/(gamma - 1.0) + ke
+
+
 def inflow_post_bc(var, g):
     # inflow boundary condition with post shock setup
     r_l = 8.0
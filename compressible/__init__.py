@@ -6,4 +6,4 @@ second-order (piecewise-linear), unsplit method of Colella 1990.
 
 __all__ = ["simulation"]
 
-from .simulation import Variables, Simulation, cons_to_prim, prim_to_cons
+from .simulation import Variables, Simulation, cons_to_prim, prim_to_cons, signal_speeds
@@ -16,19 +16,21 @@ def derive_primitives(myd, varnames):
 
     derived_vars = []
 
-    u = xmom/dens
-    v = ymom/dens
-
-    e = (ener - 0.5*dens*(u*u + v*v))/dens
-
-    gamma = myd.get_aux("gamma")
-    p = eos.pres(gamma, dens, e)
-
     if isinstance(varnames, str):
         wanted = [varnames]
     else:
         wanted = list(varnames)
 
+    u = xmom/dens
+    v = ymom/dens
+
+    # only find the energy and pressure if we need them
+    if any(var != "velocity" for var in wanted):
+        e = (ener - 0.5*dens*(u*u + v*v))/dens
+
+        gamma = myd.get_aux("gamma")
+        p = eos.pres(gamma, dens, e)
+
     for var in wanted:
 
         if var == "velocity":
@@ -1,5 +1,105 @@
+import types
+
+import numba
 import numpy as np
-from numba import njit
+from numba import njit, prange
+
+from util import msg
+
+
+@njit(cache=True)
+def _states_zone(idir, dtdx, dtdx4, ns,
+                 irho, iu, iv, ip, ix, nspec,
+                 gamma, q, dq, lvec, rvec, e_val, betal, betar, q_l, q_r):
+    """
+    predict the state in a single zone to its two edges in direction
+    idir (see :func:`states`).  q and dq are the zone's primitive
+    state and limited slopes, and lvec, rvec, e_val, betal, and betar
+    are scratch space.  The state on the right edge of the zone (the
+    left state of that interface) is returned in q_l and the state on
+    the left edge (the right state of that interface) in q_r.
+    """
+
+    nvar = q.shape[0]
+
+    cs = np.sqrt(gamma * q[ip] / q[irho])
+
+    lvec[:, :] = 0.0
+    rvec[:, :] = 0.0
+    e_val[:] = 0.0
+
+    # compute the eigenvalues and eigenvectors.  The left eigenvectors
+    # are the rows of lvec and the right eigenvectors are the columns
+    # of rvec, so the products below are on contiguous data.  Only
+    # the nonzero entries are set.
+    if (idir == 1):
+        un = iu
+        ut = iv
+    else:
+        un = iv
+        ut = iu
+
+    e_val[0] = q[un] - cs
+    e_val[1] = q[un]
+    e_val[2] = q[un]
+    e_val[3] = q[un] + cs
+
+    lvec[0, un] = -0.5 * q[irho] / cs
+    lvec[0, ip] = 0.5 / (cs * cs)
+
+    lvec[1, irho] = 1.0
+    lvec[1, ip] = -1.0 / (cs * cs)
+
+    lvec[2, ut] = 1.0
+
+    lvec[3, un] = 0.5 * q[irho] / cs
+    lvec[3, ip] = 0.5 / (cs * cs)
+
+    rvec[irho, 0] = 1.0
+    rvec[un, 0] = -cs / q[irho]
+    rvec[ip, 0] = cs * cs
+
+    rvec[irho, 1] = 1.0
+
+    rvec[ut, 2] = 1.0
+
+    rvec[irho, 3] = 1.0
+    rvec[un, 3] = cs / q[irho]
+    rvec[ip, 3] = cs * cs
+
+    # now the species -- they only have a 1 in their corresponding slot
+    e_val[ns:] = q[un]
+    for n in range(ix, ix + nspec):
+        lvec[n, n] = 1.0
+        rvec[n, n] = 1.0
+
+    # define the reference states
+    # this is one the right face of the current zone,
+    # so the fastest moving eigenvalue is e_val[3] = u + c
+    factor = 0.5 * (1.0 - dtdx * max(e_val[3], 0.0))
+    q_l[:] = q + factor * dq
+
+    # left face of the current zone, so the fastest moving
+    # eigenvalue is e_val[3] = u - c
+    factor = 0.5 * (1.0 + dtdx * min(e_val[0], 0.0))
+    q_r[:] = q - factor * dq
+
+    # compute the Vhat functions
+    for m in range(nvar):
+        sum = np.dot(lvec[m, :], dq)
+
+        betal[m] = dtdx4 * (e_val[3] - e_val[m]) * \
+            (np.copysign(1.0, e_val[m]) + 1.0) * sum
+        betar[m] = dtdx4 * (e_val[0] - e_val[m]) * \
+            (1.0 - np.copysign(1.0, e_val[m])) * sum
+
+    # construct the states
+    for m in range(nvar):
+        sum_l = np.dot(betal, rvec[m, :])
+        sum_r = np.dot(betar, rvec[m, :])
+
+        q_l[m] = q_l[m] + sum_l
+        q_r[m] = q_r[m] + sum_r
 
 
 @njit(cache=True)
@@ -106,112 +206,277 @@ def states(idir, ng, dx, dt,
     dtdx = dt / dx
     dtdx4 = 0.25 * dtdx
 
-    lvec = np.zeros((nvar, nvar))
-    rvec = np.zeros((nvar, nvar))
-    e_val = np.zeros(nvar)
-    betal = np.zeros(nvar)
-    betar = np.zeros(nvar)
-
     # this is the loop over zones.  For zone i, we see q_l[i+1] and q_r[i]
-    for i in range(ilo - 2, ihi + 2):
+    for i in prange(ilo - 2, ihi + 2):
+
+        # scratch space -- allocated for each i so the threaded
+        # version has a private copy
+        lvec = np.zeros((nvar, nvar))
+        rvec = np.zeros((nvar, nvar))
+        e_val = np.zeros(nvar)
+        betal = np.zeros(nvar)
+        betar = np.zeros(nvar)
+
         for j in range(jlo - 2, jhi + 2):
 
-            dq = dqv[i, j, :]
-            q = qv[i, j, :]
+            if (idir == 1):
+                _states_zone(idir, dtdx, dtdx4, ns,
+                             irho, iu, iv, ip, ix, nspec,
+                             gamma, qv[i, j, :], dqv[i, j, :],
+                             lvec, rvec, e_val, betal, betar,
+                             q_l[i + 1, j, :], q_r[i, j, :])
+            else:
+                _states_zone(idir, dtdx, dtdx4, ns,
+                             irho, iu, iv, ip, ix, nspec,
+                             gamma, qv[i, j, :], dqv[i, j, :],
+                             lvec, rvec, e_val, betal, betar,
+                             q_l[i, j + 1, :], q_r[i, j, :])
 
-            cs = np.sqrt(gamma * q[ip] / q[irho])
+    return q_l, q_r
 
-            lvec[:, :] = 0.0
-            rvec[:, :] = 0.0
-            e_val[:] = 0.0
 
-            # compute the eigenvalues and eigenvectors
-            if (idir == 1):
-                e_val[:] = np.array([q[iu] - cs, q[iu], q[iu], q[iu] + cs])
-
-                lvec[0, :ns] = [0.0, -0.5 *
-                                 q[irho] / cs, 0.0, 0.5 / (cs * cs)]
-                lvec[1, :ns] = [1.0, 0.0,
-                                 0.0, -1.0 / (cs * cs)]
-                lvec[2, :ns] = [0.0, 0.0,             1.0, 0.0]
-                lvec[3, :ns] = [0.0, 0.5 *
-                                 q[irho] / cs,  0.0, 0.5 / (cs * cs)]
-
-                rvec[0, :ns] = [1.0, -cs / q[irho], 0.0, cs * cs]
-                rvec[1, :ns] = [1.0, 0.0,       0.0, 0.0]
-                rvec[2, :ns] = [0.0, 0.0,       1.0, 0.0]
-                rvec[3, :ns] = [1.0, cs / q[irho],  0.0, cs * cs]
-
-                # now the species -- they only have a 1 in their corresponding slot
-                e_val[ns:] = q[iu]
-                for n in range(ix, ix + nspec):
-                    lvec[n, n] = 1.0
-                    rvec[n, n] = 1.0
+@njit(cache=True)
+def _on_wall(idir, i, j, ilo, ihi, jlo, jhi, lower_solid, upper_solid):
+    """
+    is interface (i, j) in direction idir on a solid boundary?
+    """
+
+    if (idir == 1):
+        return ((i == ilo and lower_solid == 1) or
+                (i == ihi + 1 and upper_solid == 1))
+
+    return ((j == jlo and lower_solid == 1) or
+            (j == jhi + 1 and upper_solid == 1))
+
+
+@njit(cache=True)
+def _riemann_cgf_face(idir, idens, ixmom, iymom, iener, irhoX, nspec,
+                      wall, gamma, U_l, U_r, F):
+    """
+    solve the CGF Riemann problem (see :func:`riemann_cgf`) for a
+    single interface, with conserved states U_l and U_r, and store
+    the flux in F.  If wall is set, the interface is a solid wall,
+    and the normal velocity is set to zero.
+    """
+
+    smallc = 1.e-10
+    smallrho = 1.e-10
+    smallp = 1.e-10
+
+    # primitive variable states
+    rho_l = U_l[idens]
+
+    # un = normal velocity; ut = transverse velocity
+    if (idir == 1):
+        un_l = U_l[ixmom] / rho_l
+        ut_l = U_l[iymom] / rho_l
+    else:
+        un_l = U_l[iymom] / rho_l
+        ut_l = U_l[ixmom] / rho_l
+
+    rhoe_l = U_l[iener] - 0.5 * rho_l * (un_l**2 + ut_l**2)
+
+    p_l = rhoe_l * (gamma - 1.0)
+    p_l = max(p_l, smallp)
+
+    rho_r = U_r[idens]
+
+    if (idir == 1):
+        un_r = U_r[ixmom] / rho_r
+        ut_r = U_r[iymom] / rho_r
+    else:
+        un_r = U_r[iymom] / rho_r
+        ut_r = U_r[ixmom] / rho_r
+
+    rhoe_r = U_r[iener] - 0.5 * rho_r * (un_r**2 + ut_r**2)
+
+    p_r = rhoe_r * (gamma - 1.0)
+    p_r = max(p_r, smallp)
+
+    # define the Lagrangian sound speed
+    W_l = max(smallrho * smallc, np.sqrt(gamma * p_l * rho_l))
+    W_r = max(smallrho * smallc, np.sqrt(gamma * p_r * rho_r))
+
+    # and the regular sound speeds
+    c_l = max(smallc, np.sqrt(gamma * p_l / rho_l))
+    c_r = max(smallc, np.sqrt(gamma * p_r / rho_r))
+
+    # define the star states
+    pstar = (W_l * p_r + W_r * p_l + W_l *
+             W_r * (un_l - un_r)) / (W_l + W_r)
+    pstar = max(pstar, smallp)
+    ustar = (W_l * un_l + W_r * un_r + (p_l - p_r)) / (W_l + W_r)
+
+    # now compute the remaining state to the left and right
+    # of the contact (in the star region)
+    rhostar_l = rho_l + (pstar - p_l) / c_l**2
+    rhostar_r = rho_r + (pstar - p_r) / c_r**2
+
+    rhoestar_l = rhoe_l + \
+        (pstar - p_l) * (rhoe_l / rho_l + p_l / rho_l) / c_l**2
+    rhoestar_r = rhoe_r + \
+        (pstar - p_r) * (rhoe_r / rho_r + p_r / rho_r) / c_r**2
+
+    cstar_l = max(smallc, np.sqrt(gamma * pstar / rhostar_l))
+    cstar_r = max(smallc, np.sqrt(gamma * pstar / rhostar_r))
+
+    # figure out which state we are in, based on the location of
+    # the waves
+    if (ustar > 0.0):
+
+        # contact is moving to the right, we need to understand
+        # the L and *L states
+
+        # Note: transverse velocity only jumps across contact
+        ut_state = ut_l
+
+        # define eigenvalues
+        lambda_l = un_l - c_l
+        lambdastar_l = ustar - cstar_l
+
+        if (pstar > p_l):
+            # the wave is a shock -- find the shock speed
+            sigma = (lambda_l + lambdastar_l) / 2.0
+
+            if (sigma > 0.0):
+                # shock is moving to the right -- solution is L state
+                rho_state = rho_l
+                un_state = un_l
+                p_state = p_l
+                rhoe_state = rhoe_l
 
             else:
-                e_val[:] = np.array([q[iv] - cs, q[iv], q[iv], q[iv] + cs])
-
-                lvec[0, :ns] = [0.0, 0.0, -0.5 *
-                                 q[irho] / cs, 0.5 / (cs * cs)]
-                lvec[1, :ns] = [1.0, 0.0,
-                                 0.0,             -1.0 / (cs * cs)]
-                lvec[2, :ns] = [0.0, 1.0, 0.0,             0.0]
-                lvec[3, :ns] = [0.0, 0.0, 0.5 *
-                                 q[irho] / cs,  0.5 / (cs * cs)]
-
-                rvec[0, :ns] = [1.0, 0.0, -cs / q[irho], cs * cs]
-                rvec[1, :ns] = [1.0, 0.0, 0.0,       0.0]
-                rvec[2, :ns] = [0.0, 1.0, 0.0,       0.0]
-                rvec[3, :ns] = [1.0, 0.0, cs / q[irho],  cs * cs]
-
-                # now the species -- they only have a 1 in their corresponding slot
-                e_val[ns:] = q[iv]
-                for n in range(ix, ix + nspec):
-                    lvec[n, n] = 1.0
-                    rvec[n, n] = 1.0
-
-            # define the reference states
-            if (idir == 1):
-                # this is one the right face of the current zone,
-                # so the fastest moving eigenvalue is e_val[3] = u + c
-                factor = 0.5 * (1.0 - dtdx * max(e_val[3], 0.0))
-                q_l[i + 1, j, :] = q + factor * dq
+                # solution is *L state
+                rho_state = rhostar_l
+                un_state = ustar
+                p_state = pstar
+                rhoe_state = rhoestar_l
+
+        else:
+            # the wave is a rarefaction
+            if (lambda_l < 0.0 and lambdastar_l < 0.0):
+                # rarefaction fan is moving to the left -- solution is
+                # *L state
+                rho_state = rhostar_l
+                un_state = ustar
+                p_state = pstar
+                rhoe_state = rhoestar_l
 
-                # left face of the current zone, so the fastest moving
-                # eigenvalue is e_val[3] = u - c
-                factor = 0.5 * (1.0 + dtdx * min(e_val[0], 0.0))
-                q_r[i,  j, :] = q - factor * dq
+            elif (lambda_l > 0.0 and lambdastar_l > 0.0):
+                # rarefaction fan is moving to the right -- solution is
+                # L state
+                rho_state = rho_l
+                un_state = un_l
+                p_state = p_l
+                rhoe_state = rhoe_l
 
             else:
+                # rarefaction spans x/t = 0 -- interpolate
+                alpha = lambda_l / (lambda_l - lambdastar_l)
 
-                factor = 0.5 * (1.0 - dtdx * max(e_val[3], 0.0))
-                q_l[i, j + 1, :] = q + factor * dq
+                rho_state = alpha * rhostar_l + (1.0 - alpha) * rho_l
+                un_state = alpha * ustar + (1.0 - alpha) * un_l
+                p_state = alpha * pstar + (1.0 - alpha) * p_l
+                rhoe_state = alpha * rhoestar_l + \
+                    (1.0 - alpha) * rhoe_l
 
-                factor = 0.5 * (1.0 + dtdx * min(e_val[0], 0.0))
-                q_r[i, j, :] = q - factor * dq
+    elif (ustar < 0):
 
-            # compute the Vhat functions
-            for m in range(nvar):
-                sum = np.dot(lvec[m, :], dq)
+        # contact moving left, we need to understand the R and *R
+        # states
 
-                betal[m] = dtdx4 * (e_val[3] - e_val[m]) * \
-                    (np.copysign(1.0, e_val[m]) + 1.0) * sum
-                betar[m] = dtdx4 * (e_val[0] - e_val[m]) * \
-                    (1.0 - np.copysign(1.0, e_val[m])) * sum
+        # Note: transverse velocity only jumps across contact
+        ut_state = ut_r
 
-            # construct the states
-            for m in range(nvar):
-                sum_l = np.dot(betal, rvec[:, m])
-                sum_r = np.dot(betar, rvec[:, m])
+        # define eigenvalues
+        lambda_r = un_r + c_r
+        lambdastar_r = ustar + cstar_r
 
-                if (idir == 1):
-                    q_l[i + 1, j, m] = q_l[i + 1, j, m] + sum_l
-                    q_r[i,  j, m] = q_r[i,  j, m] + sum_r
-                else:
-                    q_l[i, j + 1, m] = q_l[i, j + 1, m] + sum_l
-                    q_r[i, j,  m] = q_r[i, j,  m] + sum_r
+        if (pstar > p_r):
+            # the wave if a shock -- find the shock speed
+            sigma = (lambda_r + lambdastar_r) / 2.0
 
-    return q_l, q_r
+            if (sigma > 0.0):
+                # shock is moving to the right -- solution is *R state
+                rho_state = rhostar_r
+                un_state = ustar
+                p_state = pstar
+                rhoe_state = rhoestar_r
+
+            else:
+                # solution is R state
+                rho_state = rho_r
+                un_state = un_r
+                p_state = p_r
+                rhoe_state = rhoe_r
+
+        else:
+            # the wave is a rarefaction
+            if (lambda_r < 0.0 and lambdastar_r < 0.0):
+                # rarefaction fan is moving to the left -- solution is
+                # R state
+                rho_state = rho_r
+                un_state = un_r
+                p_state = p_r
+                rhoe_state = rhoe_r
+
+            elif (lambda_r > 0.0 and lambdastar_r > 0.0):
+                # rarefaction fan is moving to the right -- solution is
+                # *R state
+                rho_state = rhostar_r
+                un_state = ustar
+                p_state = pstar
+                rhoe_state = rhoestar_r
+
+            else:
+                # rarefaction spans x/t = 0 -- interpolate
+                alpha = lambda_r / (lambda_r - lambdastar_r)
+
+                rho_state = alpha * rhostar_r + (1.0 - alpha) * rho_r
+                un_state = alpha * ustar + (1.0 - alpha) * un_r
+                p_state = alpha * pstar + (1.0 - alpha) * p_r
+                rhoe_state = alpha * rhoestar_r + \
+                    (1.0 - alpha) * rhoe_r
+
+    else:  # ustar == 0
+
+        rho_state = 0.5 * (rhostar_l + rhostar_r)
+        un_state = ustar
+        ut_state = 0.5 * (ut_l + ut_r)
+        p_state = pstar
+        rhoe_state = 0.5 * (rhoestar_l + rhoestar_r)
+
+    # species now
+    if (nspec > 0):
+        if (ustar > 0.0):
+            xn = U_l[irhoX:irhoX + nspec] / U_l[idens]
+
+        elif (ustar < 0.0):
+            xn = U_r[irhoX:irhoX + nspec] / U_r[idens]
+        else:
+            xn = 0.5 * (U_l[irhoX:irhoX + nspec] / U_l[idens] +
+                        U_r[irhoX:irhoX + nspec] / U_r[idens])
+
+    # are we on a solid boundary?
+    if wall:
+        un_state = 0.0
+
+    # compute the fluxes
+    F[idens] = rho_state * un_state
+
+    if (idir == 1):
+        F[ixmom] = rho_state * un_state**2 + p_state
+        F[iymom] = rho_state * ut_state * un_state
+    else:
+        F[ixmom] = rho_state * ut_state * un_state
+        F[iymom] = rho_state * un_state**2 + p_state
+
+    F[iener] = rhoe_state * un_state + \
+        0.5 * rho_state * (un_state**2 + ut_state**2) * un_state + \
+        p_state * un_state
+
+    if (nspec > 0):
+        F[irhoX:irhoX + nspec] = xn * rho_state * un_state
 
 
 @njit(cache=True)
@@ -275,6 +540,89 @@ def riemann_cgf(idir, ng,
 
     F = np.zeros((qx, qy, nvar))
 
+    nx = qx - 2 * ng
+    ny = qy - 2 * ng
+    ilo = ng
+    ihi = ng + nx
+    jlo = ng
+    jhi = ng + ny
+
+    for i in prange(ilo - 1, ihi + 1):
+        for j in range(jlo - 1, jhi + 1):
+
+            wall = _on_wall(idir, i, j, ilo, ihi, jlo, jhi,
+                            lower_solid, upper_solid)
+
+            _riemann_cgf_face(idir, idens, ixmom, iymom, iener, irhoX, nspec,
+                              wall, gamma, U_l[i, j, :], U_r[i, j, :], F[i, j, :])
+
+    return F
+
+
+@njit(cache=True)
+def riemann_prim(idir, ng,
+                 irho, iu, iv, ip, iX, nspec,
+                 lower_solid, upper_solid,
+                 gamma, q_l, q_r):
+    r"""
+    this is like riemann_cgf, except that it works on a primitive
+    variable input state and returns the primitive variable interface
+    state
+
+    Solve riemann shock tube problem for a general equation of
+    state using the method of Colella, Glaz, and Ferguson.  See
+    Almgren et al. 2010 (the CASTRO paper) for details.
+
+    The Riemann problem for the Euler's equation produces 4 regions,
+    separated by the three characteristics :math:`(u - cs, u, u + cs)`::
+
+
+           u - cs    t    u      u + cs
+             \       ^   .       /
+              \  *L  |   . *R   /
+               \     |  .     /
+                \    |  .    /
+            L    \   | .   /    R
+                  \  | .  /
+                   \ |. /
+                    \|./
+           ----------+----------------> x
+
+    We care about the solution on the axis.  The basic idea is to use
+    estimates of the wave speeds to figure out which region we are in,
+    and: use jump conditions to evaluate the state there.
+
+    Only density jumps across the :math:`u` characteristic.  All primitive
+    variables jump across the other two.  Special attention is needed
+    if a rarefaction spans the axis.
+
+    Parameters
+    ----------
+    idir : int
+        Are we predicting to the edges in the x-direction (1) or y-direction (2)?
+    ng : int
+        The number of ghost cells
+    nspec : int
+        The number of species
+    irho, iu, iv, ip, iX : int
+        The indices of the density, x-velocity, y-velocity, pressure and species fractions in the state vector.
+    lower_solid, upper_solid : int
+        Are we at lower or upper solid boundaries?
+    gamma : float
+        Adiabatic index
+    q_l, q_r : ndarray
+        Primitive state on the left and right cell edges.
+
+    Returns
+    -------
+    out : ndarray
+        Primitive flux
+    """
+
+    qx, qy, nvar = q_l.shape
+
+    q_int = np.zeros((qx, qy, nvar))
+
     smallc = 1.e-10
     smallrho = 1.e-10
     smallp = 1.e-10
@@ -286,40 +634,38 @@ def riemann_cgf(idir, ng,
     jlo = ng
     jhi = ng + ny
 
-    for i in range(ilo - 1, ihi + 1):
+    for i in prange(ilo - 1, ihi + 1):
         for j in range(jlo - 1, jhi + 1):
 
             # primitive variable states
-            rho_l = U_l[i, j, idens]
+            rho_l = q_l[i, j, irho]
 
             # un = normal velocity; ut = transverse velocity
             if (idir == 1):
-                un_l = U_l[i, j, ixmom] / rho_l
-                ut_l = U_l[i, j, iymom] / rho_l
+                un_l = q_l[i, j, iu]
+                ut_l = q_l[i, j, iv]
             else:
-                un_l = U_l[i, j, iymom] / rho_l
-                ut_l = U_l[i, j, ixmom] / rho_l
-
-            rhoe_l = U_l[i, j, iener] - 0.5 * rho_l * (un_l**2 + ut_l**2)
+                un_l = q_l[i, j, iv]
+                ut_l = q_l[i, j, iu]
 
-            p_l = rhoe_l * (gamma - 1.0)
+            p_l = q_l[i, j, ip]
             p_l = max(p_l, smallp)
 
-            rho_r = U_r[i, j, idens]
+            rho_r = q_r[i, j, irho]
 
             if (idir == 1):
-                un_r = U_r[i, j, ixmom] / rho_r
-                ut_r = U_r[i, j, iymom] / rho_r
+                un_r = q_r[i, j, iu]
+                ut_r = q_r[i, j, iv]
             else:
-                un_r = U_r[i, j, iymom] / rho_r
-                ut_r = U_r[i, j, ixmom] / rho_r
-
-            rhoe_r = U_r[i, j, iener] - 0.5 * rho_r * (un_r**2 + ut_r**2)
+                un_r = q_r[i, j, iv]
+                ut_r = q_r[i, j, iu]
 
-            p_r = rhoe_r * (gamma - 1.0)
+            p_r = q_r[i, j, ip]
             p_r = max(p_r, smallp)
 
             # define the Lagrangian sound speed
+            rho_l = max(smallrho, rho_l)
+            rho_r = max(smallrho, rho_r)
             W_l = max(smallrho * smallc, np.sqrt(gamma * p_l * rho_l))
             W_r = max(smallrho * smallc, np.sqrt(gamma * p_r * rho_r))
 
@@ -338,11 +684,6 @@ def riemann_cgf(idir, ng,
             rhostar_l = rho_l + (pstar - p_l) / c_l**2
             rhostar_r = rho_r + (pstar - p_r) / c_r**2
 
-            rhoestar_l = rhoe_l + \
-                (pstar - p_l) * (rhoe_l / rho_l + p_l / rho_l) / c_l**2
-            rhoestar_r = rhoe_r + \
-                (pstar - p_r) * (rhoe_r / rho_r + p_r / rho_r) / c_r**2
-
             cstar_l = max(smallc, np.sqrt(gamma * pstar / rhostar_l))
             cstar_r = max(smallc, np.sqrt(gamma * pstar / rhostar_r))
 
@@ -369,14 +710,12 @@ def riemann_cgf(idir, ng,
                         rho_state = rho_l
                         un_state = un_l
                         p_state = p_l
-                        rhoe_state = rhoe_l
 
                     else:
                         # solution is *L state
                         rho_state = rhostar_l
                         un_state = ustar
                         p_state = pstar
-                        rhoe_state = rhoestar_l
 
                 else:
                     # the wave is a rarefaction
@@ -386,7 +725,6 @@ def riemann_cgf(idir, ng,
                         rho_state = rhostar_l
                         un_state = ustar
                         p_state = pstar
-                        rhoe_state = rhoestar_l
 
                     elif (lambda_l > 0.0 and lambdastar_l > 0.0):
                         # rarefaction fan is moving to the right -- solution is
@@ -394,7 +732,6 @@ def riemann_cgf(idir, ng,
                         rho_state = rho_l
                         un_state = un_l
                         p_state = p_l
-                        rhoe_state = rhoe_l
 
                     else:
                         # rarefaction spans x/t = 0 -- interpolate
@@ -403,8 +740,6 @@ def riemann_cgf(idir, ng,
                         rho_state = alpha * rhostar_l + (1.0 - alpha) * rho_l
                         un_state = alpha * ustar + (1.0 - alpha) * un_l
                         p_state = alpha * pstar + (1.0 - alpha) * p_l
-                        rhoe_state = alpha * rhoestar_l + \
-                            (1.0 - alpha) * rhoe_l
 
             elif (ustar < 0):
 
@@ -427,14 +762,12 @@ def riemann_cgf(idir, ng,
                         rho_state = rhostar_r
                         un_state = ustar
                         p_state = pstar
-                        rhoe_state = rhoestar_r
 
                     else:
                         # solution is R state
                         rho_state = rho_r
                         un_state = un_r
                         p_state = p_r
-                        rhoe_state = rhoe_r
 
                 else:
                     # the wave is a rarefaction
@@ -444,7 +777,6 @@ def riemann_cgf(idir, ng,
                         rho_state = rho_r
                         un_state = un_r
                         p_state = p_r
-                        rhoe_state = rhoe_r
 
                     elif (lambda_r > 0.0 and lambdastar_r > 0.0):
                         # rarefaction fan is moving to the right -- solution is
@@ -452,7 +784,6 @@ def riemann_cgf(idir, ng,
                         rho_state = rhostar_r
                         un_state = ustar
                         p_state = pstar
-                        rhoe_state = rhoestar_r
 
                     else:
                         # rarefaction spans x/t = 0 -- interpolate
@@ -461,8 +792,6 @@ def riemann_cgf(idir, ng,
                         rho_state = alpha * rhostar_r + (1.0 - alpha) * rho_r
                         un_state = alpha * ustar + (1.0 - alpha) * un_r
                         p_state = alpha * pstar + (1.0 - alpha) * p_r
-                        rhoe_state = alpha * rhoestar_r + \
-                            (1.0 - alpha) * rhoe_r
 
             else:  # ustar == 0
 
@@ -470,18 +799,17 @@ def riemann_cgf(idir, ng,
                 un_state = ustar
                 ut_state = 0.5 * (ut_l + ut_r)
                 p_state = pstar
-                rhoe_state = 0.5 * (rhoestar_l + rhoestar_r)
 
             # species now
             if (nspec > 0):
                 if (ustar > 0.0):
-                    xn = U_l[i, j, irhoX:irhoX + nspec] / U_l[i, j, idens]
+                    xn = q_l[i, j, iX:iX + nspec]
 
                 elif (ustar < 0.0):
-                    xn = U_r[i, j, irhoX:irhoX + nspec] / U_r[i, j, idens]
+                    xn = q_r[i, j, iX:iX + nspec]
                 else:
-                    xn = 0.5 * (U_l[i, j, irhoX:irhoX + nspec] / U_l[i, j, idens] +
-                                   U_r[i, j, irhoX:irhoX + nspec] / U_r[i, j, idens])
+                    xn = 0.5 * (q_l[i, j, iX:iX + nspec] +
+                                   q_r[i, j, iX:iX + nspec])
 
             # are we on a solid boundary?
             if (idir == 1):
@@ -498,307 +826,234 @@ def riemann_cgf(idir, ng,
                 if (j == jhi + 1 and upper_solid == 1):
                     un_state = 0.0
 
-            # compute the fluxes
-            F[i, j, idens] = rho_state * un_state
-
+            q_int[i, j, irho] = rho_state
             if (idir == 1):
-                F[i, j, ixmom] = rho_state * un_state**2 + p_state
-                F[i, j, iymom] = rho_state * ut_state * un_state
+                q_int[i, j, iu] = un_state
+                q_int[i, j, iv] = ut_state
             else:
-                F[i, j, ixmom] = rho_state * ut_state * un_state
-                F[i, j, iymom] = rho_state * un_state**2 + p_state
+                q_int[i, j, iu] = ut_state
+                q_int[i, j, iv] = un_state
 
-            F[i, j, iener] = rhoe_state * un_state + \
-                0.5 * rho_state * (un_state**2 + ut_state**2) * un_state + \
-                p_state * un_state
+            q_int[i, j, ip] = p_state
 
             if (nspec > 0):
-                F[i, j, irhoX:irhoX + nspec] = xn * rho_state * un_state
+                q_int[i, j, iX:iX + nspec] = xn
 
-    return F
+    return q_int
 
 
 @njit(cache=True)
-def riemann_prim(idir, ng,
-                 irho, iu, iv, ip, iX, nspec,
-                 lower_solid, upper_solid,
-                 gamma, q_l, q_r):
-    r"""
-    this is like riemann_cgf, except that it works on a primitive
-    variable input state and returns the primitive variable interface
-    state
+def _riemann_hllc_face(idir, idens, ixmom, iymom, iener, irhoX, nspec,
+                       gamma, U_l, U_r, U_state, F):
+    """
+    solve the HLLC Riemann problem (see :func:`riemann_hllc`) for a
+    single interface, with conserved states U_l and U_r, and store
+    the flux in F.  U_state is scratch space.
+    """
 
-    Solve riemann shock tube problem for a general equation of
-    state using the method of Colella, Glaz, and Ferguson.  See
-    Almgren et al. 2010 (the CASTRO paper) for details.
+    smallc = 1.e-10
+    smallp = 1.e-10
 
-    The Riemann problem for the Euler's equation produces 4 regions,
-    separated by the three characteristics :math:`(u - cs, u, u + cs)`::
+    # primitive variable states
+    rho_l = U_l[idens]
 
+    # un = normal velocity; ut = transverse velocity
+    if (idir == 1):
+        un_l = U_l[ixmom] / rho_l
+        ut_l = U_l[iymom] / rho_l
+    else:
+        un_l = U_l[iymom] / rho_l
+        ut_l = U_l[ixmom] / rho_l
 
-           u - cs    t    u      u + cs
-             \       ^   .       /
-              \  *L  |   . *R   /
-               \     |  .     /
-                \    |  .    /
-            L    \   | .   /    R
-                  \  | .  /
-                   \ |. /
-                    \|./
-           ----------+----------------> x
+    rhoe_l = U_l[iener] - 0.5 * rho_l * (un_l**2 + ut_l**2)
 
-    We care about the solution on the axis.  The basic idea is to use
-    estimates of the wave speeds to figure out which region we are in,
-    and: use jump conditions to evaluate the state there.
+    p_l = rhoe_l * (gamma - 1.0)
+    p_l = max(p_l, smallp)
 
-    Only density jumps across the :math:`u` characteristic.  All primitive
-    variables jump across the other two.  Special attention is needed
-    if a rarefaction spans the axis.
+    rho_r = U_r[idens]
 
-    Parameters
-    ----------
-    idir : int
-        Are we predicting to the edges in the x-direction (1) or y-direction (2)?
-    ng : int
-        The number of ghost cells
-    nspec : int
-        The number of species
-    irho, iu, iv, ip, iX : int
-        The indices of the density, x-velocity, y-velocity, pressure and species fractions in the state vector.
-    lower_solid, upper_solid : int
-        Are we at lower or upper solid boundaries?
-    gamma : float
-        Adiabatic index
-    q_l, q_r : ndarray
-        Primitive state on the left and right cell edges.
-
-    Returns
-    -------
-    out : ndarray
-        Primitive flux
-    """
-
-    qx, qy, nvar = q_l.shape
-
-    q_int = np.zeros((qx, qy, nvar))
-
-    smallc = 1.e-10
-    smallrho = 1.e-10
-    smallp = 1.e-10
-
-    nx = qx - 2 * ng
-    ny = qy - 2 * ng
-    ilo = ng
-    ihi = ng + nx
-    jlo = ng
-    jhi = ng + ny
-
-    for i in range(ilo - 1, ihi + 1):
-        for j in range(jlo - 1, jhi + 1):
-
-            # primitive variable states
-            rho_l = q_l[i, j, irho]
-
-            # un = normal velocity; ut = transverse velocity
-            if (idir == 1):
-                un_l = q_l[i, j, iu]
-                ut_l = q_l[i, j, iv]
-            else:
-                un_l = q_l[i, j, iv]
-                ut_l = q_l[i, j, iu]
-
-            p_l = q_l[i, j, ip]
-            p_l = max(p_l, smallp)
-
-            rho_r = q_r[i, j, irho]
-
-            if (idir == 1):
-                un_r = q_r[i, j, iu]
-                ut_r = q_r[i, j, iv]
-            else:
-                un_r = q_r[i, j, iv]
-                ut_r = q_r[i, j, iu]
-
-            p_r = q_r[i, j, ip]
-            p_r = max(p_r, smallp)
-
-            # define the Lagrangian sound speed
-            rho_l = max(smallrho, rho_l)
-            rho_r = max(smallrho, rho_r)
-            W_l = max(smallrho * smallc, np.sqrt(gamma * p_l * rho_l))
-            W_r = max(smallrho * smallc, np.sqrt(gamma * p_r * rho_r))
-
-            # and the regular sound speeds
-            c_l = max(smallc, np.sqrt(gamma * p_l / rho_l))
-            c_r = max(smallc, np.sqrt(gamma * p_r / rho_r))
-
-            # define the star states
-            pstar = (W_l * p_r + W_r * p_l + W_l *
-                     W_r * (un_l - un_r)) / (W_l + W_r)
-            pstar = max(pstar, smallp)
-            ustar = (W_l * un_l + W_r * un_r + (p_l - p_r)) / (W_l + W_r)
-
-            # now compute the remaining state to the left and right
-            # of the contact (in the star region)
-            rhostar_l = rho_l + (pstar - p_l) / c_l**2
-            rhostar_r = rho_r + (pstar - p_r) / c_r**2
-
-            cstar_l = max(smallc, np.sqrt(gamma * pstar / rhostar_l))
-            cstar_r = max(smallc, np.sqrt(gamma * pstar / rhostar_r))
-
-            # figure out which state we are in, based on the location of
-            # the waves
-            if (ustar > 0.0):
-
-                # contact is moving to the right, we need to understand
-                # the L and *L states
-
-                # Note: transverse velocity only jumps across contact
-                ut_state = ut_l
-
-                # define eigenvalues
-                lambda_l = un_l - c_l
-                lambdastar_l = ustar - cstar_l
-
-                if (pstar > p_l):
-                    # the wave is a shock -- find the shock speed
-                    sigma = (lambda_l + lambdastar_l) / 2.0
+    if (idir == 1):
+        un_r = U_r[ixmom] / rho_r
+        ut_r = U_r[iymom] / rho_r
+    else:
+        un_r = U_r[iymom] / rho_r
+        ut_r = U_r[ixmom] / rho_r
 
-                    if (sigma > 0.0):
-                        # shock is moving to the right -- solution is L state
-                        rho_state = rho_l
-                        un_state = un_l
-                        p_state = p_l
+    rhoe_r = U_r[iener] - 0.5 * rho_r * (un_r**2 + ut_r**2)
 
-                    else:
-                        # solution is *L state
-                        rho_state = rhostar_l
-                        un_state = ustar
-                        p_state = pstar
+    p_r = rhoe_r * (gamma - 1.0)
+    p_r = max(p_r, smallp)
 
-                else:
-                    # the wave is a rarefaction
-                    if (lambda_l < 0.0 and lambdastar_l < 0.0):
-                        # rarefaction fan is moving to the left -- solution is
-                        # *L state
-                        rho_state = rhostar_l
-                        un_state = ustar
-                        p_state = pstar
+    # compute the sound speeds
+    c_l = max(smallc, np.sqrt(gamma * p_l / rho_l))
+    c_r = max(smallc, np.sqrt(gamma * p_r / rho_r))
 
-                    elif (lambda_l > 0.0 and lambdastar_l > 0.0):
-                        # rarefaction fan is moving to the right -- solution is
-                        # L state
-                        rho_state = rho_l
-                        un_state = un_l
-                        p_state = p_l
+    # Estimate the star quantities -- use one of three methods to
+    # do this -- the primitive variable Riemann solver, the two
+    # shock approximation, or the two rarefaction approximation.
+    # Pick the method based on the pressure states at the
+    # interface.
 
-                    else:
-                        # rarefaction spans x/t = 0 -- interpolate
-                        alpha = lambda_l / (lambda_l - lambdastar_l)
+    p_max = max(p_l, p_r)
+    p_min = min(p_l, p_r)
 
-                        rho_state = alpha * rhostar_l + (1.0 - alpha) * rho_l
-                        un_state = alpha * ustar + (1.0 - alpha) * un_l
-                        p_state = alpha * pstar + (1.0 - alpha) * p_l
+    Q = p_max / p_min
 
-            elif (ustar < 0):
+    rho_avg = 0.5 * (rho_l + rho_r)
+    c_avg = 0.5 * (c_l + c_r)
 
-                # contact moving left, we need to understand the R and *R
-                # states
+    # primitive variable Riemann solver (Toro, 9.3)
+    factor = rho_avg * c_avg
+    # factor2 = rho_avg / c_avg
 
-                # Note: transverse velocity only jumps across contact
-                ut_state = ut_r
+    pstar = 0.5 * (p_l + p_r) + 0.5 * (un_l - un_r) * factor
+    ustar = 0.5 * (un_l + un_r) + 0.5 * (p_l - p_r) / factor
 
-                # define eigenvalues
-                lambda_r = un_r + c_r
-                lambdastar_r = ustar + cstar_r
+    # rhostar_l = rho_l + (un_l - ustar) * factor2
+    # rhostar_r = rho_r + (ustar - un_r) * factor2
 
-                if (pstar > p_r):
-                    # the wave if a shock -- find the shock speed
-                    sigma = (lambda_r + lambdastar_r) / 2.0
+    if (Q > 2 and (pstar < p_min or pstar > p_max)):
 
-                    if (sigma > 0.0):
-                        # shock is moving to the right -- solution is *R state
-                        rho_state = rhostar_r
-                        un_state = ustar
-                        p_state = pstar
+        # use a more accurate Riemann solver for the estimate here
 
-                    else:
-                        # solution is R state
-                        rho_state = rho_r
-                        un_state = un_r
-                        p_state = p_r
+        if (pstar < p_min):
 
-                else:
-                    # the wave is a rarefaction
-                    if (lambda_r < 0.0 and lambdastar_r < 0.0):
-                        # rarefaction fan is moving to the left -- solution is
-                        # R state
-                        rho_state = rho_r
-                        un_state = un_r
-                        p_state = p_r
+            # 2-rarefaction Riemann solver
+            z = (gamma - 1.0) / (2.0 * gamma)
+            p_lr = (p_l / p_r)**z
 
-                    elif (lambda_r > 0.0 and lambdastar_r > 0.0):
-                        # rarefaction fan is moving to the right -- solution is
-                        # *R state
-                        rho_state = rhostar_r
-                        un_state = ustar
-                        p_state = pstar
+            ustar = (p_lr * un_l / c_l + un_r / c_r +
+                     2.0 * (p_lr - 1.0) / (gamma - 1.0)) / \
+                    (p_lr / c_l + 1.0 / c_r)
 
-                    else:
-                        # rarefaction spans x/t = 0 -- interpolate
-                        alpha = lambda_r / (lambda_r - lambdastar_r)
+            pstar = 0.5 * (p_l * (1.0 + (gamma - 1.0) * (un_l - ustar) /
+                                  (2.0 * c_l))**(1.0 / z) +
+                           p_r * (1.0 + (gamma - 1.0) * (ustar - un_r) /
+                                  (2.0 * c_r))**(1.0 / z))
 
-                        rho_state = alpha * rhostar_r + (1.0 - alpha) * rho_r
-                        un_state = alpha * ustar + (1.0 - alpha) * un_r
-                        p_state = alpha * pstar + (1.0 - alpha) * p_r
+            # rhostar_l = rho_l * (pstar / p_l)**(1.0 / gamma)
+            # rhostar_r = rho_r * (pstar / p_r)**(1.0 / gamma)
 
-            else:  # ustar == 0
+        else:
 
-                rho_state = 0.5 * (rhostar_l + rhostar_r)
-                un_state = ustar
-                ut_state = 0.5 * (ut_l + ut_r)
-                p_state = pstar
+            # 2-shock Riemann solver
+            A_r = 2.0 / ((gamma + 1.0) * rho_r)
+            B_r = p_r * (gamma - 1.0) / (gamma + 1.0)
 
-            # species now
-            if (nspec > 0):
-                if (ustar > 0.0):
-                    xn = q_l[i, j, iX:iX + nspec]
+            A_l = 2.0 / ((gamma + 1.0) * rho_l)
+            B_l = p_l * (gamma - 1.0) / (gamma + 1.0)
 
-                elif (ustar < 0.0):
-                    xn = q_r[i, j, iX:iX + nspec]
-                else:
-                    xn = 0.5 * (q_l[i, j, iX:iX + nspec] +
-                                   q_r[i, j, iX:iX + nspec])
+            # guess of the pressure
+            p_guess = max(0.0, pstar)
 
-            # are we on a solid boundary?
-            if (idir == 1):
-                if (i == ilo and lower_solid == 1):
-                    un_state = 0.0
+            g_l = np.sqrt(A_l / (p_guess + B_l))
+            g_r = np.sqrt(A_r / (p_guess + B_r))
 
-                if (i == ihi + 1 and upper_solid == 1):
-                    un_state = 0.0
+            pstar = (g_l * p_l + g_r * p_r -
+                     (un_r - un_l)) / (g_l + g_r)
 
-            elif (idir == 2):
-                if (j == jlo and lower_solid == 1):
-                    un_state = 0.0
+            ustar = 0.5 * (un_l + un_r) + \
+                0.5 * ((pstar - p_r) * g_r - (pstar - p_l) * g_l)
 
-                if (j == jhi + 1 and upper_solid == 1):
-                    un_state = 0.0
+            # rhostar_l = rho_l * (pstar / p_l + (gamma - 1.0) / (gamma + 1.0)) / \
+            #     ((gamma - 1.0) / (gamma + 1.0) * (pstar / p_l) + 1.0)
+            #
+            # rhostar_r = rho_r * (pstar / p_r + (gamma - 1.0) / (gamma + 1.0)) / \
+            #     ((gamma - 1.0) / (gamma + 1.0) * (pstar / p_r) + 1.0)
 
-            q_int[i, j, irho] = rho_state
-            if (idir == 1):
-                q_int[i, j, iu] = un_state
-                q_int[i, j, iv] = ut_state
-            else:
-                q_int[i, j, iu] = ut_state
-                q_int[i, j, iv] = un_state
+    # estimate the nonlinear wave speeds
 
-            q_int[i, j, ip] = p_state
+    if (pstar <= p_l):
+        # rarefaction
+        S_l = un_l - c_l
+    else:
+        # shock
+        S_l = un_l - c_l * np.sqrt(1.0 + ((gamma + 1.0) / (2.0 * gamma)) *
+                                   (pstar / p_l - 1.0))
 
-            if (nspec > 0):
-                q_int[i, j, iX:iX + nspec] = xn
+    if (pstar <= p_r):
+        # rarefaction
+        S_r = un_r + c_r
+    else:
+        # shock
+        S_r = un_r + c_r * np.sqrt(1.0 + ((gamma + 1.0) / (2.0 / gamma)) *
+                                   (pstar / p_r - 1.0))
+
+    #  We could just take S_c = u_star as the estimate for the
+    #  contact speed, but we can actually do this more accurately
+    #  by using the Rankine-Hugonoit jump conditions across each
+    #  of the waves (see Toro 10.58, Batten et al. SIAM
+    #  J. Sci. and Stat. Comp., 18:1553 (1997)
+    S_c = (p_r - p_l + rho_l * un_l * (S_l - un_l) - rho_r * un_r * (S_r - un_r)) / \
+        (rho_l * (S_l - un_l) - rho_r * (S_r - un_r))
+
+    # figure out which region we are in and compute the state and
+    # the interface fluxes using the HLLC Riemann solver
+    if (S_r <= 0.0):
+        # R region
+        _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                        U_r, F)
+
+    elif (S_r > 0.0 and S_c <= 0):
+        # R* region
+        HLLCfactor = rho_r * (S_r - un_r) / (S_r - S_c)
+
+        U_state[idens] = HLLCfactor
+
+        if (idir == 1):
+            U_state[ixmom] = HLLCfactor * S_c
+            U_state[iymom] = HLLCfactor * ut_r
+        else:
+            U_state[ixmom] = HLLCfactor * ut_r
+            U_state[iymom] = HLLCfactor * S_c
+
+        U_state[iener] = HLLCfactor * (U_r[iener] / rho_r +
+                                       (S_c - un_r) * (S_c + p_r / (rho_r * (S_r - un_r))))
+
+        # species
+        for n in range(nspec):
+            U_state[irhoX + n] = HLLCfactor * U_r[irhoX + n] / rho_r
+
+        # find the flux on the right interface
+        _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                        U_r, F)
+
+        # correct the flux
+        for n in range(F.shape[0]):
+            F[n] = F[n] + S_r * (U_state[n] - U_r[n])
+
+    elif (S_c > 0.0 and S_l < 0.0):
+        # L* region
+        HLLCfactor = rho_l * (S_l - un_l) / (S_l - S_c)
+
+        U_state[idens] = HLLCfactor
+
+        if (idir == 1):
+            U_state[ixmom] = HLLCfactor * S_c
+            U_state[iymom] = HLLCfactor * ut_l
+        else:
+            U_state[ixmom] = HLLCfactor * ut_l
+            U_state[iymom] = HLLCfactor * S_c
+
+        U_state[iener] = HLLCfactor * (U_l[iener] / rho_l +
+                                       (S_c - un_l) * (S_c + p_l / (rho_l * (S_l - un_l))))
+
+        # species
+        for n in range(nspec):
+            U_state[irhoX + n] = HLLCfactor * U_l[irhoX + n] / rho_l
+
+        # find the flux on the left interface
+        _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                        U_l, F)
+
+        # correct the flux
+        for n in range(F.shape[0]):
+            F[n] = F[n] + S_l * (U_state[n] - U_l[n])
 
-    return q_int
+    else:
+        # L region
+        _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                        U_l, F)
 
 
 @njit(cache=True)
@@ -839,11 +1094,6 @@ def riemann_hllc(idir, ng,
 
     F = np.zeros((qx, qy, nvar))
 
-    smallc = 1.e-10
-    smallp = 1.e-10
-
-    U_state = np.zeros(nvar)
-
     nx = qx - 2 * ng
     ny = qy - 2 * ng
     ilo = ng
@@ -851,217 +1101,52 @@ def riemann_hllc(idir, ng,
     jlo = ng
     jhi = ng + ny
 
-    for i in range(ilo - 1, ihi + 1):
-        for j in range(jlo - 1, jhi + 1):
-
-            # primitive variable states
-            rho_l = U_l[i, j, idens]
-
-            # un = normal velocity; ut = transverse velocity
-            if (idir == 1):
-                un_l = U_l[i, j, ixmom] / rho_l
-                ut_l = U_l[i, j, iymom] / rho_l
-            else:
-                un_l = U_l[i, j, iymom] / rho_l
-                ut_l = U_l[i, j, ixmom] / rho_l
-
-            rhoe_l = U_l[i, j, iener] - 0.5 * rho_l * (un_l**2 + ut_l**2)
-
-            p_l = rhoe_l * (gamma - 1.0)
-            p_l = max(p_l, smallp)
-
-            rho_r = U_r[i, j, idens]
-
-            if (idir == 1):
-                un_r = U_r[i, j, ixmom] / rho_r
-                ut_r = U_r[i, j, iymom] / rho_r
-            else:
-                un_r = U_r[i, j, iymom] / rho_r
-                ut_r = U_r[i, j, ixmom] / rho_r
-
-            rhoe_r = U_r[i, j, iener] - 0.5 * rho_r * (un_r**2 + ut_r**2)
-
-            p_r = rhoe_r * (gamma - 1.0)
-            p_r = max(p_r, smallp)
-
-            # compute the sound speeds
-            c_l = max(smallc, np.sqrt(gamma * p_l / rho_l))
-            c_r = max(smallc, np.sqrt(gamma * p_r / rho_r))
-
-            # Estimate the star quantities -- use one of three methods to
-            # do this -- the primitive variable Riemann solver, the two
-            # shock approximation, or the two rarefaction approximation.
-            # Pick the method based on the pressure states at the
-            # interface.
-
-            p_max = max(p_l, p_r)
-            p_min = min(p_l, p_r)
-
-            Q = p_max / p_min
-
-            rho_avg = 0.5 * (rho_l + rho_r)
-            c_avg = 0.5 * (c_l + c_r)
-
-            # primitive variable Riemann solver (Toro, 9.3)
-            factor = rho_avg * c_avg
-            # factor2 = rho_avg / c_avg
-
-            pstar = 0.5 * (p_l + p_r) + 0.5 * (un_l - un_r) * factor
-            ustar = 0.5 * (un_l + un_r) + 0.5 * (p_l - p_r) / factor
-
-            # rhostar_l = rho_l + (un_l - ustar) * factor2
-            # rhostar_r = rho_r + (ustar - un_r) * factor2
+    for i in prange(ilo - 1, ihi + 1):
 
-            if (Q > 2 and (pstar < p_min or pstar > p_max)):
+        U_state = np.zeros(nvar)
 
-                # use a more accurate Riemann solver for the estimate here
-
-                if (pstar < p_min):
-
-                    # 2-rarefaction Riemann solver
-                    z = (gamma - 1.0) / (2.0 * gamma)
-                    p_lr = (p_l / p_r)**z
-
-                    ustar = (p_lr * un_l / c_l + un_r / c_r +
-                             2.0 * (p_lr - 1.0) / (gamma - 1.0)) / \
-                            (p_lr / c_l + 1.0 / c_r)
-
-                    pstar = 0.5 * (p_l * (1.0 + (gamma - 1.0) * (un_l - ustar) /
-                                          (2.0 * c_l))**(1.0 / z) +
-                                   p_r * (1.0 + (gamma - 1.0) * (ustar - un_r) /
-                                          (2.0 * c_r))**(1.0 / z))
-
-                    # rhostar_l = rho_l * (pstar / p_l)**(1.0 / gamma)
-                    # rhostar_r = rho_r * (pstar / p_r)**(1.0 / gamma)
-
-                else:
-
-                    # 2-shock Riemann solver
-                    A_r = 2.0 / ((gamma + 1.0) * rho_r)
-                    B_r = p_r * (gamma - 1.0) / (gamma + 1.0)
-
-                    A_l = 2.0 / ((gamma + 1.0) * rho_l)
-                    B_l = p_l * (gamma - 1.0) / (gamma + 1.0)
-
-                    # guess of the pressure
-                    p_guess = max(0.0, pstar)
-
-                    g_l = np.sqrt(A_l / (p_guess + B_l))
-                    g_r = np.sqrt(A_r / (p_guess + B_r))
-
-                    pstar = (g_l * p_l + g_r * p_r -
-                             (un_r - un_l)) / (g_l + g_r)
-
-                    ustar = 0.5 * (un_l + un_r) + \
-                        0.5 * ((pstar - p_r) * g_r - (pstar - p_l) * g_l)
-
-                    # rhostar_l = rho_l * (pstar / p_l + (gamma - 1.0) / (gamma + 1.0)) / \
-                    #     ((gamma - 1.0) / (gamma + 1.0) * (pstar / p_l) + 1.0)
-                    #
-                    # rhostar_r = rho_r * (pstar / p_r + (gamma - 1.0) / (gamma + 1.0)) / \
-                    #     ((gamma - 1.0) / (gamma + 1.0) * (pstar / p_r) + 1.0)
-
-            # estimate the nonlinear wave speeds
-
-            if (pstar <= p_l):
-                # rarefaction
-                S_l = un_l - c_l
-            else:
-                # shock
-                S_l = un_l - c_l * np.sqrt(1.0 + ((gamma + 1.0) / (2.0 * gamma)) *
-                                           (pstar / p_l - 1.0))
-
-            if (pstar <= p_r):
-                # rarefaction
-                S_r = un_r + c_r
-            else:
-                # shock
-                S_r = un_r + c_r * np.sqrt(1.0 + ((gamma + 1.0) / (2.0 / gamma)) *
-                                           (pstar / p_r - 1.0))
-
-            #  We could just take S_c = u_star as the estimate for the
-            #  contact speed, but we can actually do this more accurately
-            #  by using the Rankine-Hugonoit jump conditions across each
-            #  of the waves (see Toro 10.58, Batten et al. SIAM
-            #  J. Sci. and Stat. Comp., 18:1553 (1997)
-            S_c = (p_r - p_l + rho_l * un_l * (S_l - un_l) - rho_r * un_r * (S_r - un_r)) / \
-                (rho_l * (S_l - un_l) - rho_r * (S_r - un_r))
-
-            # figure out which region we are in and compute the state and
-            # the interface fluxes using the HLLC Riemann solver
-            if (S_r <= 0.0):
-                # R region
-                U_state[:] = U_r[i, j, :]
-
-                F[i, j, :] = consFlux(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
-                                      U_state)
-
-            elif (S_r > 0.0 and S_c <= 0):
-                # R* region
-                HLLCfactor = rho_r * (S_r - un_r) / (S_r - S_c)
-
-                U_state[idens] = HLLCfactor
-
-                if (idir == 1):
-                    U_state[ixmom] = HLLCfactor * S_c
-                    U_state[iymom] = HLLCfactor * ut_r
-                else:
-                    U_state[ixmom] = HLLCfactor * ut_r
-                    U_state[iymom] = HLLCfactor * S_c
-
-                U_state[iener] = HLLCfactor * (U_r[i, j, iener] / rho_r +
-                                               (S_c - un_r) * (S_c + p_r / (rho_r * (S_r - un_r))))
-
-                # species
-                if (nspec > 0):
-                    U_state[irhoX:irhoX + nspec] = HLLCfactor * \
-                        U_r[i, j, irhoX:irhoX + nspec] / rho_r
-
-                # find the flux on the right interface
-                F[i, j, :] = consFlux(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
-                                      U_r[i, j, :])
-
-                # correct the flux
-                F[i, j, :] = F[i, j, :] + S_r * (U_state[:] - U_r[i, j, :])
+        for j in range(jlo - 1, jhi + 1):
 
-            elif (S_c > 0.0 and S_l < 0.0):
-                # L* region
-                HLLCfactor = rho_l * (S_l - un_l) / (S_l - S_c)
+            _riemann_hllc_face(idir, idens, ixmom, iymom, iener, irhoX, nspec,
+                               gamma, U_l[i, j, :], U_r[i, j, :], U_state, F[i, j, :])
 
-                U_state[idens] = HLLCfactor
+            # we should deal with solid boundaries somehow here
 
-                if (idir == 1):
-                    U_state[ixmom] = HLLCfactor * S_c
-                    U_state[iymom] = HLLCfactor * ut_l
-                else:
-                    U_state[ixmom] = HLLCfactor * ut_l
-                    U_state[iymom] = HLLCfactor * S_c
+    return F
 
-                U_state[iener] = HLLCfactor * (U_l[i, j, iener] / rho_l +
-                                               (S_c - un_l) * (S_c + p_l / (rho_l * (S_l - un_l))))
 
-                # species
-                if (nspec > 0):
-                    U_state[irhoX:irhoX + nspec] = HLLCfactor * \
-                        U_l[i, j, irhoX:irhoX + nspec] / rho_l
+@njit(cache=True)
+def _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                    U_state, F):
+    """
+    compute the conservative flux of U_state (see :func:`consFlux`)
+    and store it in F
+    """
 
-                # find the flux on the left interface
-                F[i, j, :] = consFlux(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
-                                      U_l[i, j, :])
+    u = U_state[ixmom] / U_state[idens]
+    v = U_state[iymom] / U_state[idens]
 
-                # correct the flux
-                F[i, j, :] = F[i, j, :] + S_l * (U_state[:] - U_l[i, j, :])
+    p = (U_state[iener] - 0.5 * U_state[idens] * (u * u + v * v)) * (gamma - 1.0)
 
-            else:
-                # L region
-                U_state[:] = U_l[i, j, :]
+    if (idir == 1):
+        F[idens] = U_state[idens] * u
+        F[ixmom] = U_state[ixmom] * u + p
+        F[iymom] = U_state[iymom] * u
+        F[iener] = (U_state[iener] + p) * u
 
-                F[i, j, :] = consFlux(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
-                                      U_state)
+        if (nspec > 0):
+            for n in range(nspec):
+                F[irhoX + n] = U_state[irhoX + n] * u
 
-            # we should deal with solid boundaries somehow here
+    else:
+        F[idens] = U_state[idens] * v
+        F[ixmom] = U_state[ixmom] * v
+        F[iymom] = U_state[iymom] * v + p
+        F[iener] = (U_state[iener] + p) * v
 
-    return F
+        if (nspec > 0):
+            for n in range(nspec):
+                F[irhoX + n] = U_state[irhoX + n] * v
 
 
 @njit(cache=True)
@@ -1091,28 +1176,8 @@ def consFlux(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec, U_state):
 
     F = np.zeros_like(U_state)
 
-    u = U_state[ixmom] / U_state[idens]
-    v = U_state[iymom] / U_state[idens]
-
-    p = (U_state[iener] - 0.5 * U_state[idens] * (u * u + v * v)) * (gamma - 1.0)
-
-    if (idir == 1):
-        F[idens] = U_state[idens] * u
-        F[ixmom] = U_state[ixmom] * u + p
-        F[iymom] = U_state[iymom] * u
-        F[iener] = (U_state[iener] + p) * u
-
-        if (nspec > 0):
-            F[irhoX:irhoX + nspec] = U_state[irhoX:irhoX + nspec] * u
-
-    else:
-        F[idens] = U_state[idens] * v
-        F[ixmom] = U_state[ixmom] * v
-        F[iymom] = U_state[iymom] * v + p
-        F[iener] = (U_state[iener] + p) * v
-
-        if (nspec > 0):
-            F[irhoX:irhoX + nspec] = U_state[irhoX:irhoX + nspec] * v
+    _cons_flux_face(idir, gamma, idens, ixmom, iymom, iener, irhoX, nspec,
+                    U_state, F)
 
     return F
 
@@ -1176,7 +1241,7 @@ def artificial_viscosity(ng, dx, dy,
     jlo = ng
     jhi = ng + ny
 
-    for i in range(ilo - 1, ihi + 1):
+    for i in prange(ilo - 1, ihi + 1):
         for j in range(jlo - 1, jhi + 1):
 
             # start by computing the divergence on the x-interface.  The
@@ -1198,3 +1263,681 @@ def artificial_viscosity(ng, dx, dy,
             avisco_y[i, j] = cvisc * max(-divU_y * dy, 0.0)
 
     return avisco_x, avisco_y
+
+
+@njit(cache=True)
+def _mc_slope(dc, dl, dr):
+    """
+    monotonized central slope of a single zone, given the centered
+    (dc), left (dl), and right (dr) differences (see
+    :func:`mesh.reconstruction.limit2`)
+    """
+
+    if abs(dl) < abs(dr):
+        d1 = 2.0 * dl
+    else:
+        d1 = 2.0 * dr
+
+    if abs(dc) < abs(d1):
+        dt = dc
+    else:
+        dt = d1
+
+    if dl * dr > 0.0:
+        return dt
+    return 0.0
+
+
+@njit(cache=True)
+def _flatten_zone(pm2, pm1, pp1, pp2, um1, up1, z0, z1, delta):
+    """
+    1-d flattening coefficient of a single zone from the pressure
+    and normal velocity of its neighbors (see
+    :func:`mesh.reconstruction.flatten`)
+    """
+
+    smallp = 1.e-10
+
+    t1 = abs(pp1 - pm1)
+    t2 = abs(pp2 - pm2)
+
+    z = t1 / max(t2, smallp)
+
+    t2 = t1 / min(pp1, pm1)
+    t1 = um1 - up1
+
+    xi = min(1.0, max(0.0, 1.0 - (z - z0) / (z1 - z0)))
+
+    if t1 > 0.0 and t2 > delta:
+        return xi
+    return 1.0
+
+
+@njit(cache=True, error_model="numpy")
+def _cons_to_prim_zone(idens, ixmom, iymom, iener, irhoX,
+                       irho, iu, iv, ip, ix, nspec,
+                       gamma, U, q):
+    """
+    convert the conserved state U in a single zone to the primitive
+    state q.  Everything is read before it is written, so U and q can
+    be the same array.
+    """
+
+    rho = U[idens]
+    u = U[ixmom] / rho
+    v = U[iymom] / rho
+
+    e = (U[iener] - 0.5 * rho * (u**2 + v**2)) / rho
+
+    q[irho] = rho
+    q[iu] = u
+    q[iv] = v
+    q[ip] = rho * e * (gamma - 1.0)
+
+    for n in range(nspec):
+        q[ix + n] = U[irhoX + n] / rho
+
+
+@njit(cache=True, error_model="numpy")
+def _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                       idens, ixmom, iymom, iener, irhoX, nspec,
+                       gamma, q, U):
+    """
+    convert the primitive state q in a single zone to the conserved
+    state U.  Everything is read before it is written, so q and U can
+    be the same array.
+    """
+
+    rho = q[irho]
+    u = q[iu]
+    v = q[iv]
+
+    rhoe = q[ip] / (gamma - 1.0)
+
+    U[idens] = rho
+    U[ixmom] = u * rho
+    U[iymom] = v * rho
+    U[iener] = rhoe + 0.5 * rho * (u**2 + v**2)
+
+    for n in range(nspec):
+        U[irhoX + n] = q[ix + n] * rho
+
+
+@njit(cache=True, error_model="numpy")
+def cons_to_prim(ilo, ihi, jlo, jhi,
+                 idens, ixmom, iymom, iener, irhoX,
+                 irho, iu, iv, ip, ix, nspec,
+                 gamma, U, q):
+    """
+    Convert the conserved variables to primitive variables in the
+    zones [ilo, ihi) x [jlo, jhi), writing into q.  q can be the same
+    array as U, in which case the conversion is done in place.  Zones
+    outside of the region are not touched.
+
+    Parameters
+    ----------
+    ilo, ihi, jlo, jhi : int
+        The range of zones to convert (the upper bounds are exclusive)
+    idens, ixmom, iymom, iener, irhoX : int
+        The indices of the conserved variables
+    irho, iu, iv, ip, ix : int
+        The indices of the primitive variables
+    nspec : int
+        The number of species
+    gamma : float
+        Adiabatic index
+    U : ndarray
+        Conserved state
+    q : ndarray
+        The output primitive state
+    """
+
+    for i in range(ilo, ihi):
+        for j in range(jlo, jhi):
+            _cons_to_prim_zone(idens, ixmom, iymom, iener, irhoX,
+                               irho, iu, iv, ip, ix, nspec,
+                               gamma, U[i, j, :], q[i, j, :])
+
+
+@njit(cache=True, error_model="numpy")
+def prim_to_cons(ilo, ihi, jlo, jhi,
+                 irho, iu, iv, ip, ix,
+                 idens, ixmom, iymom, iener, irhoX, nspec,
+                 gamma, q, U):
+    """
+    Convert the primitive variables to conserved variables in the
+    zones [ilo, ihi) x [jlo, jhi), writing into U.  U can be the same
+    array as q, in which case the conversion is done in place.  Zones
+    outside of the region are not touched.
+
+    Parameters
+    ----------
+    ilo, ihi, jlo, jhi : int
+        The range of zones to convert (the upper bounds are exclusive)
+    irho, iu, iv, ip, ix : int
+        The indices of the primitive variables
+    idens, ixmom, iymom, iener, irhoX : int
+        The indices of the conserved variables
+    nspec : int
+        The number of species
+    gamma : float
+        Adiabatic index
+    q : ndarray
+        Primitive state
+    U : ndarray
+        The output conserved state
+    """
+
+    for i in range(ilo, ihi):
+        for j in range(jlo, jhi):
+            _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                               idens, ixmom, iymom, iener, irhoX, nspec,
+                               gamma, q[i, j, :], U[i, j, :])
+
+
+@njit(cache=True)
+def _max_speeds(smax, sx, sy, sxy):
+    """update the running maxima in smax (NaNs are kept)"""
+
+    if sx > smax[0] or sx != sx:
+        smax[0] = sx
+    if sy > smax[1] or sy != sy:
+        smax[1] = sy
+    if sxy > smax[2] or sxy != sxy:
+        smax[2] = sxy
+
+
+@njit(cache=True, error_model="numpy")
+def _signal_speeds_zone(dx, dy, idens, ixmom, iymom, iener, gamma, U_zone, smax):
+    """add the signal speeds of a single zone to the maxima in smax"""
+
+    dens = U_zone[idens]
+    u = U_zone[ixmom] / dens
+    v = U_zone[iymom] / dens
+    e = (U_zone[iener] - 0.5 * dens * (u * u + v * v)) / dens
+    p = dens * e * (gamma - 1.0)
+    cs = np.sqrt(gamma * p / dens)
+
+    sx = abs(u) + cs
+    sy = abs(v) + cs
+    _max_speeds(smax, sx, sy, sx / dx + sy / dy)
+
+
+@njit(cache=True, error_model="numpy")
+def signal_speeds(dx, dy, idens, ixmom, iymom, iener, gamma, U):
+    """
+    Find the largest signal speeds, :math:`|u| + c_s`, :math:`|v| +
+    c_s` and :math:`(|u| + c_s)/dx + (|v| + c_s)/dy`, over all of the
+    zones, including the ghost cells.  The speeds are computed in the
+    same way as the derived primitive variables, so the maxima are
+    exactly those of the derived variables.
+
+    Parameters
+    ----------
+    dx, dy : float
+        The grid spacing
+    idens, ixmom, iymom, iener : int
+        The indices of the conserved variables
+    gamma : float
+        Adiabatic index
+    U : ndarray
+        Conserved state
+
+    Returns
+    -------
+    out : ndarray
+        The three maxima
+    """
+
+    qx, qy, _ = U.shape
+
+    smax = np.full(3, -np.inf)
+
+    for i in range(qx):
+        for j in range(qy):
+            _signal_speeds_zone(dx, dy, idens, ixmom, iymom, iener,
+                                gamma, U[i, j, :], smax)
+
+    return smax
+
+
+@njit(cache=True)
+def ctu_fluxes(ng, dx, dy, dt, tile,
+               irho, iu, iv, ip, ix,
+               idens, ixmom, iymom, iener, irhoX, nspec,
+               xl_solid, xr_solid, yl_solid, yr_solid,
+               gamma, limiter, use_flattening, z0, z1, delta,
+               use_cgf, cvisc,
+               U, ymom_src, E_src):
+    r"""
+    Compute the CTU fluxes through the x- and y-interfaces in a single
+    pass.  This does the same steps as
+    :func:`compressible.unsplit_fluxes.unsplit_fluxes` -- conversion
+    to primitive variables, flattening, limiting, the interface
+    states, the gravity source, the transverse Riemann solves and
+    corrections, the normal Riemann solves, and the artificial
+    viscosity -- in the same order, so the fluxes agree with that
+    path to roundoff.
+
+    The interfaces are divided into tiles of tile x tile, and all the
+    intermediate data for a tile is kept in small arrays covering the
+    tile plus 4 zones on each side.  Only the fluxes are stored on
+    the full grid.  The zones around a tile are recomputed by its
+    neighbors, which is cheaper than storing them.
+
+    Parameters
+    ----------
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        Cell spacings
+    dt : float
+        The timestep
+    tile : int
+        The number of interfaces on a side of a tile
+    irho, iu, iv, ip, ix : int
+        Indices of the density, x-velocity, y-velocity, pressure and
+        species in the primitive state vector.
+    idens, ixmom, iymom, iener, irhoX : int
+        The indices of the density, x-momentum, y-momentum, internal energy density
+        and species partial densities in the conserved state vector.
+    nspec : int
+        The number of species
+    xl_solid, xr_solid, yl_solid, yr_solid : int
+        Are the boundaries solid?
+    gamma : float
+        Adiabatic index
+    limiter : int
+        The limiter (0 = none, 1 = 2nd order, 2 = 4th order)
+    use_flattening : int
+        Apply flattening at shocks?
+    z0, z1, delta : float
+        The flattening parameters
+    use_cgf : int
+        Use the CGF Riemann solver (otherwise HLLC)?
+    cvisc : float
+        The artificial viscosity coefficient
+    U : ndarray
+        The conserved state
+    ymom_src, E_src : ndarray
+        The gravitational sources for the y-momentum and energy,
+        including ghost cells
+
+    Returns
+    -------
+    out : ndarray, ndarray
+        Conserved fluxes on the x- and y-interfaces
+    """
+
+    qx, qy, nvar = U.shape
+
+    F_x = np.zeros((qx, qy, nvar))
+    F_y = np.zeros((qx, qy, nvar))
+
+    nx = qx - 2 * ng
+    ny = qy - 2 * ng
+    ilo = ng
+    ihi = ng + nx
+    jlo = ng
+    jhi = ng + ny
+
+    ns = nvar - nspec
+
+    dtdx = dt / dx
+    dtdy = dt / dy
+    dtdx4 = 0.25 * dtdx
+    dtdy4 = 0.25 * dtdy
+
+    # the fluxes are computed on interfaces [ilo-1, ihi+1) x
+    # [jlo-1, jhi+1).  The slopes and interface states are needed on
+    # zones [ilo-2, ihi+2) x [jlo-2, jhi+2)
+    nti = (nx + 2 + tile - 1) // tile
+    ntj = (ny + 2 + tile - 1) // tile
+
+    mt = tile + 8
+
+    for it in prange(nti):
+
+        # scratch space -- allocated for each row of tiles so the
+        # threaded version has a private copy.  Index (0, 0) is zone
+        # (a - 4, c - 4) of the current tile
+        q = np.zeros((mt, mt, nvar))
+        ldx = np.zeros((mt, mt, nvar))
+        ldy = np.zeros((mt, mt, nvar))
+
+        xi_x = np.ones((mt, mt))
+        xi_y = np.ones((mt, mt))
+        xi = np.zeros((mt, mt))
+        lda = np.zeros((mt, mt))
+
+        U_xl = np.zeros((mt, mt, nvar))
+        U_xr = np.zeros((mt, mt, nvar))
+        U_yl = np.zeros((mt, mt, nvar))
+        U_yr = np.zeros((mt, mt, nvar))
+
+        # the transverse fluxes
+        G_x = np.zeros((mt, mt, nvar))
+        G_y = np.zeros((mt, mt, nvar))
+
+        lvec = np.zeros((nvar, nvar))
+        rvec = np.zeros((nvar, nvar))
+        e_val = np.zeros(nvar)
+        betal = np.zeros(nvar)
+        betar = np.zeros(nvar)
+        U_state = np.zeros(nvar)
+
+        # the x-interfaces of this tile
+        a = ilo - 1 + it * tile
+        b = min(a + tile, ihi + 1)
+
+        for jt in range(ntj):
+
+            c = jlo - 1 + jt * tile
+            d = min(c + tile, jhi + 1)
+
+            oi = a - 4
+            oj = c - 4
+
+            # primitive variables
+            for i in range(max(a - 4, 0), min(b + 4, qx)):
+                for j in range(max(c - 4, 0), min(d + 4, qy)):
+                    li = i - oi
+                    lj = j - oj
+
+                    _cons_to_prim_zone(idens, ixmom, iymom, iener, irhoX,
+                                       irho, iu, iv, ip, ix, nspec,
+                                       gamma, U[i, j, :], q[li, lj, :])
+
+            # flattening
+            if use_flattening:
+                xi_x[:, :] = 1.0
+                xi_y[:, :] = 1.0
+
+                for li in range(max(a - 2, ilo - 2) - oi, min(b + 2, ihi + 2) - oi):
+                    for lj in range(max(c - 1, jlo - 2) - oj, min(d + 1, jhi + 2) - oj):
+                        xi_x[li, lj] = _flatten_zone(q[li - 2, lj, ip], q[li - 1, lj, ip],
+                                                     q[li + 1, lj, ip], q[li + 2, lj, ip],
+                                                     q[li - 1, lj, iu], q[li + 1, lj, iu],
+                                                     z0, z1, delta)
+
+                for li in range(max(a - 1, ilo - 2) - oi, min(b + 1, ihi + 2) - oi):
+                    for lj in range(max(c - 2, jlo - 2) - oj, min(d + 2, jhi + 2) - oj):
+                        xi_y[li, lj] = _flatten_zone(q[li, lj - 2, ip], q[li, lj - 1, ip],
+                                                     q[li, lj + 1, ip], q[li, lj + 2, ip],
+                                                     q[li, lj - 1, iv], q[li, lj + 1, iv],
+                                                     z0, z1, delta)
+
+                for li in range(a - 1 - oi, b + 1 - oi):
+                    for lj in range(c - 1 - oj, d + 1 - oj):
+                        if q[li + 1, lj, ip] - q[li - 1, lj, ip] > 0:
+                            px = xi_x[li - 1, lj]
+                        else:
+                            px = xi_x[li + 1, lj]
+
+                        if q[li, lj + 1, ip] - q[li, lj - 1, ip] > 0:
+                            py = xi_y[li, lj - 1]
+                        else:
+                            py = xi_y[li, lj + 1]
+
+                        xi[li, lj] = min(min(xi_x[li, lj], px),
+                                         min(xi_y[li, lj], py))
+
+            # limited slopes
+            for n in range(nvar):
+
+                for idir in range(1, 3):
+                    if (idir == 1):
+                        di = 1
+                        dj = 0
+                        ld = ldx
+                    else:
+                        di = 0
+                        dj = 1
+                        ld = ldy
+
+                    if limiter == 0:
+                        for li in range(a - 1 - oi, b + 1 - oi):
+                            for lj in range(c - 1 - oj, d + 1 - oj):
+                                ld[li, lj, n] = 0.5 * (q[li + di, lj + dj, n] -
+                                                       q[li - di, lj - dj, n])
+
+                    elif limiter == 1:
+                        for li in range(a - 1 - oi, b + 1 - oi):
+                            for lj in range(c - 1 - oj, d + 1 - oj):
+                                ld[li, lj, n] = _mc_slope(
+                                    0.5 * (q[li + di, lj + dj, n] - q[li - di, lj - dj, n]),
+                                    q[li + di, lj + dj, n] - q[li, lj, n],
+                                    q[li, lj, n] - q[li - di, lj - dj, n])
+
+                    else:
+                        # the 4th order limiter uses the 2nd order
+                        # slopes of the neighbors, which are zero
+                        # outside of [ilo-2, ihi+2) x [jlo-2, jhi+2)
+                        lda[:, :] = 0.0
+                        for li in range(max(a - 1 - di, ilo - 2) - oi,
+                                        min(b + 1 + di, ihi + 2) - oi):
+                            for lj in range(max(c - 1 - dj, jlo - 2) - oj,
+                                            min(d + 1 + dj, jhi + 2) - oj):
+                                lda[li, lj] = _mc_slope(
+                                    0.5 * (q[li + di, lj + dj, n] - q[li - di, lj - dj, n]),
+                                    q[li + di, lj + dj, n] - q[li, lj, n],
+                                    q[li, lj, n] - q[li - di, lj - dj, n])
+
+                        for li in range(a - 1 - oi, b + 1 - oi):
+                            for lj in range(c - 1 - oj, d + 1 - oj):
+                                ld[li, lj, n] = _mc_slope(
+                                    (2./3.) * (q[li + di, lj + dj, n] - q[li - di, lj - dj, n] -
+                                               0.25 * (lda[li + di, lj + dj] +
+                                                       lda[li - di, lj - dj])),
+                                    q[li + di, lj + dj, n] - q[li, lj, n],
+                                    q[li, lj, n] - q[li - di, lj - dj, n])
+
+                    if use_flattening:
+                        for li in range(a - 1 - oi, b + 1 - oi):
+                            for lj in range(c - 1 - oj, d + 1 - oj):
+                                ld[li, lj, n] = xi[li, lj] * ld[li, lj, n]
+
+            # interface states -- zone (i, j) gives U_xl[i+1, j],
+            # U_xr[i, j], U_yl[i, j+1], and U_yr[i, j]
+            for li in range(a - 1 - oi, b + 1 - oi):
+                for lj in range(c - 1 - oj, d + 1 - oj):
+                    _states_zone(1, dtdx, dtdx4, ns,
+                                 irho, iu, iv, ip, ix, nspec,
+                                 gamma, q[li, lj, :], ldx[li, lj, :],
+                                 lvec, rvec, e_val, betal, betar,
+                                 U_xl[li + 1, lj, :], U_xr[li, lj, :])
+
+                    _states_zone(2, dtdy, dtdy4, ns,
+                                 irho, iu, iv, ip, ix, nspec,
+                                 gamma, q[li, lj, :], ldy[li, lj, :],
+                                 lvec, rvec, e_val, betal, betar,
+                                 U_yl[li, lj + 1, :], U_yr[li, lj, :])
+
+            # conserved interface states with the gravity source, and
+            # the transverse fluxes.  The transverse fluxes are zero
+            # outside of [ilo-1, ihi+1) x [jlo-1, jhi+1)
+            G_x[:, :, :] = 0.0
+            G_y[:, :, :] = 0.0
+
+            for i in range(a, min(b + 1, ihi + 1)):
+                for j in range(max(c - 1, jlo - 1), d):
+                    li = i - oi
+                    lj = j - oj
+
+                    _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                                       idens, ixmom, iymom, iener, irhoX, nspec,
+                                       gamma, U_xl[li, lj, :], U_xl[li, lj, :])
+                    _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                                       idens, ixmom, iymom, iener, irhoX, nspec,
+                                       gamma, U_xr[li, lj, :], U_xr[li, lj, :])
+
+                    U_xl[li, lj, iymom] += 0.5 * dt * ymom_src[i - 1, j]
+                    U_xl[li, lj, iener] += 0.5 * dt * E_src[i - 1, j]
+
+                    U_xr[li, lj, iymom] += 0.5 * dt * ymom_src[i, j]
+                    U_xr[li, lj, iener] += 0.5 * dt * E_src[i, j]
+
+                    if use_cgf:
+                        wall = _on_wall(1, i, j, ilo, ihi, jlo, jhi,
+                                        xl_solid, xr_solid)
+                        _riemann_cgf_face(1, idens, ixmom, iymom, iener, irhoX, nspec,
+                                          wall, gamma, U_xl[li, lj, :], U_xr[li, lj, :],
+                                          G_x[li, lj, :])
+                    else:
+                        _riemann_hllc_face(1, idens, ixmom, iymom, iener, irhoX, nspec,
+                                           gamma, U_xl[li, lj, :], U_xr[li, lj, :],
+                                           U_state, G_x[li, lj, :])
+
+            for i in range(max(a - 1, ilo - 1), b):
+                for j in range(c, min(d + 1, jhi + 1)):
+                    li = i - oi
+                    lj = j - oj
+
+                    _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                                       idens, ixmom, iymom, iener, irhoX, nspec,
+                                       gamma, U_yl[li, lj, :], U_yl[li, lj, :])
+                    _prim_to_cons_zone(irho, iu, iv, ip, ix,
+                                       idens, ixmom, iymom, iener, irhoX, nspec,
+                                       gamma, U_yr[li, lj, :], U_yr[li, lj, :])
+
+                    U_yl[li, lj, iymom] += 0.5 * dt * ymom_src[i, j - 1]
+                    U_yl[li, lj, iener] += 0.5 * dt * E_src[i, j - 1]
+
+                    U_yr[li, lj, iymom] += 0.5 * dt * ymom_src[i, j]
+                    U_yr[li, lj, iener] += 0.5 * dt * E_src[i, j]
+
+                    if use_cgf:
+                        wall = _on_wall(2, i, j, ilo, ihi, jlo, jhi,
+                                        yl_solid, yr_solid)
+                        _riemann_cgf_face(2, idens, ixmom, iymom, iener, irhoX, nspec,
+                                          wall, gamma, U_yl[li, lj, :], U_yr[li, lj, :],
+                                          G_y[li, lj, :])
+                    else:
+                        _riemann_hllc_face(2, idens, ixmom, iymom, iener, irhoX, nspec,
+                                           gamma, U_yl[li, lj, :], U_yr[li, lj, :],
+                                           U_state, G_y[li, lj, :])
+
+            # add the transverse flux differences and solve the normal
+            # Riemann problems
+            for i in range(a, b):
+                for j in range(c, d):
+                    li = i - oi
+                    lj = j - oj
+
+                    for n in range(nvar):
+                        U_xl[li, lj, n] += - 0.5 * dtdy * (G_y[li - 1, lj + 1, n] -
+                                                           G_y[li - 1, lj, n])
+                        U_xr[li, lj, n] += - 0.5 * dtdy * (G_y[li, lj + 1, n] -
+                                                           G_y[li, lj, n])
+                        U_yl[li, lj, n] += - 0.5 * dtdx * (G_x[li + 1, lj - 1, n] -
+                                                           G_x[li, lj - 1, n])
+                        U_yr[li, lj, n] += - 0.5 * dtdx * (G_x[li + 1, lj, n] -
+                                                           G_x[li, lj, n])
+
+                    if use_cgf:
+                        wall = _on_wall(1, i, j, ilo, ihi, jlo, jhi,
+                                        xl_solid, xr_solid)
+                        _riemann_cgf_face(1, idens, ixmom, iymom, iener, irhoX, nspec,
+                                          wall, gamma, U_xl[li, lj, :], U_xr[li, lj, :],
+                                          F_x[i, j, :])
+
+                        wall = _on_wall(2, i, j, ilo, ihi, jlo, jhi,
+                                        yl_solid, yr_solid)
+                        _riemann_cgf_face(2, idens, ixmom, iymom, iener, irhoX, nspec,
+                                          wall, gamma, U_yl[li, lj, :], U_yr[li, lj, :],
+                                          F_y[i, j, :])
+                    else:
+                        _riemann_hllc_face(1, idens, ixmom, iymom, iener, irhoX, nspec,
+                                           gamma, U_xl[li, lj, :], U_xr[li, lj, :],
+                                           U_state, F_x[i, j, :])
+                        _riemann_hllc_face(2, idens, ixmom, iymom, iener, irhoX, nspec,
+                                           gamma, U_yl[li, lj, :], U_yr[li, lj, :],
+                                           U_state, F_y[i, j, :])
+
+                    # artificial viscosity (see artificial_viscosity)
+                    divU_x = (q[li, lj, iu] - q[li - 1, lj, iu]) / dx + \
+                        0.25 * (q[li, lj + 1, iv] + q[li - 1, lj + 1, iv] -
+                                q[li, lj - 1, iv] - q[li - 1, lj - 1, iv]) / dy
+
+                    avisco_x = cvisc * max(-divU_x * dx, 0.0)
+
+                    divU_y = 0.25 * (q[li + 1, lj, iu] + q[li + 1, lj - 1, iu] -
+                                     q[li - 1, lj, iu] - q[li - 1, lj - 1, iu]) / dx + \
+                        (q[li, lj, iv] - q[li, lj - 1, iv]) / dy
+
+                    avisco_y = cvisc * max(-divU_y * dy, 0.0)
+
+                    for n in range(nvar):
+                        F_x[i, j, n] += avisco_x * (U[i - 1, j, n] - U[i, j, n])
+                        F_y[i, j, n] += avisco_y * (U[i, j - 1, n] - U[i, j, n])
+
+    return F_x, F_y
+
+
+def _threaded(kernel):
+    """
+    Create a threaded version of a compiled kernel.  This compiles
+    the same python function with the outer ``prange`` loop run in
+    parallel.  Reductions are not parallelized, so each zone is
+    computed exactly as in the serial version.
+    """
+
+    func = kernel.py_func
+    pfunc = types.FunctionType(func.__code__, func.__globals__,
+                               func.__name__ + "_threaded",
+                               func.__defaults__, func.__closure__)
+    pfunc.__qualname__ = func.__qualname__ + "_threaded"
+    pfunc.__doc__ = func.__doc__
+
+    parallel = {"prange": True, "numpy": True, "comprehension": False,
+                "setitem": False, "reduction": False, "stencil": False,
+                "fusion": False}
+
+    return njit(cache=True, parallel=parallel)(pfunc)
+
+
+_KERNELS = ["states", "riemann_cgf", "riemann_prim", "riemann_hllc",
+            "artificial_viscosity", "ctu_fluxes"]
+
+serial = types.SimpleNamespace(**{k: globals()[k] for k in _KERNELS})
+threaded = types.SimpleNamespace(**{k: _threaded(globals()[k]) for k in _KERNELS})
+
+# the number of threads last requested
+_nthreads = None
+
+
+def get_kernels(rp):
+    """
+    Return the set of kernels to use, based on the runtime parameter
+    ``driver.nthreads``.  For more than one thread, the number of
+    numba threads is set and the threaded kernels are returned.
+
+    Parameters
+    ----------
+    rp : RuntimeParameters object
+        The runtime parameters for the simulation
+
+    Returns
+    -------
+    out : SimpleNamespace
+        The kernels (``states``, ``riemann_cgf``, ...) as attributes
+    """
+
+    try:
+        nthreads = rp.get_param("driver.nthreads")
+    except KeyError:
+        nthreads = 1
+
+    if nthreads <= 1:
+        return serial
+
+    global _nthreads
+    if nthreads != _nthreads:
+        _nthreads = nthreads
+        if nthreads > numba.config.NUMBA_NUM_THREADS:
+            msg.warning("WARNING: only {} threads available".format(
+                numba.config.NUMBA_NUM_THREADS))
+            nthreads = numba.config.NUMBA_NUM_THREADS
+        numba.set_num_threads(nthreads)
+
+    return threaded
@@ -7,8 +7,10 @@ import matplotlib.pyplot as plt
 
 import compressible.BC as BC
 import compressible.eos as eos
+import compressible.interface as ifc
 import compressible.derives as derives
 import compressible.unsplit_fluxes as flx
+import mesh.array_indexer as ai
 import mesh.boundary as bnd
 from simulation_null import NullSimulation, grid_setup, bc_setup
 import util.plot_tools as plot_tools
@@ -52,49 +54,125 @@ class Variables(object):
             self.ix = -1
 
 
-def cons_to_prim(U, gamma, ivars, myg):
-    """ convert an input vector of conserved variables to primitive variables """
-
-    q = myg.scratch_array(nvar=ivars.nq)
-
-    q[:, :, ivars.irho] = U[:, :, ivars.idens]
-    q[:, :, ivars.iu] = U[:, :, ivars.ixmom]/U[:, :, ivars.idens]
-    q[:, :, ivars.iv] = U[:, :, ivars.iymom]/U[:, :, ivars.idens]
+def cons_to_prim(U, gamma, ivars, myg, q=None, buf=None):
+    """
+    Convert an input vector of conserved variables to primitive
+    variables.  This is done by a compiled kernel, in a single pass
+    over the zones (including all of the species).
+
+    Parameters
+    ----------
+    U : ndarray
+        The conserved state
+    gamma : float
+        The ratio of specific heats
+    ivars : Variables object
+        The indices of the state variables
+    myg : Grid2d object
+        The grid the state lives on
+    q : ndarray, optional
+        The array to store the primitive state in.  This can be U
+        itself, to convert in place.  If not given, a new array is
+        allocated.
+    buf : int, optional
+        Only convert the valid zones plus buf ghost cells.  By default,
+        all of the ghost cells are converted.
+
+    Returns
+    -------
+    out : ArrayIndexer object
+        The primitive state
+    """
 
-    e = (U[:, :, ivars.iener] -
-         0.5*q[:, :, ivars.irho]*(q[:, :, ivars.iu]**2 +
-                                  q[:, :, ivars.iv]**2))/q[:, :, ivars.irho]
+    if q is None:
+        q = myg.scratch_array(nvar=ivars.nq)
+    elif not isinstance(q, ai.ArrayIndexer):
+        q = ai.ArrayIndexer(d=q, grid=myg)
 
-    q[:, :, ivars.ip] = eos.pres(gamma, q[:, :, ivars.irho], e)
+    if buf is None:
+        buf = myg.ng
 
-    if ivars.naux > 0:
-        for nq, nu in zip(range(ivars.ix, ivars.ix+ivars.naux),
-                          range(ivars.irhox, ivars.irhox+ivars.naux)):
-            q[:, :, nq] = U[:, :, nu]/q[:, :, ivars.irho]
+    ifc.cons_to_prim(myg.ilo-buf, myg.ihi+1+buf, myg.jlo-buf, myg.jhi+1+buf,
+                     ivars.idens, ivars.ixmom, ivars.iymom, ivars.iener, ivars.irhox,
+                     ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix, ivars.naux,
+                     gamma, U, q)
 
     return q
 
 
-def prim_to_cons(q, gamma, ivars, myg):
-    """ convert an input vector of primitive variables to conserved variables """
+def prim_to_cons(q, gamma, ivars, myg, U=None, buf=None):
+    """
+    Convert an input vector of primitive variables to conserved
+    variables.  This is done by a compiled kernel, in a single pass
+    over the zones (including all of the species).
+
+    Parameters
+    ----------
+    q : ndarray
+        The primitive state
+    gamma : float
+        The ratio of specific heats
+    ivars : Variables object
+        The indices of the state variables
+    myg : Grid2d object
+        The grid the state lives on
+    U : ndarray, optional
+        The array to store the conserved state in.  This can be q
+        itself, to convert in place.  If not given, a new array is
+        allocated.
+    buf : int, optional
+        Only convert the valid zones plus buf ghost cells.  By default,
+        all of the ghost cells are converted.
+
+    Returns
+    -------
+    out : ArrayIndexer object
+        The conserved state
+    """
 
-    U = myg.scratch_array(nvar=ivars.nvar)
+    if U is None:
+        U = myg.scratch_array(nvar=ivars.nvar)
+    elif not isinstance(U, ai.ArrayIndexer):
+        U = ai.ArrayIndexer(d=U, grid=myg)
 
-    U[:, :, ivars.idens] = q[:, :, ivars.irho]
-    U[:, :, ivars.ixmom] = q[:, :, ivars.iu]*U[:, :, ivars.idens]
-    U[:, :, ivars.iymom] = q[:, :, ivars.iv]*U[:, :, ivars.idens]
+    if buf is None:
+        buf = myg.ng
 
-    rhoe = eos.rhoe(gamma, q[:, :, ivars.ip])
+    ifc.prim_to_cons(myg.ilo-buf, myg.ihi+1+buf, myg.jlo-buf, myg.jhi+1+buf,
+                     ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
+                     ivars.idens, ivars.ixmom, ivars.iymom, ivars.iener, ivars.irhox,
+                     ivars.naux, gamma, q, U)
 
-    U[:, :, ivars.iener] = rhoe + 0.5*q[:, :, ivars.irho]*(q[:, :, ivars.iu]**2 +
-                                                           q[:, :, ivars.iv]**2)
+    return U
 
-    if ivars.naux > 0:
-        for nq, nu in zip(range(ivars.ix, ivars.ix+ivars.naux),
-                          range(ivars.irhox, ivars.irhox+ivars.naux)):
-            U[:, :, nu] = q[:, :, nq]*q[:, :, ivars.irho]
 
-    return U
+def signal_speeds(U, gamma, ivars, myg):
+    """
+    Return the largest signal speeds in the state: :math:`|u| + c_s`,
+    :math:`|v| + c_s` and :math:`(|u| + c_s)/dx + (|v| + c_s)/dy`.
+    These set the CFL timestep.  This is done by a compiled kernel, in
+    a single pass over the zones, without any temporaries.
+
+    Parameters
+    ----------
+    U : ndarray
+        The conserved state
+    gamma : float
+        The ratio of specific heats
+    ivars : Variables object
+        The indices of the state variables
+    myg : Grid2d object
+        The grid the state lives on
+
+    Returns
+    -------
+    out : ndarray
+        The three maximum speeds
+    """
+
+    return ifc.signal_speeds(myg.dx, myg.dy,
+                             ivars.idens, ivars.ixmom, ivars.iymom, ivars.iener,
+                             gamma, U)
 
 
 class Simulation(NullSimulation):
@@ -109,7 +187,10 @@ class Simulation(NullSimulation):
         the initial conditions for the chosen problem.
         """
         my_grid = grid_setup(self.rp, ng=ng)
-        my_data = self.data_class(my_grid)
+
+        # the memory layout of the state -- variable-major keeps each
+        # variable contiguous
+        my_data = self.data_class(my_grid, layout=self.rp.get_param("mesh.layout"))
 
         # define solver specific boundary condition routines
         bnd.define_bc("hse", BC.user, is_solid=False)
@@ -178,14 +259,13 @@ class Simulation(NullSimulation):
 
         cfl = self.rp.get_param("driver.cfl")
 
-        # get the variables we need
-        u, v, cs = self.cc_data.get_var(["velocity", "soundspeed"])
+        # the largest |u| + cs and |v| + cs
+        myg = self.cc_data.grid
+        sx, sy, _ = signal_speeds(self.cc_data.data, self.cc_data.get_aux("gamma"),
+                                  self.ivars, myg)
 
         # the timestep is min(dx/(|u| + cs), dy/(|v| + cs))
-        xtmp = self.cc_data.grid.dx/(abs(u) + cs)
-        ytmp = self.cc_data.grid.dy/(abs(v) + cs)
-
-        self.dt = cfl*float(min(xtmp.min(), ytmp.min()))
+        self.dt = cfl*float(min(myg.dx/sx, myg.dy/sy))
 
     def evolve(self):
         """
@@ -196,41 +276,43 @@ class Simulation(NullSimulation):
         tm_evolve = self.tc.timer("evolve")
         tm_evolve.begin()
 
-        dens = self.cc_data.get_var("density")
-        ymom = self.cc_data.get_var("y-momentum")
-        ener = self.cc_data.get_var("energy")
+        with self.cc_data.grid.scratch_scope():
 
-        grav = self.rp.get_param("compressible.grav")
+            dens = self.cc_data.get_var("density")
+            ymom = self.cc_data.get_var("y-momentum")
+            ener = self.cc_data.get_var("energy")
 
-        myg = self.cc_data.grid
+            grav = self.rp.get_param("compressible.grav")
 
-        Flux_x, Flux_y = flx.unsplit_fluxes(self.cc_data, self.aux_data, self.rp,
-                                            self.ivars, self.solid, self.tc, self.dt)
+            myg = self.cc_data.grid
 
-        old_dens = dens.copy()
-        old_ymom = ymom.copy()
+            Flux_x, Flux_y = flx.unsplit_fluxes(self.cc_data, self.aux_data, self.rp,
+                                                self.ivars, self.solid, self.tc, self.dt)
 
-        # conservative update
-        dtdx = self.dt/myg.dx
-        dtdy = self.dt/myg.dy
+            old_dens = dens.copy()
+            old_ymom = ymom.copy()
 
-        for n in range(self.ivars.nvar):
-            var = self.cc_data.get_var_by_index(n)
+            # conservative update
+            dtdx = self.dt/myg.dx
+            dtdy = self.dt/myg.dy
 
-            var.v()[:, :] += \
-                dtdx*(Flux_x.v(n=n) - Flux_x.ip(1, n=n)) + \
-                dtdy*(Flux_y.v(n=n) - Flux_y.jp(1, n=n))
+            for n in range(self.ivars.nvar):
+                var = self.cc_data.get_var_by_index(n)
 
-        # gravitational source terms
-        ymom[:, :] += 0.5*self.dt*(dens[:, :] + old_dens[:, :])*grav
-        ener[:, :] += 0.5*self.dt*(ymom[:, :] + old_ymom[:, :])*grav
+                var.v()[:, :] += \
+                    dtdx*(Flux_x.v(n=n) - Flux_x.ip(1, n=n)) + \
+                    dtdy*(Flux_y.v(n=n) - Flux_y.jp(1, n=n))
 
-        if self.particles is not None:
-            self.particles.update_particles(self.dt)
+            # gravitational source terms
+            ymom[:, :] += 0.5*self.dt*(dens[:, :] + old_dens[:, :])*grav
+            ener[:, :] += 0.5*self.dt*(ymom[:, :] + old_ymom[:, :])*grav
+
+            if self.particles is not None:
+                self.particles.update_particles(self.dt)
 
-        # increment the time
-        self.cc_data.t += self.dt
-        self.n += 1
+            # increment the time
+            self.cc_data.t += self.dt
+            self.n += 1
 
         tm_evolve.end()
 
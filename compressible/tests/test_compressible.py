@@ -1,8 +1,11 @@
 import numpy as np
-from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_equal, assert_allclose
 
 from util import runparams
 import compressible.simulation as sn
+import compressible.eos as eos
+import compressible.interface as ifc
+import compressible.unsplit_fluxes as flx
 import pytest
 
 
@@ -23,6 +26,7 @@ class TestSimulation(object):
 
         self.rp.params["mesh.nx"] = 8
         self.rp.params["mesh.ny"] = 8
+        self.rp.params["mesh.layout"] = "zone-major"
         self.rp.params["particles.do_particles"] = 0
 
         self.rp.params["eos.gamma"] = 1.4
@@ -56,8 +60,218 @@ class TestSimulation(object):
         U = sn.prim_to_cons(q, gamma, self.sim.ivars, self.sim.cc_data.grid)
         assert_array_equal(U, self.sim.cc_data.data)
 
+    def test_prim_inplace(self):
+
+        gamma = self.sim.cc_data.get_aux("gamma")
+        ivars = self.sim.ivars
+        myg = self.sim.cc_data.grid
+
+        # a state with some structure, so all the variables differ
+        U = self.sim.cc_data.data.copy()
+        U[:, :, ivars.ixmom] = 0.1*myg.x2d
+        U[:, :, ivars.iymom] = -0.2*myg.y2d
+        U[:, :, ivars.iener] += 0.5*myg.x2d*myg.y2d
+
+        q = sn.cons_to_prim(U, gamma, ivars, myg)
+
+        # converting in place gives the same result
+        W = U.copy()
+        q_in = sn.cons_to_prim(W, gamma, ivars, myg, q=W)
+        assert_array_equal(q_in, q)
+        assert np.shares_memory(q_in, W)
+
+        # only the valid region plus the buffer is converted
+        W = U.copy()
+        sn.cons_to_prim(W, gamma, ivars, myg, q=W, buf=1)
+        assert_array_equal(W.v(buf=1, n=ivars.ip), q.v(buf=1, n=ivars.ip))
+        assert_array_equal(W[:myg.ilo-1, :, :], U[:myg.ilo-1, :, :])
+        assert_array_equal(W[:, myg.jhi+2:, :], U[:, myg.jhi+2:, :])
+
+        sn.prim_to_cons(W, gamma, ivars, myg, U=W, buf=1)
+        assert_allclose(W.v(buf=1, n=ivars.iener), U.v(buf=1, n=ivars.iener), rtol=1.e-14)
+
+    def test_signal_speeds(self):
+
+        myd = self.sim.cc_data
+        myg = myd.grid
+        ivars = self.sim.ivars
+        gamma = myd.get_aux("gamma")
+
+        # a state where the fastest zone is a ghost cell
+        myd.get_var("x-momentum")[:, :] = 0.1*myg.x2d
+        myd.get_var("y-momentum")[:, :] = -0.2*myg.y2d
+        myd.get_var("x-momentum")[0, 0] = 1.0
+
+        u, v, cs = myd.get_var(["velocity", "soundspeed"])
+        sx = abs(u) + cs
+        sy = abs(v) + cs
+
+        # the speeds are exactly those of the derived variables
+        s = sn.signal_speeds(myd.data, gamma, ivars, myg)
+        assert s[0] == sx.max() and s[1] == sy.max()
+        assert s[2] == (sx/myg.dx + sy/myg.dy).max()
+
+        # and they give the same timestep as the derived variables
+        self.rp.params["driver.cfl"] = 0.8
+        self.sim.method_compute_timestep()
+        assert self.sim.dt == 0.8*min((myg.dx/sx).min(), (myg.dy/sy).min())
+
     def test_derives(self):
 
         gamma = self.sim.cc_data.get_aux("gamma")
         cs = self.sim.cc_data.get_var("soundspeed")
         assert np.all(cs == np.sqrt(gamma))
+
+
+def test_hse_bc():
+
+    rp = runparams.RuntimeParameters()
+
+    rp.params["mesh.nx"] = 8
+    rp.params["mesh.ny"] = 8
+    rp.params["mesh.layout"] = "zone-major"
+    rp.params["mesh.ylboundary"] = "hse"
+    rp.params["mesh.yrboundary"] = "hse"
+    rp.params["particles.do_particles"] = 0
+
+    rp.params["eos.gamma"] = 1.4
+    rp.params["compressible.grav"] = -1.0
+
+    sim = sn.Simulation("compressible", "test", rp)
+    sim.initialize()
+
+    myd = sim.cc_data
+    myg = myd.grid
+
+    def check():
+        # integrate HSE out from the boundary rows, one column at a time
+        dens = myd.get_var("density")
+        xmom = myd.get_var("x-momentum")
+        ymom = myd.get_var("y-momentum")
+        ener = myd.get_var("energy")
+
+        for jbase, js in [(myg.jlo, range(myg.jlo-1, -1, -1)),
+                          (myg.jhi, range(myg.jhi+1, myg.qy))]:
+            assert_array_equal(dens[:, js], dens[:, [jbase]*myg.ng])
+
+            ke = 0.5*(xmom[:, jbase]**2 + ymom[:, jbase]**2)/dens[:, jbase]
+            p = eos.pres(1.4, dens[:, jbase], (ener[:, jbase] - ke)/dens[:, jbase])
+            for j in js:
+                p = p + np.sign(j - jbase)*(-1.0)*dens[:, jbase]*myg.dy
+                assert_array_equal(ener[:, j], eos.rhoe(1.4, p) + ke)
+
+    # a state with some structure along the boundary
+    myd.get_var("density")[:, :] += 0.1*myg.x2d
+    myd.get_var("x-momentum")[:, :] = 0.1*myg.x2d
+
+    # the energy is filled before the momentum, so the corners only
+    # see the filled momentum on the second fill
+    myd.fill_BC_all()
+    myd.fill_BC_all()
+    check()
+
+    # a change along the boundary is picked up by the next fill
+    myd.get_var("energy")[:, myg.jlo-1] = 0.0
+    myd.get_var("energy")[3, myg.jhi] += 0.1
+    myd.fill_BC_all()
+    check()
+
+
+def test_threaded_kernels():
+
+    # the threaded kernels should give exactly the serial result
+    rng = np.random.default_rng(1234)
+
+    ng = 4
+    qx = qy = 16 + 2*ng
+    gamma = 1.4
+
+    q = np.empty((qx, qy, 4))
+    q[:, :, 0] = rng.uniform(0.5, 2.0, (qx, qy))
+    q[:, :, 1:3] = rng.uniform(-1.0, 1.0, (qx, qy, 2))
+    q[:, :, 3] = rng.uniform(0.5, 2.0, (qx, qy))
+    dq = 0.1*rng.uniform(-1.0, 1.0, (qx, qy, 4))
+
+    for idir in [1, 2]:
+        q_l, q_r = ifc.serial.states(idir, ng, 0.1, 0.01, 0, 1, 2, 3, 4, 0, gamma, q, dq)
+        tq_l, tq_r = ifc.threaded.states(idir, ng, 0.1, 0.01, 0, 1, 2, 3, 4, 0, gamma, q, dq)
+        assert_array_equal(q_l, tq_l)
+        assert_array_equal(q_r, tq_r)
+
+        # riemann_prim works on the primitive states directly
+        assert_array_equal(ifc.serial.riemann_prim(idir, ng, 0, 1, 2, 3, 4, 0, 0, 0, gamma, q_l, q_r),
+                           ifc.threaded.riemann_prim(idir, ng, 0, 1, 2, 3, 4, 0, 0, 0, gamma, q_l, q_r))
+
+    U_l = np.empty_like(q)
+    U_l[:, :, 0] = q[:, :, 0]
+    U_l[:, :, 1] = q[:, :, 0]*q[:, :, 1]
+    U_l[:, :, 2] = q[:, :, 0]*q[:, :, 2]
+    U_l[:, :, 3] = q[:, :, 3]/(gamma - 1.0) + 0.5*q[:, :, 0]*(q[:, :, 1]**2 + q[:, :, 2]**2)
+    U_r = np.roll(U_l, 1, axis=0)
+
+    for riemann in ["riemann_cgf", "riemann_hllc"]:
+        for idir in [1, 2]:
+            F = getattr(ifc.serial, riemann)(idir, ng, 0, 1, 2, 3, 4, 0, 0, 0, gamma, U_l, U_r)
+            tF = getattr(ifc.threaded, riemann)(idir, ng, 0, 1, 2, 3, 4, 0, 0, 0, gamma, U_l, U_r)
+            assert_array_equal(F, tF)
+
+    ax, ay = ifc.serial.artificial_viscosity(ng, 0.1, 0.1, 0.1, q[:, :, 1], q[:, :, 2])
+    tax, tay = ifc.threaded.artificial_viscosity(ng, 0.1, 0.1, 0.1, q[:, :, 1], q[:, :, 2])
+    assert_array_equal(ax, tax)
+    assert_array_equal(ay, tay)
+
+
+@pytest.mark.parametrize("riemann, limiter, use_flattening",
+                         [("HLLC", 2, 1), ("CGF", 2, 1), ("HLLC", 1, 0), ("CGF", 0, 1)])
+def test_fused_fluxes(monkeypatch, riemann, limiter, use_flattening):
+
+    # the fused kernel should give exactly the fluxes of the unfused
+    # path -- use small tiles so we cross tile boundaries
+    monkeypatch.setattr(flx, "FUSED_TILE", 8)
+
+    rp = runparams.RuntimeParameters()
+
+    rp.params["mesh.nx"] = 20
+    rp.params["mesh.ny"] = 12
+    rp.params["mesh.layout"] = "zone-major"
+    rp.params["particles.do_particles"] = 0
+
+    rp.params["eos.gamma"] = 1.4
+    rp.params["compressible.grav"] = -1.0
+    rp.params["compressible.riemann"] = riemann
+    rp.params["compressible.limiter"] = limiter
+    rp.params["compressible.use_flattening"] = use_flattening
+    rp.params["compressible.z0"] = 0.75
+    rp.params["compressible.z1"] = 0.85
+    rp.params["compressible.delta"] = 0.33
+    rp.params["compressible.cvisc"] = 0.1
+
+    sim = sn.Simulation("compressible", "test", rp)
+    sim.initialize()
+
+    # a random state, with shocks for the flattening to find
+    rng = np.random.default_rng(4321)
+    myd = sim.cc_data
+    shape = myd.get_var("density").shape
+
+    dens = myd.get_var("density")
+    dens[:, :] = rng.uniform(0.5, 2.0, shape)
+    u = rng.uniform(-1.0, 1.0, shape)
+    v = rng.uniform(-1.0, 1.0, shape)
+    p = np.where(rng.uniform(size=shape) > 0.8, 10.0, 1.0)
+    myd.get_var("x-momentum")[:, :] = dens*u
+    myd.get_var("y-momentum")[:, :] = dens*v
+    myd.get_var("energy")[:, :] = p/0.4 + 0.5*dens*(u**2 + v**2)
+    myd.fill_BC_all()
+
+    dt = 0.01
+
+    fluxes = []
+    for fused in [0, 1]:
+        rp.params["compressible.fused_ctu"] = fused
+        fluxes.append(flx.unsplit_fluxes(myd, sim.aux_data, rp, sim.ivars,
+                                         sim.solid, sim.tc, dt))
+
+    assert np.abs(fluxes[0][0]).max() > 0.0
+    assert_array_equal(fluxes[0][0], fluxes[1][0])
+    assert_array_equal(fluxes[0][1], fluxes[1][1])
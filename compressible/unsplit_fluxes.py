@@ -14,6 +14,11 @@ discussed in the Colella paper).
 
 * delta, z0, z1: flattening parameters (we use Colella 1990 defaults)
 
+* fused_ctu: set to 1 to do all of the steps below in a single
+  compiled pass over tiles of the grid (see
+  :func:`compressible.interface.ctu_fluxes`).  This gives the same
+  fluxes, but only the fluxes are stored on the full grid.
+
 The grid indices look like::
 
    j+3/2--+---------+---------+---------+
@@ -129,6 +134,9 @@ import mesh.array_indexer as ai
 
 from util import msg
 
+# the number of interfaces on a side of the tiles used by fused_fluxes
+FUSED_TILE = 32
+
 
 def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     """
@@ -170,6 +178,16 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
 
     gamma = rp.get_param("eos.gamma")
 
+    try:
+        fused = rp.get_param("compressible.fused_ctu")
+    except KeyError:
+        fused = 0
+
+    if fused:
+        F_x, F_y = fused_fluxes(my_data, my_aux, rp, ivars, solid, dt)
+        tm_flux.end()
+        return F_x, F_y
+
     # =========================================================================
     # compute the primitive variables
     # =========================================================================
@@ -205,8 +223,9 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     ldy = myg.scratch_array(nvar=ivars.nvar)
 
     for n in range(ivars.nvar):
-        ldx[:, :, n] = xi*reconstruction.limit(q[:, :, n], myg, 1, limiter)
-        ldy[:, :, n] = xi*reconstruction.limit(q[:, :, n], myg, 2, limiter)
+        with myg.scratch_scope():
+            ldx[:, :, n] = xi*reconstruction.limit(q[:, :, n], myg, 1, limiter)
+            ldy[:, :, n] = xi*reconstruction.limit(q[:, :, n], myg, 2, limiter)
 
     tm_limit.end()
 
@@ -215,20 +234,23 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     # =========================================================================
 
     # left and right primitive variable states
+    # the serial or threaded kernels, depending on driver.nthreads
+    kernels = ifc.get_kernels(rp)
+
     tm_states = tc.timer("interfaceStates")
     tm_states.begin()
 
-    V_l, V_r = ifc.states(1, myg.ng, myg.dx, dt,
-                          ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
-                          ivars.naux,
-                          gamma,
-                          q, ldx)
+    V_l, V_r = kernels.states(1, myg.ng, myg.dx, dt,
+                              ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
+                              ivars.naux,
+                              gamma,
+                              q, ldx)
 
     tm_states.end()
 
-    # transform interface states back into conserved variables
-    U_xl = comp.prim_to_cons(V_l, gamma, ivars, myg)
-    U_xr = comp.prim_to_cons(V_r, gamma, ivars, myg)
+    # transform interface states back into conserved variables (in place)
+    U_xl = comp.prim_to_cons(V_l, gamma, ivars, myg, U=V_l)
+    U_xr = comp.prim_to_cons(V_r, gamma, ivars, myg, U=V_r)
 
     # =========================================================================
     # y-direction
@@ -237,19 +259,17 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     # left and right primitive variable states
     tm_states.begin()
 
-    _V_l, _V_r = ifc.states(2, myg.ng, myg.dy, dt,
-                            ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
-                            ivars.naux,
-                            gamma,
-                            q, ldy)
-    V_l = ai.ArrayIndexer(d=_V_l, grid=myg)
-    V_r = ai.ArrayIndexer(d=_V_r, grid=myg)
+    V_l, V_r = kernels.states(2, myg.ng, myg.dy, dt,
+                              ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
+                              ivars.naux,
+                              gamma,
+                              q, ldy)
 
     tm_states.end()
 
-    # transform interface states back into conserved variables
-    U_yl = comp.prim_to_cons(V_l, gamma, ivars, myg)
-    U_yr = comp.prim_to_cons(V_r, gamma, ivars, myg)
+    # transform interface states back into conserved variables (in place)
+    U_yl = comp.prim_to_cons(V_l, gamma, ivars, myg, U=V_l)
+    U_yr = comp.prim_to_cons(V_r, gamma, ivars, myg, U=V_r)
 
     # =========================================================================
     # apply source terms
@@ -289,9 +309,9 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     riemann = rp.get_param("compressible.riemann")
 
     if riemann == "HLLC":
-        riemannFunc = ifc.riemann_hllc
+        riemannFunc = kernels.riemann_hllc
     elif riemann == "CGF":
-        riemannFunc = ifc.riemann_cgf
+        riemannFunc = kernels.riemann_cgf
     else:
         msg.fail("ERROR: Riemann solver undefined")
 
@@ -414,7 +434,7 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     # =========================================================================
     cvisc = rp.get_param("compressible.cvisc")
 
-    _ax, _ay = ifc.artificial_viscosity(myg.ng, myg.dx, myg.dy,
+    _ax, _ay = kernels.artificial_viscosity(myg.ng, myg.dx, myg.dy,
         cvisc, q.v(n=ivars.iu, buf=myg.ng), q.v(n=ivars.iv, buf=myg.ng))
 
     avisco_x = ai.ArrayIndexer(d=_ax, grid=myg)
@@ -436,3 +456,78 @@ def unsplit_fluxes(my_data, my_aux, rp, ivars, solid, tc, dt):
     tm_flux.end()
 
     return F_x, F_y
+
+
+def fused_fluxes(my_data, my_aux, rp, ivars, solid, dt):
+    """
+    Compute the same fluxes as :func:`unsplit_fluxes`, with all of
+    the steps done together, one tile of the grid at a time, by the
+    compiled kernel :func:`compressible.interface.ctu_fluxes`.
+
+    Parameters
+    ----------
+    my_data : CellCenterData2d object
+        The data object containing the grid and advective scalar that
+        we are advecting.
+    my_aux : CellCenterData2d object
+        The data object holding the source terms
+    rp : RuntimeParameters object
+        The runtime parameters for the simulation
+    ivars : Variables object
+        The Variables object that tells us which indices refer to which
+        variables
+    solid : BC_solid object
+        Which boundaries are solid walls
+    dt : float
+        The timestep we are advancing through.
+
+    Returns
+    -------
+    out : ndarray, ndarray
+        The fluxes on the x- and y-interfaces
+    """
+
+    myg = my_data.grid
+
+    gamma = rp.get_param("eos.gamma")
+
+    riemann = rp.get_param("compressible.riemann")
+    if riemann not in ["HLLC", "CGF"]:
+        msg.fail("ERROR: Riemann solver undefined")
+
+    # the gravitational sources, with their ghost cells filled, as
+    # in unsplit_fluxes
+    grav = rp.get_param("compressible.grav")
+
+    dens = my_data.get_var("density")
+    ymom = my_data.get_var("y-momentum")
+
+    ymom_src = my_aux.get_var("ymom_src")
+    ymom_src.v()[:, :] = dens.v()*grav
+    my_aux.fill_BC("ymom_src")
+
+    E_src = my_aux.get_var("E_src")
+    E_src.v()[:, :] = ymom.v()*grav
+    my_aux.fill_BC("E_src")
+
+    kernels = ifc.get_kernels(rp)
+
+    _fx, _fy = kernels.ctu_fluxes(myg.ng, myg.dx, myg.dy, dt, FUSED_TILE,
+                                  ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix,
+                                  ivars.idens, ivars.ixmom, ivars.iymom, ivars.iener,
+                                  ivars.irhox, ivars.naux,
+                                  solid.xl, solid.xr, solid.yl, solid.yr,
+                                  gamma,
+                                  rp.get_param("compressible.limiter"),
+                                  rp.get_param("compressible.use_flattening"),
+                                  rp.get_param("compressible.z0"),
+                                  rp.get_param("compressible.z1"),
+                                  rp.get_param("compressible.delta"),
+                                  riemann == "CGF",
+                                  rp.get_param("compressible.cvisc"),
+                                  my_data.data, ymom_src, E_src)
+
+    F_x = ai.ArrayIndexer(d=_fx, grid=myg)
+    F_y = ai.ArrayIndexer(d=_fy, grid=myg)
+
+    return F_x, F_y
@@ -58,9 +58,11 @@ def fluxes(myd, rp, ivars, solid, tc):
     U_cc[:, :, ivars.iymom] = myd.to_centers("y-momentum")
     U_cc[:, :, ivars.iener] = myd.to_centers("energy")
 
-    # compute the primitive variables of both the cell-center and averages
+    # compute the primitive variables of both the cell-center and averages.
+    # We only need the cell-centers where we build q_avg, so we convert
+    # them in place there
     q_bar = comp.cons_to_prim(U_avg, gamma, ivars, myd.grid)
-    q_cc = comp.cons_to_prim(U_cc, gamma, ivars, myd.grid)
+    q_cc = comp.cons_to_prim(U_cc, gamma, ivars, myd.grid, q=U_cc, buf=3)
 
     # compute the 4th-order approximation to the cell-average primitive state
     q_avg = myg.scratch_array(nvar=ivars.nq)
@@ -81,6 +83,9 @@ def fluxes(myd, rp, ivars, solid, tc):
     # for debugging
     nolimit = 0
 
+    # the serial or threaded kernels, depending on driver.nthreads
+    kernels = cf.get_kernels(rp)
+
     for idir in [1, 2]:
 
         # interpolate <W> to faces (with limiting)
@@ -117,10 +122,10 @@ def fluxes(myd, rp, ivars, solid, tc):
                     q_r.v(n=n, buf=2)[:, :] = xi.v(buf=2)*q_r.v(n=n, buf=2) + \
                         (1.0 - xi.v(buf=2))*q_avg.v(n=n, buf=2)
 
-        _q = cf.riemann_prim(idir, myg.ng,
-                             ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix, ivars.naux,
-                             0, 0,
-                             gamma, q_l, q_r)
+        _q = kernels.riemann_prim(idir, myg.ng,
+                                  ivars.irho, ivars.iu, ivars.iv, ivars.ip, ivars.ix, ivars.naux,
+                                  0, 0,
+                                  gamma, q_l, q_r)
 
         q_int_avg = ai.ArrayIndexer(_q, grid=myg)
 
@@ -22,35 +22,37 @@ class Simulation(compressible_rk.Simulation):
         myg = myd.grid
         grav = self.rp.get_param("compressible.grav")
 
-        # compute the source terms -- we need to do these to 4th
-        # order.  Start by evaluating the sources using the
-        # cell-center quantities (including one ghost cell.
-        dens_cc = myd.to_centers("density")
-        ymom_cc = myd.to_centers("y-momentum")
+        k = myg.scratch_array(nvar=self.ivars.nvar)
 
-        ymom_src = myg.scratch_array()
-        ymom_src.v(buf=1)[:, :] = dens_cc.v(buf=1)[:, :]*grav
+        with myg.scratch_scope():
 
-        E_src = myg.scratch_array()
-        E_src.v(buf=1)[:, :] = ymom_cc.v(buf=1)[:, :]*grav
+            # compute the source terms -- we need to do these to 4th
+            # order.  Start by evaluating the sources using the
+            # cell-center quantities (including one ghost cell.
+            dens_cc = myd.to_centers("density")
+            ymom_cc = myd.to_centers("y-momentum")
 
-        # now bring back to averages -- we only need this in the
-        # interior (no ghost cells)
-        ymom_src.v()[:, :] = ymom_src.v()[:, :] - myg.dx**2*ymom_src.lap()/24.0
-        E_src.v()[:, :] = E_src.v()[:, :] - myg.dx**2*E_src.lap()/24.0
+            ymom_src = myg.scratch_array()
+            ymom_src.v(buf=1)[:, :] = dens_cc.v(buf=1)[:, :]*grav
 
-        k = myg.scratch_array(nvar=self.ivars.nvar)
+            E_src = myg.scratch_array()
+            E_src.v(buf=1)[:, :] = ymom_cc.v(buf=1)[:, :]*grav
 
-        flux_x, flux_y = flx.fluxes(myd, self.rp,
-                                    self.ivars, self.solid, self.tc)
+            # now bring back to averages -- we only need this in the
+            # interior (no ghost cells)
+            ymom_src.v()[:, :] = ymom_src.v()[:, :] - myg.dx**2*ymom_src.lap()/24.0
+            E_src.v()[:, :] = E_src.v()[:, :] - myg.dx**2*E_src.lap()/24.0
 
-        for n in range(self.ivars.nvar):
-            k.v(n=n)[:, :] = \
-               (flux_x.v(n=n) - flux_x.ip(1, n=n))/myg.dx + \
-               (flux_y.v(n=n) - flux_y.jp(1, n=n))/myg.dy
+            flux_x, flux_y = flx.fluxes(myd, self.rp,
+                                        self.ivars, self.solid, self.tc)
 
-        k.v(n=self.ivars.iymom)[:, :] += ymom_src.v()[:, :]
-        k.v(n=self.ivars.iener)[:, :] += E_src.v()[:, :]
+            for n in range(self.ivars.nvar):
+                k.v(n=n)[:, :] = \
+                   (flux_x.v(n=n) - flux_x.ip(1, n=n))/myg.dx + \
+                   (flux_y.v(n=n) - flux_y.jp(1, n=n))/myg.dy
+
+            k.v(n=self.ivars.iymom)[:, :] += ymom_src.v()[:, :]
+            k.v(n=self.ivars.iener)[:, :] += E_src.v()[:, :]
 
         return k
 
@@ -74,26 +76,28 @@ class Simulation(compressible_rk.Simulation):
         tm_evolve = self.tc.timer("evolve")
         tm_evolve.begin()
 
-        myd = self.cc_data
+        with self.cc_data.grid.scratch_scope():
+
+            myd = self.cc_data
 
-        method = self.rp.get_param("compressible.temporal_method")
+            method = self.rp.get_param("compressible.temporal_method")
 
-        rk = integration.RKIntegrator(myd.t, self.dt, method=method)
-        rk.set_start(myd)
+            rk = integration.RKIntegrator(myd.t, self.dt, method=method)
+            rk.set_start(myd)
 
-        for s in range(rk.nstages()):
-            ytmp = rk.get_stage_start(s)
-            ytmp.fill_BC_all()
-            k = self.substep(ytmp)
-            rk.store_increment(s, k)
+            for s in range(rk.nstages()):
+                ytmp = rk.get_stage_start(s)
+                ytmp.fill_BC_all()
+                k = self.substep(ytmp)
+                rk.store_increment(s, k)
 
-        rk.compute_final_update()
+            rk.compute_final_update()
 
-        if self.particles is not None:
-            self.particles.update_particles(self.dt)
+            if self.particles is not None:
+                self.particles.update_particles(self.dt)
 
-        # increment the time
-        myd.t += self.dt
-        self.n += 1
+            # increment the time
+            myd.t += self.dt
+            self.n += 1
 
         tm_evolve.end()
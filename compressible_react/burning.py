@@ -0,0 +1,238 @@
+r"""
+A one-step reaction network, fuel -> ash, and a stiff integrator for
+it.
+
+We burn at constant density, so only the fuel mass fraction, X, and
+the specific internal energy, e, change::
+
+   dX/dt = -r
+   de/dt = q r
+
+with the Arrhenius rate :math:`r = A X \exp(-T_a/T)`, where q is the
+energy released per unit mass of fuel burned.  For the gamma-law EOS
+we take the temperature to be :math:`T = p/\rho = (\gamma - 1) e`
+(code units, where the gas constant is 1).
+
+The zones are independent, but we integrate them all together, as
+arrays: each substep is taken by every zone that is still burning at
+once.  We use the 4th order Kaps-Rentrop Rosenbrock method with the
+parameters of Shampine (1982), as in Numerical Recipes.  This is
+linearly implicit, so with the analytic Jacobian each substep only
+needs the solution of a 2x2 linear system per zone, which we do
+directly.  Each zone has its own substep size, controlled by the
+embedded 3rd order error estimate.  Zones drop out of the arrays as
+they finish the step.
+
+Since the method is exact for the linear invariant e + q X, the energy
+released is always exactly q times the fuel burned.
+
+"""
+
+from __future__ import print_function
+
+import numpy as np
+
+from util import msg
+
+
+class Network(object):
+    """the fuel -> ash network and its Jacobian"""
+
+    def __init__(self, rate, T_act, q, gamma):
+        """
+        Create the network.
+
+        Parameters
+        ----------
+        rate : float
+            The prefactor A of the rate
+        T_act : float
+            The activation temperature
+        q : float
+            The energy released per unit mass of fuel burned
+        gamma : float
+            The ratio of specific heats
+        """
+
+        self.rate = rate
+        self.T_act = T_act
+        self.q = q
+        self.gamma = gamma
+
+    def temperature(self, e):
+        """the temperature, given the specific internal energy"""
+        return (self.gamma - 1.0)*e
+
+    def rhs(self, X, e):
+        """
+        Return the time derivatives of the fuel mass fraction and the
+        specific internal energy.
+
+        Parameters
+        ----------
+        X, e : ndarray
+            The fuel mass fraction and specific internal energy
+
+        Returns
+        -------
+        out : tuple of ndarray
+            dX/dt, de/dt
+        """
+
+        r = X*self.rate*np.exp(-self.T_act/self.temperature(e))
+        return -r, self.q*r
+
+    def jacobian(self, X, e):
+        """
+        Return the Jacobian of the right hand side.
+
+        Parameters
+        ----------
+        X, e : ndarray
+            The fuel mass fraction and specific internal energy
+
+        Returns
+        -------
+        out : tuple of ndarray
+            The elements J_XX, J_Xe, J_eX, J_ee
+        """
+
+        T = self.temperature(e)
+        k = self.rate*np.exp(-self.T_act/T)
+        dk_de = k*self.T_act/T**2*(self.gamma - 1.0)
+
+        return -k, -X*dk_de, self.q*k, self.q*X*dk_de
+
+
+# the Rosenbrock method parameters (Shampine 1982)
+GAM = 1.0/2.0
+A21 = 2.0
+A31 = 48.0/25.0
+A32 = 6.0/25.0
+C21 = -8.0
+C31 = 372.0/25.0
+C32 = 12.0/5.0
+C41 = -112.0/125.0
+C42 = -54.0/125.0
+C43 = -2.0/5.0
+B1 = 19.0/9.0
+B2 = 1.0/2.0
+B3 = 25.0/108.0
+B4 = 125.0/108.0
+E1 = 17.0/54.0
+E2 = 7.0/36.0
+E3 = 0.0
+E4 = 125.0/108.0
+
+
+def burn(net, X, e, dt, rtol=1.e-6, atol=1.e-10, max_substeps=10000):
+    """
+    Burn each zone for a time dt.
+
+    Parameters
+    ----------
+    net : Network object
+        The reaction network
+    X : ndarray
+        The fuel mass fraction in each zone
+    e : ndarray
+        The specific internal energy in each zone
+    dt : float
+        The time to burn for
+    rtol : float, optional
+        The relative tolerance of the integration
+    atol : float, optional
+        The absolute tolerance on the fuel mass fraction
+    max_substeps : int, optional
+        The maximum number of substeps (accepted or not) in any zone
+
+    Returns
+    -------
+    out : tuple
+        The new X and e, and the total number of accepted substeps
+    """
+
+    X0 = np.asarray(X, dtype=np.float64).ravel()
+    e0 = np.asarray(e, dtype=np.float64).ravel()
+
+    X = X0.copy()
+    e = e0.copy()
+    t = np.zeros_like(X)
+
+    # we try the whole step first and let the error control cut it
+    h = np.full_like(X, dt)
+
+    # the zones that are not done yet
+    active = np.arange(len(X))
+
+    nsub = 0
+    for _ in range(max_substeps):
+        if len(active) == 0:
+            break
+
+        Xa = X[active]
+        ea = e[active]
+        remaining = dt - t[active]
+        last = h[active] >= remaining
+        ha = np.where(last, remaining, h[active])
+
+        # the system matrix, I/(GAM h) - J, and its determinant
+        J_XX, J_Xe, J_eX, J_ee = net.jacobian(Xa, ea)
+        a11 = 1.0/(GAM*ha) - J_XX
+        a12 = -J_Xe
+        a21 = -J_eX
+        a22 = 1.0/(GAM*ha) - J_ee
+        det = a11*a22 - a12*a21
+
+        def solve(r_X, r_e):
+            return (a22*r_X - a12*r_e)/det, (a11*r_e - a21*r_X)/det
+
+        with np.errstate(all="ignore"):
+            g1_X, g1_e = solve(*net.rhs(Xa, ea))
+
+            f_X, f_e = net.rhs(Xa + A21*g1_X, ea + A21*g1_e)
+            g2_X, g2_e = solve(f_X + C21*g1_X/ha, f_e + C21*g1_e/ha)
+
+            f_X, f_e = net.rhs(Xa + A31*g1_X + A32*g2_X, ea + A31*g1_e + A32*g2_e)
+            g3_X, g3_e = solve(f_X + (C31*g1_X + C32*g2_X)/ha,
+                               f_e + (C31*g1_e + C32*g2_e)/ha)
+            g4_X, g4_e = solve(f_X + (C41*g1_X + C42*g2_X + C43*g3_X)/ha,
+                               f_e + (C41*g1_e + C42*g2_e + C43*g3_e)/ha)
+
+            X_new = Xa + B1*g1_X + B2*g2_X + B3*g3_X + B4*g4_X
+            e_new = ea + B1*g1_e + B2*g2_e + B3*g3_e + B4*g4_e
+
+            # the embedded error estimate
+            err_X = np.abs(E1*g1_X + E2*g2_X + E3*g3_X + E4*g4_X) / \
+                (atol + rtol*np.maximum(np.abs(Xa), np.abs(X_new)))
+            err_e = np.abs(E1*g1_e + E2*g2_e + E3*g3_e + E4*g4_e) / \
+                (rtol*np.maximum(np.abs(ea), np.abs(e_new)))
+            err = np.maximum(err_X, err_e)
+
+        # steps that fail or give a negative energy are rejected
+        err[~(e_new > 0.0) | ~np.isfinite(err)] = np.inf
+
+        accept = err <= 1.0
+
+        ok = active[accept]
+        X[ok] = X_new[accept]
+        e[ok] = e_new[accept]
+        t[ok] += ha[accept]
+        nsub += np.count_nonzero(accept)
+
+        # the next substep size
+        with np.errstate(divide="ignore"):
+            fac = np.clip(0.9*err**-0.25, 0.2, 5.0)
+        h[active] = ha*fac
+
+        active = active[~(accept & last)]
+
+    else:
+        if len(active) > 0:
+            msg.fail("ERROR: burning did not finish in {} substeps".format(max_substeps))
+
+    # the burning can overshoot the fuel by roundoff
+    X = np.maximum(X, 0.0)
+    e = e0 + net.q*(X0 - X)
+
+    return X, e, nsub
@@ -24,6 +24,9 @@ def init_data(my_data, rp):
     ymom = my_data.get_var("y-momentum")
     ener = my_data.get_var("energy")
 
+    fuel = my_data.get_var("fuel")
+    ash = my_data.get_var("ash")
+
     # initialize the components, remember, that ener here is rho*eint
     # + 0.5*rho*v**2, where eint is the specific internal energy
     # (erg/g)
@@ -31,6 +34,10 @@ def init_data(my_data, rp):
     xmom[:, :] = 0.0
     ymom[:, :] = 0.0
 
+    # everything starts as fuel, and the hot zones burn
+    fuel[:, :] = dens
+    ash[:, :] = 0.0
+
     E_sedov = 1.0
 
     r_init = rp.get_param("sedov.r_init")
@@ -5,6 +5,7 @@ import numpy as np
 
 import compressible
 import compressible.eos as eos
+import compressible_react.burning as burning
 
 import util.plot_tools as plot_tools
 
@@ -19,14 +20,63 @@ class Simulation(compressible.Simulation):
         """
         super().initialize(extra_vars=["fuel", "ash"])
 
+        self.network = burning.Network(self.rp.get_param("react.rate"),
+                                       self.rp.get_param("react.t_act"),
+                                       self.rp.get_param("react.q"),
+                                       self.rp.get_param("eos.gamma"))
+
+        # the number of zones we looked at and burned, the substeps
+        # taken, and the time spent, over the whole run
+        self.burn_stats = {"zones": 0, "burned": 0, "substeps": 0, "time": 0.0}
+
     def burn(self, dt):
-        """ react fuel to ash """
-        # compute T
+        """
+        React fuel to ash for dt.  This is done at constant density
+        and momentum, so only the fuel, ash and energy change.  Zones
+        that are too cold or have too little fuel are skipped.
+        """
 
-        # compute energy generation rate
+        # with no reactions, the fuel and ash are passive tracers
+        if self.network.rate == 0.0:
+            return
 
-        # update energy due to reaction
-        pass
+        tm_burn = self.tc.timer("burn")
+        tm_burn.begin()
+
+        myd = self.cc_data
+
+        dens = myd.get_var("density").v()
+        xmom = myd.get_var("x-momentum").v()
+        ymom = myd.get_var("y-momentum").v()
+        ener = myd.get_var("energy").v()
+        fuel = myd.get_var("fuel").v()
+        ash = myd.get_var("ash").v()
+
+        ke = 0.5*(xmom**2 + ymom**2)/dens
+        e = (ener - ke)/dens
+        X = fuel/dens
+
+        # only burn the zones that are hot and have fuel
+        burning_zones = (X > self.rp.get_param("react.x_min")) & \
+            (self.network.temperature(e) > self.rp.get_param("react.t_min"))
+
+        X_old = X[burning_zones]
+        X_new, e_new, nsub = burning.burn(self.network, X_old, e[burning_zones], dt,
+                                          rtol=self.rp.get_param("react.rtol"),
+                                          atol=self.rp.get_param("react.atol"),
+                                          max_substeps=self.rp.get_param("react.max_substeps"))
+
+        rho = dens[burning_zones]
+        fuel[burning_zones] = rho*X_new
+        ash[burning_zones] += rho*(X_old - X_new)
+        ener[burning_zones] = rho*e_new + ke[burning_zones]
+
+        tm_burn.end()
+
+        self.burn_stats["zones"] += dens.size
+        self.burn_stats["burned"] += len(X_old)
+        self.burn_stats["substeps"] += nsub
+        self.burn_stats["time"] = tm_burn.elapsed_time
 
     def diffuse(self, dt):
         """ diffuse for dt """
@@ -62,6 +112,30 @@ class Simulation(compressible.Simulation):
 
         self.burn(self.dt/2)
 
+    def burn_rate(self):
+        """
+        Return the burning throughput so far: the zones per second
+        through the burner (including the ones that were skipped),
+        and the burning zones per second.
+        """
+
+        t = self.burn_stats["time"]
+        if t <= 0.0:
+            return 0.0, 0.0
+        return self.burn_stats["zones"]/t, self.burn_stats["burned"]/t
+
+    def finalize(self):
+        """
+        Report the burning throughput, then do the usual clean-ups.
+        """
+
+        if self.verbose > 0 and self.burn_stats["burned"] > 0:
+            zps, bps = self.burn_rate()
+            print("burning: {:.4g} zones/s ({:.4g} burning zones/s, {:.3g} substeps per burning zone)".format(
+                zps, bps, self.burn_stats["substeps"]/self.burn_stats["burned"]))
+
+        super().finalize()
+
     def dovis(self):
         """
         Do runtime visualization.
@@ -0,0 +1,128 @@
+import numpy as np
+from numpy.testing import assert_allclose
+from scipy.integrate import solve_ivp
+
+from util import runparams
+import compressible_react.burning as burning
+import compressible_react.simulation as sn
+
+
+def test_isothermal():
+
+    # with no energy release, the fuel just decays exponentially
+    net = burning.Network(rate=2.0, T_act=1.0, q=0.0, gamma=1.4)
+
+    e = np.array([1.0, 2.5, 10.0])
+    X0 = np.array([1.0, 0.5, 1.e-3])
+
+    X, e_new, _ = burning.burn(net, X0, e, 0.5, rtol=1.e-8)
+
+    k = 2.0*np.exp(-1.0/(0.4*e))
+    assert_allclose(X, X0*np.exp(-0.5*k), rtol=1.e-6)
+    assert np.all(e_new == e)
+
+
+def test_runaway():
+
+    # a thermal runaway: the zones ignite at very different times, and
+    # the hottest burn on a timescale ~1e-5 of the step
+    net = burning.Network(rate=1.e9, T_act=20.0, q=5.0, gamma=1.4)
+
+    e = np.array([2.5, 3.0, 4.0, 10.0, 50.0])
+    X0 = np.array([1.0, 1.0, 0.5, 0.9, 0.2])
+    dt = 1.e-3
+
+    X, e_new, nsub = burning.burn(net, X0, e, dt)
+
+    # the energy released is exactly q times the fuel burned
+    assert_allclose(e_new + net.q*X, e + net.q*X0, rtol=1.e-15)
+    assert np.all(X >= 0.0)
+
+    for n in range(len(X0)):
+        def rhs(_, y):
+            return net.rhs(y[0], y[1])
+
+        sol = solve_ivp(rhs, (0.0, dt), [X0[n], e[n]], method="Radau",
+                        rtol=1.e-12, atol=1.e-16)
+        assert_allclose(X[n], sol.y[0, -1], rtol=1.e-6, atol=1.e-10)
+        assert_allclose(e_new[n], sol.y[1, -1], rtol=1.e-6)
+
+    # an explicit method would need more than 1e5 steps for the
+    # hottest zone
+    assert nsub < 1000
+
+
+def test_burn_skip():
+
+    rp = runparams.RuntimeParameters()
+
+    rp.params["mesh.nx"] = 8
+    rp.params["mesh.ny"] = 8
+    rp.params["mesh.layout"] = "zone-major"
+    rp.params["particles.do_particles"] = 0
+
+    rp.params["eos.gamma"] = 1.4
+    rp.params["compressible.grav"] = 0.0
+
+    for p, value in [("dens1", 1.0), ("dens2", 1.0), ("p0", 1.0),
+                     ("amp", 0.0), ("sigma", 0.1)]:
+        rp.params["rt." + p] = value
+
+    rp.params["react.rate"] = 10.0
+    rp.params["react.t_act"] = 1.0
+    rp.params["react.q"] = 2.0
+    rp.params["react.t_min"] = 0.5
+    rp.params["react.x_min"] = 1.e-10
+    rp.params["react.rtol"] = 1.e-6
+    rp.params["react.atol"] = 1.e-10
+    rp.params["react.max_substeps"] = 10000
+
+    sim = sn.Simulation("compressible_react", "rt", rp)
+    sim.initialize()
+
+    myd = sim.cc_data
+    myg = myd.grid
+
+    # a gas at rest with T = p/rho = 1, with fuel on the left half,
+    # and the top rows too cold to burn
+    dens = myd.get_var("density")
+    ener = myd.get_var("energy")
+    fuel = myd.get_var("fuel")
+    ash = myd.get_var("ash")
+
+    myd.data[:, :, :] = 0.0
+    dens[:, :] = 1.0
+    ener[:, :] = 1.0/0.4
+
+    x = myg.x2d[myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1]
+    y = myg.y2d[myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1]
+
+    fuel.v()[:, :] = np.where(x < 0.5, 1.0, 0.0)
+    ash.v()[:, :] = 1.0 - fuel.v()
+    cold = y > 0.75
+    ener.v()[cold] *= 0.25
+
+    old = {name: myd.get_var(name).v().copy() for name in myd.names}
+
+    sim.burn(0.1)
+
+    # only the zones that are hot and have fuel burn
+    burned = (x < 0.5) & ~cold
+    assert np.all(fuel.v()[burned] < old["fuel"][burned])
+
+    for name in myd.names:
+        assert np.all(myd.get_var(name).v()[~burned] == old[name][~burned])
+
+    # the fuel becomes ash, releasing q per unit mass
+    assert_allclose(fuel.v() + ash.v(), 1.0, rtol=1.e-15)
+    assert_allclose(ener.v() - old["energy"], 2.0*(old["fuel"] - fuel.v()),
+                    atol=1.e-14)
+
+    assert sim.burn_stats["zones"] == myg.nx*myg.ny
+    assert sim.burn_stats["burned"] == np.count_nonzero(burned)
+
+    # with no reactions, the state is left alone
+    sim.network.rate = 0.0
+    state = myd.data.copy()
+    sim.burn(0.1)
+    assert np.all(myd.data == state)
@@ -94,8 +94,9 @@ def fluxes(my_data, rp, ivars, solid, tc):
     ldy = myg.scratch_array(nvar=ivars.nvar)
 
     for n in range(ivars.nvar):
-        ldx[:, :, n] = xi * reconstruction.limit(q[:, :, n], myg, 1, limiter)
-        ldy[:, :, n] = xi * reconstruction.limit(q[:, :, n], myg, 2, limiter)
+        with myg.scratch_scope():
+            ldx[:, :, n] = xi * reconstruction.limit(q[:, :, n], myg, 1, limiter)
+            ldy[:, :, n] = xi * reconstruction.limit(q[:, :, n], myg, 2, limiter)
 
     tm_limit.end()
 
@@ -126,9 +127,9 @@ def fluxes(my_data, rp, ivars, solid, tc):
 
     tm_states.end()
 
-    # transform interface states back into conserved variables
-    U_xl = comp.prim_to_cons(V_l, gamma, ivars, myg)
-    U_xr = comp.prim_to_cons(V_r, gamma, ivars, myg)
+    # transform interface states back into conserved variables (in place)
+    U_xl = comp.prim_to_cons(V_l, gamma, ivars, myg, U=V_l)
+    U_xr = comp.prim_to_cons(V_r, gamma, ivars, myg, U=V_r)
 
     # =========================================================================
     # y-direction
@@ -137,6 +138,9 @@ def fluxes(my_data, rp, ivars, solid, tc):
     # left and right primitive variable states
     tm_states.begin()
 
+    V_l = myg.scratch_array(ivars.nvar)
+    V_r = myg.scratch_array(ivars.nvar)
+
     for n in range(ivars.nvar):
         if well_balanced and n == ivars.ip:
             # we want to do p0 + p1 on the interfaces.  We found the
@@ -155,9 +159,9 @@ def fluxes(my_data, rp, ivars, solid, tc):
 
     tm_states.end()
 
-    # transform interface states back into conserved variables
-    U_yl = comp.prim_to_cons(V_l, gamma, ivars, myg)
-    U_yr = comp.prim_to_cons(V_r, gamma, ivars, myg)
+    # transform interface states back into conserved variables (in place)
+    U_yl = comp.prim_to_cons(V_l, gamma, ivars, myg, U=V_l)
+    U_yr = comp.prim_to_cons(V_r, gamma, ivars, myg, U=V_r)
 
     # =========================================================================
     # construct the fluxes normal to the interfaces
@@ -167,10 +171,13 @@ def fluxes(my_data, rp, ivars, solid, tc):
 
     riemann = rp.get_param("compressible.riemann")
 
+    # the serial or threaded kernels, depending on driver.nthreads
+    kernels = interface.get_kernels(rp)
+
     if riemann == "HLLC":
-        riemannFunc = interface.riemann_hllc
+        riemannFunc = kernels.riemann_hllc
     elif riemann == "CGF":
-        riemannFunc = interface.riemann_cgf
+        riemannFunc = kernels.riemann_cgf
     else:
         msg.fail("ERROR: Riemann solver undefined")
 
@@ -194,7 +201,7 @@ def fluxes(my_data, rp, ivars, solid, tc):
     # =========================================================================
     cvisc = rp.get_param("compressible.cvisc")
 
-    _ax, _ay = interface.artificial_viscosity(myg.ng, myg.dx, myg.dy,
+    _ax, _ay = kernels.artificial_viscosity(myg.ng, myg.dx, myg.dy,
         cvisc, q.v(n=ivars.iu, buf=myg.ng), q.v(n=ivars.iv, buf=myg.ng))
 
     avisco_x = ai.ArrayIndexer(d=_ax, grid=myg)
@@ -1,7 +1,5 @@
 from __future__ import print_function
 
-import numpy as np
-
 import mesh.integration as integration
 import compressible
 import compressible_rk.fluxes as flx
@@ -20,28 +18,30 @@ class Simulation(compressible.Simulation):
         myg = myd.grid
         grav = self.rp.get_param("compressible.grav")
 
-        # compute the source terms
-        dens = myd.get_var("density")
-        ymom = myd.get_var("y-momentum")
+        k = myg.scratch_array(nvar=self.ivars.nvar)
 
-        ymom_src = myg.scratch_array()
-        ymom_src.v()[:, :] = dens.v()[:, :]*grav
+        with myg.scratch_scope():
 
-        E_src = myg.scratch_array()
-        E_src.v()[:, :] = ymom.v()[:, :]*grav
+            # compute the source terms
+            dens = myd.get_var("density")
+            ymom = myd.get_var("y-momentum")
 
-        k = myg.scratch_array(nvar=self.ivars.nvar)
+            ymom_src = myg.scratch_array()
+            ymom_src.v()[:, :] = dens.v()[:, :]*grav
 
-        flux_x, flux_y = flx.fluxes(myd, self.rp,
-                                    self.ivars, self.solid, self.tc)
+            E_src = myg.scratch_array()
+            E_src.v()[:, :] = ymom.v()[:, :]*grav
 
-        for n in range(self.ivars.nvar):
-            k.v(n=n)[:, :] = \
-               (flux_x.v(n=n) - flux_x.ip(1, n=n))/myg.dx + \
-               (flux_y.v(n=n) - flux_y.jp(1, n=n))/myg.dy
+            flux_x, flux_y = flx.fluxes(myd, self.rp,
+                                        self.ivars, self.solid, self.tc)
 
-        k.v(n=self.ivars.iymom)[:, :] += ymom_src.v()[:, :]
-        k.v(n=self.ivars.iener)[:, :] += E_src.v()[:, :]
+            for n in range(self.ivars.nvar):
+                k.v(n=n)[:, :] = \
+                   (flux_x.v(n=n) - flux_x.ip(1, n=n))/myg.dx + \
+                   (flux_y.v(n=n) - flux_y.jp(1, n=n))/myg.dy
+
+            k.v(n=self.ivars.iymom)[:, :] += ymom_src.v()[:, :]
+            k.v(n=self.ivars.iener)[:, :] += E_src.v()[:, :]
 
         return k
 
@@ -57,14 +57,13 @@ class Simulation(compressible.Simulation):
 
         cfl = self.rp.get_param("driver.cfl")
 
-        # get the variables we need
-        u, v, cs = self.cc_data.get_var(["velocity", "soundspeed"])
-
-        # the timestep is min(dx/(|u| + cs), dy/(|v| + cs))
-        xtmp = (abs(u) + cs)/self.cc_data.grid.dx
-        ytmp = (abs(v) + cs)/self.cc_data.grid.dy
+        # the largest (|u| + cs)/dx + (|v| + cs)/dy
+        _, _, sxy = compressible.signal_speeds(self.cc_data.data,
+                                               self.cc_data.get_aux("gamma"),
+                                               self.ivars, self.cc_data.grid)
 
-        self.dt = cfl*float(np.min(1.0/(xtmp + ytmp)))
+        # the timestep is min(1/((|u| + cs)/dx + (|v| + cs)/dy))
+        self.dt = cfl*float(1.0/sxy)
 
     def evolve(self):
         """
@@ -75,26 +74,28 @@ class Simulation(compressible.Simulation):
         tm_evolve = self.tc.timer("evolve")
         tm_evolve.begin()
 
-        myd = self.cc_data
+        with self.cc_data.grid.scratch_scope():
+
+            myd = self.cc_data
 
-        method = self.rp.get_param("compressible.temporal_method")
+            method = self.rp.get_param("compressible.temporal_method")
 
-        rk = integration.RKIntegrator(myd.t, self.dt, method=method)
-        rk.set_start(myd)
+            rk = integration.RKIntegrator(myd.t, self.dt, method=method)
+            rk.set_start(myd)
 
-        for s in range(rk.nstages()):
-            ytmp = rk.get_stage_start(s)
-            ytmp.fill_BC_all()
-            k = self.substep(ytmp)
-            rk.store_increment(s, k)
+            for s in range(rk.nstages()):
+                ytmp = rk.get_stage_start(s)
+                ytmp.fill_BC_all()
+                k = self.substep(ytmp)
+                rk.store_increment(s, k)
 
-        rk.compute_final_update()
+            rk.compute_final_update()
 
-        if self.particles is not None:
-            self.particles.update_particles(self.dt)
+            if self.particles is not None:
+                self.particles.update_particles(self.dt)
 
-        # increment the time
-        myd.t += self.dt
-        self.n += 1
+            # increment the time
+            myd.t += self.dt
+            self.n += 1
 
         tm_evolve.end()
@@ -5,38 +5,30 @@ using SDC time integration
 
 from __future__ import print_function
 
-import mesh.patch as patch
+import mesh.fv as fv
+import mesh.sdc as sdc
 import compressible_fv4
-from util import msg
 
 
 class Simulation(compressible_fv4.Simulation):
     """Drive the 4th-order compressible solver with SDC time integration"""
 
-    def sdc_integral(self, m_start, m_end, As):
-        """Compute the integral over the sources from m to m+1 with a
-        Simpson's rule"""
+    def __init__(self, solver_name, problem_name, rp, timers=None, data_class=fv.FV2d):
+        super().__init__(solver_name, problem_name, rp, timers=timers, data_class=data_class)
 
-        integral = self.cc_data.grid.scratch_array(nvar=self.ivars.nvar)
+        # the SDC integrator -- this keeps the storage for the time
+        # nodes, so it is created on the first step and kept for the run
+        self.sdc = None
 
-        if m_start == 0 and m_end == 1:
-            for n in range(self.ivars.nvar):
-                integral.v(n=n)[:, :] = self.dt/24.0 * (5.0*As[0].v(n=n) + 8.0*As[1].v(n=n) - As[2].v(n=n))
-
-        elif m_start == 1 and m_end == 2:
-            for n in range(self.ivars.nvar):
-                integral.v(n=n)[:, :] = self.dt/24.0 * (-As[0].v(n=n) + 8.0*As[1].v(n=n) + 5.0*As[2].v(n=n))
-
-        else:
-            msg.fail("invalid quadrature range")
-
-        return integral
+        # the number of iterations taken in the last step
+        self.sdc_iters = 0
 
     def evolve(self):
 
         """
         Evolve the equations of compressible hydrodynamics through a
-        timestep dt.
+        timestep dt.  The time nodes and number of iterations are set
+        by the sdc runtime parameters (see :mod:`mesh.sdc`).
         """
 
         tm_evolve = self.tc.timer("evolve")
@@ -44,62 +36,25 @@ class Simulation(compressible_fv4.Simulation):
 
         myd = self.cc_data
 
-        # we need the solution at 3 time points and at the old and
-        # current iteration (except for m = 0 -- that doesn't change).
-
-        # This copy will initialize the the solution at all time nodes
-        # with the current (old) solution.
-        U_kold = []
-        U_kold.append(patch.cell_center_data_clone(self.cc_data))
-        U_kold.append(patch.cell_center_data_clone(self.cc_data))
-        U_kold.append(patch.cell_center_data_clone(self.cc_data))
-
-        U_knew = []
-        U_knew.append(U_kold[0])
-        U_knew.append(patch.cell_center_data_clone(self.cc_data))
-        U_knew.append(patch.cell_center_data_clone(self.cc_data))
-
-        # loop over iterations
-        for _ in range(1, 5):
-
-            # we need the advective term at all time nodes at the old
-            # iteration -- we'll compute this now
-            A_kold = []
-            for m in range(3):
-                _tmp = self.substep(U_kold[m])
-                A_kold.append(_tmp)
-
-            # loop over the time nodes and update
-            for m in range(2):
-
-                # update m to m+1 for knew
-
-                # compute A(U_m^{k+1})
-                A_knew = self.substep(U_knew[m])
-
-                # compute the integral over A at the old iteration
-                integral = self.sdc_integral(m, m+1, A_kold)
-
-                # and the final update
-                for n in range(self.ivars.nvar):
-                    U_knew[m+1].data.v(n=n)[:, :] = U_knew[m].data.v(n=n) + \
-                        0.5*self.dt * (A_knew.v(n=n) - A_kold[m].v(n=n)) + integral.v(n=n)
+        if self.sdc is None:
+            self.sdc = sdc.SDCIntegrator(nodes=self.rp.get_param("sdc.nodes"),
+                                         num_nodes=self.rp.get_param("sdc.num_nodes"),
+                                         sweeps=self.rp.get_param("sdc.max_iters"),
+                                         rtol=self.rp.get_param("sdc.rtol"))
 
-                # fill ghost cells
-                U_knew[m+1].fill_BC_all()
+        # the node storage is kept between steps, so it is created
+        # outside of the scratch scope
+        self.sdc.setup(myd)
 
-            # store the current iteration as the old iteration
-            for m in range(1, 3):
-                U_kold[m].data[:, :, :] = U_knew[m].data[:, :, :]
+        with myd.grid.scratch_scope():
 
-        # store the new solution
-        self.cc_data.data[:, :, :] = U_knew[-1].data[:, :, :]
+            self.sdc_iters = self.sdc.advance(myd, self.dt, self.substep)
 
-        if self.particles is not None:
-            self.particles.update_particles(self.dt)
+            if self.particles is not None:
+                self.particles.update_particles(self.dt)
 
-        # increment the time
-        myd.t += self.dt
-        self.n += 1
+            # increment the time
+            myd.t += self.dt
+            self.n += 1
 
         tm_evolve.end()
@@ -0,0 +1,125 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+
+import mesh.patch as patch
+from pyro import Pyro
+
+
+def setup_sim(rtol=0.0):
+    """a small acoustic pulse, ready to take a step"""
+
+    pyro_sim = Pyro("compressible_sdc")
+
+    inputs_dict = {"mesh.nx": 16,
+                   "mesh.ny": 16,
+                   "vis.dovis": 0,
+                   "driver.verbose": 0,
+                   "sdc.rtol": rtol}
+
+    pyro_sim.initialize_problem("acoustic_pulse", inputs_dict=inputs_dict)
+
+    sim = pyro_sim.sim
+    sim.preevolve()
+    sim.compute_timestep()
+
+    return sim
+
+
+def count_substeps(sim):
+    """wrap the substep method to count the calls"""
+
+    calls = []
+    substep = sim.substep
+
+    def counted(myd):
+        calls.append(myd)
+        return substep(myd)
+
+    sim.substep = counted
+    return calls
+
+
+def reference_evolve(sim):
+    """the SDC update without reusing any of the advective terms"""
+
+    myd = sim.cc_data
+    U_kold = [patch.cell_center_data_clone(myd) for _ in range(3)]
+    U_knew = [U_kold[0]] + [patch.cell_center_data_clone(myd) for _ in range(2)]
+
+    for _ in range(4):
+        A_kold = [sim.substep(U_kold[m]) for m in range(3)]
+
+        for m in range(2):
+            A_knew = sim.substep(U_knew[m])
+
+            # Simpson's rule over each half of the step
+            if m == 0:
+                w = [5.0, 8.0, -1.0]
+            else:
+                w = [-1.0, 8.0, 5.0]
+
+            for n in range(sim.ivars.nvar):
+                integral = sim.dt/24.0 * (w[0]*A_kold[0].v(n=n) + w[1]*A_kold[1].v(n=n) +
+                                          w[2]*A_kold[2].v(n=n))
+                U_knew[m+1].data.v(n=n)[:, :] = U_knew[m].data.v(n=n) + \
+                    0.5*sim.dt * (A_knew.v(n=n) - A_kold[m].v(n=n)) + integral
+
+            U_knew[m+1].fill_BC_all()
+
+        for m in range(1, 3):
+            U_kold[m].data[:, :, :] = U_knew[m].data[:, :, :]
+
+    return U_knew[-1].data
+
+
+def test_evolve_reuse():
+
+    sim = setup_sim()
+    ref = reference_evolve(sim)
+
+    calls = count_substeps(sim)
+    sim.evolve()
+
+    # the same answer, with 8 instead of 20 evaluations
+    assert_array_equal(sim.cc_data.data, ref)
+    assert len(calls) == 8
+    assert sim.sdc_iters == 4
+
+    # the node storage is kept between steps
+    nodes = list(sim.sdc.U[1:]) + [sim.sdc.integral]
+    sim.compute_timestep()
+    sim.evolve()
+    assert all(a is b for a, b in zip(nodes, sim.sdc.U[1:] + [sim.sdc.integral]))
+
+
+def test_evolve_rtol():
+
+    sim = setup_sim(rtol=1.e-6)
+    calls = count_substeps(sim)
+    sim.evolve()
+
+    # we stop before the maximum number of iterations
+    assert sim.sdc_iters < 4
+    assert len(calls) == 1 + 2*sim.sdc_iters
+
+
+def test_scratch_pool():
+
+    def run(pool):
+        pyro_sim = Pyro("compressible_sdc")
+        pyro_sim.initialize_problem("acoustic_pulse",
+                                    inputs_dict={"mesh.nx": 32,
+                                                 "mesh.ny": 32,
+                                                 "vis.dovis": 0,
+                                                 "driver.verbose": 0,
+                                                 "driver.max_steps": 5,
+                                                 "mesh.scratch_pool": pool})
+        pyro_sim.run_sim()
+        return pyro_sim.sim.cc_data.data
+
+    # the node storage lives across steps, so it must not come from
+    # the pool -- with the pool the answer is the same
+    no_pool = run(0)
+    pool = run(1)
+    assert np.all(np.isfinite(pool))
+    assert_array_equal(pool, no_pool)
@@ -1,19 +1,27 @@
 """ A simulation of diffusion """
 
 import importlib
-import math
 import numpy as np
 import matplotlib.pyplot as plt
 
 import mesh.patch as patch
 from simulation_null import NullSimulation, grid_setup, bc_setup
 import multigrid.MG as MG
+import multigrid.fft_solver as fft_solver
 from util import msg
 
 
 class Simulation(NullSimulation):
     """ A simulation of diffusion """
 
+    def __init__(self, solver_name, problem_name, rp, timers=None):
+        super().__init__(solver_name, problem_name, rp, timers=timers)
+
+        # the multigrid solver is created the first time we need it and
+        # then reused for each step
+        self.mg = None
+        self.mg_key = None
+
     def initialize(self):
         """
         Initialize the grid and variables for diffusion and set the initial
@@ -23,14 +31,6 @@ class Simulation(NullSimulation):
         # setup the grid
         my_grid = grid_setup(self.rp, ng=1)
 
-        # for MG, we need to be a power of two
-        if my_grid.nx != my_grid.ny:
-            msg.fail("need nx = ny for diffusion problems")
-
-        n = int(math.log(my_grid.nx)/math.log(2.0))
-        if 2**n != my_grid.nx:
-            msg.fail("grid needs to be a power of 2")
-
         # create the variables
 
         # first figure out the boundary conditions -- we allow periodic,
@@ -70,6 +70,53 @@ class Simulation(NullSimulation):
 
         self.dt = cfl*min(xtmp, ytmp)
 
+    def get_mg(self):
+        """
+        Return the elliptic solver for the implicit diffusion update.
+        The solver (and its grid hierarchy) is kept between steps and
+        only rebuilt if the grid or the boundary conditions change.
+        This is multigrid or, if diffusion.elliptic_solver = FFT, the
+        direct FFT solver.
+        """
+
+        myg = self.cc_data.grid
+        bc = self.cc_data.BCs["phi"]
+
+        solver = self.rp.get_param("diffusion.elliptic_solver")
+
+        bottom_solver = self.rp.get_param("diffusion.mg_bottom_solver")
+        bottom_size = self.rp.get_param("diffusion.mg_bottom_size")
+
+        key = (myg.nx, myg.ny, myg.xmin, myg.xmax, myg.ymin, myg.ymax,
+               bc.xlb, bc.xrb, bc.ylb, bc.yrb, solver,
+               bottom_solver, bottom_size)
+
+        if self.mg is None or self.mg_key != key:
+            # the bottom solve options only apply to multigrid
+            kwargs = {}
+
+            if solver == "MG":
+                solver_class = MG.CellCenterMG2d
+                kwargs = {"bottom_solver": bottom_solver,
+                          "bottom_size": bottom_size}
+            elif solver == "FFT":
+                solver_class = fft_solver.FFTHelmholtz2d
+            else:
+                msg.fail("ERROR: elliptic solver {} undefined".format(solver))
+
+            self.mg = solver_class(myg.nx, myg.ny,
+                                   xmin=myg.xmin, xmax=myg.xmax,
+                                   ymin=myg.ymin, ymax=myg.ymax,
+                                   xl_BC_type=bc.xlb,
+                                   xr_BC_type=bc.xrb,
+                                   yl_BC_type=bc.ylb,
+                                   yr_BC_type=bc.yrb,
+                                   alpha=1.0, beta=0.0,
+                                   verbose=0, **kwargs)
+            self.mg_key = key
+
+        return self.mg
+
     def evolve(self):
         """
         Diffusion through dt using C-N implicit solve with multigrid
@@ -92,15 +139,8 @@ class Simulation(NullSimulation):
         #
         # this is the form that arises with a Crank-Nicolson discretization
         # of the diffusion equation.
-        mg = MG.CellCenterMG2d(myg.nx, myg.ny,
-                               xmin=myg.xmin, xmax=myg.xmax,
-                               ymin=myg.ymin, ymax=myg.ymax,
-                               xl_BC_type=self.cc_data.BCs['phi'].xlb,
-                               xr_BC_type=self.cc_data.BCs['phi'].xrb,
-                               yl_BC_type=self.cc_data.BCs['phi'].ylb,
-                               yr_BC_type=self.cc_data.BCs['phi'].yrb,
-                               alpha=1.0, beta=0.5*self.dt*k,
-                               verbose=0)
+        mg = self.get_mg()
+        mg.set_coefficients(1.0, 0.5*self.dt*k)
 
         # form the RHS: f = phi + (dt/2) k L phi  (where L is the Laplacian)
         f = mg.soln_grid.scratch_array()
@@ -110,8 +150,11 @@ class Simulation(NullSimulation):
 
         mg.init_RHS(f)
 
-        # initial guess is zeros
-        mg.init_zeros()
+        # initial guess is either zeros or the current phi
+        if self.rp.get_param("diffusion.mg_warm_start"):
+            mg.init_solution(phi)
+        else:
+            mg.init_zeros()
 
         # solve the MG problem for the updated phi
         mg.solve(rtol=1.e-10)
@@ -32,3 +32,41 @@ class TestSimulation(object):
     def test_initializationst(self):
         phi = self.sim.cc_data.get_var("phi")
         assert phi.min() == 1.0 and phi.max() == 1.0
+
+    def test_mg_reuse(self):
+        self.rp.params["diffusion.k"] = 1.0
+        self.rp.params["diffusion.mg_warm_start"] = 0
+        self.rp.params["diffusion.elliptic_solver"] = "MG"
+        self.rp.params["diffusion.mg_bottom_solver"] = "smooth"
+        self.rp.params["diffusion.mg_bottom_size"] = 2
+
+        self.sim.dt = 1.e-3
+        self.sim.evolve()
+        mg = self.sim.mg
+
+        # the solver should be reused on the next step
+        self.sim.evolve()
+        assert self.sim.mg is mg
+
+        # phi is constant, so the update should not change it
+        phi = self.sim.cc_data.get_var("phi")
+        assert abs(phi.v() - 1.0).max() < 1.e-10
+
+    def test_mg_direct_bottom(self):
+        self.rp.params["diffusion.k"] = 1.0
+        self.rp.params["diffusion.mg_warm_start"] = 0
+        self.rp.params["diffusion.elliptic_solver"] = "MG"
+        self.rp.params["diffusion.mg_bottom_solver"] = "direct"
+        self.rp.params["diffusion.mg_bottom_size"] = 4
+
+        self.sim.dt = 1.e-3
+        self.sim.evolve()
+        lu = self.sim.mg.bottom_lu
+        assert lu is not None
+
+        # the factorization should be kept while dt doesn't change
+        self.sim.evolve()
+        assert self.sim.mg.bottom_lu is lu
+
+        phi = self.sim.cc_data.get_var("phi")
+        assert abs(phi.v() - 1.0).max() < 1.e-10
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Compare the CTU flux computation in the compressible solver done as
+a sequence of whole-grid passes (compressible.fused_ctu = 0) to the
+fused, tiled kernel (compressible.fused_ctu = 1).  For each, we run
+the quad problem and report the time for the flux computation, and
+the extra memory (the growth in the peak resident set size) needed
+to compute the fluxes once.  Each case is run in its own process so
+the memory measurements are independent.
+
+Both paths should give identical fluxes.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+import compressible.unsplit_fluxes as flx
+from pyro import Pyro
+
+
+def setup(N, fused, nthreads):
+    """initialize quad and return the simulation object"""
+
+    pyro_sim = Pyro("compressible")
+
+    inputs_dict = {"mesh.nx": N,
+                   "mesh.ny": N,
+                   "compressible.fused_ctu": fused,
+                   "driver.nthreads": nthreads,
+                   "vis.dovis": 0,
+                   "io.do_io": 0,
+                   "driver.verbose": 0}
+
+    pyro_sim.initialize_problem("quad", inputs_file="inputs.quad",
+                                inputs_dict=inputs_dict)
+
+    sim = pyro_sim.sim
+    sim.compute_timestep()
+
+    return sim
+
+
+def fluxes(sim):
+    return flx.unsplit_fluxes(sim.cc_data, sim.aux_data, sim.rp, sim.ivars,
+                              sim.solid, sim.tc, sim.dt)
+
+
+def run(N, fused, nthreads, ntimes, result):
+    """compute the fluxes on an N x N grid and put the peak memory
+    growth, the time per call, and the fluxes in result"""
+
+    # compile (or load) the kernels on a small grid first
+    fluxes(setup(16, fused, nthreads))
+
+    sim = setup(N, fused, nthreads)
+
+    # ru_maxrss is in kB on linux
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    F_x, F_y = fluxes(sim)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(ntimes):
+        fluxes(sim)
+    t_flux = (time.perf_counter() - start)/ntimes
+
+    result.put(((peak - base)/1024.0, t_flux,
+                np.asarray(F_x).copy(), np.asarray(F_y).copy()))
+
+
+def measure(N, fused, nthreads, ntimes):
+    """do a run in a separate process"""
+
+    result = multiprocessing.Queue()
+    p = multiprocessing.Process(target=run, args=(N, fused, nthreads, ntimes, result))
+    p.start()
+    out = result.get()
+    p.join()
+    return out
+
+
+def doit(N, nthreads, ntimes):
+
+    print("compressible quad, {}x{}, {} thread(s)".format(N, N, nthreads))
+    print("{:>10} {:>14} {:>16} {:>9}".format(
+        "fused_ctu", "flux time (s)", "peak growth (MB)", "speedup"))
+
+    mem_0, t_0, Fx_0, Fy_0 = measure(N, 0, nthreads, ntimes)
+    print("{:>10} {:14.4g} {:16.1f} {:9.2f}".format(0, t_0, mem_0, 1.0))
+
+    mem_1, t_1, Fx_1, Fy_1 = measure(N, 1, nthreads, ntimes)
+    print("{:>10} {:14.4g} {:16.1f} {:9.2f}".format(1, t_1, mem_1, t_0/t_1))
+
+    print("max difference in the fluxes: {:.3g}".format(
+        max(np.abs(Fx_1 - Fx_0).max(), np.abs(Fy_1 - Fy_0).max())))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=1024,
+                   help="number of zones in each direction")
+    p.add_argument("--nthreads", type=int, default=1,
+                   help="number of threads for the compiled kernels")
+    p.add_argument("--ntimes", type=int, default=3,
+                   help="number of timed flux computations")
+
+    args = p.parse_args()
+
+    doit(args.N, args.nthreads, args.ntimes)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Measure the strong scaling of the threaded compressible kernels
+(interface states, Riemann solvers, and artificial viscosity) by
+running a few steps of the quad problem with driver.nthreads = 1, 2,
+4, ... up to the number of threads numba was started with (set
+NUMBA_NUM_THREADS to change this).  We report the time per step and
+the speedup over the serial kernels.
+
+Every threaded run should give results identical to the serial run.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numba
+import numpy as np
+
+from pyro import Pyro
+
+
+def run(nthreads, N, nsteps, solver):
+    """run nsteps of quad with nthreads and return the wall time per
+    step and the final state"""
+
+    pyro_sim = Pyro(solver)
+
+    inputs_dict = {"mesh.nx": N,
+                   "mesh.ny": N,
+                   "driver.nthreads": nthreads,
+                   "vis.dovis": 0,
+                   "io.do_io": 0,
+                   "driver.verbose": 0}
+
+    pyro_sim.initialize_problem("quad", inputs_file="inputs.quad",
+                                inputs_dict=inputs_dict)
+
+    # take one step first so the numba kernels are compiled
+    pyro_sim.single_step()
+
+    start = time.perf_counter()
+    for _ in range(nsteps):
+        pyro_sim.single_step()
+    t_step = (time.perf_counter() - start)/nsteps
+
+    return t_step, np.asarray(pyro_sim.sim.cc_data.data).copy()
+
+
+def doit(N, nsteps, solver, max_threads):
+
+    threads = [1]
+    while 2*threads[-1] <= max_threads:
+        threads.append(2*threads[-1])
+    if threads[-1] != max_threads:
+        threads.append(max_threads)
+
+    t_serial, U_serial = run(1, N, nsteps, solver)
+
+    print("{} quad, {}x{}, {} steps".format(solver, N, N, nsteps))
+    print("{:>8} {:>14} {:>9} {:>11}".format("threads", "time/step (s)", "speedup", "max diff"))
+    print("{:>8} {:14.5g} {:9.3f} {:11.3g}".format(1, t_serial, 1.0, 0.0))
+
+    for nthreads in threads[1:]:
+        t_step, U = run(nthreads, N, nsteps, solver)
+        print("{:>8} {:14.5g} {:9.3f} {:11.3g}".format(
+            nthreads, t_step, t_serial/t_step, np.abs(U - U_serial).max()))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=1024,
+                   help="number of zones in each direction")
+    p.add_argument("--nsteps", type=int, default=5,
+                   help="number of timed steps")
+    p.add_argument("--solver", type=str, default="compressible",
+                   help="compressible-family solver to run")
+    p.add_argument("--max_threads", type=int, default=numba.config.NUMBA_NUM_THREADS,
+                   help="largest number of threads to try")
+
+    args = p.parse_args()
+
+    doit(args.N, args.nsteps, args.solver, args.max_threads)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Compare the two memory layouts of CellCenterData2d -- zone-major,
+(qx, qy, nvar), and variable-major, (nvar, qx, qy) -- by running a few
+steps of the compressible sedov problem with each and reporting the
+time per step and the throughput in zone-updates / second.
+
+The two runs should give identical results, since only the memory
+layout differs.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+from pyro import Pyro
+
+
+def run(layout, N, nsteps, solver):
+    """run nsteps of sedov with the given layout and return the
+    wall time per step and the final state"""
+
+    pyro_sim = Pyro(solver)
+
+    inputs_dict = {"mesh.nx": N,
+                   "mesh.ny": N,
+                   "mesh.layout": layout,
+                   "vis.dovis": 0,
+                   "io.do_io": 0,
+                   "driver.verbose": 0}
+
+    pyro_sim.initialize_problem("sedov", inputs_file="inputs.sedov",
+                                inputs_dict=inputs_dict)
+
+    # take one step first so the numba kernels are compiled
+    pyro_sim.single_step()
+
+    start = time.perf_counter()
+    for _ in range(nsteps):
+        pyro_sim.single_step()
+    t_step = (time.perf_counter() - start)/nsteps
+
+    return t_step, np.asarray(pyro_sim.sim.cc_data.data).copy()
+
+
+def doit(N, nsteps, solver):
+
+    results = {}
+    for layout in ["zone-major", "variable-major"]:
+        results[layout] = run(layout, N, nsteps, solver)
+
+    print("{} sedov, {}x{}, {} steps".format(solver, N, N, nsteps))
+    print("{:>16} {:>14} {:>16}".format("layout", "time/step (s)", "zone-updates/s"))
+    for layout, (t_step, _) in results.items():
+        print("{:>16} {:14.5g} {:16.5g}".format(layout, t_step, N*N/t_step))
+
+    diff = np.abs(results["zone-major"][1] - results["variable-major"][1]).max()
+    print("max difference between layouts: {}".format(diff))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=512,
+                   help="number of zones in each direction")
+    p.add_argument("--nsteps", type=int, default=10,
+                   help="number of timed steps")
+    p.add_argument("--solver", type=str, default="compressible",
+                   help="compressible-family solver to run")
+
+    args = p.parse_args()
+
+    doit(args.N, args.nsteps, args.solver)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Compare the throughput of the WENO flux construction used by
+advection_weno: the original path, which calls the 1-d fvs (and
+weno_upwind at every point) one row / column at a time, and the
+whole-array reconstruction in mesh.reconstruction.weno_upwind_multid.
+
+Throughput is reported in zone-updates / second, where one update is
+the construction of the x- and y-fluxes for a single zone.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+import advection_weno.fluxes as flx
+import mesh.patch as patch
+
+
+def fluxes_rowwise(q, weno_order, u, v, alpha, myg):
+    """the original advection_weno flux construction, one row or
+    column at a time"""
+
+    F_x = myg.scratch_array()
+    F_y = myg.scratch_array()
+
+    for j in range(myg.qy):
+        F_x[1:-1, j] = flx.fvs(q[:, j], weno_order, u, alpha)[1:-1]
+    for i in range(myg.qx):
+        F_y[i, 1:-1] = flx.fvs(q[i, :], weno_order, v, alpha)[1:-1]
+
+    return F_x, F_y
+
+
+def fluxes_multid(q, weno_order, u, v, alpha, myg):
+    """the whole-array flux construction"""
+
+    F_x = myg.scratch_array()
+    F_y = myg.scratch_array()
+
+    F_x[:, :] = flx.fvs_multid(q, weno_order, u, alpha, 0)
+    F_y[:, :] = flx.fvs_multid(q, weno_order, v, alpha, 1)
+
+    return F_x, F_y
+
+
+def time_it(func, nrepeat, *args):
+    """return the best time of nrepeat calls to func"""
+
+    best = 1.e33
+    for _ in range(nrepeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def doit(sizes, orders, nrepeat):
+
+    u = 1.0
+    v = 1.0
+    alpha = np.sqrt(u**2 + v**2)
+
+    print("{:>6} {:>6} {:>14} {:>14} {:>9} {:>10}".format(
+        "N", "order", "rowwise (z/s)", "multid (z/s)", "speedup", "max diff"))
+
+    for N in sizes:
+        for order in orders:
+            myg = patch.Grid2d(N, N, ng=order+1)
+
+            q = myg.scratch_array()
+            q[:, :] = 1.0 + np.exp(-60.0*((myg.x2d - 0.5)**2 + (myg.y2d - 0.5)**2))
+
+            F_old = fluxes_rowwise(q, order, u, v, alpha, myg)
+            F_new = fluxes_multid(q, order, u, v, alpha, myg)
+            diff = max(np.abs(F_old[0] - F_new[0]).max(),
+                       np.abs(F_old[1] - F_new[1]).max())
+
+            # the row-wise path is slow -- only time it once
+            t_old = time_it(fluxes_rowwise, 1, q, order, u, v, alpha, myg)
+            t_new = time_it(fluxes_multid, nrepeat, q, order, u, v, alpha, myg)
+
+            nzones = N*N
+            print("{:6d} {:6d} {:14.5g} {:14.5g} {:9.1f} {:10.3g}".format(
+                N, order, nzones/t_old, nzones/t_new, t_old/t_new, diff))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, nargs="+", default=[64, 128, 256],
+                   help="number of zones in each direction")
+    p.add_argument("--orders", type=int, nargs="+", default=[2, 3, 4, 5],
+                   help="WENO orders to test")
+    p.add_argument("--nrepeat", type=int, default=10,
+                   help="number of times to repeat the whole-array timing")
+
+    args = p.parse_args()
+
+    doit(args.N, args.orders, args.nrepeat)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Compare solving K righthand sides with the same operator one at a
+time (reusing one solver object) to solving them together with
+solve_batch(), on the multigrid test problems.  The righthand sides
+are the test problem's source plus smooth perturbations, so they take
+different numbers of cycles to converge.  For each we report the wall time of both approaches and
+the largest difference between the solutions.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+from examples.multigrid.mg_cycle_benchmark import PROBLEMS
+
+
+def rhs_batch(a, module, K):
+    """K righthand sides: the test problem's plus perturbations of
+    increasing size"""
+    f = module.f(a.x2d, a.y2d)
+    return np.array([f + 10.0**(k-K)*np.sin(2.0*np.pi*(k+1)*a.x2d)*np.sin(2.0*np.pi*a.y2d)
+                     for k in range(K)])
+
+
+def run(make, N, K, rtol):
+    """return the time for K separate solves and for a batched solve,
+    and the largest difference in the solutions"""
+
+    a, module = make(N)
+    rhs = rhs_batch(a, module, K)
+
+    # the separate solves reuse the same solver object
+    start = time.perf_counter()
+    separate = []
+    for k in range(K):
+        a.init_zeros()
+        a.init_RHS(rhs[k])
+        a.solve(rtol=rtol)
+        separate.append(a.get_solution())
+    t_separate = time.perf_counter() - start
+
+    a, module = make(N)
+
+    start = time.perf_counter()
+    batch = a.solve_batch(rhs, rtol=rtol)
+    t_batch = time.perf_counter() - start
+
+    diff = max(np.abs(batch[k] - separate[k]).max() for k in range(K))
+
+    return t_separate, t_batch, diff
+
+
+def doit(N, K, rtol):
+
+    print("N = {}, K = {}, rtol = {}".format(N, K, rtol))
+    print("{:>13} {:>14} {:>14} {:>8} {:>10}".format(
+        "problem", "separate (s)", "batched (s)", "speedup", "max diff"))
+
+    for name, make in PROBLEMS:
+
+        # compile the kernels first
+        run(make, 16, 2, rtol)
+
+        t_separate, t_batch, diff = run(make, N, K, rtol)
+        print("{:>13} {:14.4g} {:14.4g} {:8.2f} {:10.3g}".format(
+            name, t_separate, t_batch, t_separate/t_batch, diff))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=128,
+                   help="number of zones in each direction")
+    p.add_argument("-K", type=int, default=8,
+                   help="number of righthand sides")
+    p.add_argument("--rtol", type=float, default=1.e-11,
+                   help="relative tolerance for the solve")
+
+    args = p.parse_args()
+
+    doit(args.N, args.K, args.rtol)
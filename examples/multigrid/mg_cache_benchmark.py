@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Measure the effect of keeping the multigrid solver between steps (and
+optionally warm-starting it) in the diffusion and incompressible
+solvers.  For each problem we run a few steps in three modes:
+
+  * rebuild: a new solver is created for every solve (the old behavior)
+  * cached: the solver is kept and reused, starting from zero
+  * warm: the solver is kept and started from the previous solution
+
+and report the number of V-cycles and the wall time per step.  Note
+that the final projection in incompressible is always warm-started
+from the old phi.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import multigrid.MG as MG
+from pyro import Pyro
+
+
+PROBLEMS = [("diffusion", "gaussian", "inputs.gaussian"),
+            ("incompressible", "shear", "inputs.shear")]
+
+
+class CycleCounter(object):
+    """wrap CellCenterMG2d.solve to count the V-cycles taken"""
+
+    def __init__(self):
+        self.cycles = 0
+        self.solve = MG.CellCenterMG2d.solve
+
+    def __enter__(self):
+        counter = self
+
+        def solve(mg, rtol=1.e-11):
+            counter.solve(mg, rtol=rtol)
+            counter.cycles += mg.num_cycles
+
+        MG.CellCenterMG2d.solve = solve
+        return self
+
+    def __exit__(self, *args):
+        MG.CellCenterMG2d.solve = self.solve
+
+
+def run(solver, problem, inputs, mode, N, nsteps):
+    """run nsteps and return the V-cycles / step and time / step"""
+
+    pyro_sim = Pyro(solver)
+
+    inputs_dict = {"mesh.nx": N,
+                   "mesh.ny": N,
+                   "{}.mg_warm_start".format(solver): int(mode == "warm"),
+                   "vis.dovis": 0,
+                   "io.do_io": 0,
+                   "driver.verbose": 0}
+
+    pyro_sim.initialize_problem(problem, inputs_file=inputs,
+                                inputs_dict=inputs_dict)
+
+    # take one step first so everything is set up
+    pyro_sim.single_step()
+
+    with CycleCounter() as counter:
+        start = time.perf_counter()
+        for _ in range(nsteps):
+            if mode == "rebuild":
+                pyro_sim.sim.mg = None
+            pyro_sim.single_step()
+        t_step = (time.perf_counter() - start)/nsteps
+
+    return counter.cycles/nsteps, t_step
+
+
+def doit(N, nsteps):
+
+    print("{:>15} {:>9} {:>9} {:>14} {:>14}".format(
+        "solver", "problem", "mode", "V-cycles/step", "time/step (s)"))
+
+    for solver, problem, inputs in PROBLEMS:
+        for mode in ["rebuild", "cached", "warm"]:
+            cycles, t_step = run(solver, problem, inputs, mode, N, nsteps)
+            print("{:>15} {:>9} {:>9} {:14.3f} {:14.5g}".format(
+                solver, problem, mode, cycles, t_step))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=128,
+                   help="number of zones in each direction")
+    p.add_argument("--nsteps", type=int, default=10,
+                   help="number of timed steps")
+
+    args = p.parse_args()
+
+    doit(args.N, args.nsteps)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+Compare the multigrid cycle schedules (V-, W-, and F-cycles, with and
+without a full multigrid (FMG) first cycle) on the multigrid test
+problems.  For each we report:
+
+  * the error (L2 norm vs. the analytic solution) after the first
+    cycle, compared to the error of the converged solution (the
+    discretization error)
+  * the number of cycles and the wall time to reach rtol
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import mesh.boundary as bnd
+import mesh.patch as patch
+import multigrid.MG as MG
+import multigrid.variable_coeff_MG as vcMG
+import multigrid.general_MG as gMG
+
+import examples.multigrid.mg_test_simple as simple
+import examples.multigrid.mg_test_vc_dirichlet as vc_dirichlet
+import examples.multigrid.mg_test_vc_periodic as vc_periodic
+import examples.multigrid.mg_test_general_inhomogeneous as general
+
+
+SCHEDULES = [("V", 0), ("W", 0), ("F", 0),
+             ("V", 1), ("W", 1), ("F", 1)]
+
+
+def coeffs(N, bc_type, funcs):
+    """create a CellCenterData2d object holding the coefficients"""
+
+    g = patch.Grid2d(N, N, ng=1)
+    d = patch.CellCenterData2d(g)
+    bc_c = bnd.BC(xlb=bc_type, xrb=bc_type,
+                  ylb=bc_type, yrb=bc_type)
+    for name in funcs:
+        d.register_var(name, bc_c)
+    d.create()
+
+    for name, func in funcs.items():
+        d.get_var(name)[:, :] = func(g.x2d, g.y2d)
+
+    return d, bc_c
+
+
+def make_simple(N, **kwargs):
+    a = MG.CellCenterMG2d(N, N,
+                          xl_BC_type="dirichlet", yl_BC_type="dirichlet",
+                          xr_BC_type="dirichlet", yr_BC_type="dirichlet",
+                          **kwargs)
+    return a, simple
+
+
+def make_vc_dirichlet(N, **kwargs):
+    d, bc_c = coeffs(N, "neumann", {"c": vc_dirichlet.alpha})
+    a = vcMG.VarCoeffCCMG2d(N, N,
+                            xl_BC_type="dirichlet", yl_BC_type="dirichlet",
+                            xr_BC_type="dirichlet", yr_BC_type="dirichlet",
+                            coeffs=d.get_var("c"), coeffs_bc=bc_c,
+                            **kwargs)
+    return a, vc_dirichlet
+
+
+def make_vc_periodic(N, **kwargs):
+    d, bc_c = coeffs(N, "periodic", {"c": vc_periodic.alpha})
+    a = vcMG.VarCoeffCCMG2d(N, N,
+                            xl_BC_type="periodic", yl_BC_type="periodic",
+                            xr_BC_type="periodic", yr_BC_type="periodic",
+                            coeffs=d.get_var("c"), coeffs_bc=bc_c,
+                            **kwargs)
+    return a, vc_periodic
+
+
+def make_general(N, **kwargs):
+    d, _ = coeffs(N, "neumann", {"alpha": general.alpha,
+                                 "beta": general.beta,
+                                 "gamma_x": general.gamma_x,
+                                 "gamma_y": general.gamma_y})
+    a = gMG.GeneralMG2d(N, N,
+                        xl_BC_type="dirichlet", yl_BC_type="dirichlet",
+                        xr_BC_type="dirichlet", yr_BC_type="dirichlet",
+                        xl_BC=general.xl_func, yl_BC=general.yl_func,
+                        coeffs=d, **kwargs)
+    return a, general
+
+
+PROBLEMS = [("simple", make_simple),
+            ("vc_dirichlet", make_vc_dirichlet),
+            ("vc_periodic", make_vc_periodic),
+            ("general", make_general)]
+
+
+def error(a, module):
+    """L2 norm of the error vs. the analytic solution.  For periodic
+    problems the solution is only defined up to a constant"""
+    e = a.get_solution() - module.true(a.x2d, a.y2d)
+    if a.grids[a.nlevels-1].BCs["v"].xlb == "periodic":
+        e.v()[:, :] -= e.v().mean()
+    return e.norm()
+
+
+def run(make, N, cycle_type, fmg, rtol):
+    """solve to rtol and return the error after the first cycle, the
+    final error, the number of cycles, and the time"""
+
+    # one cycle, for the error
+    a, module = make(N, cycle_type=cycle_type, fmg=fmg)
+    a.init_zeros()
+    a.init_RHS(module.f(a.x2d, a.y2d))
+    a.solve(rtol=1.e30)
+    err1 = error(a, module)
+
+    # the full solve, timed
+    a, module = make(N, cycle_type=cycle_type, fmg=fmg)
+    a.init_zeros()
+    a.init_RHS(module.f(a.x2d, a.y2d))
+
+    start = time.perf_counter()
+    a.solve(rtol=rtol)
+    t_solve = time.perf_counter() - start
+
+    return err1, error(a, module), a.num_cycles, t_solve
+
+
+def doit(N, rtol):
+
+    print("N = {}, rtol = {}".format(N, rtol))
+    print("{:>13} {:>9} {:>13} {:>13} {:>7} {:>10}".format(
+        "problem", "schedule", "err (1 cycle)", "err (final)", "cycles", "time (s)"))
+
+    for name, make in PROBLEMS:
+
+        # compile the kernels first
+        run(make, 16, "V", 1, rtol)
+
+        for cycle_type, fmg in SCHEDULES:
+            err1, err, cycles, t_solve = run(make, N, cycle_type, fmg, rtol)
+
+            schedule = "FMG+" + cycle_type if fmg else cycle_type
+            print("{:>13} {:>9} {:13.5g} {:13.5g} {:7d} {:10.4g}".format(
+                name, schedule, err1, err, cycles, t_solve))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=256,
+                   help="number of zones in each direction")
+    p.add_argument("--rtol", type=float, default=1.e-11,
+                   help="relative tolerance for the solve")
+
+    args = p.parse_args()
+
+    doit(args.N, args.rtol)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Compare plain multigrid (V-cycles) to the multigrid-preconditioned
+Krylov solvers: PCG for the symmetric problems and BiCGStab for all of
+them.  We use the multigrid test problems, and problems with a square
+inclusion where the coefficient jumps by a factor "contrast", which
+stationary V-cycles handle poorly.  For each we report the iterations,
+the number of V-cycles, the final residual error, and the wall time.
+
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+
+import numpy as np
+
+import multigrid.krylov as krylov
+import multigrid.general_MG as gMG
+import multigrid.variable_coeff_MG as vcMG
+
+from examples.multigrid.mg_cycle_benchmark import coeffs, PROBLEMS
+
+
+def inclusion(contrast):
+    """a coefficient that is contrast in a square in the center of
+    the domain and 1 outside"""
+    def func(x, y):
+        inside = (np.abs(x - 0.5) < 0.2) & (np.abs(y - 0.5) < 0.2)
+        return np.where(inside, contrast, 1.0)
+    return func
+
+
+def rhs(x, y):
+    return np.sin(np.pi*x)*np.sin(3.0*np.pi*y)
+
+
+class Inclusion(object):
+    """the RHS for the inclusion problems (there is no analytic
+    solution)"""
+    f = staticmethod(rhs)
+
+
+def make_vc_inclusion(contrast):
+    def make(N, **kwargs):
+        d, bc_c = coeffs(N, "neumann", {"c": inclusion(contrast)})
+        a = vcMG.VarCoeffCCMG2d(N, N, coeffs=d.get_var("c"), coeffs_bc=bc_c,
+                                **kwargs)
+        return a, Inclusion
+    return make
+
+
+def make_general_inclusion(contrast):
+    def make(N, **kwargs):
+        d, _ = coeffs(N, "neumann", {"alpha": lambda x, y: np.zeros_like(x),
+                                     "beta": inclusion(contrast),
+                                     "gamma_x": lambda x, y: 10.0*np.ones_like(x),
+                                     "gamma_y": lambda x, y: 10.0*np.ones_like(x)})
+        a = gMG.GeneralMG2d(N, N, coeffs=d, **kwargs)
+        return a, Inclusion
+    return make
+
+
+# the problems, and whether the operator is symmetric
+ALL_PROBLEMS = [(name, make, name != "general") for name, make in PROBLEMS] + \
+    [("vc_incl_1e2", make_vc_inclusion(1.e2), True),
+     ("vc_incl_1e4", make_vc_inclusion(1.e4), True),
+     ("gen_incl_1e2", make_general_inclusion(1.e2), False),
+     ("gen_incl_1e4", make_general_inclusion(1.e4), False)]
+
+
+def run(make, N, method, rtol):
+    """solve to rtol and return the iterations, V-cycles, residual
+    error, and time"""
+
+    a, module = make(N)
+    a.init_zeros()
+    a.init_RHS(module.f(a.x2d, a.y2d))
+
+    start = time.perf_counter()
+    if method == "MG":
+        a.solve(rtol=rtol)
+        iters = a.num_cycles
+    elif method == "PCG":
+        iters = krylov.pcg(a, rtol=rtol)
+    else:
+        iters = krylov.bicgstab(a, rtol=rtol)
+    t_solve = time.perf_counter() - start
+
+    return iters, a.num_cycles, a.residual_error, t_solve
+
+
+def doit(N, rtol):
+
+    print("N = {}, rtol = {}".format(N, rtol))
+    print("{:>13} {:>9} {:>6} {:>9} {:>12} {:>10}".format(
+        "problem", "method", "iters", "V-cycles", "residual", "time (s)"))
+
+    for name, make, symmetric in ALL_PROBLEMS:
+
+        methods = ["MG", "PCG", "BiCGStab"] if symmetric else ["MG", "BiCGStab"]
+
+        # compile the kernels first
+        run(make, 16, "MG", rtol)
+
+        for method in methods:
+            iters, cycles, err, t_solve = run(make, N, method, rtol)
+            print("{:>13} {:>9} {:6d} {:9d} {:12.4g} {:10.4g}".format(
+                name, method, iters, cycles, err, t_solve))
+
+
+if __name__ == "__main__":
+
+    p = argparse.ArgumentParser()
+    p.add_argument("-N", type=int, default=256,
+                   help="number of zones in each direction")
+    p.add_argument("--rtol", type=float, default=1.e-11,
+                   help="relative tolerance for the solve")
+
+    args = p.parse_args()
+
+    doit(args.N, args.rtol)
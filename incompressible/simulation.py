@@ -12,11 +12,21 @@ import mesh.array_indexer as ai
 
 from simulation_null import NullSimulation, grid_setup, bc_setup
 import multigrid.MG as MG
+import multigrid.fft_solver as fft_solver
 import particles.particles as particles
+from util import msg
 
 
 class Simulation(NullSimulation):
 
+    def __init__(self, solver_name, problem_name, rp, timers=None):
+        super().__init__(solver_name, problem_name, rp, timers=timers)
+
+        # the multigrid solver used for the projections is created the
+        # first time we need it and then reused
+        self.mg = None
+        self.mg_key = None
+
     def initialize(self):
         """
         Initialize the grid and variables for incompressible flow and
@@ -53,6 +63,51 @@ class Simulation(NullSimulation):
         problem = importlib.import_module("incompressible.problems.{}".format(self.problem_name))
         problem.init_data(self.cc_data, self.rp)
 
+    def get_mg(self):
+        """
+        Return the elliptic solver for the projections.  The same
+        solver (and its grid hierarchy) is used for the initial, MAC,
+        and final projections, and is only rebuilt if the grid changes.
+        This is multigrid or, if incompressible.elliptic_solver = FFT,
+        the direct FFT solver.
+        """
+
+        myg = self.cc_data.grid
+
+        solver = self.rp.get_param("incompressible.elliptic_solver")
+
+        bottom_solver = self.rp.get_param("incompressible.mg_bottom_solver")
+        bottom_size = self.rp.get_param("incompressible.mg_bottom_size")
+
+        key = (myg.nx, myg.ny, myg.xmin, myg.xmax, myg.ymin, myg.ymax, solver,
+               bottom_solver, bottom_size)
+
+        if self.mg is None or self.mg_key != key:
+            # the bottom solve options only apply to multigrid
+            kwargs = {}
+
+            if solver == "MG":
+                solver_class = MG.CellCenterMG2d
+                kwargs = {"bottom_solver": bottom_solver,
+                          "bottom_size": bottom_size}
+            elif solver == "FFT":
+                solver_class = fft_solver.FFTHelmholtz2d
+            else:
+                msg.fail("ERROR: elliptic solver {} undefined".format(solver))
+
+            # we want periodic BCs on phi
+            self.mg = solver_class(myg.nx, myg.ny,
+                                   xl_BC_type="periodic",
+                                   xr_BC_type="periodic",
+                                   yl_BC_type="periodic",
+                                   yr_BC_type="periodic",
+                                   xmin=myg.xmin, xmax=myg.xmax,
+                                   ymin=myg.ymin, ymax=myg.ymax,
+                                   verbose=0, **kwargs)
+            self.mg_key = key
+
+        return self.mg
+
     def method_compute_timestep(self):
         """
         The timestep() function computes the advective timestep
@@ -96,16 +151,8 @@ class Simulation(NullSimulation):
         # 1. do the initial projection.  This makes sure that our original
         # velocity field satisties div U = 0
 
-        # next create the multigrid object.  We want Neumann BCs on phi
-        # at solid walls and periodic on phi for periodic BCs
-        mg = MG.CellCenterMG2d(myg.nx, myg.ny,
-                               xl_BC_type="periodic",
-                               xr_BC_type="periodic",
-                               yl_BC_type="periodic",
-                               yr_BC_type="periodic",
-                               xmin=myg.xmin, xmax=myg.xmax,
-                               ymin=myg.ymin, ymax=myg.ymax,
-                               verbose=0)
+        # get the multigrid object -- we want periodic BCs on phi
+        mg = self.get_mg()
 
         # first compute divU
         divU = mg.soln_grid.scratch_array()
@@ -243,15 +290,8 @@ class Simulation(NullSimulation):
         if self.verbose > 0:
             print("  MAC projection")
 
-        # create the multigrid object
-        mg = MG.CellCenterMG2d(myg.nx, myg.ny,
-                               xl_BC_type="periodic",
-                               xr_BC_type="periodic",
-                               yl_BC_type="periodic",
-                               yr_BC_type="periodic",
-                               xmin=myg.xmin, xmax=myg.xmax,
-                               ymin=myg.ymin, ymax=myg.ymax,
-                               verbose=0)
+        # get the multigrid object
+        mg = self.get_mg()
 
         # first compute divU
         divU = mg.soln_grid.scratch_array()
@@ -260,14 +300,22 @@ class Simulation(NullSimulation):
         divU.v()[:, :] = \
             (u_MAC.ip(1) - u_MAC.v())/myg.dx + (v_MAC.jp(1) - v_MAC.v())/myg.dy
 
-        # solve the Poisson problem
-        mg.init_zeros()
+        # solve the Poisson problem, optionally starting from the
+        # previous step's phi-MAC
+        phi_MAC = self.cc_data.get_var("phi-MAC")
+
+        if self.rp.get_param("incompressible.mg_warm_start"):
+            phiGuess = mg.soln_grid.scratch_array()
+            phiGuess.v(buf=1)[:, :] = phi_MAC.v(buf=1)
+            mg.init_solution(phiGuess)
+        else:
+            mg.init_zeros()
+
         mg.init_RHS(divU)
         mg.solve(rtol=1.e-12)
 
         # update the normal velocities with the pressure gradient -- these
         # constitute our advective velocities
-        phi_MAC = self.cc_data.get_var("phi-MAC")
         solution = mg.get_solution()
 
         phi_MAC.v(buf=1)[:, :] = solution.v(buf=1)
@@ -343,15 +391,8 @@ class Simulation(NullSimulation):
         if self.verbose > 0:
             print("  final projection")
 
-        # create the multigrid object
-        mg = MG.CellCenterMG2d(myg.nx, myg.ny,
-                               xl_BC_type="periodic",
-                               xr_BC_type="periodic",
-                               yl_BC_type="periodic",
-                               yr_BC_type="periodic",
-                               xmin=myg.xmin, xmax=myg.xmax,
-                               ymin=myg.ymin, ymax=myg.ymax,
-                               verbose=0)
+        # get the multigrid object
+        mg = self.get_mg()
 
         # first compute divU
 
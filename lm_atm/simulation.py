@@ -41,6 +41,11 @@ class Basestate(object):
 
 class Simulation(NullSimulation):
 
+    # the multigrid solver used for the projections is created the
+    # first time we need it and then reused
+    mg = None
+    mg_key = None
+
     def __init__(self, solver_name, problem_name, rp, timers=None):
 
         NullSimulation.__init__(self, solver_name, problem_name, rp, timers=timers)
@@ -135,6 +140,41 @@ class Simulation(NullSimulation):
     def make_prime(self, a, a0):
         return a - a0.v2d(buf=a0.ng)
 
+    def get_mg(self, bc_name, coeff):
+        """
+        Return the variable-coefficient multigrid solver for a
+        projection, with the BCs of the variable bc_name and the
+        coefficients coeff, and a zero initial guess.  The same solver
+        is used for all the projections and is only rebuilt if the
+        grid or BCs change.  Its coefficient hierarchy is only rebuilt
+        if coeff changes -- the final projection of one step and the
+        MAC projection of the next see the same density, so they share
+        it.
+        """
+
+        myg = self.cc_data.grid
+        bc = self.cc_data.BCs[bc_name]
+
+        key = (myg.nx, myg.ny, myg.xmin, myg.xmax, myg.ymin, myg.ymax,
+               bc.xlb, bc.xrb, bc.ylb, bc.yrb)
+
+        if self.mg is None or self.mg_key != key:
+            self.mg = vcMG.VarCoeffCCMG2d(myg.nx, myg.ny,
+                                          xl_BC_type=bc.xlb, xr_BC_type=bc.xrb,
+                                          yl_BC_type=bc.ylb, yr_BC_type=bc.yrb,
+                                          xmin=myg.xmin, xmax=myg.xmax,
+                                          ymin=myg.ymin, ymax=myg.ymax,
+                                          coeffs=coeff,
+                                          coeffs_bc=self.cc_data.BCs["density"],
+                                          verbose=0)
+            self.mg_key = key
+        else:
+            self.mg.set_coeffs(coeff)
+
+        self.mg.init_zeros()
+
+        return self.mg
+
     def method_compute_timestep(self):
         """
         The timestep() function computes the advective timestep
@@ -206,18 +246,9 @@ class Simulation(NullSimulation):
         beta0 = self.base["beta0"]
         coeff.v()[:, :] = coeff.v()*beta0.v2d()**2
 
-        # next create the multigrid object.  We defined phi with
+        # next get the multigrid object.  We defined phi with
         # the right BCs previously
-        mg = vcMG.VarCoeffCCMG2d(myg.nx, myg.ny,
-                                 xl_BC_type=self.cc_data.BCs["phi"].xlb,
-                                 xr_BC_type=self.cc_data.BCs["phi"].xrb,
-                                 yl_BC_type=self.cc_data.BCs["phi"].ylb,
-                                 yr_BC_type=self.cc_data.BCs["phi"].yrb,
-                                 xmin=myg.xmin, xmax=myg.xmax,
-                                 ymin=myg.ymin, ymax=myg.ymax,
-                                 coeffs=coeff,
-                                 coeffs_bc=self.cc_data.BCs["density"],
-                                 verbose=0)
+        mg = self.get_mg("phi", coeff)
 
         # first compute div{beta_0 U}
         div_beta_U = mg.soln_grid.scratch_array()
@@ -389,17 +420,8 @@ class Simulation(NullSimulation):
         coeff.v(buf=1)[:, :] = 1.0/rho.v(buf=1)
         coeff.v(buf=1)[:, :] = coeff.v(buf=1)*beta0.v2d(buf=1)**2
 
-        # create the multigrid object
-        mg = vcMG.VarCoeffCCMG2d(myg.nx, myg.ny,
-                                 xl_BC_type=self.cc_data.BCs["phi-MAC"].xlb,
-                                 xr_BC_type=self.cc_data.BCs["phi-MAC"].xrb,
-                                 yl_BC_type=self.cc_data.BCs["phi-MAC"].ylb,
-                                 yr_BC_type=self.cc_data.BCs["phi-MAC"].yrb,
-                                 xmin=myg.xmin, xmax=myg.xmax,
-                                 ymin=myg.ymin, ymax=myg.ymax,
-                                 coeffs=coeff,
-                                 coeffs_bc=self.cc_data.BCs["density"],
-                                 verbose=0)
+        # get the multigrid object
+        mg = self.get_mg("phi-MAC", coeff)
 
         # first compute div{beta_0 U}
         div_beta_U = mg.soln_grid.scratch_array()
@@ -552,17 +574,8 @@ class Simulation(NullSimulation):
         coeff = 1.0/rho
         coeff.v()[:, :] = coeff.v()*beta0.v2d()**2
 
-        # create the multigrid object
-        mg = vcMG.VarCoeffCCMG2d(myg.nx, myg.ny,
-                                 xl_BC_type=self.cc_data.BCs["phi"].xlb,
-                                 xr_BC_type=self.cc_data.BCs["phi"].xrb,
-                                 yl_BC_type=self.cc_data.BCs["phi"].ylb,
-                                 yr_BC_type=self.cc_data.BCs["phi"].yrb,
-                                 xmin=myg.xmin, xmax=myg.xmax,
-                                 ymin=myg.ymin, ymax=myg.ymax,
-                                 coeffs=coeff,
-                                 coeffs_bc=self.cc_data.BCs["density"],
-                                 verbose=0)
+        # get the multigrid object
+        mg = self.get_mg("phi", coeff)
 
         # first compute div{beta_0 U}
 
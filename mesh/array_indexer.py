@@ -25,6 +25,17 @@ def _buf_split(b):
     return bxlo, bxhi, bylo, byhi
 
 
+def _stride_split(s):
+    """ take an integer or a pair and break it into the x and y
+    strides
+    """
+    try:
+        sx, sy = s
+    except TypeError:
+        sx = sy = s
+    return sx, sy
+
+
 def _buf_split_1d(b):
     """ take an integer or iterable and break it into a -x, +x,
     value representing a ghost cell buffer
@@ -89,18 +100,20 @@ class ArrayIndexer(np.ndarray):
         jshift in the y direction.  By default the view is the same
         size as the valid region, but the buf can specify how many
         ghost cells on each side to include.  The component is n and s
-        is the stride
+        is the stride (either the same in both directions or an
+        (x, y) pair)
 
         """
         bxlo, bxhi, bylo, byhi = _buf_split(buf)
+        sx, sy = _stride_split(s)
         c = len(self.shape)
 
         if c == 2:
-            return np.asarray(self[self.g.ilo-bxlo+ishift:self.g.ihi+1+bxhi+ishift:s,
-                                   self.g.jlo-bylo+jshift:self.g.jhi+1+byhi+jshift:s])
+            return np.asarray(self[self.g.ilo-bxlo+ishift:self.g.ihi+1+bxhi+ishift:sx,
+                                   self.g.jlo-bylo+jshift:self.g.jhi+1+byhi+jshift:sy])
         else:
-            return np.asarray(self[self.g.ilo-bxlo+ishift:self.g.ihi+1+bxhi+ishift:s,
-                                   self.g.jlo-bylo+jshift:self.g.jhi+1+byhi+jshift:s, n])
+            return np.asarray(self[self.g.ilo-bxlo+ishift:self.g.ihi+1+bxhi+ishift:sx,
+                                   self.g.jlo-bylo+jshift:self.g.jhi+1+byhi+jshift:sy, n])
 
     def lap(self, n=0, buf=0):
         """return the 5-point Laplacian"""
@@ -125,8 +138,9 @@ class ArrayIndexer(np.ndarray):
                            np.sum((_tmp[self.g.ilo:self.g.ihi+1, self.g.jlo:self.g.jhi+1]**2).flat))
 
     def copy(self):
-        """make a copy of the array, defined on the same grid"""
-        return ArrayIndexer(np.asarray(self).copy(), grid=self.g)
+        """make a copy of the array, defined on the same grid.  The copy
+        keeps the memory layout of the original."""
+        return ArrayIndexer(np.asarray(self).copy(order="K"), grid=self.g)
 
     def is_symmetric(self, nodal=False, tol=1.e-14, asymmetric=False):
         """return True is the data is left-right symmetric (to the tolerance
@@ -287,6 +301,33 @@ class ArrayIndexer(np.ndarray):
             for j in range(self.g.jhi+1, 2*self.g.ng + self.g.ny):
                 self[:, j, n] = self[:, j-self.g.jhi-1+self.g.ng, n]
 
+    def fill_ghost_group(self, fills):
+        """Fill the ghost cells for several components at once.  Each
+        entry of fills is a tuple (idir, ghost, source, sign, ns),
+        and does a single operation that fills the ghost cells
+        normal to direction idir (1 = x, 2 = y) for all of the
+        components in ns::
+
+           self[ghost, :, ns] = sign*self[source, :, ns]
+
+        The index maps come from mesh.boundary.ghost_cell_maps.  The
+        fills are done in the order given.
+        """
+
+        d = np.asarray(self)
+
+        for idir, ghost, source, sign, ns in fills:
+            if idir == 1:
+                if sign == 1:
+                    d[ghost, :, ns] = d[source][:, :, ns]
+                else:
+                    d[ghost, :, ns] = -d[source][:, :, ns]
+            else:
+                if sign == 1:
+                    d[:, ghost, ns] = d[:, source][:, :, ns]
+                else:
+                    d[:, ghost, ns] = -d[:, source][:, :, ns]
+
     def pretty_print(self, n=0, fmt=None, show_ghost=True):
         """
         Print out a small dataset to the screen with the ghost cells
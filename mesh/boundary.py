@@ -4,6 +4,8 @@ Methods to manage boundary conditions
 
 from __future__ import print_function
 
+import numpy as np
+
 from util import msg
 
 
@@ -41,6 +43,56 @@ def _set_reflect(odd_reflect_dir, dir_string):
         return "reflect-even"
 
 
+def ghost_cell_maps(grid):
+    """
+    Precompute the index maps used to fill the ghost cells on each
+    edge for the standard (homogeneous) boundary conditions.  The fill
+    is ghost[k] = sign * source[k] along the direction normal to the
+    edge.  reflect-odd shares the reflect-even indices but has its own
+    entry, with sign -1.
+
+    Parameters
+    ----------
+    grid : Grid2d object
+        The grid the data lives on
+
+    Returns
+    -------
+    out : dict
+        maps[edge][bc_type] = (ghost, source, sign), where edge is
+        one of 'xlb', 'xrb', 'ylb', 'yrb', ghost is a slice and
+        source is an integer array
+    """
+
+    ng = grid.ng
+
+    maps = {}
+
+    for edge, lo, hi in [("xlb", grid.ilo, grid.ihi),
+                         ("ylb", grid.jlo, grid.jhi)]:
+        k = np.arange(lo)
+        maps[edge] = {"outflow": (slice(0, lo), np.full(lo, lo), 1),
+                      "reflect-even": (slice(0, lo), 2*ng-k-1, 1),
+                      "reflect-odd": (slice(0, lo), 2*ng-k-1, -1),
+                      "periodic": (slice(0, lo), hi-ng+k+1, 1)}
+
+    for edge, hi in [("xrb", grid.ihi),
+                     ("yrb", grid.jhi)]:
+        k = np.arange(ng)
+        maps[edge] = {"outflow": (slice(hi+1, hi+1+ng), np.full(ng, hi), 1),
+                      "reflect-even": (slice(hi+1, hi+1+ng), hi-k, 1),
+                      "reflect-odd": (slice(hi+1, hi+1+ng), hi-k, -1),
+                      "periodic": (slice(hi+1, hi+1+ng), k+ng, 1)}
+
+    # Neumann and Dirichlet homogeneous BCs piggy-back on outflow and
+    # reflect-odd, just as in ArrayIndexer.fill_ghost
+    for edge in maps:
+        maps[edge]["neumann"] = maps[edge]["outflow"]
+        maps[edge]["dirichlet"] = maps[edge]["reflect-odd"]
+
+    return maps
+
+
 class BCProp(object):
     """
     A simple container to hold properties of the boundary conditions.
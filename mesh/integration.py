@@ -20,6 +20,15 @@ and the s increment is::
 
    k_s = f(t + c_s dt, y_n + dt (a_s1 k1 + a_s2 k2 + ... + a_s,s-1 k_{s-1})
 
+We also support the low-storage (2N) Runge-Kutta methods of
+Williamson.  These only need two registers -- the solution y, which
+is updated in place, and the increment dy.  Each stage does::
+
+   dy = A_s dy + f(t + c_s dt, y)
+   y = y + dt B_s dy
+
+so there is no copy of the state made for the stages.
+
 """
 
 import numpy as np
@@ -70,25 +79,67 @@ b["RK4"] = np.array([1./6., 1./3., 1./3., 1./6.])
 c["RK4"] = np.array([0.0, 0.5, 0.5, 1.0])
 
 
+# low-storage methods.  These are described by the A and B
+# coefficients of the 2N update and the stage times c
+
+A_ls = {}
+B_ls = {}
+
+# third-order, 3 stages (Williamson 1980)
+A_ls["LSRK3"] = np.array([0.0, -5./9., -153./128.])
+
+B_ls["LSRK3"] = np.array([1./3., 15./16., 8./15.])
+
+c["LSRK3"] = np.array([0.0, 1./3., 3./4.])
+
+
+# fourth-order, 5 stages (Carpenter & Kennedy 1994)
+A_ls["LSRK4"] = np.array([0.0,
+                          -567301805773./1357537059087.,
+                          -2404267990393./2016746695238.,
+                          -3550918686646./2091501179385.,
+                          -1275806237668./842570457699.])
+
+B_ls["LSRK4"] = np.array([1432997174477./9575080441755.,
+                          5161836677717./13612068292357.,
+                          1720146321549./2090206949498.,
+                          3134564353537./4481467310338.,
+                          2277821191437./14882151754819.])
+
+c["LSRK4"] = np.array([0.0,
+                       1432997174477./9575080441755.,
+                       2526269341429./6820363962896.,
+                       2006345519317./3224310063776.,
+                       2802321613138./2924317926251.])
+
+
 class RKIntegrator(object):
     """the integration class for CellCenterData2d, supporting RK
     integration"""
 
     def __init__(self, t, dt, method="RK4"):
         """t is the starting time, dt is the total timestep to advance, method
-        = {2,4} is the temporal method"""
+        is the temporal method (RK2, TVD2, TVD3, RK4, or the low-storage
+        LSRK3, LSRK4)"""
         self.method = method
 
         self.t = t
         self.dt = dt
 
+        # low-storage methods update the state in place and only keep
+        # the increment register dy
+        self.low_storage = method in A_ls
+
         # storage for the intermediate stages
-        self.k = [None]*len(b[self.method])
+        self.k = [None]*self.nstages()
+        self.dy = None
 
         self.start = None
 
     def nstages(self):
         """return the number of stages"""
+        if self.method in A_ls:
+            return len(A_ls[self.method])
         return len(b[self.method])
 
     def set_start(self, start):
@@ -99,12 +150,30 @@ class RKIntegrator(object):
     def store_increment(self, istage, k_stage):
         """store the increment for stage istage -- this should not have a dt
         weighting"""
-        self.k[istage] = k_stage
+        if self.low_storage:
+            # update the increment register and then the state in place.
+            # The register is our own copy, so k_stage is not changed.
+            if istage == 0:
+                self.dy = k_stage.copy()
+            else:
+                self.dy *= A_ls[self.method][istage]
+                self.dy += k_stage
+
+            ytmp = self.start
+            for n in range(ytmp.nvar):
+                var = ytmp.get_var_by_index(n)
+                var.v()[:, :] += self.dt*B_ls[self.method][istage]*self.dy.v(n=n)[:, :]
+        else:
+            self.k[istage] = k_stage
 
     def get_stage_start(self, istage):
         """get the starting conditions (a CellCenterData2d object) for stage
         istage"""
-        if istage == 0:
+        if self.low_storage:
+            # the state is already at the start of this stage
+            ytmp = self.start
+            ytmp.t = self.t + c[self.method][istage]*self.dt
+        elif istage == 0:
             ytmp = self.start
         else:
             ytmp = patch.cell_center_data_clone(self.start)
@@ -120,6 +189,13 @@ class RKIntegrator(object):
     def compute_final_update(self):
         """this constructs the final t + dt update, overwriting the inital data"""
         ytmp = self.start
+
+        if self.low_storage:
+            # the stages already did the update -- we just reset the
+            # time, since the caller advances it
+            ytmp.t = self.t
+            return ytmp
+
         for n in range(ytmp.nvar):
             var = ytmp.get_var_by_index(n)
             for s in range(self.nstages()):
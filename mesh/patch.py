@@ -32,6 +32,8 @@ Typical usage:
 """
 from __future__ import print_function
 
+import contextlib
+
 import numpy as np
 
 import h5py
@@ -40,6 +42,13 @@ from util import msg
 
 import mesh.boundary as bnd
 import mesh.array_indexer as ai
+import mesh.scratch_pool as scratch_pool
+
+
+@contextlib.contextmanager
+def _no_scope():
+    """the scratch scope of a grid without a pool -- this does nothing"""
+    yield
 
 
 class Grid1d(object):
@@ -256,32 +265,77 @@ class Grid2d(object):
         y2d = np.transpose(y2d)
         self.y2d = y2d
 
-    def scratch_array(self, nvar=1):
+        # an optional pool for the scratch arrays
+        self.pool = None
+
+    def scratch_array(self, nvar=1, zero=True):
         """
         return a standard numpy array dimensioned to have the size
-        and number of ghostcells as the parent grid
+        and number of ghostcells as the parent grid.  If the grid
+        has a pool and we are inside of a :meth:`scratch_scope`, the
+        array comes from the pool (and is only zeroed if zero is set).
         """
         if nvar == 1:
-            _tmp = np.zeros((self.qx, self.qy), dtype=np.float64)
+            shape = (self.qx, self.qy)
+        else:
+            shape = (self.qx, self.qy, nvar)
+
+        if self.pool is not None and self.pool.in_scope():
+            _tmp = self.pool.acquire(shape, zero=zero)
         else:
-            _tmp = np.zeros((self.qx, self.qy, nvar), dtype=np.float64)
+            _tmp = np.zeros(shape, dtype=np.float64)
         return ai.ArrayIndexer(d=_tmp, grid=self)
 
+    def enable_pool(self):
+        """
+        attach a :class:`ScratchPool <mesh.scratch_pool.ScratchPool>`
+        to the grid, so scratch arrays requested inside of a
+        :meth:`scratch_scope` are reused
+        """
+        if self.pool is None:
+            self.pool = scratch_pool.ScratchPool()
+
+    def scratch_scope(self):
+        """
+        return a context manager -- the scratch arrays (and the data
+        of any CellCenterData2d objects created on this grid) requested
+        inside of it come from the pool, and are given back to the
+        pool when it ends.  Without a pool, this does nothing.
+
+        Anything that must outlive the scope -- like an increment
+        that is returned, or storage that is kept between steps --
+        has to be allocated outside of it.  Otherwise its memory is
+        handed out again by a later scope while it is still in use.
+        """
+        if self.pool is None:
+            return _no_scope()
+        return self.pool.scope()
+
     def coarse_like(self, N):
         """
         return a new grid object coarsened by a factor n, but with
-        all the other properties the same
+        all the other properties the same.  N can also be an (x, y)
+        pair of factors.
         """
-        return Grid2d(self.nx//N, self.ny//N, ng=self.ng,
+        try:
+            Nx, Ny = N
+        except TypeError:
+            Nx = Ny = N
+        return Grid2d(self.nx//Nx, self.ny//Ny, ng=self.ng,
                       xmin=self.xmin, xmax=self.xmax,
                       ymin=self.ymin, ymax=self.ymax)
 
     def fine_like(self, N):
         """
         return a new grid object finer by a factor n, but with
-        all the other properties the same
+        all the other properties the same.  N can also be an (x, y)
+        pair of factors.
         """
-        return Grid2d(self.nx*N, self.ny*N, ng=self.ng,
+        try:
+            Nx, Ny = N
+        except TypeError:
+            Nx = Ny = N
+        return Grid2d(self.nx*Nx, self.ny*Ny, ng=self.ng,
                       xmin=self.xmin, xmax=self.xmax,
                       ymin=self.ymin, ymax=self.ymax)
 
@@ -331,11 +385,18 @@ class CellCenterData2d(object):
     This last step actually allocates the storage for the state
     variables.  Once this is done, the patch is considered to be
     locked.  New variables cannot be added.
+
+    The state is always indexed as data[i, j, n], but the layout in
+    memory can be chosen when the object is created.  The default,
+    'zone-major', stores all the variables for a zone next to one
+    another.  'variable-major' stores each variable as a contiguous
+    (qx, qy) array, which is faster for operations that work on one
+    variable at a time.
     """
 
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, grid, dtype=np.float64):
+    def __init__(self, grid, dtype=np.float64, layout="zone-major"):
         """
         Initialize the CellCenterData2d object.
 
@@ -346,6 +407,11 @@ class CellCenterData2d(object):
         dtype : NumPy data type, optional
             The datatype of the data we wish to create (defaults to
             np.float64
+        layout : {'zone-major', 'variable-major'}, optional
+            The memory layout of the state data.  'zone-major' stores
+            the data as (qx, qy, nvar), 'variable-major' as
+            (nvar, qx, qy).  Either way, the data is accessed as
+            data[i, j, n].
         """
 
         self.grid = grid
@@ -353,6 +419,10 @@ class CellCenterData2d(object):
         self.dtype = dtype
         self.data = None
 
+        if layout not in ["zone-major", "variable-major"]:
+            msg.fail("ERROR: layout = {} invalid".format(layout))
+        self.layout = layout
+
         self.names = []
         self.vars = self.names  # backwards compatibility hack
         self.nvar = 0
@@ -364,6 +434,10 @@ class CellCenterData2d(object):
 
         self.BCs = {}
 
+        # how fill_BC_all groups the variables -- this is built the
+        # first time it is needed
+        self._bc_plan = None
+
         # time
         self.t = -1.0
 
@@ -426,8 +500,24 @@ class CellCenterData2d(object):
         if self.initialized == 1:
             msg.fail("ERROR: grid already initialized")
 
-        _tmp = np.zeros((self.grid.qx, self.grid.qy, self.nvar),
-                        dtype=self.dtype)
+        if self.layout == "variable-major":
+            # allocate each variable contiguously and present it to
+            # the rest of the code as a (qx, qy, nvar) view
+            shape = (self.nvar, self.grid.qx, self.grid.qy)
+        else:
+            shape = (self.grid.qx, self.grid.qy, self.nvar)
+
+        # temporary copies of the state made inside of a scratch scope
+        # (like the RK stages) can come from the grid's pool
+        pool = getattr(self.grid, "pool", None)
+        if pool is not None and pool.in_scope() and self.dtype == np.float64:
+            _tmp = pool.acquire(shape)
+        else:
+            _tmp = np.zeros(shape, dtype=self.dtype)
+
+        if self.layout == "variable-major":
+            _tmp = np.moveaxis(_tmp, 0, -1)
+
         self.data = ai.ArrayIndexer(_tmp, grid=self.grid)
 
         self.initialized = 1
@@ -443,6 +533,7 @@ class CellCenterData2d(object):
         my_str = "cc data: nx = {}, ny = {}, ng = {}\n".format(
             self.grid.nx, self.grid.ny, self.grid.ng)
         my_str += "         nvars = {}\n".format(self.nvar)
+        my_str += "         layout = {}\n".format(self.layout)
         my_str += "         variables:\n"
 
         for n in range(self.nvar):
@@ -467,8 +558,9 @@ class CellCenterData2d(object):
 
         Parameters
         ----------
-        name : str
-            The name of the variable to access
+        name : str or list of str
+            The name of the variable to access.  Derived variables
+            can be asked for together as a list.
 
         Returns
         -------
@@ -552,12 +644,90 @@ class CellCenterData2d(object):
         n = self.names.index(name)
         self.data[:, :, n] = 0.0
 
+    def _make_bc_plan(self):
+        """
+        Work out how fill_BC_all will fill the ghost cells.  Variables
+        that share a standard BC type on an edge are filled together,
+        with one operation per edge and BC type.
+
+        To give exactly the same result as filling the variables one
+        at a time, the variables are batched in registration order,
+        and a batch ends at any variable with a custom BC (since the
+        custom BC may look at the ghost cells of the other
+        variables).  Variables with inhomogeneous BC values are filled
+        on their own.
+
+        Returns
+        -------
+        out : list
+            A list of (fills, names) tuples.  fills is the list
+            passed to ArrayIndexer.fill_ghost_group, or None if the
+            variables in names are to be filled with fill_BC.  Any
+            custom BCs for names are done after fills.
+        """
+
+        myg = self.grid
+        maps = bnd.ghost_cell_maps(myg)
+
+        # the index maps read every source cell before writing any
+        # ghost cell, which is only the same as the one-at-a-time
+        # fill if the source cells are never ghost cells
+        can_group = myg.nx >= myg.ng and myg.ny >= myg.ng
+
+        edges = [("xlb", 1, "xl_value"), ("xrb", 1, "xr_value"),
+                 ("ylb", 2, "yl_value"), ("yrb", 2, "yr_value")]
+
+        plan = []
+        batch = []
+
+        def end_batch():
+            if not batch:
+                return
+            fills = []
+            for edge, idir, _ in edges:
+                for bc_type, (ghost, source, sign) in maps[edge].items():
+                    ns = [self.names.index(name) for name in batch
+                          if getattr(self.BCs[name], edge) == bc_type]
+                    if ns:
+                        fills.append((idir, ghost, source, sign, np.array(ns)))
+            plan.append((fills, list(batch)))
+            del batch[:]
+
+        for name in self.names:
+            bc = self.BCs[name]
+            if not can_group or \
+               any(getattr(bc, value) is not None for _, _, value in edges):
+                end_batch()
+                plan.append((None, [name]))
+                continue
+
+            batch.append(name)
+
+            if any(getattr(bc, edge) in bnd.ext_bcs for edge, _, _ in edges):
+                end_batch()
+
+        end_batch()
+
+        return plan
+
     def fill_BC_all(self):
         """
-        Fill boundary conditions on all variables.
+        Fill boundary conditions on all variables.  Variables that
+        share a boundary condition type are filled together, giving
+        the same result as calling fill_BC on each variable in turn.
         """
-        for name in self.names:
-            self.fill_BC(name)
+
+        if self._bc_plan is None:
+            self._bc_plan = self._make_bc_plan()
+
+        for fills, names in self._bc_plan:
+            if fills is None:
+                for name in names:
+                    self.fill_BC(name)
+            else:
+                self.data.fill_ghost_group(fills)
+                for name in names:
+                    self._fill_ext_BC(name)
 
     def fill_BC(self, name):
         """
@@ -582,6 +752,14 @@ class CellCenterData2d(object):
 
         # that will handle the standard type of BCs, but if we asked
         # for a custom BC, we handle it here
+        self._fill_ext_BC(name)
+
+    def _fill_ext_BC(self, name):
+        """
+        Fill any custom (solver-defined) boundary conditions for
+        variable name.
+        """
+
         if self.BCs[name].xlb in bnd.ext_bcs.keys():
             bnd.ext_bcs[self.BCs[name].xlb](self.BCs[name].xlb, "xlb", name, self)
         if self.BCs[name].xrb in bnd.ext_bcs.keys():
@@ -609,7 +787,8 @@ class CellCenterData2d(object):
         """
         Restrict the variable varname to a coarser grid (factor of 2
         coarser) and return an array with the resulting data (and same
-        number of ghostcells)
+        number of ghostcells).  N can also be an (x, y) pair of
+        factors of 1 or 2, for coarsening in only one direction.
         """
 
         fine_grid = self.grid
@@ -622,7 +801,17 @@ class CellCenterData2d(object):
         # fill the coarse array with the restricted data -- just
         # by averaging the fine cells into the corresponding coarse cell
         # that encompasses them.
-        if N == 2:
+        if isinstance(N, tuple):
+            rx, ry = N
+            if rx not in [1, 2] or ry not in [1, 2]:
+                raise ValueError("directional restriction is only allowed by 1 or 2")
+
+            for ii in range(rx):
+                for jj in range(ry):
+                    cdata.v()[:, :] += fdata.ip_jp(ii, jj, s=N)
+            cdata.v()[:, :] /= rx*ry
+
+        elif N == 2:
             cdata.v()[:, :] = \
                 0.25*(fdata.v(s=2) + fdata.ip(1, s=2) +
                       fdata.jp(1, s=2) + fdata.ip_jp(1, 1, s=2))
@@ -643,12 +832,15 @@ class CellCenterData2d(object):
 
         return cdata
 
-    def prolong(self, varname):
+    def prolong(self, varname, N=2):
         """
         Prolong the data in the current (coarse) grid to a finer
         (factor of 2 finer) grid.  Return an array with the resulting
         data (and same number of ghostcells).  Only the data for the
-        variable varname will be operated upon.
+        variable varname will be operated upon.  N can also be an
+        (x, y) pair of factors of 1 or 2, for refining in only one
+        direction -- then only the slope in the refined direction is
+        used.
 
         We will reconstruct the data in the zone from the
         zone-averaged variables using the same limited slopes as in
@@ -685,7 +877,7 @@ class CellCenterData2d(object):
         cdata = self.get_var(varname)
 
         # allocate an array for the finely gridded data
-        fine_grid = coarse_grid.fine_like(2)
+        fine_grid = coarse_grid.fine_like(N)
         fdata = fine_grid.scratch_array()
 
         # slopes for the coarse data
@@ -695,6 +887,21 @@ class CellCenterData2d(object):
         m_y = coarse_grid.scratch_array()
         m_y.v()[:, :] = 0.5*(cdata.jp(1) - cdata.jp(-1))
 
+        if isinstance(N, tuple):
+            rx, ry = N
+            if rx not in [1, 2] or ry not in [1, 2]:
+                raise ValueError("directional prolongation is only allowed by 1 or 2")
+
+            # the children are offset by -1/4 and +1/4 of the parent in
+            # a refined direction, and not at all otherwise
+            for ii in range(rx):
+                for jj in range(ry):
+                    sx = 0.5*ii - 0.25 if rx == 2 else 0.0
+                    sy = 0.5*jj - 0.25 if ry == 2 else 0.0
+                    fdata.ip_jp(ii, jj, s=N)[:, :] = cdata.v() + sx*m_x.v() + sy*m_y.v()
+
+            return fdata
+
         # fill the children
         fdata.v(s=2)[:, :] = cdata.v() - 0.25*m_x.v() - 0.25*m_y.v()      # 1 child
         fdata.ip(1, s=2)[:, :] = cdata.v() + 0.25*m_x.v() - 0.25*m_y.v()  # 2
@@ -740,6 +947,7 @@ class CellCenterData2d(object):
 
         # data
         gstate = f.create_group("state")
+        gstate.attrs["layout"] = self.layout
 
         for n in range(self.nvar):
             gvar = gstate.create_group(self.names[n])
@@ -835,7 +1043,7 @@ class FaceCenterData2d(CellCenterData2d):
     def restrict(self, varname, N=2):
         raise NotImplementedError("restriction not implemented for FaceCenterData2d")
 
-    def prolong(self, varname):
+    def prolong(self, varname, N=2):
         raise NotImplementedError("prolongation not implemented for FaceCenterData2d")
 
     def write_data(self, f):
@@ -880,7 +1088,7 @@ def cell_center_data_clone(old):
     # we may be a type derived from CellCenterData2d, so use the same
     # type
     myt = type(old)
-    new = myt(old.grid, dtype=old.dtype)
+    new = myt(old.grid, dtype=old.dtype, layout=old.layout)
 
     for n in range(old.nvar):
         new.register_var(old.names[n], old.BCs[old.names[n]])
@@ -888,7 +1096,7 @@ def cell_center_data_clone(old):
     new.create()
 
     new.aux = old.aux.copy()
-    new.data = old.data.copy()
+    new.data[:, :, :] = old.data[:, :, :]
     new.derives = old.derives.copy()
 
     return new
@@ -270,14 +270,87 @@ sigma_5 = np.array([[[40, 0, 0],
                      [-76, 100, 0],
                      [44, -124, 40]]]) / 12
 
+C_7 = np.array([1, 12, 18, 4]) / 35
+
+a_7 = np.array([[25, -23, 13, -3],
+                [3, 13, -5, 1],
+                [-1, 7, 7, -1],
+                [1, -5, 13, 3]]) / 12
+
+sigma_7 = np.array([[[2107, 0, 0, 0],
+                     [-9402, 11003, 0, 0],
+                     [7042, -17246, 7043, 0],
+                     [-1854, 4642, -3882, 547]],
+                    [[547, 0, 0, 0],
+                     [-2522, 3443, 0, 0],
+                     [1922, -5966, 2843, 0],
+                     [-494, 1602, -1642, 267]],
+                    [[267, 0, 0, 0],
+                     [-1642, 2843, 0, 0],
+                     [1602, -5966, 3443, 0],
+                     [-494, 1922, -2522, 547]],
+                    [[547, 0, 0, 0],
+                     [-3882, 7043, 0, 0],
+                     [4642, -17246, 11003, 0],
+                     [-1854, 7042, -9402, 2107]]]) / 240
+
+C_9 = np.array([1, 20, 60, 40, 5]) / 126
+
+a_9 = np.array([[137, -163, 137, -63, 12],
+                [12, 77, -43, 17, -3],
+                [-3, 27, 47, -13, 2],
+                [2, -13, 47, 27, -3],
+                [-3, 17, -43, 77, 12]]) / 60
+
+sigma_9 = np.array([[[107918, 0, 0, 0, 0],
+                     [-649501, 1020563, 0, 0, 0],
+                     [758823, -2462076, 1521393, 0, 0],
+                     [-411487, 1358458, -1704396, 482963, 0],
+                     [86329, -288007, 364863, -208501, 22658]],
+                    [[22658, 0, 0, 0, 0],
+                     [-140251, 242723, 0, 0, 0],
+                     [165153, -611976, 406293, 0, 0],
+                     [-88297, 337018, -464976, 138563, 0],
+                     [18079, -70237, 99213, -60871, 6908]],
+                    [[6908, 0, 0, 0, 0],
+                     [-51001, 104963, 0, 0, 0],
+                     [67923, -299076, 231153, 0, 0],
+                     [-38947, 179098, -299076, 104963, 0],
+                     [8209, -38947, 67923, -51001, 6908]],
+                    [[6908, 0, 0, 0, 0],
+                     [-60871, 138563, 0, 0, 0],
+                     [99213, -464976, 406293, 0, 0],
+                     [-70237, 337018, -611976, 242723, 0],
+                     [18079, -88297, 165153, -140251, 22658]],
+                    [[22658, 0, 0, 0, 0],
+                     [-208501, 482963, 0, 0, 0],
+                     [364863, -1704396, 1521393, 0, 0],
+                     [-288007, 1358458, -2462076, 1020563, 0],
+                     [86329, -411487, 758823, -649501, 107918]]]) / 5040
+
 C_all = {2: C_3,
-         3: C_5}
+         3: C_5,
+         4: C_7,
+         5: C_9}
 
 a_all = {2: a_3,
-         3: a_5}
+         3: a_5,
+         4: a_7,
+         5: a_9}
 
 sigma_all = {2: sigma_3,
-             3: sigma_5}
+             3: sigma_5,
+             4: sigma_7,
+             5: sigma_9}
+
+# the smoothness indicators only need the lower triangle of sigma --
+# store the nonzero (l, m, sigma) terms for each stencil once, so the
+# whole-array reconstruction does not need to search for them
+beta_terms_all = {}
+for _order, _sigma in sigma_all.items():
+    beta_terms_all[_order] = [[(l, m, _sigma[k, l, m])
+                               for l in range(_order) for m in range(l+1)]
+                              for k in range(_order)]
 
 
 def weno_upwind(q, order):
@@ -344,3 +417,78 @@ def weno(q, order):
         q_minus[i] = weno_upwind(q[i+order-1:i-order:-1], order)
 
     return q_minus, q_plus
+
+
+def weno_upwind_multid(q, order, idir, reverse=False):
+    """
+    Perform upwinded WENO reconstruction on every zone of a
+    multidimensional array at once.  This gives the same result as
+    calling weno_upwind on the stencil around each zone, but works on
+    whole-array slices, so the only Python loops are over the
+    (small) number of stencils and smoothness-indicator terms.
+
+    Parameters
+    ----------
+
+    q : np array
+        input data
+    order : int
+        WENO order (k)
+    idir : int
+        the array axis along which to reconstruct
+    reverse : bool, optional
+        if False, use the left-biased stencils to reconstruct to the
+        right edge of each zone.  If True, use the right-biased
+        stencils to reconstruct to the left edge of each zone.
+
+    Returns
+    -------
+
+    q_edge : np array
+        data reconstructed to the zone edges.  The order-1 zones at
+        either end of axis idir do not have a full stencil and are
+        left as zero.
+    """
+    a = a_all[order]
+    C = C_all[order]
+    beta_terms = beta_terms_all[order]
+    epsilon = 1e-16
+
+    sign = -1 if reverse else 1
+
+    q = np.asarray(q)
+    npts = q.shape[idir]
+    nk = order - 1
+
+    # views of the data shifted by -nk, ..., nk zones along idir,
+    # covering only the zones that have a full stencil
+    q_shift = {}
+    for m in range(-nk, nk+1):
+        idx = [slice(None)] * q.ndim
+        idx[idir] = slice(nk + sign*m, npts - nk + sign*m)
+        q_shift[m] = q[tuple(idx)]
+
+    alpha_sum = 0.0
+    alpha = []
+    q_stencils = []
+    for k in range(order):
+        beta = np.zeros_like(q_shift[0])
+        for l, m, s in beta_terms[k]:
+            beta += s * q_shift[k-l] * q_shift[k-m]
+        alpha.append(C[k] / (epsilon + beta**2))
+        alpha_sum = alpha_sum + alpha[k]
+
+        q_stencil = np.zeros_like(q_shift[0])
+        for l in range(order):
+            q_stencil += a[k, l] * q_shift[k-l]
+        q_stencils.append(q_stencil)
+
+    q_edge = np.zeros_like(q)
+
+    idx = [slice(None)] * q.ndim
+    idx[idir] = slice(nk, npts - nk)
+    valid = q_edge[tuple(idx)]
+    for k in range(order):
+        valid += (alpha[k] / alpha_sum) * q_stencils[k]
+
+    return q_edge
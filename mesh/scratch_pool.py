@@ -0,0 +1,137 @@
+"""
+A pool of scratch arrays, to avoid allocating the same temporaries
+over and over.
+
+The solvers ask for many full-grid temporaries each step through
+:meth:`Grid2d.scratch_array <mesh.patch.Grid2d.scratch_array>`.  If a
+grid has a pool attached, then inside a scope::
+
+   with myg.scratch_scope():
+       a = myg.scratch_array(nvar=4)
+       ...
+
+the arrays come from the pool, and they are all given back to the
+pool when the scope ends.  After the first step, the same arrays are
+handed out again, so there are no new large allocations.  Arrays are
+keyed by their shape, so an array is only reused for a request of the
+same shape (including the number of variables).
+
+Any array obtained inside of a scope must not be used after the scope
+ends, since it will be handed out again.
+
+"""
+
+from __future__ import print_function
+
+import contextlib
+
+import numpy as np
+
+
+class ScratchPool(object):
+    """
+    A pool of float64 arrays, keyed by shape.  We keep a stack of
+    scopes -- each array that is acquired belongs to the innermost
+    scope and is released when that scope ends.
+    """
+
+    def __init__(self):
+
+        # the arrays that are free to be handed out, for each shape
+        self._free = {}
+
+        # the arrays handed out in each open scope
+        self._scopes = []
+
+        # counters
+        self.n_allocated = 0
+        self.n_reused = 0
+        self.pooled_bytes = 0
+
+    def in_scope(self):
+        """are we inside of a scope?"""
+        return len(self._scopes) > 0
+
+    def acquire(self, shape, zero=True):
+        """
+        Return an array of the given shape.  A free array from the pool
+        is used if there is one, otherwise a new array is allocated.
+
+        Parameters
+        ----------
+        shape : tuple
+            The shape of the array
+        zero : bool, optional
+            Set the array to 0.  Otherwise the contents are whatever
+            was left from the last use.
+
+        Returns
+        -------
+        out : ndarray
+        """
+
+        shape = tuple(shape)
+
+        try:
+            a = self._free[shape].pop()
+        except (KeyError, IndexError):
+            a = np.zeros(shape, dtype=np.float64)
+            self.n_allocated += 1
+            self.pooled_bytes += a.nbytes
+        else:
+            self.n_reused += 1
+            if zero:
+                a.fill(0.0)
+
+        if self._scopes:
+            self._scopes[-1].append(a)
+
+        return a
+
+    def release(self, a):
+        """
+        Give an array back to the pool.  This is only needed for arrays
+        acquired outside of a scope.
+        """
+        self._free.setdefault(a.shape, []).append(a)
+
+    @contextlib.contextmanager
+    def scope(self):
+        """
+        A context manager -- all of the arrays acquired in the scope
+        are released back to the pool when it ends.  Scopes can be
+        nested.
+        """
+
+        self._scopes.append([])
+        try:
+            yield self
+        finally:
+            for a in self._scopes.pop():
+                self.release(a)
+
+    def clear(self):
+        """throw away all of the free arrays"""
+        for arrays in self._free.values():
+            for a in arrays:
+                self.pooled_bytes -= a.nbytes
+        self._free = {}
+
+    def stats(self):
+        """
+        Return the counters: the number of arrays allocated, the number
+        of allocations avoided by reusing an array, and the number of
+        bytes held by the pool (this is the peak, since we never free
+        an array unless the pool is cleared).
+
+        Returns
+        -------
+        out : dict
+        """
+        return {"allocated": self.n_allocated,
+                "reused": self.n_reused,
+                "pooled_bytes": self.pooled_bytes}
+
+    def __str__(self):
+        return "scratch pool: {} allocated, {} reused, {:.3f} MB".format(
+            self.n_allocated, self.n_reused, self.pooled_bytes/1024.0**2)
@@ -0,0 +1,376 @@
+r"""
+A spectral deferred correction (SDC) integrator for CellCenterData2d.
+
+We want to solve :math:`dU/dt = A(U)` over a step :math:`[t^n, t^n +
+\Delta t]`.  The step is divided by a set of time nodes, :math:`0 =
+\tau_0 < \tau_1 < \ldots < \tau_{P-1} = 1` (as fractions of the step),
+and the solution at the nodes is found by iterating ("sweeping") on
+the integral form of the equation::
+
+   U_{m+1}^{k+1} = U_m^{k+1} + (tau_{m+1} - tau_m) dt [A(U_m^{k+1}) - A(U_m^k)]
+                   + dt sum_j S_{mj} A(U_j^k)
+
+Here :math:`S_{mj}` is the integral of the Lagrange polynomial through
+the quadrature nodes for node j, from :math:`\tau_m` to
+:math:`\tau_{m+1}`.  This only depends on the nodes, so it is computed
+once, when the integrator is created.  The sweeps start from the
+solution at the start of the step copied to all the nodes, and each
+sweep raises the order of accuracy by one, up to the order of the
+quadrature.
+
+We support two families of nodes:
+
+* ``lobatto`` : M Gauss-Lobatto nodes, including both ends of the
+  step.  The quadrature is order 2M-2.  Three nodes (0, 1/2, 1) give
+  Simpson's rule.
+
+* ``radau`` : the M Radau IIA nodes, which include the end of the
+  step but not the start.  The quadrature is order 2M-1.  The start of
+  the step is used as the first node of the sweep, but not in the
+  quadrature.
+
+The integrals over all of the sub-steps are done together, as a
+single contraction of :math:`S` with the advective terms at all of
+the nodes, which are stored stacked in one array.  The node storage
+is kept between steps.  When the entries of :math:`S` are fractions
+with a small common denominator (like the 1/24ths of Simpson's rule),
+we keep them as integers and divide by the denominator, so the
+weights are exact.
+
+Any solver that can evaluate :math:`A(U)` through a function
+``substep(myd)`` that takes a CellCenterData2d object and returns the
+increment can use this::
+
+   sdc = SDCIntegrator(nodes="lobatto", num_nodes=3, sweeps=4)
+   sdc.advance(myd, dt, substep)
+
+If the grid has a scratch pool, call ``sdc.setup(myd)`` before
+entering a scratch scope, so the node storage is not taken from the
+pool.
+
+Since the solution at the first node never changes, and the advective
+term at the other nodes from one sweep is needed in the next, each
+sweep only evaluates ``substep`` P-1 times.
+
+"""
+
+from __future__ import print_function
+
+import numpy as np
+import numpy.polynomial.legendre as leg
+import numpy.polynomial.polynomial as poly
+
+import mesh.patch as patch
+from util import msg
+
+
+def quadrature_nodes(nodes, num_nodes):
+    """
+    Return the quadrature nodes in [0, 1] for the node family nodes
+    (lobatto or radau).
+
+    Parameters
+    ----------
+    nodes : str
+        The node family
+    num_nodes : int
+        The number of nodes
+
+    Returns
+    -------
+    out : ndarray
+        The nodes, in increasing order
+    """
+
+    if nodes == "lobatto":
+        if num_nodes < 2:
+            msg.fail("ERROR: need at least 2 Gauss-Lobatto nodes")
+
+        # the endpoints and the roots of P'_{M-1}
+        x = leg.Legendre.basis(num_nodes-1).deriv().roots()
+        x = np.concatenate(([-1.0], np.real(x), [1.0]))
+
+    elif num_nodes < 1:
+        msg.fail("ERROR: need at least 1 Radau node")
+
+    elif nodes == "radau":
+        # the roots of P_M - P_{M-1} (this includes x = 1)
+        x = (leg.Legendre.basis(num_nodes) - leg.Legendre.basis(num_nodes-1)).roots()
+        x = np.real(x)
+        x[np.argmax(x)] = 1.0
+
+    else:
+        msg.fail("ERROR: node type {} not supported".format(nodes))
+
+    return 0.5*(np.sort(x) + 1.0)
+
+
+def integration_matrix(tau, quad):
+    """
+    Return the matrix S, where S[m, j] is the integral of the Lagrange
+    polynomial through the points tau[quad] for point j, from tau[m]
+    to tau[m+1].  The columns for points that are not used in the
+    quadrature are 0.
+
+    Parameters
+    ----------
+    tau : ndarray
+        The points
+    quad : ndarray of bool
+        Which points are quadrature nodes
+
+    Returns
+    -------
+    out : ndarray
+        The (P-1, P) integration matrix
+    """
+
+    npts = len(tau)
+    S = np.zeros((npts-1, npts))
+
+    c = tau[quad]
+    cols = np.arange(npts)[quad]
+
+    for j, col in enumerate(cols):
+        others = np.delete(c, j)
+        if len(others) == 0:
+            lj = poly.Polynomial([1.0])
+        else:
+            lj = poly.Polynomial.fromroots(others) / np.prod(c[j] - others)
+        Lj = lj.integ()
+        S[:, col] = Lj(tau[1:]) - Lj(tau[:-1])
+
+    return S
+
+
+def common_denominator(S, max_denom=1000, tol=1.e-10):
+    """
+    Write the matrix S as W / d, where W has integer entries, if there
+    is such a d <= max_denom.
+
+    Parameters
+    ----------
+    S : ndarray
+        The matrix
+    max_denom : int, optional
+        The largest denominator to try
+    tol : float, optional
+        How close the entries of S d must be to integers
+
+    Returns
+    -------
+    d : float
+        The common denominator, or 1 if there is none
+    W : ndarray
+        The numerators, or S itself if there is no common denominator
+    """
+
+    for d in range(1, max_denom+1):
+        W = np.round(S*d)
+        if np.allclose(S*d, W, rtol=0.0, atol=tol):
+            return float(d), W
+
+    return 1.0, S
+
+
+class SDCIntegrator(object):
+    """the SDC integration class for CellCenterData2d"""
+
+    def __init__(self, nodes="lobatto", num_nodes=3, sweeps=4, rtol=0.0):
+        """
+        Create the integrator.
+
+        Parameters
+        ----------
+        nodes : str, optional
+            The node family, lobatto or radau
+        num_nodes : int, optional
+            The number of quadrature nodes
+        sweeps : int, optional
+            The (maximum) number of correction sweeps
+        rtol : float, optional
+            If > 0, we stop sweeping once the residual of the
+            collocation problem at the end of the step, relative to
+            the solution, is smaller than this
+        """
+
+        self.nodes = nodes
+        self.num_nodes = num_nodes
+        self.sweeps = sweeps
+        self.rtol = rtol
+
+        c = quadrature_nodes(nodes, num_nodes)
+
+        # the points of the sweep always start at the beginning of
+        # the step
+        if c[0] == 0.0:
+            self.tau = c
+            quad = np.ones(len(c), dtype=bool)
+        else:
+            self.tau = np.concatenate(([0.0], c))
+            quad = np.concatenate(([False], np.ones(len(c), dtype=bool)))
+
+        self.npts = len(self.tau)
+
+        self.S = integration_matrix(self.tau, quad)
+        self.S_denom, self.S_numer = common_denominator(self.S)
+
+        # the quadrature over the full step
+        self.weights = self.S.sum(axis=0)
+
+        self.dtau = self.tau[1:] - self.tau[:-1]
+
+        # the storage is created on the first step
+        self.U = None
+        self.A_old = None
+        self.A_new = None
+        self.integral = None
+
+        # the number of sweeps in the last step and the residual after
+        # the last one we checked
+        self.num_sweeps = 0
+        self.residual = None
+
+    def order(self):
+        """the formal order of accuracy of a step"""
+        if self.npts == self.num_nodes:
+            quad_order = 2*self.num_nodes - 2
+        else:
+            quad_order = 2*self.num_nodes - 1
+        return min(self.sweeps, quad_order)
+
+    def setup(self, myd):
+        """
+        Create the storage for the nodes, like myd, if we don't
+        already have it.  This storage is kept for the whole run, so
+        if the grid has a scratch pool, this must be called outside of
+        any scratch scope (otherwise the storage would come from the
+        pool and be handed out again when the scope ends).
+
+        Parameters
+        ----------
+        myd : CellCenterData2d object
+            The state the integrator will advance
+        """
+
+        if self.U is not None and self.U[1].data.shape == myd.data.shape:
+            return
+
+        P = self.npts
+        shape = myd.data.shape
+
+        # the solution at the points after the first
+        self.U = [None] + [patch.cell_center_data_clone(myd) for _ in range(P-1)]
+
+        # the advective terms at all the points, stacked, at the old
+        # and new iteration, and the integrals over each sub-step
+        self.A_old = np.zeros((P,) + shape)
+        self.A_new = np.zeros((P,) + shape)
+        self.integral = np.zeros((P-1,) + shape)
+
+    def advance(self, myd, dt, substep):
+        """
+        Advance myd by dt, in place.
+
+        Parameters
+        ----------
+        myd : CellCenterData2d object
+            The state at the start of the step.  This is overwritten
+            with the state at the end.
+        dt : float
+            The timestep
+        substep : function
+            substep(d) returns the advective term, dU/dt, for the
+            CellCenterData2d object d
+
+        Returns
+        -------
+        out : int
+            The number of sweeps taken
+        """
+
+        self.setup(myd)
+
+        P = self.npts
+        myg = myd.grid
+
+        # the first point is the start of the step, which never changes
+        U = self.U
+        U[0] = myd
+        for m in range(1, P):
+            U[m].t = myd.t + self.tau[m]*dt
+
+        def evaluate(A, m):
+            with myg.scratch_scope():
+                A[m, ...] = substep(U[m])
+
+        # initially the solution at all the points is the old
+        # solution, so the advective term is the same everywhere
+        evaluate(self.A_old, 0)
+        self.A_old[1:, ...] = self.A_old[0]
+        self.A_new[0, ...] = self.A_old[0]
+
+        # the integral over each sub-step is S A, done on all the data
+        # at once
+        scale = dt/self.S_denom
+
+        v = (slice(myg.ilo, myg.ihi+1), slice(myg.jlo, myg.jhi+1))
+
+        self.residual = None
+
+        for k in range(self.sweeps):
+
+            np.einsum("mj,j...->m...", self.S_numer, self.A_old, out=self.integral)
+            self.integral *= scale
+
+            for m in range(P-1):
+                if m > 0:
+                    evaluate(self.A_new, m)
+
+                U[m+1].data[v] = U[m].data[v] + \
+                    self.dtau[m]*dt*(self.A_new[m][v] - self.A_old[m][v]) + \
+                    self.integral[m][v]
+
+                U[m+1].fill_BC_all()
+
+            self.num_sweeps = k + 1
+
+            if k == self.sweeps - 1:
+                break
+
+            # the next sweep needs A at the last point too
+            evaluate(self.A_new, P-1)
+
+            if self.rtol > 0.0:
+                self.residual = self._residual(myd, dt, v)
+                if self.residual < self.rtol:
+                    break
+
+            # the current iteration is the old one for the next sweep
+            self.A_old, self.A_new = self.A_new, self.A_old
+
+        # store the new solution
+        myd.data[:, :, :] = U[-1].data[:, :, :]
+
+        return self.num_sweeps
+
+    def _residual(self, myd, dt, v):
+        """the residual of the collocation problem at the end of the
+        step, U_end - U_0 - int A dt, relative to the norm of U_end
+        (the largest over the variables)"""
+
+        U_end = self.U[-1].data[v]
+        R = U_end - myd.data[v] - \
+            np.tensordot(dt*self.weights, self.A_new[(slice(None),) + v], axes=1)
+
+        err = 0.0
+        for n in range(myd.nvar):
+            norm = np.sqrt(np.sum(U_end[:, :, n]**2))
+            r = np.sqrt(np.sum(R[:, :, n]**2))
+            err = max(err, r/norm if norm > 0.0 else r)
+
+        return err
+
+    def __str__(self):
+        return "SDC: {} {} nodes, {} sweeps".format(self.num_nodes, self.nodes,
+                                                     self.sweeps)
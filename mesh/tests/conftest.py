@@ -0,0 +1,43 @@
+# shared setup for the mesh tests
+
+import mesh.boundary as bnd
+import mesh.patch as patch
+import numpy as np
+import pytest
+
+
+class DecayProblem(object):
+    """the ODE dy/dt = -y + cos(t), with y(0) = 1, solved in each zone
+    of a small periodic grid -- this is used to test the time
+    integrators"""
+
+    def initial_data(self):
+        """return a CellCenterData2d object with y = 1 at t = 0"""
+
+        myg = patch.Grid2d(4, 4, ng=1)
+        myd = patch.CellCenterData2d(myg)
+        bco = bnd.BC(xlb="periodic", xrb="periodic",
+                     ylb="periodic", yrb="periodic")
+        myd.register_var("y", bco)
+        myd.create()
+
+        myd.get_var("y")[:, :] = 1.0
+        myd.t = 0.0
+
+        return myd
+
+    @staticmethod
+    def rhs(y, t):
+        """the righthand side, dy/dt"""
+        return -y + np.cos(t)
+
+    @staticmethod
+    def error(myd):
+        """the error in the solution at t = 1"""
+        exact = 0.5*(np.cos(1.0) + np.sin(1.0)) + 0.5*np.exp(-1.0)
+        return abs(myd.get_var("y").v()[0, 0] - exact)
+
+
+@pytest.fixture
+def decay():
+    return DecayProblem()
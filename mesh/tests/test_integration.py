@@ -0,0 +1,56 @@
+import mesh.integration as integration
+import numpy as np
+import pytest
+
+
+def integrate(decay, method, nsteps):
+    """integrate the decay problem to t = 1 and return the error"""
+
+    myd = decay.initial_data()
+    myg = myd.grid
+
+    dt = 1.0/nsteps
+    for _ in range(nsteps):
+        rk = integration.RKIntegrator(myd.t, dt, method=method)
+        rk.set_start(myd)
+
+        for s in range(rk.nstages()):
+            ytmp = rk.get_stage_start(s)
+            k = myg.scratch_array()
+            k[:, :] = decay.rhs(ytmp.get_var("y"), ytmp.t)
+            rk.store_increment(s, k)
+
+        rk.compute_final_update()
+        myd.t += dt
+
+    return decay.error(myd)
+
+
+@pytest.mark.parametrize("method, order",
+                         [("RK2", 2), ("TVD2", 2), ("TVD3", 3), ("RK4", 4),
+                          ("LSRK3", 3), ("LSRK4", 4)])
+def test_convergence(decay, method, order):
+    e_coarse = integrate(decay, method, 8)
+    e_fine = integrate(decay, method, 16)
+    assert np.log2(e_coarse/e_fine) == pytest.approx(order, abs=0.25)
+
+
+@pytest.mark.parametrize("method", ["LSRK3", "LSRK4"])
+def test_increment_not_changed(decay, method):
+
+    # the increments we pass in are ours -- the low-storage methods
+    # must not use them as their register
+    myd = decay.initial_data()
+    rk = integration.RKIntegrator(myd.t, 0.1, method=method)
+    rk.set_start(myd)
+
+    ks = []
+    for s in range(rk.nstages()):
+        ytmp = rk.get_stage_start(s)
+        k = myd.grid.scratch_array()
+        k[:, :] = decay.rhs(ytmp.get_var("y"), ytmp.t)
+        ks.append((k, k.copy()))
+        rk.store_increment(s, k)
+
+    for k, k_orig in ks:
+        assert np.array_equal(k, k_orig)
@@ -1,15 +1,20 @@
+import h5py
 import mesh.boundary as bnd
 import mesh.patch as patch
 import numpy as np
+import pytest
 import util.io as io
+from simulation_null import NullSimulation
+from util import runparams
 
 from numpy.testing import assert_array_equal
 
 
-def test_write_read():
+@pytest.mark.parametrize("layout", ["zone-major", "variable-major"])
+def test_write_read(layout):
 
     myg = patch.Grid2d(8, 6, ng=2, xmax=1.0, ymax=1.0)
-    myd = patch.CellCenterData2d(myg)
+    myd = patch.CellCenterData2d(myg, layout=layout)
 
     bco = bnd.BC(xlb="outflow", xrb="outflow",
                  ylb="outflow", yrb="outflow")
@@ -28,6 +33,7 @@ def test_write_read():
     anew = nd.get_var("a")
 
     assert_array_equal(anew.v(), a.v())
+    assert nd.layout == layout
 
 
 def test_write_read_1d():
@@ -51,3 +57,46 @@ def test_write_read_1d():
     anew = nd.get_var("a")
 
     assert_array_equal(anew.v(), a.v())
+
+
+def test_async_write(tmp_path):
+
+    rp = runparams.RuntimeParameters()
+    rp.params["io.async_output"] = 1
+    rp.params["io.async_depth"] = 1
+
+    sim = NullSimulation("advection", "test", rp)
+
+    myg = patch.Grid2d(8, 6, ng=2, xmax=1.0, ymax=1.0)
+    myd = patch.CellCenterData2d(myg)
+
+    bco = bnd.BC(xlb="outflow", xrb="outflow",
+                 ylb="outflow", yrb="outflow")
+    myd.register_var("a", bco)
+
+    myd.create()
+    sim.cc_data = myd
+
+    a = myd.get_var("a")
+
+    # each file should have the data at the time write was called,
+    # even though we change it before the writes are done
+    for n in range(3):
+        a.v()[:, :] = n
+        sim.n = n
+        sim.write(str(tmp_path / "async_{}".format(n)))
+
+    sim.flush_output()
+
+    for n in range(3):
+        with h5py.File(str(tmp_path / "async_{}.h5".format(n)), "r") as f:
+            assert f.attrs["nsteps"] == n
+            assert_array_equal(f["state/a/data"][()], np.full((8, 6), n))
+
+    # closing the writer stops its thread and releases it
+    writer = sim.writer
+    assert writer in io._writers
+
+    writer.close()
+    assert writer.thread is None
+    assert writer not in io._writers
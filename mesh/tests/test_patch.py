@@ -44,6 +44,51 @@ class TestGrid2d(object):
         q = self.g.scratch_array()
         assert q.shape == (self.g.qx, self.g.qy)
 
+    def test_scratch_pool(self):
+        # without a pool, the scope does nothing
+        with self.g.scratch_scope():
+            q = self.g.scratch_array()
+        assert self.g.pool is None
+
+        self.g.enable_pool()
+        pool = self.g.pool
+
+        # outside of a scope, we don't use the pool
+        q = self.g.scratch_array(nvar=3)
+        assert pool.stats()["allocated"] == 0
+
+        with self.g.scratch_scope():
+            a = self.g.scratch_array(nvar=3)
+            a[:, :, :] = 1.0
+            b = self.g.scratch_array(nvar=3)
+            c = self.g.scratch_array()
+            assert not np.shares_memory(a, b)
+            assert a.shape == q.shape and c.shape == (self.g.qx, self.g.qy)
+
+            # a nested scope releases its arrays first
+            with self.g.scratch_scope():
+                d = self.g.scratch_array(nvar=3)
+            with self.g.scratch_scope():
+                e = self.g.scratch_array(nvar=3)
+            assert np.shares_memory(d, e)
+
+        assert pool.stats() == {"allocated": 4, "reused": 1,
+                                "pooled_bytes": (3*3 + 1)*self.g.qx*self.g.qy*8}
+
+        # the arrays are reused, and zeroed unless we ask otherwise
+        with self.g.scratch_scope():
+            a2 = self.g.scratch_array(nvar=3)
+            b2 = self.g.scratch_array(nvar=3, zero=False)
+            assert a2.v(n=1).max() == 0.0
+            assert a2.g is self.g
+
+        assert np.shares_memory(a2, a) or np.shares_memory(b2, a)
+        assert pool.stats()["allocated"] == 4
+        assert pool.stats()["reused"] == 3
+
+        pool.clear()
+        assert pool.stats()["pooled_bytes"] == 0
+
     def test_coarse_like(self):
         q = self.g.coarse_like(2)
         assert q.qx == 2*self.g.ng + self.g.nx//2
@@ -147,6 +192,19 @@ class TestCellCenterData2d(object):
         # prologation should be conservative, so compare the volume-weighted sums
         assert 4.0*np.sum(a.v()) == np.sum(f.v())
 
+    def test_restrict_prolong_directional(self):
+        a = self.d.get_var("a")
+        a.v()[:, :] = np.arange(self.g.nx*self.g.ny).reshape(self.g.nx, self.g.ny) + 1
+
+        for N in [(2, 1), (1, 2)]:
+            c = self.d.restrict("a", N=N)
+            assert c.g.nx == self.g.nx//N[0] and c.g.ny == self.g.ny//N[1]
+            assert np.sum(a.v()) == 2.0*np.sum(c.v())
+
+            f = self.d.prolong("a", N=N)
+            assert f.g.nx == self.g.nx*N[0] and f.g.ny == self.g.ny*N[1]
+            assert 2.0*np.sum(a.v()) == np.sum(f.v())
+
     def test_zero(self):
         a = self.d.get_var("a")
         a.v()[:, :] = np.arange(self.g.nx*self.g.ny).reshape(self.g.nx, self.g.ny) + 1
@@ -154,6 +212,69 @@ class TestCellCenterData2d(object):
         self.d.zero("a")
         assert self.d.min("a") == 0.0 and self.d.max("a") == 0.0
 
+    def test_derived(self):
+
+        def derive(myd, name):
+            if name == "sum":
+                return myd.get_var("a") + myd.get_var("b")
+            return []
+
+        self.d.add_derived(derive)
+
+        a = self.d.get_var("a")
+        a[:, :] = 1
+
+        s = self.d.get_var("sum")
+        assert np.all(s == 1)
+
+        # a change through a view we already have is seen
+        a[:, :] = 3
+        assert np.all(self.d.get_var("sum") == 3)
+
+        # and the derived variable is ours to change
+        s[:, :] = 0
+
+
+def test_variable_major_layout():
+
+    myg = patch.Grid2d(8, 6, ng=2)
+
+    bco = bnd.BC(xlb="outflow", xrb="outflow",
+                 ylb="outflow", yrb="outflow")
+
+    data = {}
+    for layout in ["zone-major", "variable-major"]:
+        d = patch.CellCenterData2d(myg, layout=layout)
+        d.register_var("a", bco)
+        d.register_var("b", bco)
+        d.create()
+
+        a = d.get_var("a")
+        b = d.get_var("b")
+        a[:, :] = myg.x2d + 2*myg.y2d
+        b[:, :] = a**2
+        d.fill_BC_all()
+
+        data[layout] = d
+
+    # the data is indexed the same way regardless of layout
+    zm = data["zone-major"]
+    vm = data["variable-major"]
+
+    assert vm.data.shape == (myg.qx, myg.qy, 2)
+    assert_array_equal(zm.data, vm.data)
+    assert_array_equal(zm.get_var("b").ip(1), vm.get_var("b").ip(1))
+
+    # but each variable is contiguous for variable-major
+    assert vm.get_var("a").flags["C_CONTIGUOUS"]
+    assert not zm.get_var("a").flags["C_CONTIGUOUS"]
+
+    # clones keep the layout
+    vc = patch.cell_center_data_clone(vm)
+    assert vc.layout == "variable-major"
+    assert vc.get_var_by_index(1).flags["C_CONTIGUOUS"]
+    assert_array_equal(vc.data, vm.data)
+
 
 def test_bcs():
 
@@ -246,6 +367,53 @@ def test_bcs():
                        -np.fliplr(d[myg.ilo:myg.ihi+1, myg.jhi+1:myg.jhi+3]))
 
 
+def test_fill_BC_all_grouped():
+
+    # fill_BC_all groups variables that share a BC type -- it should
+    # give exactly the same result as filling them one at a time
+    myg = patch.Grid2d(8, 6, ng=3)
+
+    bc_types = ["outflow", "reflect-even", "reflect-odd", "dirichlet",
+                "neumann"]
+
+    bcs = []
+    for xl, xr, yl, yr in zip(bc_types, bc_types[::-1],
+                              bc_types[1:] + bc_types[:1],
+                              bc_types[2:] + bc_types[:2]):
+        bcs.append(bnd.BC(xlb=xl, xrb=xr, ylb=yl, yrb=yr))
+
+    bcs.append(bnd.BC(xlb="periodic", xrb="periodic",
+                      ylb="periodic", yrb="periodic"))
+    bcs.append(bnd.BC(xlb="periodic", xrb="periodic",
+                      ylb="reflect", yrb="outflow", odd_reflect_dir="y"))
+
+    # an inhomogeneous BC is filled on its own
+    bcs.append(bnd.BC(xlb="dirichlet", xrb="neumann",
+                      ylb="outflow", yrb="outflow",
+                      xl_func=lambda y: y, xr_func=lambda y: 2*y, grid=myg))
+
+    np.random.seed(4321)
+    _tmp = np.random.rand(myg.qx, myg.qy, len(bcs))
+
+    for layout in ["zone-major", "variable-major"]:
+        d_all = patch.CellCenterData2d(myg, layout=layout)
+        d_one = patch.CellCenterData2d(myg, layout=layout)
+        for n, bc in enumerate(bcs):
+            d_all.register_var("var{}".format(n), bc)
+            d_one.register_var("var{}".format(n), bc)
+        d_all.create()
+        d_one.create()
+
+        d_all.data[:, :, :] = _tmp
+        d_one.data[:, :, :] = _tmp
+
+        d_all.fill_BC_all()
+        for name in d_one.names:
+            d_one.fill_BC(name)
+
+        assert_array_equal(d_all.data, d_one.data)
+
+
 # Grid1d tests
 class TestGrid1d(object):
     @classmethod
@@ -380,6 +548,10 @@ class TestCellCenterData1d(object):
         self.d.zero("a")
         assert self.d.min("a") == 0.0 and self.d.max("a") == 0.0
 
+    def test_str(self):
+        s = str(self.d)
+        assert "nvars = 2" in s
+
 
 def test_bcs_1d():
 
@@ -0,0 +1,57 @@
+# unit tests for the reconstruction routines
+import mesh.reconstruction as reconstruction
+import numpy as np
+import pytest
+
+from numpy.testing import assert_array_almost_equal
+
+
+@pytest.mark.parametrize("order", [2, 3, 4, 5])
+def test_weno_coefficients(order):
+    # the optimal weights and the stencil reconstruction weights
+    # should each sum to one
+    assert reconstruction.C_all[order].sum() == pytest.approx(1.0)
+    assert_array_almost_equal(reconstruction.a_all[order].sum(axis=1),
+                              np.ones(order))
+
+    # the smoothness indicators vanish for constant data
+    assert_array_almost_equal(reconstruction.sigma_all[order].sum(axis=(1, 2)),
+                              np.zeros(order))
+
+
+@pytest.mark.parametrize("order", [2, 3, 4, 5])
+def test_weno_upwind_multid(order):
+    np.random.seed(100)
+    q = np.random.rand(16, 12)
+
+    q_plus = reconstruction.weno_upwind_multid(q, order, 0)
+    q_minus = reconstruction.weno_upwind_multid(q, order, 1, reverse=True)
+
+    for i in range(order-1, 16-order+1):
+        for j in range(12):
+            assert q_plus[i, j] == pytest.approx(
+                reconstruction.weno_upwind(q[i+1-order:i+order, j], order),
+                rel=1.e-14, abs=1.e-14)
+
+    for i in range(16):
+        for j in range(order-1, 12-order+1):
+            # reverse the stencil so weno_upwind sees it left-biased
+            stencil = q[i, j-order+1:j+order][::-1]
+            assert q_minus[i, j] == pytest.approx(
+                reconstruction.weno_upwind(stencil, order),
+                rel=1.e-14, abs=1.e-14)
+
+    # zones without a full stencil are not filled
+    assert np.all(q_plus[:order-1, :] == 0.0)
+    assert np.all(q_minus[:, 12-order+1:] == 0.0)
+
+
+def test_weno_upwind_multid_smooth():
+    # WENO should be exact for a linear profile, regardless of order
+    x = np.arange(20, dtype=np.float64)
+    q = np.outer(2.0*x + 1.0, np.ones(4))
+
+    for order in [2, 3, 4, 5]:
+        q_plus = reconstruction.weno_upwind_multid(q, order, 0)
+        assert_array_almost_equal(q_plus[order-1:20-order+1, :],
+                                  q[order-1:20-order+1, :] + 1.0)
@@ -0,0 +1,46 @@
+import mesh.sdc as sdc
+import numpy as np
+from numpy.testing import assert_allclose
+import pytest
+
+
+def integrate(decay, nodes, num_nodes, sweeps, nsteps):
+    """integrate the decay problem to t = 1 and return the error"""
+
+    myd = decay.initial_data()
+
+    def rhs(d):
+        return decay.rhs(d.data, d.t)
+
+    integrator = sdc.SDCIntegrator(nodes=nodes, num_nodes=num_nodes, sweeps=sweeps)
+
+    dt = 1.0/nsteps
+    for _ in range(nsteps):
+        integrator.advance(myd, dt, rhs)
+        myd.t += dt
+
+    return decay.error(myd)
+
+
+def test_weights():
+
+    # 3 Gauss-Lobatto nodes is Simpson's rule
+    s = sdc.SDCIntegrator(nodes="lobatto", num_nodes=3)
+    assert_allclose(s.tau, [0.0, 0.5, 1.0])
+    assert_allclose(s.weights, [1.0/6.0, 2.0/3.0, 1.0/6.0], rtol=1.e-14)
+
+    # the 2-stage Radau IIA method, plus the start of the step
+    s = sdc.SDCIntegrator(nodes="radau", num_nodes=2)
+    assert_allclose(s.tau, [0.0, 1.0/3.0, 1.0])
+    assert_allclose(s.weights, [0.0, 0.75, 0.25], rtol=1.e-14)
+
+
+@pytest.mark.parametrize("nodes, num_nodes, sweeps",
+                         [("lobatto", 2, 1), ("lobatto", 3, 2),
+                          ("lobatto", 3, 4), ("lobatto", 4, 6),
+                          ("radau", 2, 3), ("radau", 3, 6)])
+def test_convergence(decay, nodes, num_nodes, sweeps):
+    order = sdc.SDCIntegrator(nodes=nodes, num_nodes=num_nodes, sweeps=sweeps).order()
+    e_coarse = integrate(decay, nodes, num_nodes, sweeps, 8)
+    e_fine = integrate(decay, nodes, num_nodes, sweeps, 16)
+    assert np.log2(e_coarse/e_fine) == pytest.approx(order, abs=0.3)
@@ -47,10 +47,36 @@ Then to solve, you just do::
 
 where rtol is the desired tolerance (residual norm / source norm)
 
+By default, the solve does V-cycles.  W- or F-cycles can be selected
+with the cycle_type argument when creating the object, and fmg=1 makes
+the first cycle a full multigrid (FMG) cycle: the problem is first
+solved on the coarsest grid and the solution interpolated up the
+hierarchy, with one cycle on each level.  The FMG cycle replaces any
+initial guess and usually gets to the level of the discretization
+error in one cycle.
+
+By default, the hierarchy is coarsened down to a 2x2 grid, and the
+bottom solve is done by smoothing.  With bottom_solver="direct", the
+coarsening instead stops at a bottom_size x bottom_size grid (e.g. 16
+or 32), and the problem there is solved exactly with a sparse LU
+factorization.  The factorization is built the first time it is needed
+and kept until the coefficients change.
+
 to access the final solution, use the get_solution method::
 
    v = a.get_solution()
 
+Several problems with the same operator (coefficients and BCs) but
+different righthand sides can be solved together::
+
+   v = a.solve_batch(f, rtol=1.e-10)
+
+where f is a stack of K righthand sides (an array of shape (K, qx,
+qy), with the batch as the leading axis), and v is the stack of
+solutions.  All of the systems go through the cycles together, with
+each compiled smoothing or residual call working on the whole batch,
+and a system is dropped from the batch once it has converged.
+
 For convenience, the grid information on the solution level is available as
 attributes to the class,
 
@@ -64,14 +90,15 @@ a.dx and a.dy are the grid spacings
 
 from __future__ import print_function
 
-import math
-
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
+import scipy.sparse as sparse
+from scipy.sparse.linalg import splu
 
 import mesh.boundary as bnd
 import mesh.patch as patch
+import multigrid.mg_kernels as mg_kernels
 from util import msg
 
 
@@ -79,8 +106,8 @@ class CellCenterMG2d(object):
     """
     The main multigrid class for cell-centered data.
 
-    We require that nx = ny be a power of 2 and dx = dy, for
-    simplicity
+    The grid can be rectangular, with nx != ny and dx != dy.  We
+    coarsen by factors of 2 for as long as the number of zones allows.
     """
 
     def __init__(self, nx, ny, ng=1,
@@ -91,12 +118,19 @@ class CellCenterMG2d(object):
                  yl_BC=None, yr_BC=None,
                  alpha=0.0, beta=-1.0,
                  nsmooth=10, nsmooth_bottom=50,
+                 cycle_type="V", fmg=0,
+                 bottom_solver="smooth", bottom_size=2,
                  verbose=0,
                  aux_field=None, aux_bc=None,
                  true_function=None, vis=0, vis_title=""):
         """
-        Create the CellCenterMG2d object.  Note that this requires a
-        grid to be a power of 2 in size and square.
+        Create the CellCenterMG2d object.  The hierarchy is coarsened
+        by a factor of 2 in each direction until a direction can no
+        longer be halved (or would go below bottom_size zones), so
+        nx and ny work best with many factors of 2.  If the zones are
+        strongly anisotropic (one of dx, dy at least twice the other),
+        we only coarsen the direction with the smaller spacing until
+        the zones are close to square (semi-coarsening).
 
         Parameters
         ----------
@@ -142,6 +176,16 @@ class CellCenterMG2d(object):
         nsmooth_bottom : int, optional
             number of smoothing iterations to be done during the bottom
             solve
+        cycle_type : {'V', 'W', 'F'}, optional
+            the type of multigrid cycle to do
+        fmg : int, optional
+            make the first cycle a full multigrid cycle (for fmg=1)
+        bottom_solver : {'smooth', 'direct'}, optional
+            do the bottom solve by smoothing or with a sparse direct
+            (LU) solve
+        bottom_size : int, optional
+            stop coarsening before a direction gets fewer than this
+            many zones
         verbose : int, optional
             increase verbosity during the solve (for verbose=1)
         aux_field : list of str, optional
@@ -165,9 +209,6 @@ class CellCenterMG2d(object):
 
         """
 
-        if nx != ny:
-            raise ValueError("ERROR: multigrid currently requires nx = ny")
-
         self.nx = nx
         self.ny = ny
 
@@ -179,15 +220,32 @@ class CellCenterMG2d(object):
         self.ymin = ymin
         self.ymax = ymax
 
-        if (xmax-xmin) != (ymax-ymin):
-            raise ValueError("ERROR: multigrid currently requires a square domain")
-
         self.alpha = alpha
         self.beta = beta
 
         self.nsmooth = nsmooth
         self.nsmooth_bottom = nsmooth_bottom
 
+        if cycle_type not in ["V", "W", "F"]:
+            raise ValueError("ERROR: cycle_type {} not supported".format(cycle_type))
+
+        self.cycle_type = cycle_type
+        self.fmg = fmg
+
+        if bottom_solver not in ["smooth", "direct"]:
+            raise ValueError("ERROR: bottom_solver {} not supported".format(bottom_solver))
+
+        if bottom_size < 1:
+            raise ValueError("ERROR: bottom_size must be positive")
+
+        self.bottom_solver = bottom_solver
+        self.bottom_size = bottom_size
+
+        # the LU factorization of the operator on the bottom level --
+        # this is built when first needed
+        self.bottom_lu = None
+        self.bottom_singular = False
+
         self.max_cycles = 100
 
         self.verbose = verbose
@@ -203,13 +261,22 @@ class CellCenterMG2d(object):
         # keep track of whether we've initialized the RHS
         self.initialized_rhs = 0
 
-        # assume that self.nx = 2^(nlevels-1) and that nx = ny
-        # this defines nlevels such that we end exactly on a 2x2 grid
-        self.nlevels = int(math.log(self.nx)/math.log(2.0))
+        # work out the size of each level, from the finest down, and
+        # the factor we coarsen by to get from each level to the next
+        # coarser one.  For a square power of 2 grid, this ends on a
+        # bottom_size x bottom_size grid (2x2 by default)
+        sizes, self.ratios = self._hierarchy(nx, ny, (xmax-xmin)/nx, (ymax-ymin)/ny,
+                                             bottom_size)
+        self.nlevels = len(sizes)
 
         # a multigrid object will be a list of grids
         self.grids = []
 
+        # the BCs for the solution on each level.  Below the finest
+        # level, v is normally a correction, with homogeneous BCs, but
+        # in an FMG cycle it is the solution on that level
+        self.soln_bcs = []
+
         # create the grids.  Here, self.grids[0] will be the coarsest
         # grid and self.grids[nlevel-1] will be the finest grid
         # we store the solution, v, the rhs, f.
@@ -218,10 +285,10 @@ class CellCenterMG2d(object):
         bc = bnd.BC(xlb=xl_BC_type, xrb=xr_BC_type,
                     ylb=yl_BC_type, yrb=yr_BC_type)
 
-        nx_t = ny_t = 2
-
         for i in range(self.nlevels):
 
+            nx_t, ny_t = sizes[i]
+
             # create the grid
             my_grid = patch.Grid2d(nx_t, ny_t, ng=self.ng,
                                    xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax)
@@ -237,6 +304,8 @@ class CellCenterMG2d(object):
                           xl_func=xl_BC, xr_func=xr_BC,
                           yl_func=yl_BC, yr_func=yr_BC, grid=my_grid)
 
+            self.soln_bcs.append(bc_p)
+
             if i == self.nlevels-1:
                 self.grids[i].register_var("v", bc_p)
             else:
@@ -254,8 +323,12 @@ class CellCenterMG2d(object):
             if self.verbose:
                 print(self.grids[i])
 
-            nx_t = nx_t*2
-            ny_t = ny_t*2
+        # the boundary conditions on the solution on each level, in the
+        # form used by the compiled smoothers
+        self.ghost_bcs = [mg_kernels.ghost_bcs(g.BCs["v"]) for g in self.grids]
+        self.corr_bcs = [bc for g in self.grids]
+        self.corr_ghost_bcs = [mg_kernels.ghost_bcs(bc) for g in self.grids]
+        self.soln_ghost_bcs = [mg_kernels.ghost_bcs(bc) for bc in self.soln_bcs]
 
         # provide coordinate and indexing information for the solution mesh
         soln_grid = self.grids[self.nlevels-1].grid
@@ -270,7 +343,7 @@ class CellCenterMG2d(object):
         self.x2d = soln_grid.x2d
 
         self.y = soln_grid.y
-        self.dy = soln_grid.dy   # note, dy = dx is assumed
+        self.dy = soln_grid.dy
         self.y2d = soln_grid.y2d
 
         self.soln_grid = soln_grid
@@ -295,6 +368,39 @@ class CellCenterMG2d(object):
         self.vis_title = vis_title
         self.frame = 0
 
+    @staticmethod
+    def _hierarchy(nx, ny, dx, dy, bottom_size):
+        """
+        Return the (nx, ny) of each level, coarsest first, and the
+        factor to coarsen each level to the one below it (None for
+        the coarsest level).  The factor is 2 when coarsening in both
+        directions and an (x, y) pair for semi-coarsening.
+        """
+
+        sizes = [(nx, ny)]
+        ratios = []
+
+        while True:
+            # only coarsen the directions whose spacing is within a
+            # factor of 2 of the smallest spacing
+            h_min = min(dx, dy)
+            rx = 2 if dx < 2.0*h_min else 1
+            ry = 2 if dy < 2.0*h_min else 1
+
+            if (rx == 2 and (nx % 2 != 0 or nx//2 < bottom_size)) or \
+               (ry == 2 and (ny % 2 != 0 or ny//2 < bottom_size)):
+                break
+
+            nx //= rx
+            ny //= ry
+            dx *= rx
+            dy *= ry
+
+            sizes.insert(0, (nx, ny))
+            ratios.insert(0, 2 if rx == ry == 2 else (rx, ry))
+
+        return sizes, [None] + ratios
+
     # these draw functions are for visualization purposes and are
     # not ordinarily used, except for plotting the progression of the
     # solution within the V
@@ -481,6 +587,27 @@ class CellCenterMG2d(object):
         """
         return self.grids[self.nlevels-1]
 
+    def set_coefficients(self, alpha, beta):
+        r"""
+        Change the coefficients of the Helmholtz equation
+        :math:`(\alpha - \beta L) \phi = f`.  This lets a solver
+        (and its grid hierarchy) be reused when only the coefficients
+        change, e.g. when the timestep changes.
+
+        Parameters
+        ----------
+        alpha : float
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+        beta : float
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+
+        """
+        if alpha != self.alpha or beta != self.beta:
+            self.bottom_lu = None
+
+        self.alpha = alpha
+        self.beta = beta
+
     def init_solution(self, data):
         """
         Initialize the solution to the elliptic problem by passing in
@@ -538,9 +665,75 @@ class CellCenterMG2d(object):
 
         # compute the residual
         # r = f - alpha phi + beta L phi
-        r.v()[:, :] = f.v()[:, :] - self.alpha*v.v()[:, :] + \
-            self.beta*((v.ip(-1) + v.ip(1) - 2*v.v())/myg.dx**2 +
-                       (v.jp(-1) + v.jp(1) - 2*v.v())/myg.dy**2)
+        mg_kernels.residual_cc(v, f, r, self.alpha, self.beta,
+                               myg.ng, myg.dx, myg.dy)
+
+    def apply_operator(self, x, out, homogeneous=True):
+        """
+        Apply the elliptic operator to x on the finest level, storing
+        the result in out.  This uses the same stencil as the residual
+        (with a zero RHS, the residual is -A x).  By default, x is
+        taken to satisfy homogeneous BCs, so this is the linear
+        operator used by the Krylov solvers (see
+        :mod:`multigrid.krylov`).  With homogeneous=False, the BCs of
+        the solution are used.  Note: this overwrites v and f on the
+        finest level.
+
+        Parameters
+        ----------
+        x : ArrayIndexer
+            The data to apply the operator to
+        out : ArrayIndexer
+            The result, A x
+        homogeneous : bool, optional
+            Use homogeneous boundary conditions on x
+
+        """
+
+        level = self.nlevels-1
+        fp = self.grids[level]
+
+        if homogeneous:
+            self._set_bcs(level, soln=False)
+
+        fp.get_var("v").v()[:, :] = x.v()
+        fp.get_var("f").v()[:, :] = 0.0
+        fp.fill_BC("v")
+
+        self._compute_residual(level)
+        out.v()[:, :] = -fp.get_var("r").v()
+
+        self._set_bcs(level, soln=True)
+
+    def precondition(self, r, out):
+        """
+        Approximately solve A z = r (with homogeneous BCs) with a
+        single multigrid cycle (of type cycle_type) starting from
+        z = 0, storing z in out.  Note: this overwrites v and f on the
+        finest level.
+
+        Parameters
+        ----------
+        r : ArrayIndexer
+            The righthand side (a residual)
+        out : ArrayIndexer
+            The approximate solution, z
+
+        """
+
+        level = self.nlevels-1
+        fp = self.grids[level]
+
+        self._set_bcs(level, soln=False)
+
+        fp.get_var("f").v()[:, :] = r.v()
+        for g in self.grids:
+            g.zero("v")
+
+        self.mg_cycle(level)
+        out.v()[:, :] = fp.get_var("v").v()
+
+        self._set_bcs(level, soln=True)
 
     def smooth(self, level, nsmooth):
         """
@@ -563,41 +756,27 @@ class CellCenterMG2d(object):
 
         myg = self.grids[level].grid
 
-        self.grids[level].fill_BC("v")
-
-        xcoeff = self.beta/myg.dx**2
-        ycoeff = self.beta/myg.dy**2
-
-        # do red-black G-S
-        for i in range(nsmooth):
-
-            # do the red black updating in four decoupled groups
-            #
-            #
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #        |   4   |   3   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #   jlo  |   1   |   2   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |  ilo  |       |
-            #
-            # groups 1 and 3 are done together, then we need to
-            # fill ghost cells, and then groups 2 and 4
-
-            for n, (ix, iy) in enumerate([(0, 0), (1, 1), (1, 0), (0, 1)]):
-
-                v.ip_jp(ix, iy, s=2)[:, :] = (f.ip_jp(ix, iy, s=2) +
-                    xcoeff*(v.ip_jp(1+ix, iy, s=2) + v.ip_jp(-1+ix, iy, s=2)) +
-                    ycoeff*(v.ip_jp(ix, 1+iy, s=2) + v.ip_jp(ix, -1+iy, s=2))) / \
-                    (self.alpha + 2.0*xcoeff + 2.0*ycoeff)
-
-                if n == 1 or n == 3:
-                    self.grids[level].fill_BC("v")
+        # with visualization on, we smooth one iteration at a time so
+        # we can plot after each
+        nsweeps = 1 if self.vis == 1 else max(nsmooth, 1)
+
+        # the number of sweeps in each call -- the last call does any
+        # remainder
+        sweeps = [nsweeps]*(nsmooth // nsweeps)
+        if nsmooth % nsweeps > 0:
+            sweeps.append(nsmooth % nsweeps)
+
+        # the ghost cells are filled even if we do no smoothing
+        mg_kernels.fill_ghost(v, myg.ng, myg.dx, myg.dy, *self.ghost_bcs[level])
+
+        # do red-black G-S -- each call does n complete sweeps,
+        # including the ghost cell fills between the red and black
+        # updates
+        for n in sweeps:
+
+            mg_kernels.smooth_cc(v, f, self.alpha, self.beta,
+                                 myg.ng, myg.dx, myg.dy, n,
+                                 *self.ghost_bcs[level])
 
             if self.vis == 1:
                 plt.clf()
@@ -624,9 +803,10 @@ class CellCenterMG2d(object):
     def solve(self, rtol=1.e-11):
         """
         The main driver for the multigrid solution of the Helmholtz
-        equation.  This controls the V-cycles, smoothing at each
-        step of the way and uses simple smoothing at the coarsest
-        level to perform the bottom solve.
+        equation.  This controls the cycles (V, W, or F, after an
+        optional FMG cycle), smoothing at each step of the way and
+        uses simple smoothing at the coarsest level to perform the
+        bottom solve.
 
         Parameters
         ----------
@@ -659,12 +839,21 @@ class CellCenterMG2d(object):
             for level in range(self.nlevels-1):
                 self.grids[level].zero("v")
 
-            if self.verbose:
-                print("<<< beginning V-cycle (cycle {}) >>>\n".format(cycle))
-
-            # do V-cycles through the entire hierarchy
+            # do a cycle through the entire hierarchy
             level = self.nlevels-1
-            self.v_cycle(level)
+
+            if cycle == 1 and self.fmg:
+                if self.verbose:
+                    print("<<< beginning FMG cycle (cycle {}) >>>\n".format(cycle))
+
+                self.fmg_cycle()
+
+            else:
+                if self.verbose:
+                    print("<<< beginning {}-cycle (cycle {}) >>>\n".format(
+                        self.cycle_type, cycle))
+
+                self.mg_cycle(level)
 
             # compute the error with respect to the previous solution
             # this is for diagnostic purposes only -- it is not used to
@@ -697,11 +886,327 @@ class CellCenterMG2d(object):
         self.residual_error = residual_error
         fp.fill_BC("v")
 
+    def solve_batch(self, rhs, rtol=1.e-11, guess=None):
+        """
+        Solve the Helmholtz equation for a batch of K righthand sides
+        with the same operator and BCs.  The systems are carried
+        through the same cycles (V, W, or F, after an optional FMG
+        cycle) together, with the smoothing, residual, restriction,
+        and prolongation done on the whole batch at once.  Each system
+        is checked for convergence after every cycle, and the ones
+        that have converged are frozen and dropped from the batch.
+        This gives the same solutions as K separate solves, but
+        avoids most of the per-call overhead.
+
+        This does not touch the solution or RHS set with
+        init_solution() / init_RHS().  After the solve, num_cycles
+        and residual_error are arrays with the values for each system.
+
+        Parameters
+        ----------
+        rhs : ndarray
+            An array of shape (K, qx, qy) holding the righthand sides
+            (each the size of the finest MG level)
+        rtol : float, optional
+            The relative tolerance (residual norm / source norm) to
+            solve each system to.  If the source norm of a system is
+            0, then we just use the norm of its residual.
+        guess : ndarray, optional
+            An array of shape (K, qx, qy) with the initial guesses.
+            The default is zero.
+
+        Returns
+        -------
+        out : ndarray
+            An array of shape (K, qx, qy) with the solutions,
+            including valid ghost cells
+
+        """
+
+        myg = self.soln_grid
+        level = self.nlevels-1
+
+        rhs = np.asarray(rhs, dtype=np.float64)
+        if rhs.ndim != 3 or rhs.shape[1:] != (myg.qx, myg.qy):
+            raise ValueError("ERROR: rhs must have shape (K, {}, {})".format(myg.qx, myg.qy))
+
+        K = rhs.shape[0]
+
+        if guess is None:
+            soln = np.zeros_like(rhs)
+        else:
+            soln = np.array(guess, dtype=np.float64)
+            if soln.shape != rhs.shape:
+                raise ValueError("ERROR: guess must have the same shape as rhs")
+
+        source_norm = self._batch_norm(level, rhs)
+
+        num_cycles = np.zeros(K, dtype=np.int64)
+        residual_error = np.full(K, 1.e33)
+
+        # v, f, and r on each level, for the whole batch.  The systems
+        # still being solved are kept at the start of the batch, so
+        # each cycle works on contiguous views of these
+        work = [tuple(np.zeros((K, g.grid.qx, g.grid.qy)) for _ in range(3))
+                for g in self.grids]
+
+        v = work[level][0]
+        f = work[level][1]
+        v[:] = soln
+        f[:] = rhs
+
+        # the system each entry in the batch holds
+        active = np.arange(K)
+
+        cycle = 1
+        while len(active) > 0 and cycle <= self.max_cycles:
+
+            self.current_cycle = cycle
+
+            na = len(active)
+            w = [tuple(a[:na] for a in lw) for lw in work]
+
+            if cycle == 1 and self.fmg:
+                self._fmg_cycle_batch(w)
+            else:
+                self._cycle_batch(level, w, self.cycle_type)
+
+            v, f, r = w[level]
+            self._residual_batch(level, v, f, r)
+
+            norms = self._batch_norm(level, r)
+            err = np.where(source_norm[active] != 0.0,
+                           norms/np.where(source_norm[active] != 0.0,
+                                          source_norm[active], 1.0),
+                           norms)
+
+            soln[active] = v
+            num_cycles[active] = cycle
+            residual_error[active] = err
+
+            if self.verbose:
+                print("cycle {}: {} systems, max residual err = {}".format(
+                    cycle, na, err.max()))
+
+            # freeze the systems that converged by moving the rest to
+            # the start of the batch
+            keep = err > rtol
+            if not keep.all():
+                nk = keep.sum()
+                v[:nk] = v[keep]
+                f[:nk] = f[keep]
+                active = active[keep]
+
+            cycle += 1
+
+        self.num_cycles = num_cycles
+        self.residual_error = residual_error
+
+        return soln
+
+    def mg_cycle(self, level):
+        """
+        Perform a cycle of type cycle_type (V, W, or F) from level
+        down through the hierarchy.
+        """
+        self._cycle(level, self.cycle_type)
+
     def v_cycle(self, level):
         """
         Perform a V-cycle for a single 2-level solve.  This is applied
         recursively do V-cycle through the entire hierarchy.
 
+        """
+        self._cycle(level, "V")
+
+    def fmg_cycle(self):
+        """
+        Perform a full multigrid cycle.  The RHS is restricted down to
+        the coarsest level, where the problem is solved.  Then, going
+        up, the solution on each level is interpolated to the next
+        finer level to be the initial guess there, and one cycle of
+        type cycle_type is done.  This replaces the solution on the
+        finest level.
+        """
+
+        # the RHS on all levels
+        for level in range(self.nlevels-1, 0, -1):
+            f_coarse = self.grids[level-1].get_var("f")
+            f_coarse.v()[:, :] = self.grids[level].restrict("f", N=self.ratios[level]).v()
+
+        for level in range(self.nlevels):
+
+            self.current_level = level
+            fp = self.grids[level]
+
+            # v is the solution on this level, not a correction
+            self._set_bcs(level, soln=True)
+
+            if level == 0:
+                if self.verbose:
+                    print("  bottom solve:")
+
+                fp.zero("v")
+                self.bottom_solve()
+
+            else:
+                # interpolate the coarser solution up as the initial guess
+                v = fp.get_var("v")
+                v.v()[:, :] = self.grids[level-1].prolong("v", N=self.ratios[level]).v()
+                fp.fill_BC("v")
+
+                self._cycle(level, self.cycle_type)
+
+            fp.fill_BC("v")
+
+            if level < self.nlevels-1:
+                self._set_bcs(level, soln=False)
+
+    def bottom_solve(self):
+        """
+        Solve the problem on the coarsest level, either by smoothing
+        or with the LU factorization of the operator there.
+        """
+
+        if self.bottom_solver == "smooth":
+            self.smooth(0, self.nsmooth_bottom)
+            return
+
+        if self.bottom_lu is None:
+            self._factor_bottom()
+
+        # we solve for the correction to the current v, so this works
+        # with any initial guess and BCs
+        bp = self.grids[0]
+        bp.fill_BC("v")
+        self._compute_residual(0)
+
+        rhs = bp.get_var("r").v().ravel()
+        if self.bottom_singular:
+            rhs = np.append(rhs, 0.0)
+
+        e = self.bottom_lu.solve(rhs)[:bp.grid.nx*bp.grid.ny]
+
+        v = bp.get_var("v")
+        v.v()[:, :] += e.reshape(bp.grid.nx, bp.grid.ny)
+        bp.fill_BC("v")
+
+    def _factor_bottom(self):
+        """
+        Build the matrix of the (homogeneous) operator on the coarsest
+        level and its LU factorization.  We don't need to know the
+        stencil -- the operator is applied to a set of probe vectors,
+        using the residual, and since each row only couples a zone to
+        its 4 neighbors, zones 4 apart in each direction can share a
+        probe.  If the operator is singular (e.g. periodic or Neumann
+        BCs with no alpha term), we add a constraint that the solution
+        has zero average.
+        """
+
+        bp = self.grids[0]
+        myg = bp.grid
+        nx = myg.nx
+        ny = myg.ny
+
+        v = bp.get_var("v")
+        f = bp.get_var("f")
+        r = bp.get_var("r")
+
+        # save the state of the level, and use homogeneous BCs
+        saved = (v.copy(), f.copy(), bp.BCs["v"], self.ghost_bcs[0])
+        self._set_bcs(0, soln=False)
+
+        def apply(x):
+            v.v()[:, :] = x
+            f.v()[:, :] = 0.0
+            bp.fill_BC("v")
+            self._compute_residual(0)
+            return -r.v().copy()
+
+        periodic_x = bp.BCs["v"].xlb == "periodic"
+        periodic_y = bp.BCs["v"].ylb == "periodic"
+
+        # with periodic BCs, the spacing of the probes must divide
+        # the domain, so zones don't couple across the boundary
+        px = min(4, nx)
+        if periodic_x and nx % px != 0:
+            px = nx
+
+        py = min(4, ny)
+        if periodic_y and ny % py != 0:
+            py = ny
+
+        rows = []
+        cols = []
+        vals = []
+
+        for ci in range(px):
+            for cj in range(py):
+                x = np.zeros((nx, ny))
+                x[ci::px, cj::py] = 1.0
+                ax = apply(x)
+
+                ii, jj = np.meshgrid(np.arange(ci, nx, px), np.arange(cj, ny, py),
+                                     indexing="ij")
+                ii = ii.ravel()
+                jj = jj.ravel()
+
+                pairs = set()
+                for di, dj in [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    ni = ii + di
+                    nj = jj + dj
+
+                    if periodic_x:
+                        ni = ni % nx
+                    if periodic_y:
+                        nj = nj % ny
+
+                    valid = (ni >= 0) & (ni < nx) & (nj >= 0) & (nj < ny)
+
+                    for n, m, i, j in zip(ni[valid], nj[valid], ii[valid], jj[valid]):
+                        if (n, m, i, j) not in pairs:
+                            pairs.add((n, m, i, j))
+                            rows.append(n*ny + m)
+                            cols.append(i*ny + j)
+                            vals.append(ax[n, m])
+
+        N = nx*ny
+        A = sparse.csc_matrix((vals, (rows, cols)), shape=(N, N))
+
+        # check whether constants are in the null space
+        ones = apply(np.ones((nx, ny)))
+        self.bottom_singular = np.abs(ones).max() <= 1.e-10*abs(A).max()
+
+        if self.bottom_singular:
+            e = sparse.csc_matrix(np.ones((N, 1)))
+            A = sparse.bmat([[A, e], [e.T, None]], format="csc")
+
+        self.bottom_lu = splu(A)
+
+        # restore the level
+        v[:, :] = saved[0]
+        f[:, :] = saved[1]
+        bp.BCs["v"] = saved[2]
+        self.ghost_bcs[0] = saved[3]
+
+    def _set_bcs(self, level, soln=False):
+        """
+        Switch the BCs on v at level between those of the solution
+        (soln=True) and the homogeneous BCs of a correction.
+        """
+        if soln:
+            self.grids[level].BCs["v"] = self.soln_bcs[level]
+            self.ghost_bcs[level] = self.soln_ghost_bcs[level]
+        else:
+            self.grids[level].BCs["v"] = self.corr_bcs[level]
+            self.ghost_bcs[level] = self.corr_ghost_bcs[level]
+
+    def _cycle(self, level, cycle_type):
+        """
+        Perform a cycle of type cycle_type for a single 2-level
+        solve.  This is applied recursively through the hierarchy.
+        A V-cycle visits the coarser level once, a W-cycle twice, and
+        an F-cycle does an F-cycle and then a V-cycle there.
         """
 
         if level > 0:
@@ -729,10 +1234,19 @@ class CellCenterMG2d(object):
 
             # restrict the residual down to the RHS of the coarser level
             f_coarse = cp.get_var("f")
-            f_coarse.v()[:, :] = fp.restrict("r").v()
+            f_coarse.v()[:, :] = fp.restrict("r", N=self.ratios[level]).v()
 
-            # solve the coarse problem
-            self.v_cycle(level-1)
+            # solve the coarse problem, starting from a zero correction
+            cp.zero("v")
+
+            if cycle_type == "V":
+                self._cycle(level-1, "V")
+            elif cycle_type == "W":
+                self._cycle(level-1, "W")
+                self._cycle(level-1, "W")
+            else:
+                self._cycle(level-1, "F")
+                self._cycle(level-1, "V")
 
             # ascending part
             self.current_level = level
@@ -742,7 +1256,7 @@ class CellCenterMG2d(object):
             cp = self.grids[level-1]
 
             # prolong the error up from the coarse grid
-            e = cp.prolong("v")
+            e = cp.prolong("v", N=self.ratios[level])
 
             # correct the solution on the current grid
             v = fp.get_var("v")
@@ -763,10 +1277,8 @@ class CellCenterMG2d(object):
                 print("  after G-S, residual L2: {}\n".format(fp.get_var("r").norm()))
 
         else:
-            # bottom solve: solve the discrete coarse problem.  We
-            # could use any number of different matrix solvers here
-            # (like CG), but since we are 2x2 by design at this point,
-            # we will just smooth
+            # bottom solve: solve the discrete coarse problem, either
+            # by smoothing (fine on a 2x2 grid) or directly
             if self.verbose:
                 print("  bottom solve:")
 
@@ -777,6 +1289,202 @@ class CellCenterMG2d(object):
                 self.grid_info(level, indent=2)
                 print("")
 
-            self.smooth(level, self.nsmooth_bottom)
+            self.bottom_solve()
 
             bp.fill_BC("v")
+
+    def _smooth_batch(self, level, v, f, nsmooth):
+        """smooth a batch of solutions at a given level"""
+        myg = self.grids[level].grid
+        mg_kernels.smooth_cc_batch(v, f, self.alpha, self.beta,
+                                   myg.ng, myg.dx, myg.dy, nsmooth,
+                                   *self.ghost_bcs[level])
+
+    def _residual_batch(self, level, v, f, r):
+        """compute the residual of a batch of solutions at a given level"""
+        myg = self.grids[level].grid
+        mg_kernels.residual_cc_batch(v, f, r, self.alpha, self.beta,
+                                     myg.ng, myg.dx, myg.dy)
+
+    def _fill_batch(self, level, v):
+        """fill the ghost cells of a batch of solutions at a given level"""
+        myg = self.grids[level].grid
+        mg_kernels.fill_ghost_batch(v, myg.ng, myg.dx, myg.dy,
+                                    *self.ghost_bcs[level])
+
+    def _batch_norm(self, level, a):
+        """the norm of the valid data of each of a batch of arrays"""
+        myg = self.grids[level].grid
+        return np.array([np.sqrt(myg.dx * myg.dy *
+                                 np.sum((a[k, myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1]**2).flat))
+                         for k in range(a.shape[0])])
+
+    def _restrict_batch(self, level, fdata, cdata):
+        """
+        restrict a batch of arrays on level to the valid zones of a
+        batch on the next coarser level -- this does the same
+        operations as CellCenterData2d.restrict()
+        """
+
+        fg = self.grids[level].grid
+        cg = self.grids[level-1].grid
+
+        N = self.ratios[level]
+        rx, ry = N if isinstance(N, tuple) else (2, 2)
+
+        def child(ii, jj):
+            return fdata[:, fg.ilo+ii:fg.ihi+1:rx, fg.jlo+jj:fg.jhi+1:ry]
+
+        c = cdata[:, cg.ilo:cg.ihi+1, cg.jlo:cg.jhi+1]
+
+        if isinstance(N, tuple):
+            c[:] = 0.0
+            for ii in range(rx):
+                for jj in range(ry):
+                    c += child(ii, jj)
+            c /= rx*ry
+        else:
+            c[:] = 0.25*(child(0, 0) + child(1, 0) +
+                         child(0, 1) + child(1, 1))
+
+    def _prolong_batch(self, level, cdata, fdata):
+        """
+        prolong a batch of arrays on the next coarser level (with
+        valid ghost cells) to level and add them to the valid zones
+        of fdata -- this does the same operations as
+        CellCenterData2d.prolong()
+        """
+
+        fg = self.grids[level].grid
+        cg = self.grids[level-1].grid
+
+        N = self.ratios[level]
+        rx, ry = N if isinstance(N, tuple) else (2, 2)
+
+        ilo, ihi, jlo, jhi = cg.ilo, cg.ihi, cg.jlo, cg.jhi
+
+        c = cdata[:, ilo:ihi+1, jlo:jhi+1]
+        m_x = 0.5*(cdata[:, ilo+1:ihi+2, jlo:jhi+1] - cdata[:, ilo-1:ihi, jlo:jhi+1])
+        m_y = 0.5*(cdata[:, ilo:ihi+1, jlo+1:jhi+2] - cdata[:, ilo:ihi+1, jlo-1:jhi])
+
+        def child(ii, jj):
+            return fdata[:, fg.ilo+ii:fg.ihi+1:rx, fg.jlo+jj:fg.jhi+1:ry]
+
+        if isinstance(N, tuple):
+            for ii in range(rx):
+                for jj in range(ry):
+                    sx = 0.5*ii - 0.25 if rx == 2 else 0.0
+                    sy = 0.5*jj - 0.25 if ry == 2 else 0.0
+                    child(ii, jj)[:] += c + sx*m_x + sy*m_y
+        else:
+            child(0, 0)[:] += c - 0.25*m_x - 0.25*m_y
+            child(1, 0)[:] += c + 0.25*m_x - 0.25*m_y
+            child(0, 1)[:] += c - 0.25*m_x + 0.25*m_y
+            child(1, 1)[:] += c + 0.25*m_x + 0.25*m_y
+
+    def _bottom_solve_batch(self, w):
+        """
+        Solve the problem on the coarsest level for a batch, either by
+        smoothing or with the LU factorization of the operator there
+        """
+
+        v, f, r = w[0]
+
+        if self.bottom_solver == "smooth":
+            self._smooth_batch(0, v, f, self.nsmooth_bottom)
+            return
+
+        if self.bottom_lu is None:
+            self._factor_bottom()
+
+        myg = self.grids[0].grid
+        nx = myg.nx
+        ny = myg.ny
+        na = v.shape[0]
+
+        self._fill_batch(0, v)
+        self._residual_batch(0, v, f, r)
+
+        # the LU solve works on all of the systems at once, as columns
+        rhs = r[:, myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1].reshape(na, nx*ny).T
+        if self.bottom_singular:
+            rhs = np.vstack([rhs, np.zeros((1, na))])
+
+        e = self.bottom_lu.solve(np.ascontiguousarray(rhs))[:nx*ny]
+
+        v[:, myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1] += e.T.reshape(na, nx, ny)
+        self._fill_batch(0, v)
+
+    def _cycle_batch(self, level, w, cycle_type):
+        """
+        Perform a cycle of type cycle_type for a single 2-level solve
+        on a batch of systems, where w is the list of (v, f, r) for
+        the batch on each level.  This is the same as _cycle().
+        """
+
+        v, f, r = w[level]
+
+        if level > 0:
+
+            cv, cf, _ = w[level-1]
+
+            # smooth and restrict the residual to the coarser level
+            self._smooth_batch(level, v, f, self.nsmooth)
+            self._residual_batch(level, v, f, r)
+            self._restrict_batch(level, r, cf)
+
+            # solve the coarse problem, starting from a zero correction
+            cv[:] = 0.0
+
+            if cycle_type == "V":
+                self._cycle_batch(level-1, w, "V")
+            elif cycle_type == "W":
+                self._cycle_batch(level-1, w, "W")
+                self._cycle_batch(level-1, w, "W")
+            else:
+                self._cycle_batch(level-1, w, "F")
+                self._cycle_batch(level-1, w, "V")
+
+            # correct the solution with the prolonged error and smooth
+            self._prolong_batch(level, cv, v)
+            self._fill_batch(level, v)
+
+            self._smooth_batch(level, v, f, self.nsmooth)
+
+        else:
+            self._bottom_solve_batch(w)
+            self._fill_batch(level, v)
+
+    def _fmg_cycle_batch(self, w):
+        """
+        Perform a full multigrid cycle on a batch of systems, where w
+        is the list of (v, f, r) for the batch on each level.  This is
+        the same as fmg_cycle().
+        """
+
+        for level in range(self.nlevels-1, 0, -1):
+            self._restrict_batch(level, w[level][1], w[level-1][1])
+
+        for level in range(self.nlevels):
+
+            v = w[level][0]
+
+            # v is the solution on this level, not a correction
+            self._set_bcs(level, soln=True)
+
+            if level == 0:
+                v[:] = 0.0
+                self._bottom_solve_batch(w)
+
+            else:
+                # interpolate the coarser solution up as the initial guess
+                v[:] = 0.0
+                self._prolong_batch(level, w[level-1][0], v)
+                self._fill_batch(level, v)
+
+                self._cycle_batch(level, w, self.cycle_type)
+
+            self._fill_batch(level, v)
+
+            if level < self.nlevels-1:
+                self._set_bcs(level, soln=False)
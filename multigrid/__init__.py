@@ -20,8 +20,18 @@ general_MG implements a more general elliptic equation
    \alpha \phi + \nabla \cdot { \beta \nabla \phi } + \gamma \cdot \nabla \phi = f
 
 
-All use pure V-cycles to solve elliptic problems
+All use multigrid cycles (V-cycles by default, or W- or F-cycles,
+optionally starting with a full multigrid cycle) to solve elliptic
+problems
+
+krylov provides conjugate gradient and BiCGStab solvers that use any
+of these as the operator and a multigrid cycle as the preconditioner
+
+fft_solver is a direct solver for the same constant-coefficient
+Helmholtz equation as MG, for periodic or homogeneous Dirichlet /
+Neumann boundary conditions
 
 """
 
-__all__ = ['MG', 'variable_coeff_MG', 'general_MG', 'edge_coeffs.py']
+__all__ = ['MG', 'variable_coeff_MG', 'general_MG', 'edge_coeffs.py', 'mg_kernels',
+           'fft_solver', 'krylov']
@@ -26,13 +26,14 @@ class EdgeCoeffs(object):
             self.x = eta_x
             self.y = eta_y
 
-    def restrict(self):
+    def restrict(self, N=2):
         """
         restrict the edge values to a coarser grid.  Return a new
-        EdgeCoeffs object
+        EdgeCoeffs object.  N can also be an (x, y) pair of factors
+        of 1 or 2, for coarsening in only one direction.
         """
 
-        cg = self.grid.coarse_like(2)
+        cg = self.grid.coarse_like(N)
 
         c_edge_coeffs = EdgeCoeffs(cg, None, empty=True)
 
@@ -41,11 +42,29 @@ class EdgeCoeffs(object):
 
         fg = self.grid
 
-        b = (0, 1, 0, 0)
-        c_eta_x.v(buf=b)[:, :] = 0.5*(self.x.v(buf=b, s=2) + self.x.jp(1, buf=b, s=2))
-
-        b = (0, 0, 0, 1)
-        c_eta_y.v(buf=b)[:, :] = 0.5*(self.y.v(buf=b, s=2) + self.y.ip(1, buf=b, s=2))
+        if isinstance(N, tuple):
+            rx, ry = N
+
+            # the coarse x-edges are every rx-th fine x-edge, averaged
+            # over the ry fine edges they cover in y, and likewise for y
+            b = (0, 1, 0, 0)
+            if ry == 2:
+                c_eta_x.v(buf=b)[:, :] = 0.5*(self.x.v(buf=b, s=N) + self.x.jp(1, buf=b, s=N))
+            else:
+                c_eta_x.v(buf=b)[:, :] = self.x.v(buf=b, s=N)
+
+            b = (0, 0, 0, 1)
+            if rx == 2:
+                c_eta_y.v(buf=b)[:, :] = 0.5*(self.y.v(buf=b, s=N) + self.y.ip(1, buf=b, s=N))
+            else:
+                c_eta_y.v(buf=b)[:, :] = self.y.v(buf=b, s=N)
+
+        else:
+            b = (0, 1, 0, 0)
+            c_eta_x.v(buf=b)[:, :] = 0.5*(self.x.v(buf=b, s=2) + self.x.jp(1, buf=b, s=2))
+
+            b = (0, 0, 0, 1)
+            c_eta_y.v(buf=b)[:, :] = 0.5*(self.y.v(buf=b, s=2) + self.y.ip(1, buf=b, s=2))
 
         # redo the normalization
         c_edge_coeffs.x = c_eta_x*fg.dx**2/cg.dx**2
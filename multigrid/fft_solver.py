@@ -0,0 +1,414 @@
+r"""
+A direct (spectral) solver for the constant-coefficient Helmholtz
+equation
+
+.. math::
+
+   (\alpha - \beta L) \phi = f
+
+on a uniform grid, where :math:`L` is the same 5-point discrete
+Laplacian used by the multigrid solver.  This works when the boundary
+conditions are homogeneous and of the same type on both sides of a
+direction:
+
+* periodic -- we use an FFT
+* homogeneous Dirichlet -- we use a discrete sine transform (DST-II)
+* homogeneous Neumann -- we use a discrete cosine transform (DCT-II)
+
+These transforms diagonalize the discrete Laplacian, so the solution
+is just a forward transform, a division by the eigenvalues of
+:math:`(\alpha - \beta L)`, and an inverse transform.  The solution
+is exact (to roundoff) and no iteration is needed.  The eigenvalues
+only depend on the grid and boundary conditions, so they are computed
+once, when the object is created.
+
+The interface is the same as :class:`CellCenterMG2d
+<multigrid.MG.CellCenterMG2d>`, so this can be used in its place::
+
+   a = multigrid.fft_solver.FFTHelmholtz2d(nx, ny,
+                                           xl_BC_type="periodic", ...)
+   a.init_RHS(f)
+   a.solve()
+   v = a.get_solution()
+
+Unlike the multigrid solver, nx and ny do not need to have any factors
+of 2.
+
+For a periodic or Neumann domain with :math:`\alpha = 0`, the solution
+is only defined up to a constant -- we return the solution with zero
+average.
+
+"""
+
+from __future__ import print_function
+
+import numpy as np
+import scipy.fft as fft
+
+import mesh.boundary as bnd
+import mesh.patch as patch
+from util import msg
+
+
+# the transform used for each type of boundary condition
+_transform = {"periodic": "fft",
+              "dirichlet": "dst",
+              "reflect-odd": "dst",
+              "neumann": "dct",
+              "outflow": "dct",
+              "reflect-even": "dct"}
+
+
+class FFTHelmholtz2d(object):
+    """
+    A direct solver for the Helmholtz equation on a uniform grid with
+    periodic or homogeneous Dirichlet / Neumann boundary conditions.
+    """
+
+    def __init__(self, nx, ny, ng=1,
+                 xmin=0.0, xmax=1.0, ymin=0.0, ymax=1.0,
+                 xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                 yl_BC_type="dirichlet", yr_BC_type="dirichlet",
+                 alpha=0.0, beta=-1.0,
+                 verbose=0):
+        """
+        Create the FFTHelmholtz2d object.
+
+        Parameters
+        ----------
+        nx : int
+            number of cells in x-direction
+        ny : int
+            number of cells in y-direction.
+        ng : int, optional
+            number of ghost cells on the solution grid
+        xmin : float, optional
+            minimum physical coordinate in x-direction
+        xmax : float, optional
+            maximum physical coordinate in x-direction
+        ymin : float, optional
+            minimum physical coordinate in y-direction
+        ymax : float, optional
+            maximum physical coordinate in y-direction
+        xl_BC_type : {'neumann', 'dirichlet', 'periodic'}, optional
+            boundary condition to enforce on lower x face
+        xr_BC_type : {'neumann', 'dirichlet', 'periodic'}, optional
+            boundary condition to enforce on upper x face
+        yl_BC_type : {'neumann', 'dirichlet', 'periodic'}, optional
+            boundary condition to enforce on lower y face
+        yr_BC_type : {'neumann', 'dirichlet', 'periodic'}, optional
+            boundary condition to enforce on upper y face
+        alpha : float, optional
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+        beta : float, optional
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+        verbose : int, optional
+            increase verbosity during the solve (for verbose=1)
+
+        Returns
+        -------
+        out: FFTHelmholtz2d object
+
+        """
+
+        self.nx = nx
+        self.ny = ny
+        self.ng = ng
+
+        self.xmin = xmin
+        self.xmax = xmax
+        self.ymin = ymin
+        self.ymax = ymax
+
+        self.alpha = alpha
+        self.beta = beta
+
+        self.verbose = verbose
+
+        # the transform to use in each direction
+        self.transforms = []
+        for lo, hi in [(xl_BC_type, xr_BC_type), (yl_BC_type, yr_BC_type)]:
+            if lo not in _transform or hi not in _transform or \
+               _transform[lo] != _transform[hi]:
+                msg.fail("ERROR: BCs {} and {} not supported by the FFT solver".format(lo, hi))
+            self.transforms.append(_transform[lo])
+
+        # the solution and RHS live on a single grid
+        bc = bnd.BC(xlb=xl_BC_type, xrb=xr_BC_type,
+                    ylb=yl_BC_type, yrb=yr_BC_type)
+
+        self.soln_grid = patch.Grid2d(nx, ny, ng=ng,
+                                      xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax)
+
+        self.soln = patch.CellCenterData2d(self.soln_grid)
+        self.soln.register_var("v", bc)
+        self.soln.register_var("f", bc)
+        self.soln.create()
+
+        # provide coordinate and indexing information for the solution mesh
+        myg = self.soln_grid
+
+        self.ilo = myg.ilo
+        self.ihi = myg.ihi
+        self.jlo = myg.jlo
+        self.jhi = myg.jhi
+
+        self.x = myg.x
+        self.dx = myg.dx
+        self.x2d = myg.x2d
+
+        self.y = myg.y
+        self.dy = myg.dy
+        self.y2d = myg.y2d
+
+        # the eigenvalues of the discrete Laplacian, in the layout of
+        # the transformed data
+        lx = self._eigenvalues(self.transforms[0], nx, myg.dx,
+                               full=self.transforms == ["fft", "fft"])
+        ly = self._eigenvalues(self.transforms[1], ny, myg.dy)
+        self.lap_eigen = lx[:, np.newaxis] + ly[np.newaxis, :]
+
+        # 1/(alpha - beta lambda) -- this is computed when needed and
+        # reset if the coefficients change
+        self._scale = None
+
+        self.source_norm = 0.0
+        self.initialized_rhs = 0
+
+        # for compatibility with the multigrid solver -- the solve is
+        # direct, so there is only ever one "cycle"
+        self.num_cycles = 0
+
+    @staticmethod
+    def _eigenvalues(transform, n, h, full=False):
+        """
+        Return the eigenvalues of the 1-d second difference operator
+        for the modes in the order they come out of the transform.
+        A periodic direction is done with a real FFT, so only the
+        non-negative wavenumbers are stored, unless full is set (for
+        the first axis of a 2-d real FFT).
+        """
+
+        if transform == "fft":
+            nk = n if full else n//2 + 1
+            theta = 2.0*np.pi*np.arange(nk)/n
+        elif transform == "dct":
+            theta = np.pi*np.arange(n)/n
+        else:
+            theta = np.pi*np.arange(1, n+1)/n
+
+        return (2.0*np.cos(theta) - 2.0)/h**2
+
+    def _forward(self, f):
+        """transform f (the valid data) to the eigenbasis"""
+
+        g = f
+        for axis, t in enumerate(self.transforms):
+            if t == "dct":
+                g = fft.dct(g, type=2, axis=axis, norm="ortho")
+            elif t == "dst":
+                g = fft.dst(g, type=2, axis=axis, norm="ortho")
+
+        if self.transforms == ["fft", "fft"]:
+            g = fft.rfft2(g)
+        elif self.transforms[1] == "fft":
+            g = fft.rfft(g, axis=1)
+        elif self.transforms[0] == "fft":
+            g = fft.rfft(g, axis=0)
+
+        return g
+
+    def _inverse(self, g):
+        """transform g from the eigenbasis back to the grid"""
+
+        if self.transforms == ["fft", "fft"]:
+            g = fft.irfft2(g, s=(self.nx, self.ny))
+        elif self.transforms[1] == "fft":
+            g = fft.irfft(g, n=self.ny, axis=1)
+        elif self.transforms[0] == "fft":
+            g = fft.irfft(g, n=self.nx, axis=0)
+
+        for axis, t in enumerate(self.transforms):
+            if t == "dct":
+                g = fft.idct(g, type=2, axis=axis, norm="ortho")
+            elif t == "dst":
+                g = fft.idst(g, type=2, axis=axis, norm="ortho")
+
+        return g
+
+    def grid_info(self, level=0, indent=0):
+        """
+        Report simple grid information
+        """
+        print("{}FFT solver, grid: {} x {}".format(indent*" ", self.nx, self.ny))
+
+    def get_solution(self, grid=None):
+        """
+        Return the solution after doing the solve
+
+        If a grid object is passed in, then the solution is put on that
+        grid -- not the passed in grid must have the same dx and dy
+
+        Returns
+        -------
+        out : ndarray
+
+        """
+
+        v = self.soln.get_var("v")
+
+        if grid is None:
+            return v.copy()
+
+        myg = self.soln_grid
+        assert grid.dx == myg.dx and grid.dy == myg.dy
+
+        sol = grid.scratch_array()
+        sol.v(buf=1)[:, :] = v.v(buf=1)
+        return sol
+
+    def get_solution_gradient(self, grid=None):
+        """
+        Return the gradient of the solution after doing the solve.  The
+        x- and y-components are returned in separate arrays.
+
+        If a grid object is passed in, then the gradient is computed on that
+        grid.  Note: the passed-in grid must have the same dx, dy
+
+        Returns
+        -------
+        out : ndarray, ndarray
+
+        """
+
+        myg = self.soln_grid
+
+        if grid is None:
+            og = self.soln_grid
+        else:
+            og = grid
+            assert og.dx == myg.dx and og.dy == myg.dy
+
+        v = self.soln.get_var("v")
+
+        gx = og.scratch_array()
+        gy = og.scratch_array()
+
+        gx.v()[:, :] = 0.5*(v.ip(1) - v.ip(-1))/myg.dx
+        gy.v()[:, :] = 0.5*(v.jp(1) - v.jp(-1))/myg.dy
+
+        return gx, gy
+
+    def get_solution_object(self):
+        """
+        Return the full solution data object
+
+        Returns
+        -------
+        out : CellCenterData2d object
+
+        """
+        return self.soln
+
+    def set_coefficients(self, alpha, beta):
+        r"""
+        Change the coefficients of the Helmholtz equation
+        :math:`(\alpha - \beta L) \phi = f`.
+
+        Parameters
+        ----------
+        alpha : float
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+        beta : float
+            coefficient in Helmholtz equation (alpha - beta L) phi = f
+
+        """
+        if alpha != self.alpha or beta != self.beta:
+            self._scale = None
+
+        self.alpha = alpha
+        self.beta = beta
+
+    def init_solution(self, data):
+        """
+        Initialize the solution.  The solve is direct, so this is not
+        used as an initial guess, but it is kept for compatibility
+        with the multigrid solver.
+
+        Parameters
+        ----------
+        data : ndarray
+            An array (of the same size as the solution grid) with the
+            values to initialize the solution to.
+
+        """
+        v = self.soln.get_var("v")
+        v[:, :] = data.copy()
+
+    def init_zeros(self):
+        """
+        Set the initial solution to zero
+        """
+        self.soln.zero("v")
+
+    def init_RHS(self, data):
+        r"""
+        Initialize the right hand side, f, of the Helmholtz equation
+        :math:`(\alpha - \beta L) \phi = f`
+
+        Parameters
+        ----------
+        data : ndarray
+            An array (of the same size as the solution grid) with the
+            right hand side.
+
+        """
+
+        f = self.soln.get_var("f")
+        f[:, :] = data.copy()
+
+        # store the source norm
+        self.source_norm = f.norm()
+
+        if self.verbose:
+            print("Source norm = ", self.source_norm)
+
+        self.initialized_rhs = 1
+
+    def solve(self, rtol=1.e-11):
+        """
+        Solve the Helmholtz equation.  This is a direct solve, so rtol
+        is not used -- it is accepted for compatibility with the
+        multigrid solver.
+
+        Parameters
+        ----------
+        rtol : float
+            ignored
+
+        """
+
+        # start by making sure that we've initialized the RHS
+        if not self.initialized_rhs:
+            msg.fail("ERROR: RHS not initialized")
+
+        if self._scale is None:
+            denom = self.alpha - self.beta*self.lap_eigen
+
+            # for a singular operator, the zero mode is arbitrary
+            singular = denom == 0.0
+            denom[singular] = 1.0
+            self._scale = 1.0/denom
+            self._scale[singular] = 0.0
+
+        f = self.soln.get_var("f")
+        v = self.soln.get_var("v")
+
+        v.v()[:, :] = self._inverse(self._forward(f.v())*self._scale)
+
+        self.soln.fill_BC("v")
+
+        self.num_cycles = 1
+
+        if self.verbose:
+            print("FFT solve done")
@@ -21,6 +21,7 @@ import matplotlib.pyplot as plt
 
 import multigrid.edge_coeffs as ec
 import multigrid.MG as MG
+import multigrid.mg_kernels as mg_kernels
 
 np.set_printoptions(precision=3, linewidth=128)
 
@@ -47,6 +48,8 @@ class GeneralMG2d(MG.CellCenterMG2d):
                  xl_BC=None, xr_BC=None,
                  yl_BC=None, yr_BC=None,
                  nsmooth=10, nsmooth_bottom=50,
+                 cycle_type="V", fmg=0,
+                 bottom_solver="smooth", bottom_size=2,
                  verbose=0,
                  coeffs=None,
                  true_function=None, vis=0, vis_title=""):
@@ -68,6 +71,9 @@ class GeneralMG2d(MG.CellCenterMG2d):
                                    yl_BC=yl_BC, yr_BC=yr_BC,
                                    alpha=0.0, beta=0.0,
                                    nsmooth=nsmooth, nsmooth_bottom=nsmooth_bottom,
+                                   cycle_type=cycle_type, fmg=fmg,
+                                   bottom_solver=bottom_solver,
+                                   bottom_size=bottom_size,
                                    verbose=verbose,
                                    aux_field=["alpha", "beta", "gamma_x", "gamma_y"],
                                    aux_bc=[coeffs.BCs["alpha"], coeffs.BCs["beta"],
@@ -91,7 +97,7 @@ class GeneralMG2d(MG.CellCenterMG2d):
                 c_patch = self.grids[n]
 
                 coeffs_c = c_patch.get_var(c)
-                coeffs_c.v()[:, :] = f_patch.restrict(c).v()
+                coeffs_c.v()[:, :] = f_patch.restrict(c, N=self.ratios[n+1]).v()
 
                 self.grids[n].fill_BC(c)
                 n -= 1
@@ -102,7 +108,7 @@ class GeneralMG2d(MG.CellCenterMG2d):
 
         n = self.nlevels-2
         while n >= 0:
-            self.beta_edge.insert(0, self.beta_edge[0].restrict())
+            self.beta_edge.insert(0, self.beta_edge[0].restrict(N=self.ratios[n+1]))
             n -= 1
 
     def smooth(self, level, nsmooth):
@@ -129,8 +135,6 @@ class GeneralMG2d(MG.CellCenterMG2d):
         dx = myg.dx
         dy = myg.dy
 
-        self.grids[level].fill_BC("v")
-
         alpha = self.grids[level].get_var("alpha")
         gamma_x = 0.5*self.grids[level].get_var("gamma_x")/dx
         gamma_y = 0.5*self.grids[level].get_var("gamma_y")/dy
@@ -140,46 +144,28 @@ class GeneralMG2d(MG.CellCenterMG2d):
         beta_x = self.beta_edge[level].x
         beta_y = self.beta_edge[level].y
 
-        # do red-black G-S
-        for i in range(nsmooth):
-
-            # do the red black updating in four decoupled groups
-            #
-            #
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #        |   4   |   3   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #   jlo  |   1   |   2   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |  ilo  |       |
-            #
-            # groups 1 and 3 are done together, then we need to
-            # fill ghost cells, and then groups 2 and 4
-
-            for n, (ix, iy) in enumerate([(0, 0), (1, 1), (1, 0), (0, 1)]):
-
-                denom = (
-                    alpha.ip_jp(ix, iy, s=2) -
-                    beta_x.ip_jp(1+ix, iy, s=2) - beta_x.ip_jp(ix, iy, s=2) -
-                    beta_y.ip_jp(ix, 1+iy, s=2) - beta_y.ip_jp(ix, iy, s=2))
-
-                v.ip_jp(ix, iy, s=2)[:, :] = (f.ip_jp(ix, iy, s=2) -
-                    # (beta_{i+1/2,j} + gamma^x_{i,j}) phi_{i+1,j}
-                    (beta_x.ip_jp(1+ix, iy, s=2) + gamma_x.ip_jp(ix, iy, s=2)) * v.ip_jp(1+ix, iy, s=2) -
-                    # (beta_{i-1/2,j} - gamma^x_{i,j}) phi_{i-1,j}
-                    (beta_x.ip_jp(ix, iy, s=2) - gamma_x.ip_jp(ix, iy, s=2)) * v.ip_jp(-1+ix, iy, s=2) -
-                    # (beta_{i,j+1/2} + gamma^y_{i,j}) phi_{i,j+1}
-                    (beta_y.ip_jp(ix, 1+iy, s=2) + gamma_y.ip_jp(ix, iy, s=2)) * v.ip_jp(ix, 1+iy, s=2) -
-                    # (beta_{i,j-1/2} - gamma^y_{i,j}) phi_{i,j-1}
-                    (beta_y.ip_jp(ix, iy, s=2) - gamma_y.ip_jp(ix, iy, s=2)) * v.ip_jp(ix, -1+iy, s=2)) / denom
-
-                if n == 1 or n == 3:
-                    self.grids[level].fill_BC("v")
+        # with visualization on, we smooth one iteration at a time so
+        # we can plot after each
+        nsweeps = 1 if self.vis == 1 else max(nsmooth, 1)
+
+        # the number of sweeps in each call -- the last call does any
+        # remainder
+        sweeps = [nsweeps]*(nsmooth // nsweeps)
+        if nsmooth % nsweeps > 0:
+            sweeps.append(nsmooth % nsweeps)
+
+        # the ghost cells are filled even if we do no smoothing
+        mg_kernels.fill_ghost(v, myg.ng, myg.dx, myg.dy, *self.ghost_bcs[level])
+
+        # do red-black G-S -- each call does n complete sweeps,
+        # including the ghost cell fills between the red and black
+        # updates
+        for n in sweeps:
+
+            mg_kernels.smooth_general(v, f, alpha, beta_x, beta_y,
+                                      gamma_x, gamma_y,
+                                      myg.ng, dx, dy, n,
+                                      *self.ghost_bcs[level])
 
             if self.vis == 1:
                 plt.clf()
@@ -224,20 +210,28 @@ class GeneralMG2d(MG.CellCenterMG2d):
 
         # compute the residual
         # r = f - L_eta phi
-        L_eta_phi = (
-            # alpha_{i,j} phi_{i,j}
-            alpha.v()*v.v() +
-            # beta_{i+1/2,j} (phi_{i+1,j} - phi_{i,j})
-            beta_x.ip(1)*(v.ip(1) - v.v()) - \
-            # beta_{i-1/2,j} (phi_{i,j} - phi_{i-1,j})
-            beta_x.v()*(v.v() - v.ip(-1)) + \
-            # beta_{i,j+1/2} (phi_{i,j+1} - phi_{i,j})
-            beta_y.jp(1)*(v.jp(1) - v.v()) - \
-            # beta_{i,j-1/2} (phi_{i,j} - phi_{i,j-1})
-            beta_y.v()*(v.v() - v.jp(-1)) + \
-            # gamma^x_{i,j} (phi_{i+1,j} - phi_{i-1,j})
-            gamma_x.v()*(v.ip(1) - v.ip(-1)) + \
-            # gamma^y_{i,j} (phi_{i,j+1} - phi_{i,j-1})
-            gamma_y.v()*(v.jp(1) - v.jp(-1)))
-
-        r.v()[:, :] = f.v() - L_eta_phi
+        mg_kernels.residual_general(v, f, r, alpha, beta_x, beta_y,
+                                    gamma_x, gamma_y, myg.ng)
+
+    def _batch_coeffs(self, level):
+        """the coefficients at a given level, as used by the kernels"""
+
+        myg = self.grids[level].grid
+
+        alpha = self.grids[level].get_var("alpha")
+        gamma_x = 0.5*self.grids[level].get_var("gamma_x")/myg.dx
+        gamma_y = 0.5*self.grids[level].get_var("gamma_y")/myg.dy
+
+        return alpha, self.beta_edge[level].x, self.beta_edge[level].y, gamma_x, gamma_y
+
+    def _smooth_batch(self, level, v, f, nsmooth):
+        """smooth a batch of solutions at a given level"""
+        myg = self.grids[level].grid
+        mg_kernels.smooth_general_batch(v, f, *self._batch_coeffs(level),
+                                        myg.ng, myg.dx, myg.dy, nsmooth,
+                                        *self.ghost_bcs[level])
+
+    def _residual_batch(self, level, v, f, r):
+        """compute the residual of a batch of solutions at a given level"""
+        mg_kernels.residual_general_batch(v, f, r, *self._batch_coeffs(level),
+                                          self.grids[level].grid.ng)
@@ -0,0 +1,243 @@
+r"""
+Krylov solvers preconditioned by multigrid.  These work on top of any
+of the multigrid solvers (:class:`CellCenterMG2d
+<multigrid.MG.CellCenterMG2d>`, :class:`VarCoeffCCMG2d
+<multigrid.variable_coeff_MG.VarCoeffCCMG2d>`, or :class:`GeneralMG2d
+<multigrid.general_MG.GeneralMG2d>`), using the multigrid object for
+the operator (the same stencil as its residual) and a single multigrid
+cycle as the preconditioner.
+
+* :func:`pcg` is preconditioned conjugate gradient, for the symmetric
+  operators (the constant- and variable-coefficient solvers)
+
+* :func:`bicgstab` is preconditioned BiCGStab, for non-symmetric
+  operators (the general solver with :math:`\gamma \ne 0`)
+
+Stationary multigrid cycles can converge slowly when the coefficients
+have a large contrast.  The Krylov iteration takes care of the few
+modes that the cycle handles badly, so these usually converge in fewer
+cycles.
+
+The usage is the same as for the multigrid solver, except for the
+solve::
+
+   a = multigrid.variable_coeff_MG.VarCoeffCCMG2d(nx, ny, ...)
+   a.init_zeros()
+   a.init_RHS(f)
+   multigrid.krylov.pcg(a, rtol=1.e-11)
+   v = a.get_solution()
+
+As with the multigrid solve, rtol is on the residual norm / source
+norm.  After the solve, the multigrid object's num_cycles is the number
+of multigrid cycles used, and residual_error is the final residual
+error.
+
+"""
+
+from __future__ import print_function
+
+import numpy as np
+
+from util import msg
+
+
+def _dot(a, b):
+    """the inner product of the valid data of a and b"""
+    return np.sum(a.v()*b.v())
+
+
+def _setup(mg):
+    """return the finest level of the multigrid object, copies of the
+    initial guess and RHS, and the initial residual"""
+
+    if not mg.initialized_rhs:
+        msg.fail("ERROR: RHS not initialized")
+
+    fp = mg.grids[mg.nlevels-1]
+    myg = mg.soln_grid
+
+    x = myg.scratch_array()
+    x.v()[:, :] = fp.get_var("v").v()
+
+    b = myg.scratch_array()
+    b.v()[:, :] = fp.get_var("f").v()
+
+    # the initial residual, using the BCs of the solution
+    r = myg.scratch_array()
+    mg.apply_operator(x, r, homogeneous=False)
+    r.v()[:, :] = b.v() - r.v()
+
+    return fp, x, b, r
+
+
+def _error(mg, r):
+    """the residual error, relative to the source norm"""
+    if mg.source_norm != 0.0:
+        return r.norm()/mg.source_norm
+    return r.norm()
+
+
+def _finish(mg, fp, x, b, residual_error, num_cycles):
+    """store the solution and restore the RHS"""
+
+    fp.get_var("v").v()[:, :] = x.v()
+    fp.get_var("f").v()[:, :] = b.v()
+    fp.fill_BC("v")
+
+    mg.num_cycles = num_cycles
+    mg.residual_error = residual_error
+
+
+def pcg(mg, rtol=1.e-11):
+    """
+    Solve the elliptic problem set up in the multigrid object mg with
+    conjugate gradient, preconditioned by one multigrid cycle.  The
+    initial guess is the current solution in mg.  We use the flexible
+    (Polak-Ribiere) form of the update, since a multigrid cycle is not
+    exactly a symmetric preconditioner.
+
+    Parameters
+    ----------
+    mg : CellCenterMG2d object
+        The multigrid object, with the RHS initialized.  The operator
+        must be symmetric.
+    rtol : float, optional
+        The relative tolerance (residual norm / source norm) to
+        solve to
+
+    Returns
+    -------
+    out : int
+        The number of iterations taken
+
+    """
+
+    fp, x, b, r = _setup(mg)
+    myg = mg.soln_grid
+
+    residual_error = _error(mg, r)
+
+    z = myg.scratch_array()
+    q = myg.scratch_array()
+    r_old = myg.scratch_array()
+
+    mg.precondition(r, z)
+    num_cycles = 1
+
+    p = z.copy()
+    rz = _dot(r, z)
+
+    it = 0
+    while residual_error > rtol and it < mg.max_cycles:
+
+        mg.apply_operator(p, q)
+        a = rz/_dot(p, q)
+
+        x.v()[:, :] += a*p.v()
+
+        r_old.v()[:, :] = r.v()
+        r.v()[:, :] -= a*q.v()
+
+        it += 1
+        residual_error = _error(mg, r)
+
+        if mg.verbose:
+            print("PCG iteration {}: residual err = {}".format(it, residual_error))
+
+        if residual_error <= rtol:
+            break
+
+        mg.precondition(r, z)
+        num_cycles += 1
+
+        beta = (_dot(z, r) - _dot(z, r_old))/rz
+        rz = _dot(r, z)
+
+        p.v()[:, :] = z.v() + beta*p.v()
+
+    _finish(mg, fp, x, b, residual_error, num_cycles)
+
+    return it
+
+
+def bicgstab(mg, rtol=1.e-11):
+    """
+    Solve the elliptic problem set up in the multigrid object mg with
+    BiCGStab, right-preconditioned by one multigrid cycle.  The
+    initial guess is the current solution in mg.  Each iteration uses
+    two multigrid cycles.
+
+    Parameters
+    ----------
+    mg : CellCenterMG2d object
+        The multigrid object, with the RHS initialized.
+    rtol : float, optional
+        The relative tolerance (residual norm / source norm) to
+        solve to
+
+    Returns
+    -------
+    out : int
+        The number of iterations taken
+
+    """
+
+    fp, x, b, r = _setup(mg)
+    myg = mg.soln_grid
+
+    residual_error = _error(mg, r)
+
+    r_hat = r.copy()
+
+    p = myg.scratch_array()
+    v = myg.scratch_array()
+    p_hat = myg.scratch_array()
+    s_hat = myg.scratch_array()
+    t = myg.scratch_array()
+
+    rho_old = alpha = omega = 1.0
+    num_cycles = 0
+
+    it = 0
+    while residual_error > rtol and it < mg.max_cycles:
+
+        rho = _dot(r_hat, r)
+        if rho == 0.0:
+            msg.fail("ERROR: BiCGStab breakdown")
+
+        beta = (rho/rho_old)*(alpha/omega)
+        p.v()[:, :] = r.v() + beta*(p.v() - omega*v.v())
+
+        mg.precondition(p, p_hat)
+        mg.apply_operator(p_hat, v)
+
+        alpha = rho/_dot(r_hat, v)
+
+        # r now holds s = r - alpha v
+        r.v()[:, :] -= alpha*v.v()
+        x.v()[:, :] += alpha*p_hat.v()
+
+        it += 1
+        num_cycles += 1
+        residual_error = _error(mg, r)
+
+        if residual_error > rtol:
+            mg.precondition(r, s_hat)
+            mg.apply_operator(s_hat, t)
+            num_cycles += 1
+
+            omega = _dot(t, r)/_dot(t, t)
+
+            x.v()[:, :] += omega*s_hat.v()
+            r.v()[:, :] -= omega*t.v()
+
+            residual_error = _error(mg, r)
+
+        rho_old = rho
+
+        if mg.verbose:
+            print("BiCGStab iteration {}: residual err = {}".format(it, residual_error))
+
+    _finish(mg, fp, x, b, residual_error, num_cycles)
+
+    return it
@@ -0,0 +1,553 @@
+"""
+Compiled kernels for the multigrid solvers: red-black Gauss-Seidel
+smoothing and residual evaluation for the constant-coefficient,
+variable-coefficient, and general elliptic equations, together with
+the ghost cell fill of the solution that is needed between the two
+halves of each red-black sweep.
+
+The smoothers update the zones in the same four decoupled groups as a
+strided-slice implementation would::
+
+            |       |       |
+          --+-------+-------+--
+            |       |       |
+            |   4   |   3   |
+            |       |       |
+          --+-------+-------+--
+            |       |       |
+       jlo  |   1   |   2   |
+            |       |       |
+          --+-------+-------+--
+            |  ilo  |       |
+
+groups 1 and 3 are done first, then the ghost cells are filled, and
+then groups 2 and 4 (followed by another ghost cell fill), and each
+zone is updated with the same sequence of floating point operations,
+so the results are identical.
+
+Each kernel also has a batched version (e.g. smooth_cc_batch) that
+works on a stack of K solutions and righthand sides, with the batch as
+the leading axis, for solving with several righthand sides at once.
+The same operator (coefficients and BCs) is used for all of them.
+
+"""
+
+import numpy as np
+from numba import njit
+
+# boundary condition codes for the ghost cell fill.  The homogeneous
+# Neumann and Dirichlet BCs are the same as outflow and reflect-odd
+# respectively; the inhomogeneous versions use the boundary values
+BC_OUTFLOW = 0
+BC_REFLECT_EVEN = 1
+BC_REFLECT_ODD = 2
+BC_PERIODIC = 3
+BC_NEUMANN_VALUE = 4
+BC_DIRICHLET_VALUE = 5
+
+# the order that the four groups of zones are updated in, as the
+# offset (ix, iy) from (ilo, jlo)
+_GROUPS = ((0, 0), (1, 1), (1, 0), (0, 1))
+
+
+def ghost_bcs(bc):
+    """
+    Translate a BC object into the form used by the compiled ghost cell
+    fill.
+
+    Parameters
+    ----------
+    bc : BC object
+        The boundary conditions for the multigrid solution
+
+    Returns
+    -------
+    out : tuple
+        An integer array with the BC code on each of the four edges
+        (-x, +x, -y, +y) and a tuple of the four arrays of boundary
+        values (empty if the BC is homogeneous)
+
+    """
+
+    codes = np.zeros(4, dtype=np.int64)
+    values = []
+
+    for n, (btype, value) in enumerate([(bc.xlb, bc.xl_value),
+                                        (bc.xrb, bc.xr_value),
+                                        (bc.ylb, bc.yl_value),
+                                        (bc.yrb, bc.yr_value)]):
+
+        if btype in ["outflow", "neumann"]:
+            codes[n] = BC_OUTFLOW if value is None else BC_NEUMANN_VALUE
+        elif btype == "reflect-even":
+            codes[n] = BC_REFLECT_EVEN
+        elif btype in ["reflect-odd", "dirichlet"]:
+            codes[n] = BC_REFLECT_ODD if value is None else BC_DIRICHLET_VALUE
+        elif btype == "periodic":
+            codes[n] = BC_PERIODIC
+        else:
+            raise ValueError("BC type {} not supported by the multigrid solver".format(btype))
+
+        if codes[n] in [BC_NEUMANN_VALUE, BC_DIRICHLET_VALUE]:
+            values.append(np.ascontiguousarray(value, dtype=np.float64))
+        else:
+            values.append(np.zeros(0, dtype=np.float64))
+
+    return codes, tuple(values)
+
+
+@njit(cache=True)
+def fill_ghost(v, ng, dx, dy, bc_codes, bc_values):
+    """
+    Fill the ghost cells of v.  This matches ArrayIndexer.fill_ghost:
+    the x-boundaries are filled first (for all j), followed by the
+    y-boundaries (for all i).
+
+    Parameters
+    ----------
+    v : ndarray
+        The solution, including ghost cells
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        The cell spacings
+    bc_codes : ndarray
+        The BC code on each edge (-x, +x, -y, +y)
+    bc_values : tuple
+        The boundary values on each edge, for the inhomogeneous BCs
+
+    """
+
+    qx, qy = v.shape
+
+    ilo = ng
+    ihi = qx - ng - 1
+    jlo = ng
+    jhi = qy - ng - 1
+
+    # -x boundary
+    bc = bc_codes[0]
+    for j in range(qy):
+        if bc == BC_OUTFLOW:
+            for i in range(ilo):
+                v[i, j] = v[ilo, j]
+        elif bc == BC_NEUMANN_VALUE:
+            v[ilo-1, j] = v[ilo, j] - dx*bc_values[0][j]
+        elif bc == BC_REFLECT_EVEN:
+            for i in range(ilo):
+                v[i, j] = v[2*ng-i-1, j]
+        elif bc == BC_REFLECT_ODD:
+            for i in range(ilo):
+                v[i, j] = -v[2*ng-i-1, j]
+        elif bc == BC_DIRICHLET_VALUE:
+            v[ilo-1, j] = 2*bc_values[0][j] - v[ilo, j]
+        elif bc == BC_PERIODIC:
+            for i in range(ilo):
+                v[i, j] = v[ihi-ng+i+1, j]
+
+    # +x boundary
+    bc = bc_codes[1]
+    for j in range(qy):
+        if bc == BC_OUTFLOW:
+            for i in range(ihi+1, qx):
+                v[i, j] = v[ihi, j]
+        elif bc == BC_NEUMANN_VALUE:
+            v[ihi+1, j] = v[ihi, j] + dx*bc_values[1][j]
+        elif bc == BC_REFLECT_EVEN:
+            for i in range(ng):
+                v[ihi+1+i, j] = v[ihi-i, j]
+        elif bc == BC_REFLECT_ODD:
+            for i in range(ng):
+                v[ihi+1+i, j] = -v[ihi-i, j]
+        elif bc == BC_DIRICHLET_VALUE:
+            v[ihi+1, j] = 2*bc_values[1][j] - v[ihi, j]
+        elif bc == BC_PERIODIC:
+            for i in range(ihi+1, qx):
+                v[i, j] = v[i-ihi-1+ng, j]
+
+    # -y boundary
+    bc = bc_codes[2]
+    for i in range(qx):
+        if bc == BC_OUTFLOW:
+            for j in range(jlo):
+                v[i, j] = v[i, jlo]
+        elif bc == BC_NEUMANN_VALUE:
+            v[i, jlo-1] = v[i, jlo] - dy*bc_values[2][i]
+        elif bc == BC_REFLECT_EVEN:
+            for j in range(jlo):
+                v[i, j] = v[i, 2*ng-j-1]
+        elif bc == BC_REFLECT_ODD:
+            for j in range(jlo):
+                v[i, j] = -v[i, 2*ng-j-1]
+        elif bc == BC_DIRICHLET_VALUE:
+            v[i, jlo-1] = 2*bc_values[2][i] - v[i, jlo]
+        elif bc == BC_PERIODIC:
+            for j in range(jlo):
+                v[i, j] = v[i, jhi-ng+j+1]
+
+    # +y boundary
+    bc = bc_codes[3]
+    for i in range(qx):
+        if bc == BC_OUTFLOW:
+            for j in range(jhi+1, qy):
+                v[i, j] = v[i, jhi]
+        elif bc == BC_NEUMANN_VALUE:
+            v[i, jhi+1] = v[i, jhi] + dy*bc_values[3][i]
+        elif bc == BC_REFLECT_EVEN:
+            for j in range(ng):
+                v[i, jhi+1+j] = v[i, jhi-j]
+        elif bc == BC_REFLECT_ODD:
+            for j in range(ng):
+                v[i, jhi+1+j] = -v[i, jhi-j]
+        elif bc == BC_DIRICHLET_VALUE:
+            v[i, jhi+1] = 2*bc_values[3][i] - v[i, jhi]
+        elif bc == BC_PERIODIC:
+            for j in range(jhi+1, qy):
+                v[i, j] = v[i, j-jhi-1+ng]
+
+
+@njit(cache=True)
+def smooth_cc(v, f, alpha, beta, ng, dx, dy, nsmooth, bc_codes, bc_values):
+    r"""
+    Red-black Gauss-Seidel smoothing for the constant-coefficient
+    Helmholtz equation :math:`(\alpha - \beta L) \phi = f`.
+
+    Parameters
+    ----------
+    v : ndarray
+        The solution, updated in place
+    f : ndarray
+        The right hand side
+    alpha, beta : float
+        The coefficients of the Helmholtz equation
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        The cell spacings
+    nsmooth : int
+        The number of red-black sweeps
+    bc_codes, bc_values : ndarray, tuple
+        The boundary conditions on v, from ghost_bcs()
+
+    """
+
+    qx, qy = v.shape
+
+    ilo = ng
+    ihi = qx - ng - 1
+    jlo = ng
+    jhi = qy - ng - 1
+
+    xcoeff = beta/dx**2
+    ycoeff = beta/dy**2
+
+    denom = alpha + 2.0*xcoeff + 2.0*ycoeff
+
+    fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+    for _ in range(nsmooth):
+        for n in range(4):
+            ix, iy = _GROUPS[n]
+
+            for i in range(ilo+ix, ihi+1+ix, 2):
+                for j in range(jlo+iy, jhi+1+iy, 2):
+                    v[i, j] = (f[i, j] +
+                               xcoeff*(v[i+1, j] + v[i-1, j]) +
+                               ycoeff*(v[i, j+1] + v[i, j-1])) / denom
+
+            if n == 1 or n == 3:
+                fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_cc(v, f, r, alpha, beta, ng, dx, dy):
+    r"""
+    Compute the residual, :math:`r = f - (\alpha - \beta L) \phi`, for
+    the constant-coefficient Helmholtz equation, in the interior zones.
+
+    Parameters
+    ----------
+    v, f, r : ndarray
+        The solution, right hand side, and residual
+    alpha, beta : float
+        The coefficients of the Helmholtz equation
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        The cell spacings
+
+    """
+
+    qx, qy = v.shape
+
+    dx2 = dx**2
+    dy2 = dy**2
+
+    for i in range(ng, qx-ng):
+        for j in range(ng, qy-ng):
+            r[i, j] = f[i, j] - alpha*v[i, j] + \
+                beta*((v[i-1, j] + v[i+1, j] - 2*v[i, j])/dx2 +
+                      (v[i, j-1] + v[i, j+1] - 2*v[i, j])/dy2)
+
+
+@njit(cache=True)
+def smooth_vc(v, f, eta_x, eta_y, ng, dx, dy, nsmooth, bc_codes, bc_values):
+    r"""
+    Red-black Gauss-Seidel smoothing for the variable-coefficient
+    Poisson equation :math:`\nabla \cdot (\eta \nabla \phi) = f`.
+
+    Parameters
+    ----------
+    v : ndarray
+        The solution, updated in place
+    f : ndarray
+        The right hand side
+    eta_x, eta_y : ndarray
+        The coefficients on the x- and y-edges, already scaled by
+        1/dx**2 and 1/dy**2
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        The cell spacings
+    nsmooth : int
+        The number of red-black sweeps
+    bc_codes, bc_values : ndarray, tuple
+        The boundary conditions on v, from ghost_bcs()
+
+    """
+
+    qx, qy = v.shape
+
+    ilo = ng
+    ihi = qx - ng - 1
+    jlo = ng
+    jhi = qy - ng - 1
+
+    fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+    for _ in range(nsmooth):
+        for n in range(4):
+            ix, iy = _GROUPS[n]
+
+            for i in range(ilo+ix, ihi+1+ix, 2):
+                for j in range(jlo+iy, jhi+1+iy, 2):
+                    denom = (eta_x[i+1, j] + eta_x[i, j] +
+                             eta_y[i, j+1] + eta_y[i, j])
+
+                    v[i, j] = (-f[i, j] +
+                               eta_x[i+1, j]*v[i+1, j] +
+                               eta_x[i, j]*v[i-1, j] +
+                               eta_y[i, j+1]*v[i, j+1] +
+                               eta_y[i, j]*v[i, j-1]) / denom
+
+            if n == 1 or n == 3:
+                fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_vc(v, f, r, eta_x, eta_y, ng):
+    r"""
+    Compute the residual, :math:`r = f - \nabla \cdot (\eta \nabla \phi)`,
+    for the variable-coefficient Poisson equation, in the interior zones.
+
+    Parameters
+    ----------
+    v, f, r : ndarray
+        The solution, right hand side, and residual
+    eta_x, eta_y : ndarray
+        The coefficients on the x- and y-edges, already scaled by
+        1/dx**2 and 1/dy**2
+    ng : int
+        The number of ghost cells
+
+    """
+
+    qx, qy = v.shape
+
+    for i in range(ng, qx-ng):
+        for j in range(ng, qy-ng):
+            L_eta_phi = (eta_x[i+1, j]*(v[i+1, j] - v[i, j]) -
+                         eta_x[i, j]*(v[i, j] - v[i-1, j]) +
+                         eta_y[i, j+1]*(v[i, j+1] - v[i, j]) -
+                         eta_y[i, j]*(v[i, j] - v[i, j-1]))
+
+            r[i, j] = f[i, j] - L_eta_phi
+
+
+@njit(cache=True)
+def smooth_general(v, f, alpha, beta_x, beta_y, gamma_x, gamma_y,
+                   ng, dx, dy, nsmooth, bc_codes, bc_values):
+    r"""
+    Red-black Gauss-Seidel smoothing for the general elliptic equation
+    :math:`\alpha \phi + \nabla \cdot (\beta \nabla \phi) + \gamma \cdot \nabla \phi = f`.
+
+    Parameters
+    ----------
+    v : ndarray
+        The solution, updated in place
+    f : ndarray
+        The right hand side
+    alpha : ndarray
+        The cell-centered alpha coefficient
+    beta_x, beta_y : ndarray
+        The beta coefficient on the x- and y-edges, already scaled by
+        1/dx**2 and 1/dy**2
+    gamma_x, gamma_y : ndarray
+        The cell-centered gamma coefficients, already scaled by
+        1/(2 dx) and 1/(2 dy)
+    ng : int
+        The number of ghost cells
+    dx, dy : float
+        The cell spacings
+    nsmooth : int
+        The number of red-black sweeps
+    bc_codes, bc_values : ndarray, tuple
+        The boundary conditions on v, from ghost_bcs()
+
+    """
+
+    qx, qy = v.shape
+
+    ilo = ng
+    ihi = qx - ng - 1
+    jlo = ng
+    jhi = qy - ng - 1
+
+    fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+    for _ in range(nsmooth):
+        for n in range(4):
+            ix, iy = _GROUPS[n]
+
+            for i in range(ilo+ix, ihi+1+ix, 2):
+                for j in range(jlo+iy, jhi+1+iy, 2):
+                    denom = (alpha[i, j] -
+                             beta_x[i+1, j] - beta_x[i, j] -
+                             beta_y[i, j+1] - beta_y[i, j])
+
+                    v[i, j] = (f[i, j] -
+                               (beta_x[i+1, j] + gamma_x[i, j])*v[i+1, j] -
+                               (beta_x[i, j] - gamma_x[i, j])*v[i-1, j] -
+                               (beta_y[i, j+1] + gamma_y[i, j])*v[i, j+1] -
+                               (beta_y[i, j] - gamma_y[i, j])*v[i, j-1]) / denom
+
+            if n == 1 or n == 3:
+                fill_ghost(v, ng, dx, dy, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_general(v, f, r, alpha, beta_x, beta_y, gamma_x, gamma_y, ng):
+    r"""
+    Compute the residual, :math:`r = f - (\alpha \phi + \nabla \cdot (\beta \nabla \phi) + \gamma \cdot \nabla \phi)`,
+    for the general elliptic equation, in the interior zones.
+
+    Parameters
+    ----------
+    v, f, r : ndarray
+        The solution, right hand side, and residual
+    alpha : ndarray
+        The cell-centered alpha coefficient
+    beta_x, beta_y : ndarray
+        The beta coefficient on the x- and y-edges, already scaled by
+        1/dx**2 and 1/dy**2
+    gamma_x, gamma_y : ndarray
+        The cell-centered gamma coefficients, already scaled by
+        1/(2 dx) and 1/(2 dy)
+    ng : int
+        The number of ghost cells
+
+    """
+
+    qx, qy = v.shape
+
+    for i in range(ng, qx-ng):
+        for j in range(ng, qy-ng):
+            L_eta_phi = (alpha[i, j]*v[i, j] +
+                         beta_x[i+1, j]*(v[i+1, j] - v[i, j]) -
+                         beta_x[i, j]*(v[i, j] - v[i-1, j]) +
+                         beta_y[i, j+1]*(v[i, j+1] - v[i, j]) -
+                         beta_y[i, j]*(v[i, j] - v[i, j-1]) +
+                         gamma_x[i, j]*(v[i+1, j] - v[i-1, j]) +
+                         gamma_y[i, j]*(v[i, j+1] - v[i, j-1]))
+
+            r[i, j] = f[i, j] - L_eta_phi
+
+
+@njit(cache=True)
+def fill_ghost_batch(v, ng, dx, dy, bc_codes, bc_values):
+    """
+    Fill the ghost cells of each of a batch of solutions, v[k], as
+    in fill_ghost().
+    """
+
+    for k in range(v.shape[0]):
+        fill_ghost(v[k], ng, dx, dy, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def smooth_cc_batch(v, f, alpha, beta, ng, dx, dy, nsmooth, bc_codes, bc_values):
+    """
+    Smooth each of a batch of solutions, v[k], with righthand side
+    f[k], as in smooth_cc().
+    """
+
+    for k in range(v.shape[0]):
+        smooth_cc(v[k], f[k], alpha, beta, ng, dx, dy, nsmooth, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_cc_batch(v, f, r, alpha, beta, ng, dx, dy):
+    """
+    Compute the residual for each of a batch of solutions, as in
+    residual_cc().
+    """
+
+    for k in range(v.shape[0]):
+        residual_cc(v[k], f[k], r[k], alpha, beta, ng, dx, dy)
+
+
+@njit(cache=True)
+def smooth_vc_batch(v, f, eta_x, eta_y, ng, dx, dy, nsmooth, bc_codes, bc_values):
+    """
+    Smooth each of a batch of solutions, v[k], with righthand side
+    f[k], as in smooth_vc().
+    """
+
+    for k in range(v.shape[0]):
+        smooth_vc(v[k], f[k], eta_x, eta_y, ng, dx, dy, nsmooth, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_vc_batch(v, f, r, eta_x, eta_y, ng):
+    """
+    Compute the residual for each of a batch of solutions, as in
+    residual_vc().
+    """
+
+    for k in range(v.shape[0]):
+        residual_vc(v[k], f[k], r[k], eta_x, eta_y, ng)
+
+
+@njit(cache=True)
+def smooth_general_batch(v, f, alpha, beta_x, beta_y, gamma_x, gamma_y,
+                         ng, dx, dy, nsmooth, bc_codes, bc_values):
+    """
+    Smooth each of a batch of solutions, v[k], with righthand side
+    f[k], as in smooth_general().
+    """
+
+    for k in range(v.shape[0]):
+        smooth_general(v[k], f[k], alpha, beta_x, beta_y, gamma_x, gamma_y,
+                       ng, dx, dy, nsmooth, bc_codes, bc_values)
+
+
+@njit(cache=True)
+def residual_general_batch(v, f, r, alpha, beta_x, beta_y, gamma_x, gamma_y, ng):
+    """
+    Compute the residual for each of a batch of solutions, as in
+    residual_general().
+    """
+
+    for k in range(v.shape[0]):
+        residual_general(v[k], f[k], r[k], alpha, beta_x, beta_y,
+                         gamma_x, gamma_y, ng)
@@ -1,10 +1,16 @@
 # unit tests
 
 import multigrid.edge_coeffs as edge_coeffs
+import mesh.boundary as bnd
 import mesh.patch as patch
 import numpy as np
 from numpy.testing import assert_array_equal
 import multigrid.MG as MG
+import multigrid.fft_solver as fft_solver
+import multigrid.krylov as krylov
+import multigrid.mg_kernels as mg_kernels
+import multigrid.variable_coeff_MG as vcMG
+import pytest
 
 
 # utilities
@@ -55,3 +61,339 @@ def test_mg_gradient():
 
     assert_array_equal(gy[gx.g.ic, :],
                        np.array([0., 36., 60., 36., 12., -12., -36., -60., -36., 0.]))
+
+
+# the compiled ghost cell fill should agree with fill_BC
+@pytest.mark.parametrize("xlb, xrb, ylb, yrb, inhomogeneous",
+                         [("dirichlet", "dirichlet", "dirichlet", "dirichlet", False),
+                          ("neumann", "neumann", "neumann", "neumann", False),
+                          ("periodic", "periodic", "periodic", "periodic", False),
+                          ("reflect-even", "outflow", "reflect-odd", "outflow", False),
+                          ("dirichlet", "neumann", "neumann", "dirichlet", True)])
+def test_fill_ghost(xlb, xrb, ylb, yrb, inhomogeneous):
+    g = patch.Grid2d(6, 8, ng=1)
+
+    func = None
+    if inhomogeneous:
+        func = np.cos
+
+    bc = bnd.BC(xlb=xlb, xrb=xrb, ylb=ylb, yrb=yrb,
+                xl_func=func, xr_func=func, yl_func=func, yr_func=func, grid=g)
+
+    d = patch.CellCenterData2d(g)
+    d.register_var("v", bc)
+    d.create()
+
+    v = d.get_var("v")
+    v.v()[:, :] = np.random.rand(g.nx, g.ny)
+
+    a = v.copy()
+    mg_kernels.fill_ghost(a, g.ng, g.dx, g.dy, *mg_kernels.ghost_bcs(bc))
+
+    d.fill_BC("v")
+    assert_array_equal(a, v)
+
+
+# a compiled red-black sweep should give the same answer as the
+# strided-slice update.  With no smoothing, the ghost cells are still
+# filled
+@pytest.mark.parametrize("nsmooth", [0, 1, 2])
+def test_smooth_cc(nsmooth):
+
+    def setup_mg():
+        a = MG.CellCenterMG2d(16, 16, alpha=1.0, beta=0.25,
+                              xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                              yl_BC_type="periodic", yr_BC_type="periodic")
+
+        a.init_RHS(np.sin(2.0*np.pi*a.x2d)*np.cos(2.0*np.pi*a.y2d))
+
+        s = a.soln_grid.scratch_array()
+        s.v()[:, :] = np.fromfunction(lambda i, j: np.cos(i + 2*j), (a.nx, a.ny))
+        a.init_solution(s)
+
+        return a
+
+    a = setup_mg()
+    level = a.nlevels-1
+    a.smooth(level, nsmooth)
+
+    ref = setup_mg()
+    v = ref.grids[level].get_var("v")
+    f = ref.grids[level].get_var("f")
+
+    xcoeff = ref.beta/ref.dx**2
+    ycoeff = ref.beta/ref.dy**2
+
+    ref.grids[level].fill_BC("v")
+
+    for _ in range(nsmooth):
+        for n, (ix, iy) in enumerate([(0, 0), (1, 1), (1, 0), (0, 1)]):
+            v.ip_jp(ix, iy, s=2)[:, :] = (f.ip_jp(ix, iy, s=2) +
+                xcoeff*(v.ip_jp(1+ix, iy, s=2) + v.ip_jp(-1+ix, iy, s=2)) +
+                ycoeff*(v.ip_jp(ix, 1+iy, s=2) + v.ip_jp(ix, -1+iy, s=2))) / \
+                (ref.alpha + 2.0*xcoeff + 2.0*ycoeff)
+
+            if n == 1 or n == 3:
+                ref.grids[level].fill_BC("v")
+
+    assert_array_equal(a.grids[level].get_var("v"), v)
+
+
+@pytest.mark.parametrize("xbc, ybc", [("periodic", "periodic"),
+                                      ("dirichlet", "neumann"),
+                                      ("neumann", "periodic"),
+                                      ("periodic", "dirichlet")])
+def test_fft_solver(xbc, ybc):
+
+    # a non-square grid with dx != dy
+    alpha = 1.0
+    beta = 0.1
+    a = fft_solver.FFTHelmholtz2d(16, 12, ymax=2.0,
+                                  xl_BC_type=xbc, xr_BC_type=xbc,
+                                  yl_BC_type=ybc, yr_BC_type=ybc,
+                                  alpha=alpha, beta=beta)
+
+    myg = a.soln_grid
+    f = myg.scratch_array()
+    f.v()[:, :] = np.sin(2.0*np.pi*myg.x2d[myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1]) + \
+        myg.y2d[myg.ilo:myg.ihi+1, myg.jlo:myg.jhi+1]**2
+
+    a.init_RHS(f)
+    a.solve()
+    v = a.get_solution()
+
+    # the solution (with its ghost cells) should satisfy the discrete
+    # equation
+    lap = (v.ip(1) - 2.0*v.v() + v.ip(-1))/myg.dx**2 + \
+        (v.jp(1) - 2.0*v.v() + v.jp(-1))/myg.dy**2
+
+    assert np.abs(alpha*v.v() - beta*lap - f.v()).max() < 1.e-12
+
+
+# with an FMG first cycle, the error should already be at the level of
+# the discretization error, and all the cycle types should converge to
+# the same solution
+@pytest.mark.parametrize("cycle_type", ["V", "W", "F"])
+def test_fmg(cycle_type):
+
+    # inhomogeneous Dirichlet BCs, so the coarse levels in the FMG
+    # cycle need the BCs of the solution
+    def true(x, y):
+        return np.cos(0.5*np.pi*x)*np.cos(0.5*np.pi*y)
+
+    def setup_mg(**kwargs):
+        a = MG.CellCenterMG2d(64, 64,
+                              xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                              yl_BC_type="dirichlet", yr_BC_type="dirichlet",
+                              xl_BC=lambda y: np.cos(0.5*np.pi*y),
+                              yl_BC=lambda x: np.cos(0.5*np.pi*x),
+                              **kwargs)
+        a.init_zeros()
+        a.init_RHS(-0.5*np.pi**2*true(a.x2d, a.y2d))
+        return a
+
+    ref = setup_mg()
+    ref.solve(rtol=1.e-11)
+    err_ref = (ref.get_solution() - true(ref.x2d, ref.y2d)).norm()
+
+    a = setup_mg(cycle_type=cycle_type, fmg=1)
+    a.solve(rtol=1.e30)
+    assert a.num_cycles == 1
+
+    err = (a.get_solution() - true(a.x2d, a.y2d)).norm()
+    assert err < 1.1*err_ref
+
+    a = setup_mg(cycle_type=cycle_type, fmg=1)
+    a.solve(rtol=1.e-11)
+    assert np.abs(a.get_solution().v() - ref.get_solution().v()).max() < 1.e-10
+
+
+# the Krylov solvers should converge to the same solution as plain
+# multigrid, including with inhomogeneous BCs
+@pytest.mark.parametrize("method", [krylov.pcg, krylov.bicgstab])
+def test_krylov(method):
+
+    def setup_mg():
+        a = MG.CellCenterMG2d(32, 32, alpha=1.0, beta=1.0,
+                              xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                              yl_BC_type="periodic", yr_BC_type="periodic",
+                              xl_BC=lambda y: np.sin(2.0*np.pi*y))
+        a.init_zeros()
+        a.init_RHS(np.sin(2.0*np.pi*a.x2d)*np.cos(2.0*np.pi*a.y2d))
+        return a
+
+    ref = setup_mg()
+    ref.solve(rtol=1.e-11)
+
+    a = setup_mg()
+    method(a, rtol=1.e-11)
+
+    assert a.residual_error < 1.e-11
+    assert np.abs(a.get_solution().v() - ref.get_solution().v()).max() < 1.e-10
+
+    # the RHS and BCs are restored, so a multigrid solve from here
+    # should already be converged
+    a.solve(rtol=1.e-11)
+    assert a.num_cycles == 1
+
+
+# with the direct bottom solve on the finest grid, one cycle is an exact
+# solve.  This checks the assembled matrix, including the singular
+# (periodic, no alpha) case and inhomogeneous BCs.  A coarser direct
+# bottom solve should converge to the same solution as smoothing.
+@pytest.mark.parametrize("alpha, beta, xbc, ybc", [(0.0, -1.0, "periodic", "periodic"),
+                                                   (1.0, 1.0, "neumann", "periodic"),
+                                                   (0.0, -1.0, "dirichlet", "neumann")])
+def test_direct_bottom(alpha, beta, xbc, ybc):
+
+    def setup_mg(**kwargs):
+        a = MG.CellCenterMG2d(32, 32, alpha=alpha, beta=beta,
+                              xl_BC_type=xbc, xr_BC_type=xbc,
+                              yl_BC_type=ybc, yr_BC_type=ybc,
+                              xl_BC=lambda y: np.cos(2.0*np.pi*y) if xbc == "dirichlet" else None,
+                              **kwargs)
+        a.init_zeros()
+        a.init_RHS(np.sin(2.0*np.pi*a.x2d)*np.cos(2.0*np.pi*a.y2d))
+        return a
+
+    ref = setup_mg()
+    ref.solve(rtol=1.e-11)
+
+    for size in [8, 32]:
+        a = setup_mg(bottom_solver="direct", bottom_size=size)
+        assert a.grids[0].grid.nx == size
+
+        a.solve(rtol=1.e-11)
+        if size == 32:
+            assert a.num_cycles == 1
+
+        assert np.abs(a.get_solution().v() - ref.get_solution().v()).max() < 1.e-10
+
+
+def test_hierarchy():
+
+    # square, power of 2
+    sizes, ratios = MG.CellCenterMG2d._hierarchy(16, 16, 1.0/16, 1.0/16, 2)
+    assert sizes == [(2, 2), (4, 4), (8, 8), (16, 16)]
+    assert ratios == [None, 2, 2, 2]
+
+    # rectangular, stopping when y can't be halved
+    sizes, ratios = MG.CellCenterMG2d._hierarchy(24, 12, 1.0/12, 1.0/12, 2)
+    assert sizes == [(6, 3), (12, 6), (24, 12)]
+
+    # anisotropic zones: semi-coarsen in y until the zones are square
+    sizes, ratios = MG.CellCenterMG2d._hierarchy(8, 32, 1.0/8, 1.0/32, 2)
+    assert sizes == [(2, 2), (4, 4), (8, 8), (8, 16), (8, 32)]
+    assert ratios == [None, 2, 2, (1, 2), (1, 2)]
+
+
+# rectangular, non-power of 2, and anisotropic grids should converge
+# to the exact solution of the discrete problem (a direct solve on the
+# finest grid)
+@pytest.mark.parametrize("nx, ny, ymax", [(64, 32, 0.5),
+                                          (48, 48, 1.0),
+                                          (16, 128, 1.0)])
+def test_rectangular(nx, ny, ymax):
+
+    def setup_mg(**kwargs):
+        a = MG.CellCenterMG2d(nx, ny, ymax=ymax,
+                              xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                              yl_BC_type="neumann", yr_BC_type="neumann",
+                              **kwargs)
+        a.init_zeros()
+        a.init_RHS(np.sin(2.0*np.pi*a.x2d)*np.cos(np.pi*a.y2d/ymax))
+        return a
+
+    ref = setup_mg(bottom_solver="direct", bottom_size=max(nx, ny))
+    ref.solve(rtol=1.e-11)
+    assert ref.nlevels == 1
+
+    a = setup_mg()
+    a.solve(rtol=1.e-11)
+
+    assert a.nlevels > 1
+    assert a.num_cycles < 10
+    assert np.abs(a.get_solution().v() - ref.get_solution().v()).max() < 1.e-10
+
+
+# a variable-coefficient solver reused with set_coeffs should only
+# rebuild its hierarchy when the coefficients change, and then give the
+# same answer as a new solver
+def test_set_coeffs():
+
+    g = patch.Grid2d(32, 32, ng=1)
+    d = patch.CellCenterData2d(g)
+    bc_c = bnd.BC(xlb="neumann", xrb="neumann",
+                  ylb="neumann", yrb="neumann")
+    d.register_var("c", bc_c)
+    d.create()
+
+    c = d.get_var("c")
+    c[:, :] = 1.0 + g.x2d*g.y2d
+
+    def setup_mg(coeffs):
+        a = vcMG.VarCoeffCCMG2d(32, 32,
+                                xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                                yl_BC_type="dirichlet", yr_BC_type="dirichlet",
+                                coeffs=coeffs, coeffs_bc=bc_c)
+        a.init_zeros()
+        a.init_RHS(np.sin(2.0*np.pi*a.x2d)*np.sin(2.0*np.pi*a.y2d))
+        return a
+
+    a = setup_mg(c)
+    edge_coeffs = a.edge_coeffs
+
+    # the same values (in a different array) reuse the hierarchy
+    assert not a.set_coeffs(c.copy())
+    assert a.edge_coeffs is edge_coeffs
+
+    c2 = c.copy()
+    c2.v()[:, :] *= 2.0 + g.x2d[g.ilo:g.ihi+1, g.jlo:g.jhi+1]
+
+    assert a.set_coeffs(c2)
+    a.solve(rtol=1.e-11)
+
+    ref = setup_mg(c2)
+    ref.solve(rtol=1.e-11)
+
+    assert a.num_cycles == ref.num_cycles
+    assert_array_equal(a.get_solution(), ref.get_solution())
+
+
+# a batched solve should give the same solutions (and cycle counts) as
+# separate solves, freezing each system as it converges -- here the
+# first system starts from its converged solution, so it is done after
+# one cycle
+@pytest.mark.parametrize("kwargs", [{},
+                                    {"cycle_type": "W"},
+                                    {"bottom_solver": "direct", "bottom_size": 8}])
+def test_solve_batch(kwargs):
+
+    def solve(f, guess):
+        b = MG.CellCenterMG2d(32, 32, alpha=1.0, beta=1.0,
+                              xl_BC_type="dirichlet", xr_BC_type="dirichlet",
+                              yl_BC_type="periodic", yr_BC_type="periodic",
+                              xl_BC=lambda y: np.sin(2.0*np.pi*y),
+                              **kwargs)
+        b.init_solution(guess)
+        b.init_RHS(f)
+        b.solve(rtol=1.e-11)
+        return b
+
+    a = solve(np.zeros((34, 34)), np.zeros((34, 34)))
+
+    rhs = np.array([np.sin(2.0*np.pi*(k+1)*a.x2d)*np.cos(2.0*np.pi*a.y2d)
+                    for k in range(4)])
+    guess = np.zeros_like(rhs)
+    guess[0] = solve(rhs[0], guess[0]).get_solution()
+
+    soln = a.solve_batch(rhs, rtol=1.e-11, guess=guess)
+    assert soln.shape == rhs.shape
+    assert (a.residual_error < 1.e-11).all()
+    assert a.num_cycles[0] == 1 and (a.num_cycles[1:] > 1).all()
+
+    for k in range(rhs.shape[0]):
+        b = solve(rhs[k], guess[k])
+
+        assert a.num_cycles[k] == b.num_cycles
+        assert_array_equal(soln[k], b.get_solution())
@@ -18,6 +18,7 @@ import matplotlib.pyplot as plt
 
 import multigrid.MG as MG
 import multigrid.edge_coeffs as ec
+import multigrid.mg_kernels as mg_kernels
 
 np.set_printoptions(precision=3, linewidth=128)
 
@@ -28,7 +29,8 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
 
     we need to accept a coefficient array, coeffs, defined at each
     level.  We can do this at the fine level and restrict it
-    down the MG grids once.
+    down the MG grids once.  The coefficients can be changed later
+    with ``set_coeffs()``, which only redoes this if they differ.
 
     we need a new ``compute_residual()`` and ``smooth()`` function, that
     understands coeffs.
@@ -38,6 +40,8 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
                  xl_BC_type="dirichlet", xr_BC_type="dirichlet",
                  yl_BC_type="dirichlet", yr_BC_type="dirichlet",
                  nsmooth=10, nsmooth_bottom=50,
+                 cycle_type="V", fmg=0,
+                 bottom_solver="smooth", bottom_size=2,
                  verbose=0,
                  coeffs=None, coeffs_bc=None,
                  true_function=None, vis=0, vis_title=""):
@@ -53,25 +57,59 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
                                    yl_BC_type=yl_BC_type, yr_BC_type=yr_BC_type,
                                    alpha=0.0, beta=0.0,
                                    nsmooth=nsmooth, nsmooth_bottom=nsmooth_bottom,
+                                   cycle_type=cycle_type, fmg=fmg,
+                                   bottom_solver=bottom_solver,
+                                   bottom_size=bottom_size,
                                    verbose=verbose,
                                    aux_field=["coeffs"], aux_bc=[coeffs_bc],
                                    true_function=true_function, vis=vis,
                                    vis_title=vis_title)
 
-        # set the coefficients and restrict them down the hierarchy
-        # we only need to do this once.  We need to hold the original
-        # coeffs in our grid so we can do a ghost cell fill.
+        # the fine-level coefficients the hierarchy was last built from
+        self.fine_coeffs = None
+
+        self.set_coeffs(coeffs)
+
+    def set_coeffs(self, coeffs):
+        """
+        Set the coefficients, eta, and restrict them down the
+        hierarchy.  The hierarchy is only rebuilt if the coefficients
+        differ from the ones it was last built from, so the same
+        solver can be reused for many solves (e.g. one per timestep)
+        with only the RHS and initial guess changing between them.
+
+        Parameters
+        ----------
+        coeffs : ndarray
+            An array (of the same size as the finest MG level) with
+            the coefficients.  Only the valid zones are used.
+
+        Returns
+        -------
+        out : bool
+            True if the hierarchy was rebuilt
+
+        """
+
         c = self.grids[self.nlevels-1].get_var("coeffs")
 
-        if c.g.nx != nx or c.g.ny != ny:
+        if coeffs.g.nx != self.nx or coeffs.g.ny != self.ny:
             raise IndexError("coefficient array not the same size as multigrid problem")
 
-        c.v()[:, :] = coeffs.v().copy()
+        if self.fine_coeffs is not None and \
+           np.array_equal(self.fine_coeffs, coeffs.v()):
+            return False
+
+        self.fine_coeffs = coeffs.v().copy()
+
+        # we need to hold the original coeffs in our grid so we can do
+        # a ghost cell fill
+        c.v()[:, :] = self.fine_coeffs
 
         self.grids[self.nlevels-1].fill_BC("coeffs")
 
         # put the coefficients on edges
-        self.edge_coeffs.insert(0, ec.EdgeCoeffs(self.grids[self.nlevels-1].grid, c))
+        self.edge_coeffs = [ec.EdgeCoeffs(self.grids[self.nlevels-1].grid, c)]
 
         n = self.nlevels-2
         while n >= 0:
@@ -82,12 +120,12 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
             c_patch = self.grids[n]
 
             coeffs_c = c_patch.get_var("coeffs")
-            coeffs_c.v()[:, :] = f_patch.restrict("coeffs").v()
+            coeffs_c.v()[:, :] = f_patch.restrict("coeffs", N=self.ratios[n+1]).v()
 
             self.grids[n].fill_BC("coeffs")
 
             # put the coefficients on edges
-            self.edge_coeffs.insert(0, self.edge_coeffs[0].restrict())  # _EdgeCoeffs(self.grids[n].grid, coeffs_c))
+            self.edge_coeffs.insert(0, self.edge_coeffs[0].restrict(N=self.ratios[n+1]))
 
             # if we are periodic, then we should force the edge coefficents
             # to be periodic
@@ -101,6 +139,11 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
 
             n -= 1
 
+        # the operator changed, so any bottom factorization is stale
+        self.bottom_lu = None
+
+        return True
+
     def smooth(self, level, nsmooth):
         """
         Use red-black Gauss-Seidel iterations to smooth the solution
@@ -120,53 +163,32 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
         v = self.grids[level].get_var("v")
         f = self.grids[level].get_var("f")
 
-        self.grids[level].fill_BC("v")
+        myg = self.grids[level].grid
 
         eta_x = self.edge_coeffs[level].x
         eta_y = self.edge_coeffs[level].y
 
-        # print( "min/max c: {}, {}".format(np.min(c), np.max(c)))
-        # print( "min/max eta_x: {}, {}".format(np.min(eta_x), np.max(eta_x)))
-        # print( "min/max eta_y: {}, {}".format(np.min(eta_y), np.max(eta_y)))
-
-        # do red-black G-S
-        for i in range(nsmooth):
-
-            # do the red black updating in four decoupled groups
-            #
-            #
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #        |   4   |   3   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |       |       |
-            #   jlo  |   1   |   2   |
-            #        |       |       |
-            #      --+-------+-------+--
-            #        |  ilo  |       |
-            #
-            # groups 1 and 3 are done together, then we need to
-            # fill ghost cells, and then groups 2 and 4
-
-            for n, (ix, iy) in enumerate([(0, 0), (1, 1), (1, 0), (0, 1)]):
-
-                denom = (eta_x.ip_jp(1+ix, iy, s=2) + eta_x.ip_jp(ix, iy, s=2) +
-                         eta_y.ip_jp(ix, 1+iy, s=2) + eta_y.ip_jp(ix, iy, s=2))
-
-                v.ip_jp(ix, iy, s=2)[:, :] = (-f.ip_jp(ix, iy, s=2) +
-                    # eta_{i+1/2,j} phi_{i+1,j}
-                    eta_x.ip_jp(1+ix, iy, s=2) * v.ip_jp(1+ix, iy, s=2) +
-                    # eta_{i-1/2,j} phi_{i-1,j}
-                    eta_x.ip_jp(ix, iy, s=2) * v.ip_jp(-1+ix, iy, s=2) +
-                    # eta_{i,j+1/2} phi_{i,j+1}
-                    eta_y.ip_jp(ix, 1+iy, s=2) * v.ip_jp(ix, 1+iy, s=2) +
-                    # eta_{i,j-1/2} phi_{i,j-1}
-                    eta_y.ip_jp(ix, iy, s=2) * v.ip_jp(ix, -1+iy, s=2)) / denom
-
-                if n == 1 or n == 3:
-                    self.grids[level].fill_BC("v")
+        # with visualization on, we smooth one iteration at a time so
+        # we can plot after each
+        nsweeps = 1 if self.vis == 1 else max(nsmooth, 1)
+
+        # the number of sweeps in each call -- the last call does any
+        # remainder
+        sweeps = [nsweeps]*(nsmooth // nsweeps)
+        if nsmooth % nsweeps > 0:
+            sweeps.append(nsmooth % nsweeps)
+
+        # the ghost cells are filled even if we do no smoothing
+        mg_kernels.fill_ghost(v, myg.ng, myg.dx, myg.dy, *self.ghost_bcs[level])
+
+        # do red-black G-S -- each call does n complete sweeps,
+        # including the ghost cell fills between the red and black
+        # updates
+        for n in sweeps:
+
+            mg_kernels.smooth_vc(v, f, eta_x, eta_y,
+                                 myg.ng, myg.dx, myg.dy, n,
+                                 *self.ghost_bcs[level])
 
             if self.vis == 1:
                 plt.clf()
@@ -201,14 +223,16 @@ class VarCoeffCCMG2d(MG.CellCenterMG2d):
 
         # compute the residual
         # r = f - L_eta phi
-        L_eta_phi = (
-            # eta_{i+1/2,j} (phi_{i+1,j} - phi_{i,j})
-            eta_x.ip(1)*(v.ip(1) - v.v()) - \
-            # eta_{i-1/2,j} (phi_{i,j} - phi_{i-1,j})
-            eta_x.v()*(v.v() - v.ip(-1)) + \
-            # eta_{i,j+1/2} (phi_{i,j+1} - phi_{i,j})
-            eta_y.jp(1)*(v.jp(1) - v.v()) - \
-            # eta_{i,j-1/2} (phi_{i,j} - phi_{i,j-1})
-            eta_y.v()*(v.v() - v.jp(-1)))
-
-        r.v()[:, :] = f.v() - L_eta_phi
+        mg_kernels.residual_vc(v, f, r, eta_x, eta_y, self.grids[level].grid.ng)
+
+    def _smooth_batch(self, level, v, f, nsmooth):
+        """smooth a batch of solutions at a given level"""
+        myg = self.grids[level].grid
+        mg_kernels.smooth_vc_batch(v, f, self.edge_coeffs[level].x, self.edge_coeffs[level].y,
+                                   myg.ng, myg.dx, myg.dy, nsmooth,
+                                   *self.ghost_bcs[level])
+
+    def _residual_batch(self, level, v, f, r):
+        """compute the residual of a batch of solutions at a given level"""
+        mg_kernels.residual_vc_batch(v, f, r, self.edge_coeffs[level].x, self.edge_coeffs[level].y,
+                                     self.grids[level].grid.ng)
@@ -95,14 +95,10 @@ class Particles(object):
         """
         Initialize the Particles object.
 
-        Particles are stored as a dictionary, with their keys being tuples
-        of their initial position. This was done in order to have a simple way
-        to access the initial particle positions when plotting.
-
-        However, this assumes that no two particles are
-        initialised with the same initial position, which is fine for the
-        massless particle case, however could no longer be a sensible thing
-        to do if have particles have other properties (e.g. mass).
+        The particles are stored as a structure of arrays: the current
+        positions, the velocities, the initial positions (used to dye
+        the particles when plotting), and an integer id, with one row
+        per particle.  This lets us update all of the particles at once.
 
         Parameters
         ----------
@@ -122,13 +118,12 @@ class Particles(object):
 
         self.sim_data = sim_data
         self.bc = bc
-        self.particles = dict()
 
         if n_particles <= 0:
             msg.fail("ERROR: n_particles = %s <= 0" % (n_particles))
 
         if callable(particle_generator):  # custom particle generator function
-            self.particles = particle_generator(n_particles)
+            self.set_particles(particle_generator(n_particles))
         else:
             if particle_generator == "random":
                 self.randomly_generate_particles(n_particles)
@@ -140,7 +135,52 @@ class Particles(object):
                 msg.fail("ERROR: do not recognise particle generator %s"
                          % (particle_generator))
 
-        self.n_particles = len(self.particles)
+    def _create(self, positions, init_positions=None):
+        """
+        Create the particle arrays from an (N, 2) array of positions and
+        (optionally) of initial positions.  The velocities start at 0.
+        """
+
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+
+        if init_positions is None:
+            self.init_positions = self.positions.copy()
+        else:
+            self.init_positions = np.array(init_positions, dtype=np.float64).reshape(-1, 2)
+
+        self.velocities = np.zeros_like(self.positions)
+        self.ids = np.arange(len(self.positions))
+
+        self.n_particles = len(self.positions)
+
+    def set_particles(self, particle_dict):
+        """
+        Set the particles from a dictionary of Particle objects, keyed by
+        their initial positions.  This is the form returned by a custom
+        particle generator function.
+
+        Parameters
+        ----------
+        particle_dict : dict
+            Dictionary of Particle objects
+        """
+
+        self._create([[p.x, p.y] for p in particle_dict.values()],
+                     [[x, y] for (x, y) in particle_dict.keys()])
+
+        self.velocities[:, 0] = [p.u for p in particle_dict.values()]
+        self.velocities[:, 1] = [p.v for p in particle_dict.values()]
+
+    @property
+    def particles(self):
+        """
+        A dictionary of Particle objects, keyed by their initial
+        positions.  This is a copy of the particle data -- changing
+        it does not change the particles.
+        """
+        return {(ix, iy): Particle(x, y, u, v) for (ix, iy), (x, y), (u, v)
+                in zip(self.init_positions.tolist(), self.positions.tolist(),
+                       self.velocities.tolist())}
 
     def randomly_generate_particles(self, n_particles):
         """
@@ -156,8 +196,7 @@ class Particles(object):
         positions[:, 1] = positions[:, 1] * (myg.ymax - myg.ymin) + \
             myg.ymin
 
-        for (x, y) in positions:
-            self.particles[(x, y)] = Particle(x, y)
+        self._create(positions)
 
     def grid_generate_particles(self, n_particles):
         """
@@ -181,9 +220,10 @@ class Particles(object):
         xs += 0.5 * step
         ys, step = np.linspace(myg.ymin, myg.ymax, num=sq_n_particles, endpoint=False, retstep=True)
         ys += 0.5 * step
-        for x in xs:
-            for y in ys:
-                self.particles[(x, y)] = Particle(x, y)
+
+        # x varies slowest
+        x2d, y2d = np.meshgrid(xs, ys, indexing="ij")
+        self._create(np.column_stack((x2d.ravel(), y2d.ravel())))
 
     def array_generate_particles(self, pos_array, init_array=None):
         """
@@ -202,12 +242,61 @@ class Particles(object):
             msg.fail("ERROR: Array of particle positions has not been passed into Particles constructor.\
             Cannot generate particles.")
 
-        if init_array is None:
-            for (x, y) in pos_array:
-                self.particles[(x, y)] = Particle(x, y)
-        else:
-            for (ix, iy), (x, y) in zip(init_array, pos_array):
-                self.particles[(ix, iy)] = Particle(x, y)
+        self._create(pos_array, init_array)
+
+    def interpolate_velocity(self, u, v, positions=None):
+        """
+        Bilinearly interpolate the x- and y-velocities defined on the
+        grid to the particle positions.
+
+        Parameters
+        ----------
+        u : ArrayIndexer
+            x-velocity
+        v : ArrayIndexer
+            y_velocity
+        positions : float array, optional
+            (N, 2) array of positions to interpolate to.  If not given,
+            the current particle positions are used.
+
+        Returns
+        -------
+        out : float array, float array
+            The x- and y-velocities at each position
+        """
+
+        myg = self.sim_data.grid
+
+        if positions is None:
+            positions = self.positions
+
+        # find what cell each particle lives in
+        x_idx = (positions[:, 0] - myg.xmin) / myg.dx - 0.5
+        y_idx = (positions[:, 1] - myg.ymin) / myg.dy - 0.5
+
+        x_frac = x_idx % 1
+        y_frac = y_idx % 1
+
+        # get the index of the particle's closest bottom left cell.
+        # We allow for a single ghost cell, to catch the cases where
+        # the particle is near the edges of the grid.
+        x_idx = x_idx.astype(int) + myg.ilo
+        y_idx = y_idx.astype(int) + myg.jlo
+
+        # the interpolation weights
+        w_00 = (1-x_frac)*(1-y_frac)
+        w_10 = x_frac*(1-y_frac)
+        w_01 = (1-x_frac)*y_frac
+        w_11 = x_frac*y_frac
+
+        vels = []
+        for q in [np.asarray(u), np.asarray(v)]:
+            vels.append(w_00*q[x_idx, y_idx] +
+                        w_10*q[x_idx+1, y_idx] +
+                        w_01*q[x_idx, y_idx+1] +
+                        w_11*q[x_idx+1, y_idx+1])
+
+        return vels[0], vels[1]
 
     def update_particles(self, dt, u=None, v=None):
         r"""
@@ -227,7 +316,6 @@ class Particles(object):
         v : ArrayIndexer object
             y-velocity
         """
-        myg = self.sim_data.grid
 
         if (u is None) and (v is None):
             u, v = self.sim_data.get_var("velocity")
@@ -236,109 +324,86 @@ class Particles(object):
         elif v is None:
             v = self.sim_data.get_var("y-velocity")
 
-        for k, p in self.particles.items():
+        # predict the location at dt/2
+        u_vel, v_vel = self.interpolate_velocity(u, v)
 
-            # save old position and predict location at dt/2
-            initial_position = p.pos()
+        half_positions = self.positions.copy()
+        half_positions[:, 0] += u_vel * (0.5*dt)
+        half_positions[:, 1] += v_vel * (0.5*dt)
 
-            u_vel, v_vel = p.interpolate_velocity(myg, u, v)
+        # find velocity at dt/2
+        u_vel, v_vel = self.interpolate_velocity(u, v, half_positions)
 
-            p.update(u_vel, v_vel, 0.5*dt)
+        # update to final time using original position and vel at dt/2
+        self.velocities[:, 0] = u_vel
+        self.velocities[:, 1] = v_vel
 
-            # find velocity at dt/2
-            u_vel, v_vel = p.interpolate_velocity(myg, u, v)
-
-            # update to final time using original position and vel at dt/2
-            p.x, p.y = initial_position
-
-            p.update(u_vel, v_vel, dt)
+        self.positions[:, 0] += u_vel * dt
+        self.positions[:, 1] += v_vel * dt
 
         self.enforce_particle_boundaries()
 
     def enforce_particle_boundaries(self):
         """
-        Enforce the particle boundaries
-
-        TODO: copying the dict and adding everything back again is messy
-        - think of a better way to do this? Did it this way so don't have
-        to remove items from a dictionary while iterating it for outflow
-        boundaries.
+        Enforce the particle boundaries.  Particles that leave through
+        an outflow boundary are removed.
         """
-        old_particles = self.particles.copy()
-        self.particles = dict()
 
         myg = self.sim_data.grid
 
-        xlb = self.bc.xlb
-        xrb = self.bc.xrb
-        ylb = self.bc.ylb
-        yrb = self.bc.yrb
-
-        while old_particles:
-            k, p = old_particles.popitem()
-
-            # -x boundary
-            if p.x < myg.xmin:
-                if xlb in ["outflow", "neumann"]:
-                    continue
-                elif xlb == "periodic":
-                    p.x = myg.xmax + p.x - myg.xmin
-                elif xlb in ["reflect-even", "reflect-odd", "dirichlet"]:
-                    p.x = 2 * myg.xmin - p.x
-                else:
-                    msg.fail("ERROR: xlb = %s invalid BC for particles" % (xlb))
-
-            # +x boundary
-            if p.x > myg.xmax:
-                if xrb in ["outflow", "neumann"]:
-                    continue
-                elif xrb == "periodic":
-                    p.x = myg.xmin + p.x - myg.xmax
-                elif xrb in ["reflect-even", "reflect-odd", "dirichlet"]:
-                    p.x = 2 * myg.xmax - p.x
-                else:
-                    msg.fail("ERROR: xrb = %s invalid BC for particles" % (xrb))
-
-            # -y boundary
-            if p.y < myg.ymin:
-                if ylb in ["outflow", "neumann"]:
-                    continue
-                elif ylb == "periodic":
-                    p.y = myg.ymax + p.y - myg.ymin
-                elif ylb in ["reflect-even", "reflect-odd", "dirichlet"]:
-                    p.y = 2 * myg.ymin - p.y
-                else:
-                    msg.fail("ERROR: ylb = %s invalid BC for particles" % (ylb))
-
-            # +y boundary
-            if p.y > myg.ymax:
-                if yrb in ["outflow", "neumann"]:
-                    continue
-                elif yrb == "periodic":
-                    p.y = myg.ymin + p.y - myg.ymax
-                elif yrb in ["reflect-even", "reflect-odd", "dirichlet"]:
-                    p.y = 2 * myg.ymax - p.y
-                else:
-                    msg.fail("ERROR: yrb = %s invalid BC for particles" % (yrb))
-
-            self.particles[k] = p
-
-        self.n_particles = len(self.particles)
+        x = self.positions[:, 0]
+        y = self.positions[:, 1]
+
+        # the particles still in the domain
+        keep = np.ones(self.n_particles, dtype=bool)
+
+        # the boundaries are processed in the order -x, +x, -y, +y,
+        # since a particle moved by one BC can then cross another.  For
+        # each we give the coordinate, the boundary, and the opposite
+        # boundary (for periodic)
+        edges = [("xlb", self.bc.xlb, x, myg.xmin, myg.xmax),
+                 ("xrb", self.bc.xrb, x, myg.xmax, myg.xmin),
+                 ("ylb", self.bc.ylb, y, myg.ymin, myg.ymax),
+                 ("yrb", self.bc.yrb, y, myg.ymax, myg.ymin)]
+
+        for name, btype, q, wall, other in edges:
+
+            if name in ["xlb", "ylb"]:
+                idx = keep & (q < wall)
+            else:
+                idx = keep & (q > wall)
+
+            if not idx.any():
+                continue
+
+            if btype in ["outflow", "neumann"]:
+                keep[idx] = False
+            elif btype == "periodic":
+                q[idx] = other + q[idx] - wall
+            elif btype in ["reflect-even", "reflect-odd", "dirichlet"]:
+                q[idx] = 2 * wall - q[idx]
+            else:
+                msg.fail("ERROR: %s = %s invalid BC for particles" % (name, btype))
+
+        if not keep.all():
+            self.positions = self.positions[keep]
+            self.velocities = self.velocities[keep]
+            self.init_positions = self.init_positions[keep]
+            self.ids = self.ids[keep]
+
+        self.n_particles = len(self.positions)
 
     def get_positions(self):
         """
         Return an array of current particle positions.
         """
-        return np.array([[p.x, p.y] for p in self.particles.values()])
+        return self.positions.copy()
 
     def get_init_positions(self):
         """
         Return initial positions of the particles as an array.
-
-        We defined the particles as a dictionary with their initial positions
-        as the keys, so this just becomes a restructuring operation.
         """
-        return np.array([[x, y] for (x, y) in self.particles.keys()])
+        return self.init_positions.copy()
 
     def write_particles(self, f):
         """
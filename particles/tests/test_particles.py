@@ -285,3 +285,37 @@ def test_outflow_bcs():
     correct_positions = [[0.5, 0.1], [0.9, 0.5]]
 
     np.testing.assert_array_almost_equal(positions, correct_positions)
+
+
+def test_particle_arrays():
+    """
+    Test the particle arrays stay consistent when particles are removed.
+    """
+
+    extra_rp_params = {"mesh.xlboundary": "outflow",
+                       "mesh.xrboundary": "outflow",
+                       "mesh.ylboundary": "periodic",
+                       "mesh.yrboundary": "periodic"}
+
+    myd, bc, _ = setup_test(extra_rp_params=extra_rp_params)
+
+    init_particle_positions = [[0.05, 0.5], [0.5, 0.5], [0.95, 0.5]]
+
+    ps = particles.Particles(myd, bc, 3, "array", init_particle_positions)
+
+    u = myd.grid.scratch_array()
+    v = myd.grid.scratch_array()
+
+    u[:, :] = 1
+    v[:, :] = 1
+
+    ps.update_particles(0.1, u, v)
+
+    # the last particle flows out through the +x boundary
+    assert ps.n_particles == 2
+    assert_array_equal(ps.ids, [0, 1])
+    assert_array_equal(ps.get_init_positions(), init_particle_positions[:2])
+    assert_array_equal(ps.velocities, [[1, 1], [1, 1]])
+
+    np.testing.assert_array_almost_equal(ps.get_positions(),
+                                         [[0.15, 0.6], [0.6, 0.6]])
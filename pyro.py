@@ -325,6 +325,7 @@ class PyroBenchmark(Pyro):
             basename + "%4.4d" % (self.sim.n)
         msg.warning("storing new benchmark: {}\n".format(bench_file))
         self.sim.write(bench_file)
+        self.sim.flush_output()
 
 
 def parse_args():
@@ -1,8 +1,9 @@
+import copy
 import h5py
 import importlib
 import mesh.boundary as bnd
 import mesh.patch as patch
-from util import msg, profile
+from util import msg, profile, io
 
 
 def grid_setup(rp, ng=1):
@@ -36,6 +37,15 @@ def grid_setup(rp, ng=1):
     my_grid = patch.Grid2d(nx, ny,
                            xmin=xmin, xmax=xmax,
                            ymin=ymin, ymax=ymax, ng=ng)
+
+    try:
+        scratch_pool = rp.get_param("mesh.scratch_pool")
+    except KeyError:
+        scratch_pool = 0
+
+    if scratch_pool:
+        my_grid.enable_pool()
+
     return my_grid
 
 
@@ -163,6 +173,9 @@ class NullSimulation(object):
         self.cc_data = None
         self.particles = None
 
+        # the background writer, if we are doing asynchronous output
+        self.writer = None
+
         self.SMALL = 1.e-12
 
         self.solver_name = solver_name
@@ -263,14 +276,86 @@ class NullSimulation(object):
 
         problem.finalize()
 
+        # finish any outputs and stop the background writer
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
     def write(self, filename):
         """
-        Output the state of the simulation to an HDF5 file for plotting
+        Output the state of the simulation to an HDF5 file for plotting.
+
+        If io.async_output is set, then the state is copied and the
+        file is written in the background while we continue to evolve.
         """
 
         if not filename.endswith(".h5"):
             filename += ".h5"
 
+        try:
+            async_output = self.rp.get_param("io.async_output")
+        except (AttributeError, KeyError):
+            async_output = 0
+
+        if async_output:
+            if self.writer is None:
+                self.writer = io.AsyncWriter(self.rp.get_param("io.async_depth"))
+
+            snap = self.stage_output(self.writer.get_buffer())
+            self.writer.submit(snap.write_file, filename, snap)
+        else:
+            self.write_file(filename)
+
+    def flush_output(self):
+        """
+        Wait for any outputs that are being written in the background
+        to finish.
+        """
+
+        if self.writer is not None:
+            self.writer.flush()
+
+    def stage_output(self, snap=None):
+        """
+        Return a copy of the simulation that can be written out while
+        the original continues to evolve.  The state data, particles,
+        and runtime parameters are copied; everything else is shared.
+
+        Parameters
+        ----------
+        snap : NullSimulation, optional
+            A copy made by an earlier call whose write has finished.
+            Its state array is reused if it is the right size.
+        """
+
+        cc_data = copy.copy(self.cc_data)
+        cc_data.aux = dict(self.cc_data.aux)
+
+        if snap is not None and snap.cc_data.data.shape == self.cc_data.data.shape:
+            cc_data.data = snap.cc_data.data
+            cc_data.data[...] = self.cc_data.data
+        else:
+            cc_data.data = self.cc_data.data.copy()
+
+        snap = copy.copy(self)
+        snap.cc_data = cc_data
+        snap.writer = None
+
+        if self.particles is not None:
+            snap.particles = copy.copy(self.particles)
+            snap.particles.positions = self.particles.positions.copy()
+            snap.particles.init_positions = self.particles.init_positions.copy()
+
+        snap.rp = copy.copy(self.rp)
+        snap.rp.params = dict(self.rp.params)
+
+        return snap
+
+    def write_file(self, filename):
+        """
+        Write the state of the simulation to the HDF5 file filename
+        """
+
         with h5py.File(filename, "w") as f:
 
             # main attributes
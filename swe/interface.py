@@ -576,3 +576,56 @@ def consFlux(idir, g, ih, ixmom, iymom, ihX, nspec, U_state):
             F[ihX:ihX + nspec] = U_state[ihX:ihX + nspec] * v
 
     return F
+
+
+@njit(cache=True)
+def _signal_speeds_zone(ih, ixmom, iymom, g, U_zone, smax):
+    """add the signal speeds of a single zone to the maxima in smax"""
+
+    h = U_zone[ih]
+    u = U_zone[ixmom] / h
+    v = U_zone[iymom] / h
+    cs = np.sqrt(g * h)
+
+    sx = abs(u) + cs
+    sy = abs(v) + cs
+
+    # keep any NaNs
+    if sx > smax[0] or sx != sx:
+        smax[0] = sx
+    if sy > smax[1] or sy != sy:
+        smax[1] = sy
+
+
+@njit(cache=True)
+def signal_speeds(ih, ixmom, iymom, g, U):
+    r"""
+    Find the largest signal speeds, :math:`|u| + \sqrt{gh}` and
+    :math:`|v| + \sqrt{gh}`, over all of the zones, including the
+    ghost cells.
+
+    Parameters
+    ----------
+    ih, ixmom, iymom : int
+        The indices of the height, x-momentum and y-momentum in the
+        conserved state vector
+    g : float
+        Graviational acceleration
+    U : ndarray
+        Conserved state
+
+    Returns
+    -------
+    out : ndarray
+        The two maxima
+    """
+
+    qx, qy, _ = U.shape
+
+    smax = np.full(2, -np.inf)
+
+    for i in range(qx):
+        for j in range(qy):
+            _signal_speeds_zone(ih, ixmom, iymom, g, U[i, j, :], smax)
+
+    return smax
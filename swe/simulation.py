@@ -6,6 +6,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 import swe.derives as derives
+import swe.interface as ifc
 import swe.unsplit_fluxes as flx
 import mesh.boundary as bnd
 from simulation_null import NullSimulation, grid_setup, bc_setup
@@ -89,6 +90,33 @@ def prim_to_cons(q, g, ivars, myg):
     return U
 
 
+def signal_speeds(U, g, ivars, myg):
+    r"""
+    Return the largest signal speeds in the state, :math:`|u| +
+    \sqrt{gh}` and :math:`|v| + \sqrt{gh}`.  These set the CFL
+    timestep.  This is done by a compiled kernel, in a single pass over
+    the zones, without any temporaries.
+
+    Parameters
+    ----------
+    U : ndarray
+        The conserved state
+    g : float
+        The gravitational acceleration
+    ivars : Variables object
+        The indices of the state variables
+    myg : Grid2d object
+        The grid the state lives on
+
+    Returns
+    -------
+    out : ndarray
+        The two maximum speeds
+    """
+
+    return ifc.signal_speeds(ivars.ih, ivars.ixmom, ivars.iymom, g, U)
+
+
 class Simulation(NullSimulation):
     """The main simulation class for the corner transport upwind
     swe hydrodynamics solver
@@ -101,7 +129,10 @@ class Simulation(NullSimulation):
         the initial conditions for the chosen problem.
         """
         my_grid = grid_setup(self.rp, ng=ng)
-        my_data = self.data_class(my_grid)
+
+        # the memory layout of the state -- variable-major keeps each
+        # variable contiguous
+        my_data = self.data_class(my_grid, layout=self.rp.get_param("mesh.layout"))
 
         bc, bc_xodd, bc_yodd = bc_setup(self.rp)
 
@@ -167,14 +198,13 @@ class Simulation(NullSimulation):
 
         cfl = self.rp.get_param("driver.cfl")
 
-        # get the variables we need
-        u, v, cs = self.cc_data.get_var(["velocity", "soundspeed"])
+        # the largest |u| + cs and |v| + cs
+        myg = self.cc_data.grid
+        sx, sy = signal_speeds(self.cc_data.data, self.cc_data.get_aux("g"),
+                               self.ivars, myg)
 
         # the timestep is min(dx/(|u| + cs), dy/(|v| + cs))
-        xtmp = self.cc_data.grid.dx/(abs(u) + cs)
-        ytmp = self.cc_data.grid.dy/(abs(v) + cs)
-
-        self.dt = cfl*float(min(xtmp.min(), ytmp.min()))
+        self.dt = cfl*float(min(myg.dx/sx, myg.dy/sy))
 
     def evolve(self):
         """
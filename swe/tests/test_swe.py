@@ -22,6 +22,7 @@ class TestSimulation(object):
 
         self.rp.params["mesh.nx"] = 8
         self.rp.params["mesh.ny"] = 8
+        self.rp.params["mesh.layout"] = "zone-major"
         self.rp.params["particles.do_particles"] = 0
 
         self.rp.params["swe.grav"] = 1.0
@@ -53,3 +54,17 @@ class TestSimulation(object):
         g = self.sim.cc_data.get_aux("g")
         cs = self.sim.cc_data.get_var("soundspeed")
         assert np.all(cs == np.sqrt(g))
+
+    def test_signal_speeds(self):
+
+        myd = self.sim.cc_data
+        myg = myd.grid
+        g = myd.get_aux("g")
+
+        myd.get_var("x-momentum")[:, :] = 0.1*myg.x2d
+        myd.get_var("y-momentum")[:, :] = -0.2*myg.y2d
+
+        u, v, cs = myd.get_var(["velocity", "soundspeed"])
+
+        s = sn.signal_speeds(myd.data, g, self.sim.ivars, myg)
+        assert s[0] == (abs(u) + cs).max() and s[1] == (abs(v) + cs).max()
@@ -1,6 +1,7 @@
 from pyro import Pyro
 from numpy.testing import assert_array_equal
 import numpy as np
+import pytest
 
 
 class TestSimulation(object):
@@ -62,3 +63,33 @@ class TestSimulation(object):
         assert_array_equal(dens, np.ones_like(dens))
 
         assert pyro_sim.sim.cc_data.t == 1
+
+
+@pytest.mark.parametrize("solver_name, problem_name",
+                         [("compressible", "sedov"),
+                          ("compressible_react", "rt"),
+                          ("compressible_rk", "kh"),
+                          ("compressible_fv4", "acoustic_pulse"),
+                          ("compressible_sdc", "acoustic_pulse")])
+def test_scratch_pool(solver_name, problem_name):
+    """
+    Check that each solver that uses the scratch pool gets the same
+    answer with and without it.
+    """
+
+    def run(pool):
+        pyro_sim = Pyro(solver_name)
+        pyro_sim.initialize_problem(problem_name,
+                                    inputs_dict={"mesh.nx": 16,
+                                                 "mesh.ny": 16,
+                                                 "vis.dovis": 0,
+                                                 "driver.verbose": 0,
+                                                 "driver.max_steps": 5,
+                                                 "mesh.scratch_pool": pool})
+        pyro_sim.run_sim()
+        return pyro_sim.sim.cc_data.data
+
+    no_pool = run(0)
+    pool = run(1)
+    assert np.all(np.isfinite(pool))
+    assert_array_equal(pool, no_pool)
@@ -1,12 +1,17 @@
-"""This manages the reading of the HDF5 output files for pyro.
+"""This manages the reading of the HDF5 output files for pyro, and
+the background writer used for asynchronous output.
 
 """
+import atexit
 import importlib
+import queue
+import threading
 
 import h5py
 import mesh.patch as patch
 import mesh.boundary as bnd
 import particles.particles as particles
+from util import msg
 
 
 def read_bcs(f):
@@ -71,8 +76,9 @@ def read(filename):
         for n in gs:
             names.append(n)
 
-        # create the CellCenterData2d object
-        myd = patch.CellCenterData2d(myg)
+        # create the CellCenterData2d object, with the layout it was
+        # written with (older files don't record it)
+        myd = patch.CellCenterData2d(myg, layout=gs.attrs.get("layout", "zone-major"))
 
         for n in names:
             grp = gs[n]
@@ -217,3 +223,137 @@ def read_1d(filename):
         return sim
 
     return myd
+
+
+# the writers whose background threads are running -- any that are
+# still open when the interpreter exits are closed then, so their
+# pending writes are finished
+_writers = set()
+
+
+def _close_writers():
+    """close all of the open writers"""
+    for writer in list(_writers):
+        writer.close()
+
+
+atexit.register(_close_writers)
+
+
+class AsyncWriter(object):
+    """
+    Write output files in a background thread, so the evolution can
+    continue while the file is written.
+
+    The caller copies the state into a staging buffer (see
+    ``get_buffer``) and passes it, along with the function that does
+    the write, to ``submit``.  At most ``depth`` buffers exist, so at
+    most ``depth`` outputs can be waiting to be written -- if they are
+    all in use, ``get_buffer`` waits until a write finishes and its
+    buffer can be reused.
+    """
+
+    def __init__(self, depth=2):
+        """
+        Create the writer and start the background thread.
+
+        Parameters
+        ----------
+        depth : int, optional
+            The maximum number of outputs that can be waiting to be
+            written
+        """
+
+        if depth < 1:
+            msg.fail("ERROR: async output depth must be >= 1")
+
+        self.depth = depth
+        self.nbuffers = 0
+
+        # staging buffers that are free to reuse, and writes to do
+        self.free = queue.Queue()
+        self.jobs = queue.Queue()
+
+        self.error = None
+
+        self.thread = threading.Thread(target=self._work, daemon=True)
+        self.thread.start()
+
+        _writers.add(self)
+
+    def get_buffer(self):
+        """
+        Return a staging buffer whose write has finished, or None if a
+        new buffer should be created.  If all the buffers are in use,
+        this blocks until one is free.
+        """
+
+        self._check()
+
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            pass
+
+        if self.nbuffers < self.depth:
+            self.nbuffers += 1
+            return None
+
+        return self.free.get()
+
+    def submit(self, func, filename, buffer):
+        """
+        Write the file in the background by calling func(filename).
+        Once the write is done, buffer is available for reuse.
+        """
+
+        self.jobs.put((func, filename, buffer))
+
+    def flush(self):
+        """
+        Wait until all the pending writes are done.
+        """
+
+        self.jobs.join()
+        self._check()
+
+    def close(self):
+        """
+        Wait until all the pending writes are done, then stop the
+        background thread.  The writer cannot be used after this.
+        """
+
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+            _writers.discard(self)
+
+        self._check()
+
+    def _work(self):
+        """ the background thread: do the writes in order, until we
+        are told to stop """
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+
+            func, filename, buffer = job
+            try:
+                func(filename)
+            except Exception as e:
+                self.error = (filename, e)
+            finally:
+                self.free.put(buffer)
+                self.jobs.task_done()
+
+    def _check(self):
+        """ report any error from a background write """
+
+        if self.error is not None:
+            filename, e = self.error
+            self.error = None
+            msg.fail("ERROR: unable to write {}: {}".format(filename, e))